@@ -20,6 +20,7 @@ from alpaca.data.requests import StockBarsRequest
 from alpaca.data.timeframe import TimeFrame
 import alpaca.data
 from combined_strategy import MarketRegime
+from historical_data_store import get_data_store
 
 logger = logging.getLogger(__name__)
 
@@ -58,6 +59,9 @@ class BacktestEngine:
         # Initialize Alpaca client
         self.data_client = StockHistoricalDataClient(api_key, api_secret)
         
+        # Shared batched data layer with an on-disk Parquet cache
+        self.data_store = get_data_store(api_key, api_secret)
+        
         # Initialize positions and orders
         self.positions = {}
         self.orders = []
@@ -106,72 +110,24 @@ class BacktestEngine:
         
         data = {}
         
+        try:
+            # One batched request for all symbols; cached days are not fetched again
+            bars = self.data_store.get_bars(self.symbols, self.start_date, self.end_date, self.timeframe)
+        except Exception as e:
+            logger.error(f"Error fetching historical data: {e}")
+            return data
+        
         for symbol in self.symbols:
-            try:
-                # Create request
-                request_params = StockBarsRequest(
-                    symbol_or_symbols=symbol,
-                    timeframe=self.alpaca_timeframe,
-                    start=self.start_date,
-                    end=self.end_date,
-                    adjustment='all'  # Apply all adjustments
-                )
-                
-                # Get bars
-                bars = self.data_client.get_stock_bars(request_params)
-                
-                # Convert to dataframe
-                if bars and hasattr(bars, 'df'):
-                    # If bars returned as a single dataframe
-                    df = bars.df
-                    
-                    # Filter for the specific symbol if needed
-                    if 'symbol' in df.columns:
-                        df = df[df['symbol'] == symbol]
-                    
-                    # Reset index to make timestamp a column
-                    df = df.reset_index()
-                    
-                    # Rename columns to match expected format
-                    df = df.rename(columns={
-                        'timestamp': 'timestamp',
-                        'open': 'open',
-                        'high': 'high',
-                        'low': 'low',
-                        'close': 'close',
-                        'volume': 'volume',
-                        'trade_count': 'trade_count',
-                        'vwap': 'vwap'
-                    })
-                    
-                    data[symbol] = df
-                    logger.info(f"Fetched {len(df)} bars for {symbol}")
-                elif bars and symbol in bars:
-                    # If bars returned as a dictionary of dataframes
-                    df = bars[symbol].df
-                    
-                    # Reset index to make timestamp a column
-                    df = df.reset_index()
-                    
-                    # Rename columns to match expected format
-                    df = df.rename(columns={
-                        'timestamp': 'timestamp',
-                        'open': 'open',
-                        'high': 'high',
-                        'low': 'low',
-                        'close': 'close',
-                        'volume': 'volume',
-                        'trade_count': 'trade_count',
-                        'vwap': 'vwap'
-                    })
-                    
-                    data[symbol] = df
-                    logger.info(f"Fetched {len(df)} bars for {symbol}")
-                else:
-                    logger.warning(f"No data found for {symbol}")
+            if symbol not in bars:
+                logger.warning(f"No data found for {symbol}")
+                continue
+            
+            # Reset index to make timestamp a column
+            df = bars[symbol].reset_index()
+            df.insert(0, 'symbol', symbol)
             
-            except Exception as e:
-                logger.error(f"Error fetching data for {symbol}: {e}")
+            data[symbol] = df
+            logger.info(f"Fetched {len(df)} bars for {symbol}")
         
         return data
     
@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Backtest Replay
+-------------------------------------
+Event-driven replay of several bar streams (index, VIX, one per symbol).
+The streams are merged into a single timestamp-ordered timeline and a cursor
+walks it one step at a time. At every step each stream exposes a bounded,
+zero-copy view that ends at the current timestamp, so strategies can never
+see bars from the future and nothing is copied or rescanned per step.
+
+The bars visible to each stream at every step are computed once up front
+with a vectorised search, which keeps a whole replay O(N log N) in bars.
+
+Usage:
+    cursor = ReplayCursor({"SPY": market_data, "AAPL": candle_data["AAPL"]},
+                          start=dt.date(2024, 1, 2), end=dt.date(2024, 12, 31))
+    for timestamp in cursor:
+        if cursor.updated("AAPL"):
+            candles = cursor.view("AAPL")   # bars up to and including timestamp
+"""
+
+import datetime as dt
+from typing import Dict, Hashable, Iterator, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from bar_store import BarView, _ns_to_datetime, as_bars
+
+
+def _to_ns(value: Union[dt.date, dt.datetime], tz: Optional[dt.tzinfo]) -> int:
+    """Convert a date or datetime to int64 ns on the same clock as the bar views"""
+    timestamp = pd.Timestamp(value)
+    if tz is not None:
+        timestamp = timestamp.tz_localize(tz) if timestamp.tzinfo is None else timestamp.tz_convert(tz)
+    elif timestamp.tzinfo is not None:
+        timestamp = timestamp.tz_localize(None)
+    return int(timestamp.as_unit("ns").value)
+
+
+class ReplayCursor:
+    """Cursor over the merged timeline of several bar streams
+
+    Streams must not be modified while the cursor is in use: views share
+    memory with the underlying buffers.
+    """
+
+    def __init__(self, streams: Dict[Hashable, object],
+                 start: Optional[Union[dt.date, dt.datetime]] = None,
+                 end: Optional[Union[dt.date, dt.datetime]] = None):
+        """Initialize the cursor
+
+        Args:
+            streams (dict): Stream name -> BarBuffer, BarView or list of candles
+            start (date or datetime): First timestamp to replay (inclusive)
+            end (date or datetime): Last timestamp to replay; a date includes
+                the whole day
+        """
+        self._views: Dict[Hashable, BarView] = {name: as_bars(stream) for name, stream in streams.items()}
+        self.tz = next((view.tz for view in self._views.values() if len(view)), None)
+
+        columns = [view.ts_ns for view in self._views.values() if len(view)]
+        timeline = np.unique(np.concatenate(columns)) if columns else np.empty(0, dtype=np.int64)
+
+        if start is not None:
+            timeline = timeline[timeline >= _to_ns(start, self.tz)]
+        if end is not None:
+            if not isinstance(end, dt.datetime):
+                end = dt.datetime.combine(end, dt.time()) + dt.timedelta(days=1)
+                timeline = timeline[timeline < _to_ns(end, self.tz)]
+            else:
+                timeline = timeline[timeline <= _to_ns(end, self.tz)]
+        self.timeline = timeline
+
+        # Number of bars of each stream at or before every step
+        self._visible = {name: np.searchsorted(view.ts_ns, timeline, side="right")
+                         for name, view in self._views.items()}
+
+        # Calendar day of every step, in the streams' own timezone
+        index = pd.to_datetime(timeline, utc=True)
+        index = index.tz_convert(self.tz) if self.tz is not None else index.tz_localize(None)
+        self._days = index.normalize().asi8
+        self._dates = index.date
+
+        self.step = -1
+
+    def __len__(self) -> int:
+        return len(self.timeline)
+
+    def __iter__(self) -> Iterator[dt.datetime]:
+        self.step = -1
+        while self.advance():
+            yield self.timestamp
+
+    def __contains__(self, name) -> bool:
+        return name in self._views
+
+    def advance(self) -> bool:
+        """Move to the next timestamp; returns False once the timeline is exhausted"""
+        if self.step + 1 >= len(self.timeline):
+            return False
+        self.step += 1
+        return True
+
+    @property
+    def timestamp(self) -> dt.datetime:
+        """Timestamp of the current step"""
+        return _ns_to_datetime(self.timeline[self.step], self.tz)
+
+    @property
+    def date(self) -> dt.date:
+        """Calendar date of the current step"""
+        return self._dates[self.step]
+
+    @property
+    def is_day_end(self) -> bool:
+        """True on the last step of a calendar day"""
+        return self.step + 1 >= len(self.timeline) or self._days[self.step + 1] != self._days[self.step]
+
+    def count(self, name) -> int:
+        """Number of bars of ``name`` visible at the current step"""
+        return int(self._visible[name][self.step]) if self.step >= 0 else 0
+
+    def updated(self, name) -> bool:
+        """True if ``name`` has a bar stamped exactly at the current step"""
+        # The latest visible bar must be stamped now (a cursor starting after
+        # the first bars already sees older ones at its first step)
+        count = self.count(name)
+        return count > 0 and self._views[name].ts_ns[count - 1] == self.timeline[self.step]
+
+    def view(self, name, count: Optional[int] = None) -> BarView:
+        """Zero-copy view of the bars of ``name`` up to the current step
+
+        Args:
+            name: Stream name
+            count (int): Only include the most recent ``count`` bars
+
+        Returns:
+            BarView: Bars with timestamps <= the current timestamp
+        """
+        end = self.count(name)
+        start = 0 if count is None else max(0, end - count)
+        return self._views[name][start:end]
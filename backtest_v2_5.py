@@ -24,6 +24,8 @@ from typing import Dict, List, Tuple, Any, Optional, Union
 import alpaca_trade_api as tradeapi
 from alpaca_trade_api.rest import REST, TimeFrame
 
+from performance_metrics import compute_metrics, sharpe_ratio
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -943,52 +945,8 @@ class MultiStrategyBacktest:
                 "total_trades": 0
             }
         
-        # Calculate total return
-        total_return = (daily_equity[-1] - daily_equity[0]) / daily_equity[0]
-        
-        # Calculate annualized return
-        days = (dates[-1] - dates[0]).days
-        if days > 0:
-            annualized_return = (1 + total_return) ** (365 / days) - 1
-        else:
-            annualized_return = 0.0
-        
-        # Calculate max drawdown
-        max_drawdown = 0.0
-        peak = daily_equity[0]
-        
-        for equity in daily_equity:
-            if equity > peak:
-                peak = equity
-            drawdown = (peak - equity) / peak
-            max_drawdown = max(max_drawdown, drawdown)
-        
-        # Calculate Sharpe ratio
-        if self.daily_returns:
-            avg_daily_return = np.mean(self.daily_returns)
-            std_daily_return = np.std(self.daily_returns)
-            
-            if std_daily_return > 0:
-                sharpe_ratio = avg_daily_return / std_daily_return * np.sqrt(252)  # Annualized
-            else:
-                sharpe_ratio = 0.0
-        else:
-            sharpe_ratio = 0.0
-        
-        # Calculate win rate and profit factor
-        winning_trades = [t for t in self.trade_history if t.pnl > 0]
-        losing_trades = [t for t in self.trade_history if t.pnl <= 0]
-        
-        win_rate = len(winning_trades) / len(self.trade_history) if self.trade_history else 0.0
-        
-        total_profit = sum(t.pnl for t in winning_trades)
-        total_loss = abs(sum(t.pnl for t in losing_trades))
-        
-        profit_factor = total_profit / total_loss if total_loss > 0 else float('inf') if total_profit > 0 else 0.0
-        
-        # Calculate average trade metrics
-        avg_win = np.mean([t.pnl for t in winning_trades]) if winning_trades else 0.0
-        avg_loss = np.mean([t.pnl for t in losing_trades]) if losing_trades else 0.0
+        metrics = compute_metrics(daily_equity, pnl=[t.pnl for t in self.trade_history],
+                                  days=(dates[-1] - dates[0]).days)
         
         # Calculate strategy-specific metrics
         strategy_performance = {}
@@ -1009,15 +967,17 @@ class MultiStrategyBacktest:
         return {
             "initial_capital": daily_equity[0],
             "final_equity": daily_equity[-1],
-            "total_return_pct": total_return * 100,
-            "annualized_return_pct": annualized_return * 100,
-            "max_drawdown_pct": max_drawdown * 100,
-            "sharpe_ratio": sharpe_ratio,
-            "win_rate": win_rate * 100,
-            "profit_factor": profit_factor,
-            "total_trades": len(self.trade_history),
-            "avg_win": avg_win,
-            "avg_loss": avg_loss,
+            "total_return_pct": metrics.total_return_pct,
+            "annualized_return_pct": metrics.annualized_return_pct,
+            "max_drawdown_pct": metrics.max_drawdown_pct,
+            # Sharpe ratio of the daily returns recorded while stepping the backtest
+            "sharpe_ratio": sharpe_ratio(self.daily_returns),
+            "sortino_ratio": metrics.sortino_ratio,
+            "win_rate": metrics.win_rate * 100,
+            "profit_factor": metrics.profit_factor,
+            "total_trades": metrics.total_trades,
+            "avg_win": metrics.avg_win,
+            "avg_loss": metrics.avg_loss,
             "strategy_performance": strategy_performance,
             "equity_curve": daily_equity,
             "dates": [d.strftime("%Y-%m-%d") for d in dates]
@@ -0,0 +1,489 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Columnar Bar Store
+-------------------------------------
+NumPy-backed storage for OHLCV bars. Each symbol keeps a fixed-capacity
+rolling buffer of timestamp/open/high/low/close/volume columns, and readers
+get zero-copy array views of the most recent bars instead of lists of
+CandleData objects.
+
+Views also behave like the old candle lists (len, indexing, slicing and
+iteration materialise candles on demand), so existing callers keep working
+while hot paths switch to the array attributes.
+"""
+
+import datetime as dt
+from collections import namedtuple
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Column order of the float block inside a buffer
+BAR_FIELDS = ("open", "high", "low", "close", "volume")
+
+# Lightweight candle used when no candle factory is supplied
+Bar = namedtuple("Bar", ["timestamp", "open", "high", "low", "close", "volume"])
+
+
+def _timestamps_to_ns(timestamps: Sequence) -> Tuple[np.ndarray, Optional[dt.tzinfo]]:
+    """Convert a sequence of datetimes to int64 UTC nanoseconds plus timezone"""
+    index = pd.DatetimeIndex(pd.to_datetime(list(timestamps)))
+    # .values is UTC for tz-aware indexes and wall time for naive ones
+    ns = index.values.astype("datetime64[ns]").view("int64")
+    return ns, index.tz
+
+
+def _ns_to_datetime(value: int, tz: Optional[dt.tzinfo]) -> dt.datetime:
+    """Convert int64 nanoseconds back to a python datetime"""
+    if tz is not None:
+        return pd.Timestamp(int(value), tz="UTC").tz_convert(tz).to_pydatetime()
+    return pd.Timestamp(int(value)).to_pydatetime()
+
+
+class BarView:
+    """Read-only window of bars backed by NumPy arrays
+
+    The ``open``, ``high``, ``low``, ``close`` and ``volume`` attributes are
+    float64 arrays and ``timestamp`` is a datetime64[ns] array. When the view
+    comes from a BarBuffer these are views into the buffer, not copies.
+    """
+
+    __slots__ = ("ts_ns", "open", "high", "low", "close", "volume", "tz", "_candle_factory")
+
+    def __init__(self, ts_ns: np.ndarray, open: np.ndarray, high: np.ndarray,
+                 low: np.ndarray, close: np.ndarray, volume: np.ndarray,
+                 tz: Optional[dt.tzinfo] = None, candle_factory: Optional[Callable] = None):
+        self.ts_ns = ts_ns
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+        self.tz = tz
+        self._candle_factory = candle_factory or Bar
+
+    @classmethod
+    def from_candles(cls, candles: Sequence, candle_factory: Optional[Callable] = None) -> "BarView":
+        """Build a view from a list of candle objects (copies the data once)"""
+        count = len(candles)
+        if count == 0:
+            empty = np.empty(0, dtype=np.float64)
+            return cls(np.empty(0, dtype=np.int64), empty, empty, empty, empty, empty,
+                       candle_factory=candle_factory)
+
+        ts_ns, tz = _timestamps_to_ns([c.timestamp for c in candles])
+        columns = {
+            name: np.fromiter((getattr(c, name) for c in candles), dtype=np.float64, count=count)
+            for name in BAR_FIELDS
+        }
+        factory = candle_factory or type(candles[0])
+        return cls(ts_ns, tz=tz, candle_factory=factory, **columns)
+
+    @property
+    def timestamp(self) -> np.ndarray:
+        """Bar timestamps as datetime64[ns] (UTC wall time for tz-aware data)"""
+        return self.ts_ns.view("datetime64[ns]")
+
+    @property
+    def index(self) -> pd.DatetimeIndex:
+        """Bar timestamps as a DatetimeIndex in the original timezone"""
+        index = pd.DatetimeIndex(self.timestamp, name="timestamp")
+        if self.tz is not None:
+            index = index.tz_localize("UTC").tz_convert(self.tz)
+        return index
+
+    def __len__(self) -> int:
+        return len(self.ts_ns)
+
+    def _slice(self, key: slice) -> "BarView":
+        return BarView(self.ts_ns[key], self.open[key], self.high[key], self.low[key],
+                       self.close[key], self.volume[key], tz=self.tz,
+                       candle_factory=self._candle_factory)
+
+    def candle(self, i: int):
+        """Materialise a single bar as a candle object"""
+        return self._candle_factory(
+            timestamp=_ns_to_datetime(self.ts_ns[i], self.tz),
+            open=float(self.open[i]),
+            high=float(self.high[i]),
+            low=float(self.low[i]),
+            close=float(self.close[i]),
+            volume=int(self.volume[i])
+        )
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return self._slice(key)
+        return self.candle(key)
+
+    def __iter__(self) -> Iterator:
+        for i in range(len(self)):
+            yield self.candle(i)
+
+    def last_timestamp(self) -> Optional[dt.datetime]:
+        """Timestamp of the most recent bar, or None when empty"""
+        if len(self) == 0:
+            return None
+        return _ns_to_datetime(self.ts_ns[-1], self.tz)
+
+    def index_before(self, timestamp) -> int:
+        """Index of the last bar at or before timestamp, or -1 if there is none"""
+        if len(self) == 0:
+            return -1
+        ns = _timestamps_to_ns([timestamp])[0][0]
+        return int(np.searchsorted(self.ts_ns, ns, side="right")) - 1
+
+    def last_sessions(self, count: int = 1) -> "BarView":
+        """View of the bars of the last ``count`` calendar days
+
+        Days are taken in the bars' timezone; the start of each day is found
+        with a binary search, so the cost does not depend on the history length.
+        """
+        start = len(self)
+        for _ in range(count):
+            if start == 0:
+                break
+            day = pd.Timestamp(_ns_to_datetime(self.ts_ns[start - 1], self.tz)).normalize()
+            midnight = day.tz_convert("UTC").tz_localize(None) if day.tzinfo is not None else day
+            start = int(np.searchsorted(self.ts_ns, midnight.value, side="left"))
+        return self._slice(slice(start, len(self)))
+
+    def to_frame(self) -> pd.DataFrame:
+        """Return an OHLCV DataFrame indexed by timestamp"""
+        return pd.DataFrame({name: getattr(self, name) for name in BAR_FIELDS}, index=self.index)
+
+    def to_candles(self) -> List:
+        """Materialise every bar as a candle object"""
+        return list(self)
+
+
+def as_bars(candles) -> BarView:
+    """Return a BarView for candles, without copying when already columnar
+
+    Args:
+        candles: BarView, BarBuffer or a sequence of candle objects
+
+    Returns:
+        BarView: Columnar view of the candles
+    """
+    if isinstance(candles, BarView):
+        return candles
+    if isinstance(candles, BarBuffer):
+        return candles.view()
+    return BarView.from_candles(candles)
+
+
+class BarBuffer:
+    """Fixed-capacity rolling buffer of bars for one symbol
+
+    Bars are written into preallocated columns with some headroom past the
+    capacity. When the headroom is used up the most recent ``capacity`` bars
+    are moved back to the front, so trimming costs amortised O(1) per bar and
+    the live window is always contiguous (views never need to be copied).
+
+    ``pin()`` hands out a view that stays valid while the buffer keeps
+    changing: appends only write past the pinned rows, and compactions or
+    replacements move to new columns instead of overwriting them.
+    """
+
+    def __init__(self, capacity: Optional[int] = 10000, candle_factory: Optional[Callable] = None,
+                 headroom: Optional[int] = None):
+        """Initialize the buffer
+
+        Args:
+            capacity (int): Maximum number of bars kept (None keeps every bar)
+            candle_factory (callable): Class used to materialise single bars
+            headroom (int): Extra rows allocated to batch compactions
+        """
+        self._headroom = headroom
+        self.set_capacity(capacity)
+        self.candle_factory = candle_factory or Bar
+        self.tz = None
+
+        # Columns grow geometrically up to capacity + headroom, so symbols
+        # with short histories do not pay for the full capacity up front
+        self._ts = np.zeros(0, dtype=np.int64)
+        self._data = np.zeros((len(BAR_FIELDS), 0), dtype=np.float64)
+        self._start = 0
+        self._end = 0
+        # False while the columns are borrowed through attach()
+        self._owned = True
+        # True while views returned by pin() may read the current columns
+        self._pinned = False
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    def __bool__(self) -> bool:
+        return self._end > self._start
+
+    def __getitem__(self, key):
+        return self.view()[key]
+
+    def __iter__(self) -> Iterator:
+        return iter(self.view())
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the buffer columns"""
+        return self._ts.nbytes + self._data.nbytes
+
+    def set_capacity(self, capacity: Optional[int]):
+        """Change the number of bars kept; shrinking drops the oldest bars
+
+        Args:
+            capacity (int): Maximum number of bars kept (None keeps every bar)
+        """
+        if capacity is not None and capacity <= 0:
+            raise ValueError("capacity must be positive")
+
+        self.capacity = capacity
+        if capacity is None:
+            self.headroom = 0
+        else:
+            self.headroom = self._headroom if self._headroom is not None else max(capacity // 4, 1)
+            if hasattr(self, "_ts"):
+                self._start = max(self._start, self._end - capacity)
+
+    @property
+    def columns(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Live timestamp column and (field, bar) float block, as views"""
+        return self._ts[self._start:self._end], self._data[:, self._start:self._end]
+
+    def attach(self, ts_ns: np.ndarray, data: np.ndarray, tz: Optional[dt.tzinfo] = None):
+        """Use existing columns as the buffer contents without copying them
+
+        The buffer becomes unbounded and never writes to the borrowed arrays:
+        the first append copies them into memory it owns. This lets several
+        processes read the same bars from shared memory.
+
+        Args:
+            ts_ns (np.ndarray): int64 timestamps in nanoseconds
+            data (np.ndarray): float64 block of shape (len(BAR_FIELDS), len(ts_ns))
+            tz (tzinfo): Timezone of the timestamps
+        """
+        if data.shape != (len(BAR_FIELDS), len(ts_ns)):
+            raise ValueError(f"expected a data block of shape {(len(BAR_FIELDS), len(ts_ns))}, got {data.shape}")
+        self.set_capacity(None)
+        self._ts = ts_ns
+        self._data = data
+        self._start = 0
+        self._end = len(ts_ns)
+        self._owned = False
+        self.tz = tz
+
+    def view(self, count: Optional[int] = None) -> BarView:
+        """Return a zero-copy view of the most recent bars
+
+        Args:
+            count (int): Number of bars to include (all by default)
+
+        Returns:
+            BarView: View over the buffer columns
+        """
+        start = self._start if count is None else max(self._start, self._end - count)
+        end = self._end
+        data = self._data
+        return BarView(self._ts[start:end], data[0, start:end], data[1, start:end],
+                       data[2, start:end], data[3, start:end], data[4, start:end],
+                       tz=self.tz, candle_factory=self.candle_factory)
+
+    def pin(self) -> BarView:
+        """Return a read-only view that later writes will never change
+
+        The view is zero-copy. Until the next reallocation the buffer only
+        appends behind the pinned rows; a compaction or replacement copies
+        the surviving bars to new columns and leaves the old ones to the
+        views still holding them.
+
+        Returns:
+            BarView: Frozen view of every bar currently in the buffer
+        """
+        view = self.view()
+        for array in (view.ts_ns, view.open, view.high, view.low, view.close, view.volume):
+            array.flags.writeable = False
+        self._pinned = True
+        return view
+
+    def last_timestamp(self) -> Optional[dt.datetime]:
+        """Timestamp of the most recent bar, or None when empty"""
+        if not self:
+            return None
+        return _ns_to_datetime(self._ts[self._end - 1], self.tz)
+
+    def clear(self):
+        """Drop all bars"""
+        if self._pinned:
+            # Pinned views keep the old columns; start over in new ones
+            self._ts = np.zeros(0, dtype=np.int64)
+            self._data = np.zeros((len(BAR_FIELDS), 0), dtype=np.float64)
+            self._owned = True
+            self._pinned = False
+        self._start = 0
+        self._end = 0
+        self.tz = None
+
+    def append(self, candle):
+        """Append a single candle object"""
+        self.extend([candle])
+
+    def extend(self, candles):
+        """Append candle objects (or another view) in timestamp order"""
+        if isinstance(candles, BarBuffer):
+            candles = candles.view()
+        if not isinstance(candles, BarView):
+            candles = list(candles)
+            if not candles:
+                return
+            candles = BarView.from_candles(candles, self.candle_factory)
+        if len(candles) == 0:
+            return
+        if self.tz is None and not self:
+            self.tz = candles.tz
+        self.extend_arrays(candles.ts_ns, candles.open, candles.high, candles.low,
+                           candles.close, candles.volume)
+
+    def extend_arrays(self, ts_ns: np.ndarray, open: np.ndarray, high: np.ndarray,
+                      low: np.ndarray, close: np.ndarray, volume: np.ndarray):
+        """Append bars given as column arrays (timestamps in int64 nanoseconds)"""
+        count = len(ts_ns)
+        if count == 0:
+            return
+        columns = (open, high, low, close, volume)
+        if not self._owned:
+            self._grow(len(self._ts))
+
+        if self.capacity is None:
+            if self._end + count > len(self._ts):
+                self._grow(max(2 * len(self._ts), self._end + count, 64))
+        elif count >= self.capacity:
+            # Only the newest bars survive, start over from the front
+            if len(self._ts) < self.capacity or self._pinned:
+                self._end = 0
+                self._grow(max(len(self._ts), self.capacity))
+            self._ts[:self.capacity] = ts_ns[-self.capacity:]
+            for row, values in enumerate(columns):
+                self._data[row, :self.capacity] = values[-self.capacity:]
+            self._start = 0
+            self._end = self.capacity
+            return
+        else:
+            max_size = self.capacity + self.headroom
+            if self._end + count > len(self._ts) and len(self._ts) < max_size:
+                self._grow(min(max_size, max(2 * len(self._ts), self._end + count, 64)))
+
+        if self._end + count > len(self._ts):
+            # Compact: keep just enough history so the new bars fit the capacity
+            keep = min(len(self), self.capacity - count)
+            src = self._end - keep
+            if self._pinned:
+                # Move to new columns rather than overwrite pinned rows
+                ts, data = self._ts, self._data
+                self._end = 0
+                self._grow(len(ts))
+                self._ts[:keep] = ts[src:src + keep]
+                self._data[:, :keep] = data[:, src:src + keep]
+            else:
+                self._ts[:keep] = self._ts[src:self._end]
+                self._data[:, :keep] = self._data[:, src:self._end]
+            self._start = 0
+            self._end = keep
+
+        end = self._end + count
+        self._ts[self._end:end] = ts_ns
+        for row, values in enumerate(columns):
+            self._data[row, self._end:end] = values
+        self._end = end
+        if self.capacity is not None:
+            self._start = max(self._start, self._end - self.capacity)
+
+    def _grow(self, size: int):
+        """Reallocate the columns with room for ``size`` bars"""
+        ts = np.zeros(size, dtype=np.int64)
+        data = np.zeros((len(BAR_FIELDS), size), dtype=np.float64)
+        ts[:self._end] = self._ts[:self._end]
+        data[:, :self._end] = self._data[:, :self._end]
+        self._ts = ts
+        self._data = data
+        self._owned = True
+        self._pinned = False
+
+    def replace(self, candles):
+        """Replace the buffer contents with new candles"""
+        self.clear()
+        self.extend(candles)
+
+
+class BarStore:
+    """Per-symbol collection of BarBuffers with dict-like access
+
+    ``store[symbol]`` returns the symbol's buffer, which supports the same
+    len/index/slice/extend operations as the candle lists it replaces.
+    Assigning a list of candles replaces the symbol's bars.
+    """
+
+    def __init__(self, capacity: Optional[int] = 10000, candle_factory: Optional[Callable] = None):
+        """Initialize the store
+
+        Args:
+            capacity (int): Maximum number of bars kept per symbol (None keeps every bar)
+            candle_factory (callable): Class used to materialise single bars
+        """
+        self.capacity = capacity
+        self.candle_factory = candle_factory
+        self._buffers: Dict[str, BarBuffer] = {}
+
+    def add_symbol(self, symbol: str) -> BarBuffer:
+        """Create an empty buffer for a symbol if it does not exist yet"""
+        if symbol not in self._buffers:
+            self._buffers[symbol] = BarBuffer(self.capacity, candle_factory=self.candle_factory)
+        return self._buffers[symbol]
+
+    def set_capacity(self, capacity: Optional[int]):
+        """Change the number of bars kept for every symbol"""
+        self.capacity = capacity
+        for buffer in self._buffers.values():
+            buffer.set_capacity(capacity)
+
+    def __getitem__(self, symbol: str) -> BarBuffer:
+        return self._buffers[symbol]
+
+    def __setitem__(self, symbol: str, candles: Iterable):
+        self.add_symbol(symbol).replace(candles)
+
+    def __contains__(self, symbol) -> bool:
+        return symbol in self._buffers
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._buffers)
+
+    def __len__(self) -> int:
+        return len(self._buffers)
+
+    def get(self, symbol: str, default=None):
+        return self._buffers.get(symbol, default)
+
+    def keys(self):
+        return self._buffers.keys()
+
+    def values(self):
+        return self._buffers.values()
+
+    def items(self):
+        return self._buffers.items()
+
+    def view(self, symbol: str, count: Optional[int] = None) -> BarView:
+        """Zero-copy view of the most recent bars for a symbol"""
+        return self._buffers[symbol].view(count)
+
+    def pin(self) -> Dict[str, BarView]:
+        """Pinned views of every symbol (see BarBuffer.pin)"""
+        return {symbol: buffer.pin() for symbol, buffer in self._buffers.items()}
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by all buffers"""
+        return sum(buffer.nbytes for buffer in self._buffers.values())
@@ -30,6 +30,7 @@ except ImportError:
 from mean_reversion_strategy_optimized import MeanReversionStrategyOptimized
 from trend_following_strategy import TrendFollowingStrategy, TradeDirection, Signal
 from seasonality_enhanced import SeasonalityEnhanced
+from sector_index import get_sector_index
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -54,6 +55,9 @@ class CombinedStrategy:
         # Initialize strategy parameters
         self.config = config
         
+        # Shared sector metadata
+        self.sector_index = get_sector_index(config.get('paths', {}).get('sector_map'))
+        
         # Initialize seasonality parameters
         self.use_seasonality = config.get('seasonality', {}).get('enabled', False)
         self.use_seasonality_filter = config.get('seasonality', {}).get('use_filter', False)
@@ -334,6 +338,37 @@ class CombinedStrategy:
                 # No seasonality data available
                 return 0.0, 'LONG'
     
+    def get_seasonal_scores(self, symbols, dates):
+        """Seasonality scores of many symbols on many dates (batch form of get_seasonal_score)
+        
+        Uses one gather from the analyzer's score tensor and applies the same
+        symbol/date differentiation to neutral scores as get_seasonal_score.
+        
+        Args:
+            symbols (list): Symbols to score
+            dates: Sequence of dates (e.g. a DatetimeIndex)
+            
+        Returns:
+            tuple: (scores, directions) arrays of shape (symbols, dates); scores
+                are between -1.0 and 1.0 and directions 'LONG' or 'SHORT'
+        """
+        symbols = list(symbols)
+        dates = pd.DatetimeIndex(dates)
+        if self.seasonality_analyzer is None:
+            shape = (len(symbols), len(dates))
+            return np.zeros(shape), np.full(shape, 'LONG', dtype=object)
+        
+        score = self.seasonality_analyzer.get_seasonal_scores(symbols, dates).astype(float)
+        
+        # Deterministic differentiation of scores close to 0.5
+        symbol_hash = np.array([sum(ord(c) for c in symbol) for symbol in symbols])
+        date_hash = dates.day.to_numpy() + dates.month.to_numpy() * 31
+        variation = ((symbol_hash[:, None] + date_hash[None, :]) % 100 / 100 - 0.5) * 0.1
+        neutral = (score >= 0.45) & (score <= 0.55)
+        score = np.where(neutral, np.clip(score + variation, 0.0, 1.0), score)
+        
+        return (score - 0.5) * 2, np.where(score >= 0.5, 'LONG', 'SHORT').astype(object)
+    
     def detect_market_regime(self, df):
         """
         Detect the current market regime (trending, range-bound, or mixed).
@@ -564,63 +599,7 @@ class CombinedStrategy:
         Returns:
             str: Sector name or None if not found
         """
-        # Basic sector mapping for common stocks
-        # This could be enhanced with a more comprehensive database
-        tech_stocks = ['AAPL', 'MSFT', 'GOOGL', 'GOOG', 'META', 'NVDA', 'AMD', 'INTC', 'CSCO', 'ORCL', 'IBM', 
-                      'ADBE', 'CRM', 'PYPL', 'NFLX', 'TSLA', 'AVGO', 'TXN', 'QCOM', 'MU', 'AMAT', 'ADI', 'LRCX', 
-                      'KLAC', 'SNPS', 'CDNS', 'INTU', 'NOW', 'WDAY', 'TEAM', 'ZS', 'OKTA', 'CRWD', 'NET', 'DDOG', 'SNOW']
-        
-        financial_stocks = ['JPM', 'BAC', 'WFC', 'C', 'GS', 'MS', 'BLK', 'AXP', 'V', 'MA', 'SCHW', 'PNC', 'USB', 
-                           'TFC', 'COF', 'BK', 'STT', 'DFS', 'AIG', 'MET', 'PRU', 'ALL', 'TRV', 'CB', 'PGR', 'MMC', 
-                           'AON', 'ICE', 'CME', 'SPGI', 'MCO']
-        
-        healthcare_stocks = ['JNJ', 'PFE', 'MRK', 'ABBV', 'LLY', 'ABT', 'TMO', 'DHR', 'UNH', 'CVS', 'AMGN', 'GILD', 
-                            'ISRG', 'REGN', 'VRTX', 'MRNA', 'BIIB', 'BMY', 'MDT', 'SYK', 'BSX', 'ZTS', 'DXCM', 'ILMN', 
-                            'IDXX', 'EW', 'HUM', 'CI', 'ANTM', 'CNC', 'BDX', 'BAX']
-        
-        consumer_stocks = ['PG', 'KO', 'PEP', 'WMT', 'COST', 'HD', 'LOW', 'MCD', 'SBUX', 'NKE', 'DIS', 'CMCSA', 
-                          'TGT', 'BKNG', 'EXPE', 'MAR', 'HLT', 'YUM', 'QSR', 'MO', 'PM', 'KHC', 'GIS', 'K', 'CL', 
-                          'CLX', 'CHD', 'EL', 'ULTA', 'VFC', 'TPR', 'RL']
-        
-        industrial_stocks = ['GE', 'HON', 'MMM', 'CAT', 'DE', 'BA', 'LMT', 'RTX', 'GD', 'NOC', 'UPS', 'FDX', 'UNP', 
-                            'CSX', 'NSC', 'EMR', 'ETN', 'PH', 'ITW', 'CMI', 'ROK', 'IR', 'DOV', 'SWK', 'URI', 'PCAR', 'WAB']
-        
-        energy_stocks = ['XOM', 'CVX', 'COP', 'EOG', 'PXD', 'OXY', 'MPC', 'PSX', 'VLO', 'KMI', 'WMB', 'ET', 'EPD', 
-                        'SLB', 'HAL', 'BKR']
-        
-        materials_stocks = ['LIN', 'APD', 'SHW', 'FCX', 'NEM', 'GOLD', 'NUE', 'STLD', 'DOW', 'DD', 'ECL', 'PPG', 
-                           'ALB', 'CF', 'MOS']
-        
-        utilities_stocks = ['NEE', 'DUK', 'SO', 'D', 'AEP', 'EXC', 'SRE', 'PCG', 'ED', 'XEL', 'WEC', 'ES', 'PEG', 
-                           'DTE', 'FE']
-        
-        real_estate_stocks = ['AMT', 'CCI', 'EQIX', 'PLD', 'PSA', 'WELL', 'AVB', 'EQR', 'DLR', 'O', 'SPG', 'VICI']
-        
-        communication_stocks = ['T', 'VZ', 'TMUS', 'CHTR', 'EA', 'ATVI', 'TTWO', 'MTCH', 'PINS', 'SNAP', 'TWTR']
-        
-        # Map symbol to sector
-        if symbol in tech_stocks:
-            return 'Technology'
-        elif symbol in financial_stocks:
-            return 'Financial'
-        elif symbol in healthcare_stocks:
-            return 'Healthcare'
-        elif symbol in consumer_stocks:
-            return 'Consumer'
-        elif symbol in industrial_stocks:
-            return 'Industrial'
-        elif symbol in energy_stocks:
-            return 'Energy'
-        elif symbol in materials_stocks:
-            return 'Materials'
-        elif symbol in utilities_stocks:
-            return 'Utilities'
-        elif symbol in real_estate_stocks:
-            return 'Real Estate'
-        elif symbol in communication_stocks:
-            return 'Communication'
-        else:
-            return None
+        return self.sector_index.sector(symbol)
     
     def adjust_weights_by_regime(self, regime):
         """Adjust strategy weights based on market regime
@@ -873,6 +852,21 @@ class CombinedStrategy:
         """
         return self.regime_performance
     
+    def _calendar_days(self, df):
+        """Dates of the first occurrence of each calendar day (month-day) in a DataFrame's range
+        
+        Args:
+            df (pd.DataFrame): DataFrame with a DatetimeIndex
+            
+        Returns:
+            tuple: (dates, list of 'MM-DD' keys) in order of first occurrence
+        """
+        days = pd.date_range(df.index[0], df.index[-1], freq='D')
+        codes = days.month.to_numpy() * 100 + days.day.to_numpy()
+        _, first = np.unique(codes, return_index=True)
+        first = np.sort(first)
+        return days[first], [f"{code // 100:02d}-{code % 100:02d}" for code in codes[first]]
+    
     def calculate_seasonality(self, symbol, df):
         """Calculate seasonality for a symbol
         
@@ -889,23 +883,10 @@ class CombinedStrategy:
         # If seasonality analyzer is available, use it
         if self.seasonality_analyzer and hasattr(self.seasonality_analyzer, 'get_seasonal_bias'):
             try:
-                # Get date range from dataframe
-                start_date = df.index[0]
-                end_date = df.index[-1]
-                
-                # Get seasonality for each day in the range
-                current_date = start_date
-                while current_date <= end_date:
-                    month_day = f"{current_date.month:02d}-{current_date.day:02d}"
-                    
-                    # Get seasonal bias from analyzer
-                    bias = self.seasonality_analyzer.get_seasonal_bias(symbol, current_date)
-                    
-                    # Store bias
-                    seasonality[month_day] = bias
-                    
-                    # Move to next day
-                    current_date += pd.Timedelta(days=1)
+                # Each calendar day once, however many years the data spans
+                dates, month_days = self._calendar_days(df)
+                for current_date, month_day in zip(dates, month_days):
+                    seasonality[month_day] = self.seasonality_analyzer.get_seasonal_bias(symbol, current_date)
             except Exception as e:
                 logger.error(f"Error calculating seasonality for {symbol}: {e}")
                 # Use fallback method
@@ -926,55 +907,21 @@ class CombinedStrategy:
         Returns:
             dict: Dictionary of month-day -> bias ('bullish', 'bearish', or 'neutral')
         """
-        # Default to neutral seasonality
-        seasonality = {}
+        _, month_days = self._calendar_days(df)
         
-        # If seasonality data is available for this symbol, use it
-        if symbol in self.seasonality_data:
-            # Get seasonality data for this symbol
-            symbol_seasonality = self.seasonality_data[symbol]
-            
-            # Get date range from dataframe
-            start_date = df.index[0]
-            end_date = df.index[-1]
-            
-            # Get seasonality for each day in the range
-            current_date = start_date
-            while current_date <= end_date:
-                month_day = f"{current_date.month:02d}-{current_date.day:02d}"
-                
-                # Default to neutral
-                bias = 'neutral'
-                
-                # Check if month-day is in seasonality data
+        # Default to neutral
+        seasonality = dict.fromkeys(month_days, 'neutral')
+        
+        # Month-day scores of the symbol, if legacy seasonality data was loaded
+        symbol_seasonality = getattr(self, 'seasonality_data', {}).get(symbol)
+        if isinstance(symbol_seasonality, dict):
+            for month_day in month_days:
                 if month_day in symbol_seasonality:
                     # Get bias based on historical performance
                     if symbol_seasonality[month_day] > 0.6:
-                        bias = 'bullish'
+                        seasonality[month_day] = 'bullish'
                     elif symbol_seasonality[month_day] < 0.4:
-                        bias = 'bearish'
-                
-                # Store bias
-                seasonality[month_day] = bias
-                
-                # Move to next day
-                current_date += pd.Timedelta(days=1)
-        else:
-            # If no seasonality data is available, use all neutral
-            # Get date range from dataframe
-            start_date = df.index[0]
-            end_date = df.index[-1]
-            
-            # Get seasonality for each day in the range
-            current_date = start_date
-            while current_date <= end_date:
-                month_day = f"{current_date.month:02d}-{current_date.day:02d}"
-                
-                # Default to neutral
-                seasonality[month_day] = 'neutral'
-                
-                # Move to next day
-                current_date += pd.Timedelta(days=1)
+                        seasonality[month_day] = 'bearish'
         
         return seasonality
     
@@ -1341,6 +1288,15 @@ class CombinedStrategy:
         # Calculate technical and seasonality scores for each symbol
         stock_scores = []
         
+        # Seasonality scores of the whole universe in one lookup
+        seasonal_scores = {}
+        if self.use_seasonality and self.seasonality_analyzer:
+            try:
+                symbols = list(symbol_data)
+                seasonal_scores = dict(zip(symbols, self.seasonality_analyzer.get_seasonal_scores(symbols, current_date).tolist()))
+            except Exception as e:
+                self.logger.warning(f"Error getting batch seasonality scores: {e}")
+        
         for symbol, df in symbol_data.items():
             if df is None or df.empty:
                 continue
@@ -1361,7 +1317,9 @@ class CombinedStrategy:
                 
                 if self.use_seasonality and self.seasonality_analyzer:
                     try:
-                        seasonal_score = self.seasonality_analyzer.get_seasonal_score(symbol, current_date)
+                        seasonal_score = seasonal_scores.get(symbol)
+                        if seasonal_score is None:
+                            seasonal_score = self.seasonality_analyzer.get_seasonal_score(symbol, current_date)
                         self.logger.debug(f"Seasonality score for {symbol} on {current_date.strftime('%Y-%m-%d')}: {seasonal_score:.4f}")
                         
                         # Calculate seasonality confidence
@@ -21,6 +21,7 @@ import argparse
 # Import strategy modules
 from enhanced_mean_reversion_backtest import EnhancedMeanReversionBacktest
 from trend_following_strategy import TrendFollowingStrategy
+from performance_metrics import StreamingMetrics, annualized_return, equity_returns, sharpe_ratio, trade_statistics
 
 # Configure logging
 logging.basicConfig(
@@ -52,6 +53,7 @@ class CombinedStrategyBacktest:
         self.drawdowns = []
         self.peak_equity = initial_capital
         self.max_drawdown = 0.0
+        self.equity_stats = StreamingMetrics(initial_capital)
         self.total_trades = 0
         self.winning_trades = 0
         self.losing_trades = 0
@@ -567,11 +569,9 @@ class CombinedStrategyBacktest:
             'total_pnl': self.total_pnl
         })
         
-        # Calculate drawdown
-        if len(self.equity_curve) > 1:
-            max_value = max([e['total_value'] for e in self.equity_curve])
-            current_drawdown = (max_value - total_value) / max_value if max_value > 0 else 0
-            self.max_drawdown = max(self.max_drawdown, current_drawdown)
+        # Running drawdown from the peak value
+        self.equity_stats.update(total_value)
+        self.max_drawdown = self.equity_stats.max_drawdown
         
         return total_value
     
@@ -595,38 +595,11 @@ class CombinedStrategyBacktest:
         total_return_pct = (total_return / start_value) * 100
         
         # Calculate annualized return
-        if len(self.equity_curve) > 1:
-            start_date = self.equity_curve[0]['date']
-            end_date = self.equity_curve[-1]['date']
-            days = (end_date - start_date).days
-            if days > 0:
-                years = days / 365.0
-                annualized_return = ((1 + total_return_pct/100) ** (1/years) - 1) * 100
-            else:
-                annualized_return = 0
-        else:
-            annualized_return = 0
+        days = (self.equity_curve[-1]['date'] - self.equity_curve[0]['date']).days
+        annualized_return_pct = annualized_return(total_return_pct / 100, days) * 100
         
         # Calculate Sharpe ratio (simplified)
-        if len(self.equity_curve) > 1:
-            daily_returns = []
-            for i in range(1, len(self.equity_curve)):
-                prev_value = self.equity_curve[i-1]['total_value']
-                curr_value = self.equity_curve[i]['total_value']
-                daily_return = (curr_value / prev_value) - 1
-                daily_returns.append(daily_return)
-            
-            if daily_returns:
-                avg_return = np.mean(daily_returns)
-                std_return = np.std(daily_returns)
-                if std_return > 0:
-                    sharpe_ratio = (avg_return / std_return) * np.sqrt(252)  # Annualized
-                else:
-                    sharpe_ratio = 0
-            else:
-                sharpe_ratio = 0
-        else:
-            sharpe_ratio = 0
+        sharpe = sharpe_ratio(equity_returns([e['total_value'] for e in self.equity_curve]))
         
         # Calculate win rate
         if self.total_trades > 0:
@@ -636,9 +609,7 @@ class CombinedStrategyBacktest:
         
         # Calculate profit factor
         if self.losing_trades > 0:
-            total_profit = sum([t['profit_loss'] for t in self.trades if t['profit_loss'] > 0])
-            total_loss = abs(sum([t['profit_loss'] for t in self.trades if t['profit_loss'] < 0]))
-            profit_factor = total_profit / total_loss if total_loss > 0 else 0
+            profit_factor = trade_statistics([t['profit_loss'] for t in self.trades])['profit_factor']
         else:
             profit_factor = 0
         
@@ -664,8 +635,8 @@ class CombinedStrategyBacktest:
         
         return {
             'total_return_pct': total_return_pct,
-            'annualized_return': annualized_return,
-            'sharpe_ratio': sharpe_ratio,
+            'annualized_return': annualized_return_pct,
+            'sharpe_ratio': sharpe,
             'max_drawdown': self.max_drawdown,
             'win_rate': win_rate,
             'profit_factor': profit_factor,
@@ -0,0 +1,161 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Concurrent Fetcher
+-------------------------------------
+Runs many small download tasks (one per symbol) on a bounded thread pool.
+
+Every request a task makes goes through a token bucket of its data provider,
+so the pool never exceeds the provider's rate limit however many workers it
+has. A refresh has a deadline: tasks that have not finished by then are
+abandoned (queued ones are cancelled, running ones finish in the background
+and their results are dropped) and reported as timed out, so one slow symbol
+cannot hold back the others.
+
+Tasks only download; they must not modify shared state. The caller applies
+the results of a refresh in one step, which keeps every refresh consistent.
+
+Usage:
+    fetcher = ConcurrentFetcher(max_workers=8, rate_limits={"YAHOO": 5.0})
+    refresh = fetcher.run({"AAPL": partial(download, "AAPL"), ...},
+                          provider="YAHOO", timeout=30)
+    for symbol, candles in refresh.results.items():
+        ...
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Hashable, Optional, Set
+
+logger = logging.getLogger("ConcurrentFetcher")
+
+
+class DeadlineExceeded(Exception):
+    """A request could not start before the refresh deadline"""
+
+
+class RateLimiter:
+    """Thread-safe token bucket"""
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        """Initialize the limiter
+
+        Args:
+            rate (float): Requests per second
+            burst (float): Requests that may be made at once (``rate`` by default)
+        """
+        self.rate = rate
+        self.burst = max(1.0, burst if burst is not None else rate)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, deadline: Optional[float] = None) -> bool:
+        """Take one token, waiting for it if needed
+
+        Args:
+            deadline (float): time.monotonic() value to give up at
+
+        Returns:
+            bool: False if no token became available before the deadline
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait_time = (1 - self._tokens) / self.rate
+            if deadline is not None and now + wait_time > deadline:
+                return False
+            time.sleep(wait_time)
+
+
+class FetchRefresh:
+    """Outcome of one ConcurrentFetcher.run"""
+
+    def __init__(self):
+        self.results: Dict[Hashable, Any] = {}
+        self.errors: Dict[Hashable, str] = {}
+        self.timed_out: Set[Hashable] = set()
+        self.duration = 0.0
+
+    @property
+    def missing(self) -> Set[Hashable]:
+        """Tasks without a result, failed or timed out"""
+        return set(self.errors) | self.timed_out
+
+
+class ConcurrentFetcher:
+    """Bounded, rate-limited thread pool for per-symbol downloads"""
+
+    def __init__(self, max_workers: int = 8, rate_limits: Optional[Dict[str, float]] = None):
+        """Initialize the fetcher
+
+        Args:
+            max_workers (int): Requests in flight at most
+            rate_limits (dict): Provider -> requests per second; providers
+                not listed are not limited
+        """
+        self.max_workers = max_workers
+        self.limiters = {provider: RateLimiter(rate) for provider, rate in (rate_limits or {}).items() if rate}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="fetch")
+
+    def _requester(self, provider: str, deadline: float) -> Callable:
+        """Function tasks use to make a rate-limited request"""
+        limiter = self.limiters.get(provider)
+
+        def request(function: Callable, *args, **kwargs):
+            if time.monotonic() > deadline or (limiter is not None and not limiter.acquire(deadline)):
+                raise DeadlineExceeded(f"no {provider} request slot before the deadline")
+            return function(*args, **kwargs)
+
+        return request
+
+    def run(self, tasks: Dict[Hashable, Callable[[Callable], Any]], provider: str,
+            timeout: float) -> FetchRefresh:
+        """Run every task concurrently and wait at most ``timeout`` seconds
+
+        Args:
+            tasks (dict): Key -> callable taking a ``request(function, *args,
+                **kwargs)`` helper it must use for every provider call
+            provider (str): Data provider the tasks call
+            timeout (float): Seconds until unfinished tasks are abandoned
+
+        Returns:
+            FetchRefresh: Results, errors and timed out keys
+        """
+        refresh = FetchRefresh()
+        start = time.monotonic()
+        deadline = start + timeout
+        request = self._requester(provider, deadline)
+
+        futures = {self._executor.submit(task, request): key for key, task in tasks.items()}
+        done, pending = wait(futures, timeout=max(0.0, deadline - time.monotonic()))
+
+        for future in done:
+            key = futures[future]
+            try:
+                refresh.results[key] = future.result()
+            except DeadlineExceeded:
+                refresh.timed_out.add(key)
+            except Exception as e:
+                refresh.errors[key] = str(e)
+        for future in pending:
+            future.cancel()
+            refresh.timed_out.add(futures[future])
+
+        refresh.duration = time.monotonic() - start
+        if refresh.timed_out or refresh.errors:
+            logger.warning(f"Refresh of {len(tasks)} tasks in {refresh.duration:.1f}s: "
+                           f"{len(refresh.errors)} failed, {len(refresh.timed_out)} timed out")
+        return refresh
+
+    def close(self):
+        """Stop the pool without waiting for abandoned requests"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,225 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Correlation Service
+-------------------------------------
+Rolling correlations between the traded symbols, kept up to date bar by bar.
+
+Instead of rebuilding ``pct_change().corr()`` from the full price history,
+the service keeps an exponentially weighted (EWMA) mean and covariance of
+the symbols' returns as NumPy arrays. Each new bar updates them in O(N^2)
+whatever the length of the history, so a 500 x 500 universe costs a few
+milliseconds per bar. Pairs with fewer than ``min_periods`` common
+observations use a prior correlation (e.g. a sector-based default).
+
+Exposure queries are vectorized: the book is netted into one signed size
+per symbol, so the correlation-weighted exposure of a whole batch of
+candidate signals is a single matrix-vector product.
+
+Usage:
+    service = CorrelationService(symbols, halflife=30)
+    service.warm_up(close_frame)                    # seed from history
+    service.update({'AAPL': 187.2, ...}, timestamp) # once per bar
+    service.correlation('AAPL', 'MSFT')
+    service.exposure(['AAPL', 'XOM'], [1, -1], book_symbols, book_sizes, book_directions)
+"""
+
+import logging
+import threading
+from typing import Dict, Hashable, Mapping, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger("CorrelationService")
+
+
+class CorrelationService:
+    """EWMA covariance and correlation matrix of a fixed symbol universe"""
+
+    def __init__(self, symbols: Sequence[str], halflife: float = 30.0, min_periods: int = 20,
+                 prior: Optional[np.ndarray] = None, default_correlation: float = 0.0):
+        """Initialize the service
+
+        Args:
+            symbols (list): Symbols of the universe (matrix order)
+            halflife (float): Half-life of the EWMA weights, in bars
+            min_periods (int): Common observations a pair needs before its
+                estimated correlation replaces the prior
+            prior (np.ndarray): N x N correlations used until then
+            default_correlation (float): Prior off-diagonal correlation when
+                no prior matrix is given
+        """
+        self.symbols = list(symbols)
+        self._index = pd.Index(self.symbols)
+        size = len(self.symbols)
+
+        self.halflife = halflife
+        self.alpha = 1.0 - 0.5 ** (1.0 / halflife)
+        self.min_periods = min_periods
+
+        if prior is None:
+            prior = np.full((size, size), float(default_correlation))
+        self.prior = np.array(prior, dtype=float)
+        np.fill_diagonal(self.prior, 1.0)
+
+        self._last_close = np.full(size, np.nan)
+        self._mean = np.zeros(size)
+        self._seen = np.zeros(size, dtype=bool)
+        self._cov = np.zeros((size, size))
+        self._counts = np.zeros((size, size), dtype=np.int64)
+        self._correlation: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+
+        self.bars = 0
+        self.last_timestamp: Optional[Hashable] = None
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def indexer(self, symbols: Sequence[str]) -> np.ndarray:
+        """Matrix position of every symbol (-1 if not in the universe)"""
+        return self._index.get_indexer(list(symbols))
+
+    def _closes(self, closes: Union[Mapping[str, float], Sequence[float], np.ndarray]) -> np.ndarray:
+        if isinstance(closes, Mapping):
+            aligned = np.full(len(self.symbols), np.nan)
+            positions = self.indexer(closes.keys())
+            known = positions >= 0
+            aligned[positions[known]] = np.fromiter(closes.values(), dtype=float, count=len(closes))[known]
+            return aligned
+        return np.asarray(closes, dtype=float)
+
+    def update(self, closes: Union[Mapping[str, float], Sequence[float], np.ndarray],
+               timestamp: Optional[Hashable] = None) -> bool:
+        """Fold one bar of closing prices into the estimates
+
+        Args:
+            closes: Close per symbol (dict), or an array in matrix order;
+                missing symbols (NaN) keep their estimates
+            timestamp: Bar time; a bar already applied is ignored
+
+        Returns:
+            bool: True if the bar was applied
+        """
+        if timestamp is not None and timestamp == self.last_timestamp:
+            return False
+        closes = self._closes(closes)
+
+        with self._lock:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                returns = closes / self._last_close - 1.0
+            valid = np.isfinite(returns)
+            self._last_close = np.where(np.isfinite(closes), closes, self._last_close)
+            self.last_timestamp = timestamp
+            self.bars += 1
+            if not valid.any():
+                return True
+
+            # First return of a symbol only seeds its mean
+            updating = valid & self._seen
+            self._mean[valid & ~self._seen] = returns[valid & ~self._seen]
+            self._seen |= valid
+            if not updating.any():
+                return True
+
+            deviation = np.where(updating, returns - self._mean, 0.0)
+            self._mean += self.alpha * deviation
+            cross = np.outer(deviation, deviation)
+            cross *= self.alpha
+            if updating.all():
+                self._cov += cross
+                self._cov *= 1.0 - self.alpha
+                self._counts += 1
+            else:
+                pairs = np.outer(updating, updating)
+                self._cov[pairs] = (1.0 - self.alpha) * (self._cov[pairs] + cross[pairs])
+                self._counts += pairs
+            self._correlation = None
+        return True
+
+    def warm_up(self, closes: pd.DataFrame):
+        """Seed the estimates from a history of closes
+
+        Args:
+            closes (DataFrame): Close prices, one column per symbol, oldest
+                row first (unknown columns are ignored)
+        """
+        aligned = closes.reindex(columns=self.symbols)
+        for timestamp, row in zip(aligned.index, aligned.to_numpy(dtype=float)):
+            self.update(row, timestamp)
+
+    @property
+    def matrix(self) -> np.ndarray:
+        """N x N correlation matrix (shared, do not modify)"""
+        correlation = self._correlation
+        if correlation is None:
+            with self._lock:
+                std = np.sqrt(np.diag(self._cov))
+                denominator = np.outer(std, std)
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    correlation = np.clip(self._cov / denominator, -1.0, 1.0)
+                usable = (self._counts >= self.min_periods) & (denominator > 0)
+                correlation = np.where(usable, correlation, self.prior)
+                np.fill_diagonal(correlation, 1.0)
+                correlation.setflags(write=False)
+                self._correlation = correlation
+        return correlation
+
+    def correlation(self, symbol: str, other: str, default: float = 0.0) -> float:
+        """Correlation of two symbols (default if either is unknown)"""
+        i, j = self.indexer([symbol, other])
+        if i < 0 or j < 0:
+            return default
+        return float(self.matrix[i, j])
+
+    def net_book(self, symbols: Sequence[str], sizes: Sequence[float],
+                 directions: Sequence[float]) -> np.ndarray:
+        """Signed size per symbol of a book of positions (matrix order)
+
+        Args:
+            symbols (list): Symbol of each position
+            sizes (list): Size of each position
+            directions (list): +1 for long, -1 for short positions
+
+        Returns:
+            np.ndarray: Net signed size per universe symbol
+        """
+        positions = self.indexer(symbols)
+        known = positions >= 0
+        signed = np.asarray(sizes, dtype=float) * np.asarray(directions, dtype=float)
+        return np.bincount(positions[known], weights=signed[known], minlength=len(self.symbols))
+
+    def exposure(self, candidates: Sequence[str], candidate_directions: Sequence[float],
+                 book_symbols: Sequence[str] = (), book_sizes: Sequence[float] = (),
+                 book_directions: Sequence[float] = (), net: Optional[np.ndarray] = None) -> np.ndarray:
+        """Correlation-weighted exposure of candidate trades to the book
+
+        For each candidate: sum over book positions of size x correlation,
+        negated for positions in the opposite direction. Positions in the
+        candidate's own symbol and symbols outside the universe are ignored.
+
+        Args:
+            candidates (list): Candidate symbols
+            candidate_directions (list): +1 long, -1 short per candidate
+            book_symbols, book_sizes, book_directions: Open positions
+            net (np.ndarray): Precomputed net_book(), instead of the book
+
+        Returns:
+            np.ndarray: Exposure per candidate (0 for unknown symbols)
+        """
+        if net is None:
+            net = self.net_book(book_symbols, book_sizes, book_directions)
+        positions = self.indexer(candidates)
+        known = positions >= 0
+        exposure = np.zeros(len(positions))
+        if known.any():
+            rows = positions[known]
+            # The diagonal is 1, so removing the own-symbol term is a subtraction
+            exposure[known] = self.matrix[rows] @ net - net[rows]
+        return exposure * np.asarray(candidate_directions, dtype=float)
+
+    def to_dict(self) -> Dict[str, Dict[str, float]]:
+        """Correlations as a dict of dicts (for reports; slow for large universes)"""
+        return pd.DataFrame(self.matrix, index=self.symbols, columns=self.symbols).to_dict(orient="index")
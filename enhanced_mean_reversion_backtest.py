@@ -691,11 +691,13 @@ class EnhancedMeanReversionBacktest:
         
         # Apply ML filtering if available
         if self.ml_signal_classifier and self.ml_signal_classifier.is_trained:
+            # Score all signals of the symbol with one model call
+            quality_scores = self.ml_signal_classifier.predict_signal_quality_batch(
+                {symbol: candles}, signals, market_state
+            )
             filtered_signals = []
-            for signal in signals:
-                # Get quality score from ML classifier
-                quality_score = self.ml_signal_classifier.predict_signal_quality(candles, signal, market_state)
-                signal.quality_score = quality_score
+            for signal, quality_score in zip(signals, quality_scores):
+                signal.quality_score = float(quality_score)
                 
                 # Apply quality threshold
                 min_quality = self.config.get('min_signal_quality', 0.5)
@@ -22,6 +22,7 @@ from multi_strategy_system import (
     Signal, TradeDirection, SignalStrength, PositionState,
     CandleData, MarketState, MarketRegime
 )
+from correlation_service import CorrelationService
 
 logger = logging.getLogger("EnhancedTradeManagement")
 
@@ -268,12 +269,70 @@ def filter_signals_by_quality(
     
     return filtered_signals
 
+def _direction_sign(direction: TradeDirection) -> float:
+    return -1.0 if direction == TradeDirection.SHORT else 1.0
+
+
+def correlation_adjustment_factor(exposure: np.ndarray, max_correlation_exposure: float = 1.5) -> np.ndarray:
+    """
+    Size multiplier for a correlation-weighted exposure
+    
+    Args:
+        exposure: Correlation-weighted exposure per candidate
+        max_correlation_exposure: Maximum exposure to correlated assets
+        
+    Returns:
+        np.ndarray: Multiplier per candidate (0.2-1.5)
+    """
+    exposure = np.asarray(exposure, dtype=float)
+    # Reduce size if we already have correlated exposure, increase it if we have negative correlation (hedging)
+    return np.where(exposure > 0,
+                    np.maximum(0.2, 1.0 - exposure / max_correlation_exposure),
+                    np.minimum(1.5, 1.0 + np.abs(exposure) / max_correlation_exposure))
+
+
+def adjust_sizes_for_correlation(
+    base_sizes: np.ndarray,
+    symbols: List[str],
+    directions: List[TradeDirection],
+    current_positions: List[PositionState],
+    correlations: CorrelationService,
+    max_correlation_exposure: float = 1.5
+) -> np.ndarray:
+    """
+    Adjust the sizes of a batch of candidate positions for correlation with the book
+    
+    Args:
+        base_sizes: Base position size per candidate
+        symbols: Symbol per candidate
+        directions: Direction per candidate
+        current_positions: Open positions
+        correlations: Correlation service covering the universe
+        max_correlation_exposure: Maximum exposure to correlated assets
+        
+    Returns:
+        np.ndarray: Adjusted position sizes
+    """
+    base_sizes = np.asarray(base_sizes, dtype=float)
+    if not current_positions:
+        return base_sizes
+    
+    exposure = correlations.exposure(
+        symbols,
+        [_direction_sign(direction) for direction in directions],
+        [position.symbol for position in current_positions],
+        [position.position_size for position in current_positions],
+        [_direction_sign(position.direction) for position in current_positions]
+    )
+    return base_sizes * correlation_adjustment_factor(exposure, max_correlation_exposure)
+
+
 def adjust_position_for_correlation(
     base_size: float,
     symbol: str,
     direction: TradeDirection,
     current_positions: List[PositionState],
-    correlation_matrix: Dict[str, Dict[str, float]],
+    correlation_matrix: Union[CorrelationService, Dict[str, Dict[str, float]]],
     max_correlation_exposure: float = 1.5
 ) -> float:
     """
@@ -284,12 +343,19 @@ def adjust_position_for_correlation(
         symbol: Symbol for the new position
         direction: Direction of the new position
         current_positions: List of current positions
-        correlation_matrix: Matrix of correlations between symbols
+        correlation_matrix: Correlation service, or matrix of correlations between symbols
         max_correlation_exposure: Maximum exposure to correlated assets
         
     Returns:
         float: Adjusted position size
     """
+    if isinstance(correlation_matrix, CorrelationService):
+        if not current_positions or correlation_matrix.indexer([symbol])[0] < 0:
+            return base_size
+        return float(adjust_sizes_for_correlation(
+            [base_size], [symbol], [direction], current_positions, correlation_matrix, max_correlation_exposure
+        )[0])
+    
     if not current_positions or not correlation_matrix or symbol not in correlation_matrix:
         return base_size
     
@@ -298,28 +364,15 @@ def adjust_position_for_correlation(
     
     for position in current_positions:
         pos_symbol = position.symbol
-        pos_direction = position.direction
-        pos_size = position.size
         
         # Skip if same symbol or not in correlation matrix
         if pos_symbol == symbol or pos_symbol not in correlation_matrix[symbol]:
             continue
         
-        # Get correlation between symbols
-        correlation = correlation_matrix[symbol][pos_symbol]
-        
         # Adjust for direction (negative correlation if opposite directions)
-        direction_factor = 1.0 if direction == pos_direction else -1.0
+        direction_factor = 1.0 if direction == position.direction else -1.0
         
         # Add to correlation-weighted exposure
-        correlation_weighted_exposure += pos_size * correlation * direction_factor
-    
-    # Calculate adjustment factor
-    if correlation_weighted_exposure > 0:
-        # Reduce size if we already have correlated exposure
-        adjustment_factor = max(0.2, 1.0 - (correlation_weighted_exposure / max_correlation_exposure))
-    else:
-        # Increase size if we have negative correlation (hedging)
-        adjustment_factor = min(1.5, 1.0 + (abs(correlation_weighted_exposure) / max_correlation_exposure))
+        correlation_weighted_exposure += position.position_size * correlation_matrix[symbol][pos_symbol] * direction_factor
     
-    return base_size * adjustment_factor
+    return base_size * float(correlation_adjustment_factor(correlation_weighted_exposure, max_correlation_exposure))
@@ -1,10 +1,15 @@
 import datetime as dt
 import numpy as np
 import logging
-import copy
 from typing import List, Dict, Any
 from enum import Enum
 
+from signal_filters import ENHANCED_STAGES, SignalFilterPipeline
+from strategy_registry import get_strategy_registry
+
+# Shared by the systems that filter through filter_signals
+_filter_pipeline = SignalFilterPipeline(stages=ENHANCED_STAGES)
+
 class SignalStrength(Enum):
     STRONG_BUY = 3
     MODERATE_BUY = 2
@@ -126,94 +131,16 @@ def filter_signals(signals, candle_data, config, signal_quality_filters, logger)
     """
     if not signals:
         return []
-        
-    filtered_signals = []
-    signals_by_sector = {}
-    signals_today = 0
     
-    # Sort signals by score (descending)
-    sorted_signals = sorted(signals, key=lambda s: getattr(s, 'score', 0.5), reverse=True)
-    
-    for signal in sorted_signals:
-        try:
-            # Skip if we've reached the daily signal limit
-            if signals_today >= signal_quality_filters["max_signals_per_day"]:
-                logger.info(f"Daily signal limit reached, skipping {signal.symbol}")
-                continue
-            
-            # Score threshold filter
-            if hasattr(signal, 'score') and signal.score < signal_quality_filters["min_score_threshold"]:
-                logger.info(f"Signal for {signal.symbol} rejected: score {signal.score:.2f} below threshold")
-                continue
-            
-            # Basic price filter
-            if signal.entry_price < signal_quality_filters["min_price"]:
-                logger.info(f"Signal for {signal.symbol} rejected: price {signal.entry_price} below minimum")
-                continue
-            
-            # Check volume if data is available
-            if signal.symbol in candle_data and len(candle_data[signal.symbol]) > 0:
-                volume_data = [candle.volume for candle in candle_data[signal.symbol][-20:]]
-                if volume_data:
-                    current_volume = volume_data[-1]
-                    avg_volume = sum(volume_data) / len(volume_data)
-                    
-                    if avg_volume > 0 and current_volume < avg_volume * 0.5:
-                        logger.info(f"Signal for {signal.symbol} rejected: volume {current_volume} below threshold")
-                        continue
-            
-            # Check sector exposure
-            sector = "Unknown"
-            for stock in config.stocks:
-                if stock.symbol == signal.symbol:
-                    sector = stock.sector
-                    break
-            
-            if sector not in signals_by_sector:
-                signals_by_sector[sector] = 0
-            
-            max_sector_signals = int(signal_quality_filters["max_sector_exposure"] * signal_quality_filters["max_signals_per_day"])
-            if signals_by_sector[sector] >= max_sector_signals:
-                logger.info(f"Signal for {signal.symbol} rejected: sector {sector} exposure limit reached")
-                continue
-            
-            # Check correlation with existing signals
-            if signal_quality_filters["max_correlation_threshold"] < 1.0:
-                correlated = False
-                for existing_signal in filtered_signals:
-                    # Skip same symbol
-                    if existing_signal.symbol == signal.symbol:
-                        continue
-                    
-                    # Check if symbols are in same sector
-                    existing_sector = "Unknown"
-                    for stock in config.stocks:
-                        if stock.symbol == existing_signal.symbol:
-                            existing_sector = stock.sector
-                            break
-                    
-                    # If same sector, consider them correlated
-                    if sector == existing_sector and sector != "Unknown":
-                        correlated = True
-                        logger.info(f"Signal for {signal.symbol} rejected: correlated with {existing_signal.symbol} (same sector)")
-                        break
-                
-                if correlated:
-                    continue
-            
-            # Signal passed all filters
-            filtered_signals.append(signal)
-            signals_by_sector[sector] = signals_by_sector.get(sector, 0) + 1
-            signals_today += 1
-            
-            logger.info(f"Signal for {signal.symbol} accepted")
-            
-        except Exception as e:
-            logger.error(f"Error filtering signal for {signal.symbol}: {str(e)}")
+    # Score, price, volume, sector correlation and exposure, daily limit
+    _filter_pipeline.set_stocks(config.stocks)
+    filtered_signals, report = _filter_pipeline.run(signals, signal_quality_filters, bars=candle_data.get)
+    logger.info(report.summary())
     
     return filtered_signals
 
-def generate_ml_signals(stocks, strategies, candle_data, market_state, ml_strategy_selector, logger):
+def generate_ml_signals(stocks, strategies, candle_data, market_state, ml_strategy_selector, logger,
+                        background_training=False):
     """
     Generate trading signals using ML-based strategy selection
     
@@ -224,6 +151,9 @@ def generate_ml_signals(stocks, strategies, candle_data, market_state, ml_strate
         market_state: Current market state/regime
         ml_strategy_selector: ML strategy selector object
         logger: Logger object
+        background_training: Let retraining run in the background (live
+            trading only); by default the models are retrained before
+            predicting, so backtests and sweeps are reproducible
         
     Returns:
         List: Generated trading signals
@@ -235,9 +165,14 @@ def generate_ml_signals(stocks, strategies, candle_data, market_state, ml_strate
     logger.info(f"Generating signals for market regime: {market_state.regime}")
     
     all_signals = []
+    strategy_registry = get_strategy_registry()
     
-    # Train ML models if needed
-    ml_strategy_selector.train_models(dt.datetime.now())
+    # Train ML models if needed, on the market clock (the replay time while backtesting)
+    current_date = getattr(market_state, 'timestamp', None) or dt.datetime.now()
+    ml_strategy_selector.train_models(current_date, wait_for_completion=not background_training)
+    
+    # Predict every strategy's performance in the current market state once
+    predictions = ml_strategy_selector.predict_strategies(market_state, list(strategies))
     
     # Process each stock
     for stock_config in stocks:
@@ -253,10 +188,8 @@ def generate_ml_signals(stocks, strategies, candle_data, market_state, ml_strate
         # Process each strategy
         for name, strategy in strategies.items():
             try:
-                # Use ML to predict strategy performance in current market state
-                predicted_performance = ml_strategy_selector.predict_strategy_performance(
-                    name, market_state
-                )
+                # ML prediction of strategy performance in current market state
+                predicted_performance = predictions[name]
                 
                 # Skip strategies with negative expected performance
                 if predicted_performance < 0:
@@ -272,24 +205,7 @@ def generate_ml_signals(stocks, strategies, candle_data, market_state, ml_strate
                     continue
                 
                 # Apply stock-specific strategy parameters if available
-                if name == "MeanReversion" and hasattr(stock_config, "mean_reversion_params"):
-                    strategy_copy = copy.deepcopy(strategy)
-                    strategy_copy.config.update(stock_config.mean_reversion_params)
-                    strategy_to_use = strategy_copy
-                elif name == "TrendFollowing" and hasattr(stock_config, "trend_following_params"):
-                    strategy_copy = copy.deepcopy(strategy)
-                    strategy_copy.config.update(stock_config.trend_following_params)
-                    strategy_to_use = strategy_copy
-                elif name == "VolatilityBreakout" and hasattr(stock_config, "volatility_breakout_params"):
-                    strategy_copy = copy.deepcopy(strategy)
-                    strategy_copy.config.update(stock_config.volatility_breakout_params)
-                    strategy_to_use = strategy_copy
-                elif name == "GapTrading" and hasattr(stock_config, "gap_trading_params"):
-                    strategy_copy = copy.deepcopy(strategy)
-                    strategy_copy.config.update(stock_config.gap_trading_params)
-                    strategy_to_use = strategy_copy
-                else:
-                    strategy_to_use = strategy
+                strategy_to_use = strategy_registry.bind(name, strategy, stock_config)
                 
                 # Generate signals
                 new_signals = strategy_to_use.generate_signals(
@@ -0,0 +1,377 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Exit Rule Grid
+-------------------------------------
+First-touch outcomes of a fixed set of entries under a whole grid of exit
+rules (ATR stop, ATR target, trailing stop, maximum holding period).
+
+ATR optimizations (test_atr_settings.py, optimize_mean_reversion.py) used to
+run a complete backtest per stop/target combination, although the entry
+signals are the same and only the exit multipliers change. Here the entries
+are taken once, and the bars after each entry are turned into excursions in
+ATR units (entries x bars arrays). In those units every exit rule is a
+scalar threshold, so the first bar that touches a stop or target is found
+for all cells x entries x bars with one broadcast comparison.
+
+Fills follow the usual conservative conventions: entries fill at the close
+of the entry bar, a bar that touches both the stop and the target exits at
+the stop, a gap through a level fills at the open, trailing stops move with
+the best excursion of the previous bars, and positions still open after
+``max_hold`` bars exit at that bar's close.
+
+Usage:
+    grid = ExitGrid(stop_loss_atr=[1.5, 2.0, 2.5], take_profit_atr=[2.5, 3.0, 4.0],
+                    trailing=[None, (1.0, 1.5)], max_hold=[10, 20])
+    result = evaluate_exit_grid(entries_from_trades(trade_history), bars, grid)
+    result.summary()        # win rate, returns, profit factor and exit reasons per cell
+"""
+
+import itertools
+import logging
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger("ExitGrid")
+
+# Exit reason codes in ExitGridResult.reasons
+EXIT_REASONS = ("end", "stop", "target", "trailing", "time")
+END, STOP, TARGET, TRAILING, TIME = range(len(EXIT_REASONS))
+
+# Upper bound on cell x entry x bar comparisons evaluated at once
+MAX_CELLS_PER_CHUNK = 20_000_000
+
+CELL_COLUMNS = ["stop_loss_atr", "take_profit_atr", "trailing_activation_atr",
+                "trailing_distance_atr", "max_hold"]
+
+
+class ExitGrid:
+    """Exit rule combinations to evaluate, one row of ``cells`` per rule set"""
+
+    def __init__(self, stop_loss_atr: Iterable[float], take_profit_atr: Iterable[Optional[float]],
+                 trailing: Iterable[Optional[Tuple[float, float]]] = (None,),
+                 max_hold: Iterable[int] = (20,)):
+        """Initialize the grid as the product of all settings
+
+        Args:
+            stop_loss_atr (list): Stop distances in ATRs
+            take_profit_atr (list): Target distances in ATRs (None: no target)
+            trailing (list): (activation, distance) in ATRs, or None for no
+                trailing stop
+            max_hold (list): Maximum bars held after the entry bar
+        """
+        rows = [(stop, target) + _trailing_pair(trail) + (hold,)
+                for stop, target, trail, hold in itertools.product(stop_loss_atr, take_profit_atr, trailing, max_hold)]
+        self.cells = _cell_frame(rows)
+
+    @classmethod
+    def from_combinations(cls, combinations: Sequence[Dict],
+                          trailing: Iterable[Optional[Tuple[float, float]]] = (None,),
+                          max_hold: Iterable[int] = (20,)) -> 'ExitGrid':
+        """Grid of paired stop/target settings, like ``atr_combinations``
+
+        Args:
+            combinations (list): Dicts with 'stop_loss', 'take_profit' and
+                optional 'name'
+            trailing (list): Trailing stop settings crossed with every pair
+            max_hold (list): Holding periods crossed with every pair
+        """
+        grid = cls.__new__(cls)
+        rows, names = [], []
+        for combo, trail, hold in itertools.product(combinations, trailing, max_hold):
+            rows.append((combo['stop_loss'], combo.get('take_profit')) + _trailing_pair(trail) + (hold,))
+            names.append(combo.get('name'))
+        grid.cells = _cell_frame(rows)
+        if any(name is not None for name in names):
+            grid.cells.insert(0, 'name', names)
+        return grid
+
+    def __len__(self) -> int:
+        return len(self.cells)
+
+
+def _trailing_pair(trail: Optional[Tuple[float, float]]) -> Tuple[float, float]:
+    return (np.nan, np.nan) if trail is None else (float(trail[0]), float(trail[1]))
+
+
+def _cell_frame(rows: List[Tuple]) -> pd.DataFrame:
+    cells = pd.DataFrame(rows, columns=CELL_COLUMNS)
+    cells['take_profit_atr'] = cells['take_profit_atr'].astype(float)
+    cells['max_hold'] = cells['max_hold'].astype(int)
+    if (cells['stop_loss_atr'] <= 0).any() or (cells['max_hold'] < 1).any():
+        raise ValueError("Stops must be positive and positions held for at least one bar")
+    return cells
+
+
+def entries_from_trades(trades: Sequence[Dict]) -> pd.DataFrame:
+    """Entries of a backtest's trade history
+
+    Keeps symbol, entry_time and direction, plus the trades' own entry_price
+    and atr when they carry them, so the grid scores the fills the backtest
+    actually made instead of re-pricing them at the entry bar's close.
+    """
+    frame = pd.DataFrame(list(trades))
+    if frame.empty:
+        return pd.DataFrame(columns=['symbol', 'entry_time', 'direction'])
+    columns = ['symbol', 'entry_time', 'direction'] + [column for column in ('entry_price', 'atr') if column in frame]
+    return frame[columns].reset_index(drop=True)
+
+
+def average_true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int = 14) -> np.ndarray:
+    """Mean of the last ``period`` true ranges at every bar (NaN until period + 1 bars)"""
+    atr = np.full(len(close), np.nan)
+    if len(close) <= period:
+        return atr
+    prev_close = close[:-1]
+    true_range = np.maximum(high[1:] - low[1:], np.maximum(np.abs(high[1:] - prev_close), np.abs(low[1:] - prev_close)))
+    sums = np.cumsum(np.concatenate([[0.0], true_range]))
+    atr[period:] = (sums[period:] - sums[:-period]) / period
+    return atr
+
+
+@dataclass
+class EntryWindows:
+    """Bars after each entry as excursions from the entry price, in ATRs"""
+    entries: pd.DataFrame
+    entry_price: np.ndarray
+    atr: np.ndarray
+    # entries x bars; NaN after the last available bar
+    open: np.ndarray
+    adverse: np.ndarray
+    favorable: np.ndarray
+    close: np.ndarray
+    # Best favorable excursion before each bar (at least 0)
+    peak: np.ndarray
+    bars_available: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+def build_entry_windows(entries: pd.DataFrame, bars: Mapping[str, pd.DataFrame], horizon: int,
+                        atr_period: int = 14, intrabar: bool = True) -> EntryWindows:
+    """Gather the bars after every entry
+
+    Args:
+        entries (pd.DataFrame): 'symbol', 'entry_time' and 'direction'
+            ('LONG'/'SHORT' or +1/-1); optional 'entry_price' and 'atr'
+        bars (dict): Symbol -> OHLC DataFrame indexed by timestamp
+        horizon (int): Bars to gather after each entry
+        atr_period (int): ATR period for entries without an 'atr'
+        intrabar (bool): Use highs and lows for touches; False checks the
+            levels against closes only, like the live exit checks
+
+    Returns:
+        EntryWindows: Windows of the entries that have a bar, a price and a
+            positive ATR (others are dropped)
+    """
+    entries = entries.reset_index(drop=True)
+    count = len(entries)
+    entry_price = np.full(count, np.nan)
+    atr = np.full(count, np.nan)
+    sign = np.where(entries['direction'].map(_direction_sign).to_numpy(dtype=float) < 0, -1.0, 1.0) \
+        if count else np.zeros(0)
+    shape = (count, horizon)
+    opens, highs, lows, closes = (np.full(shape, np.nan) for _ in range(4))
+    available = np.zeros(count, dtype=np.int64)
+    steps = np.arange(1, horizon + 1)
+
+    for symbol, rows in entries.groupby('symbol').indices.items():
+        frame = bars.get(symbol)
+        if frame is None or frame.empty:
+            continue
+        index = frame.index
+        times = pd.DatetimeIndex(pd.to_datetime(entries['entry_time'].iloc[rows]))
+        if index.tz is not None and times.tz is None:
+            times = times.tz_localize(index.tz)
+        elif index.tz is None and times.tz is not None:
+            times = times.tz_convert(None)
+        # Entry bar: the last bar at or before the entry time
+        positions = index.searchsorted(times, side='right') - 1
+        found = positions >= 0
+        rows, positions = rows[found], positions[found]
+
+        o, h, l, c = (frame[column].to_numpy(dtype=float) for column in ('open', 'high', 'low', 'close'))
+        entry_price[rows] = c[positions]
+        atr[rows] = average_true_range(h, l, c, atr_period)[positions]
+
+        window = positions[:, None] + steps[None, :]
+        inside = window < len(c)
+        window = np.minimum(window, len(c) - 1)
+        for target, values in ((opens, o), (highs, h), (lows, l), (closes, c)):
+            target[rows] = np.where(inside, values[window], np.nan)
+        available[rows] = inside.sum(axis=1)
+
+    # Prices and ATRs the entries carry win over the bar close and bar ATR
+    found = np.isfinite(entry_price)
+    if 'entry_price' in entries:
+        given = entries['entry_price'].to_numpy(dtype=float)
+        entry_price = np.where(found & np.isfinite(given), given, entry_price)
+    if 'atr' in entries:
+        given = entries['atr'].to_numpy(dtype=float)
+        atr = np.where(found & np.isfinite(given), given, atr)
+
+    keep = np.isfinite(entry_price) & np.isfinite(atr) & (atr > 0)
+    if (~keep).any():
+        logger.info(f"Skipping {int((~keep).sum())} of {count} entries without bars or ATR")
+
+    price, scale, sign = entry_price[keep, None], atr[keep, None], sign[keep, None]
+    opened = sign * (opens[keep] - price) / scale
+    closed = sign * (closes[keep] - price) / scale
+    if intrabar:
+        adverse = np.where(sign > 0, lows[keep] - price, price - highs[keep]) / scale
+        favorable = np.where(sign > 0, highs[keep] - price, price - lows[keep]) / scale
+    else:
+        opened = adverse = favorable = closed
+
+    best = np.maximum.accumulate(np.where(np.isnan(favorable), 0.0, np.maximum(favorable, 0.0)), axis=1)
+    peak = np.zeros_like(best)
+    peak[:, 1:] = best[:, :-1]
+
+    return EntryWindows(
+        entries=entries[keep].reset_index(drop=True),
+        entry_price=entry_price[keep],
+        atr=atr[keep],
+        open=opened,
+        adverse=adverse,
+        favorable=favorable,
+        close=closed,
+        peak=peak,
+        bars_available=available[keep]
+    )
+
+
+def _direction_sign(direction) -> float:
+    if isinstance(direction, str):
+        return -1.0 if direction.upper() in ('SHORT', 'SELL') else 1.0
+    return float(np.sign(direction)) or 1.0
+
+
+def _evaluate_chunk(windows: EntryWindows, cells: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """Exit of every entry under a block of cells (cells x entries arrays)"""
+    def column(name, missing):
+        values = cells[name].to_numpy(dtype=float)
+        return np.where(np.isnan(values), missing, values)[:, None, None]
+
+    stop = column('stop_loss_atr', np.inf)
+    target = column('take_profit_atr', np.inf)
+    activation = column('trailing_activation_atr', np.inf)
+    distance = column('trailing_distance_atr', np.inf)
+    hold = cells['max_hold'].to_numpy()[:, None]
+
+    horizon = windows.adverse.shape[1]
+    bar = np.arange(horizon)
+    last = np.minimum(hold, windows.bars_available[None, :])
+    inside = bar[None, None, :] < last[:, :, None]
+
+    # Stop level of every bar: the fixed stop, raised by an active trailing stop
+    trailing = np.where(windows.peak[None] >= activation, windows.peak[None] - distance, -np.inf)
+    level = np.maximum(-stop, trailing)
+    stopped = inside & (windows.adverse[None] <= level)
+    reached = inside & (windows.favorable[None] >= target)
+    touched = stopped | reached
+
+    exited = touched.any(axis=2)
+    first = touched.argmax(axis=2)
+    cell, entry = np.indices(first.shape)
+    at_stop = stopped[cell, entry, first]
+    opened = windows.open[entry, first]
+    fill_stop = np.fmin(opened, level[cell, entry, first])
+    fill_target = np.fmax(opened, np.broadcast_to(target[:, :, 0], first.shape))
+    raised = level[cell, entry, first] > -stop[:, :, 0]
+
+    # Open positions leave at the close of their last bar
+    final = np.maximum(last - 1, 0)
+    closed = np.where(last > 0, windows.close[entry, final], 0.0)
+    timed_out = hold <= windows.bars_available[None, :]
+
+    return {
+        'excursion': np.where(exited, np.where(at_stop, fill_stop, fill_target), closed),
+        'reasons': np.where(exited, np.where(at_stop, np.where(raised, TRAILING, STOP), TARGET),
+                            np.where(timed_out, TIME, END)).astype(np.int8),
+        'bars_held': np.where(exited, first + 1, last)
+    }
+
+
+@dataclass
+class ExitGridResult:
+    """Exit of every entry under every cell of a grid (cells x entries arrays)"""
+    cells: pd.DataFrame
+    windows: EntryWindows
+    # Exit relative to the entry price in ATRs (positive = profit)
+    excursion: np.ndarray
+    reasons: np.ndarray
+    bars_held: np.ndarray
+
+    @property
+    def returns(self) -> np.ndarray:
+        """Return of every trade, as a fraction of the entry price"""
+        return self.excursion * (self.windows.atr / self.windows.entry_price)[None, :]
+
+    @property
+    def exit_prices(self) -> np.ndarray:
+        sign = np.where(self.windows.entries['direction'].map(_direction_sign).to_numpy(dtype=float) < 0, -1.0, 1.0)
+        return self.windows.entry_price[None, :] + sign[None, :] * self.excursion * self.windows.atr[None, :]
+
+    def summary(self) -> pd.DataFrame:
+        """Trade statistics per cell, best total return first"""
+        returns = self.returns
+        wins = returns > 0
+        gains = np.where(wins, returns, 0.0).sum(axis=1)
+        losses = np.abs(np.where(returns < 0, returns, 0.0).sum(axis=1))
+        trades = returns.shape[1]
+
+        summary = self.cells.copy()
+        summary['trades'] = trades
+        with np.errstate(divide='ignore', invalid='ignore'):
+            summary['win_rate'] = wins.sum(axis=1) / trades * 100 if trades else 0.0
+            summary['avg_return'] = returns.mean(axis=1) * 100 if trades else 0.0
+            summary['total_return'] = returns.sum(axis=1) * 100
+            summary['profit_factor'] = np.where(losses > 0, gains / losses, np.inf)
+            summary['expectancy_r'] = (self.excursion / self.cells['stop_loss_atr'].to_numpy()[:, None]).mean(axis=1) \
+                if trades else 0.0
+            summary['avg_bars_held'] = self.bars_held.mean(axis=1) if trades else 0.0
+        for code, reason in enumerate(EXIT_REASONS):
+            summary[f'{reason}_exits'] = (self.reasons == code).sum(axis=1)
+        return summary.sort_values('total_return', ascending=False, kind='stable')
+
+    def trades(self, cell: int) -> pd.DataFrame:
+        """Every entry with its exit under one cell (row of ``cells``)"""
+        trades = self.windows.entries.copy()
+        trades['entry_price'] = self.windows.entry_price
+        trades['atr'] = self.windows.atr
+        trades['exit_price'] = self.exit_prices[cell]
+        trades['bars_held'] = self.bars_held[cell]
+        trades['exit_reason'] = np.asarray(EXIT_REASONS)[self.reasons[cell]]
+        trades['return_pct'] = self.returns[cell] * 100
+        return trades
+
+
+def evaluate_exit_grid(entries: pd.DataFrame, bars: Mapping[str, pd.DataFrame], grid: ExitGrid,
+                       atr_period: int = 14, intrabar: bool = True) -> ExitGridResult:
+    """Evaluate every exit rule set of a grid on the same entries
+
+    Args:
+        entries (pd.DataFrame): Entries (see build_entry_windows)
+        bars (dict): Symbol -> OHLC DataFrame indexed by timestamp
+        grid (ExitGrid): Exit rules to evaluate
+        atr_period (int): ATR period for entries without an 'atr'
+        intrabar (bool): Touch levels with highs/lows (False: closes only)
+
+    Returns:
+        ExitGridResult: Exits per cell and entry
+    """
+    horizon = int(grid.cells['max_hold'].max())
+    windows = build_entry_windows(entries, bars, horizon, atr_period, intrabar)
+
+    chunk = max(1, MAX_CELLS_PER_CHUNK // max(1, len(windows) * horizon))
+    parts = [_evaluate_chunk(windows, grid.cells.iloc[start:start + chunk])
+             for start in range(0, len(grid), chunk)]
+    outcome = {name: np.concatenate([part[name] for part in parts]) for name in parts[0]}
+
+    logger.info(f"Evaluated {len(grid)} exit rule sets on {len(windows)} entries")
+    return ExitGridResult(cells=grid.cells, windows=windows, **outcome)
@@ -19,6 +19,14 @@ import alpaca_trade_api as tradeapi
 from tqdm import tqdm
 import math
 from strategy_performance_tracker import StrategyPerformanceTracker
+from historical_data_store import get_data_store
+from sector_index import get_sector_index
+from regime_service import RegimeService
+from monte_carlo import TradeOutcomeModel, build_trade_plan, simulate_outcomes
+from results_catalog import record_backtest_run
+from performance_metrics import trade_statistics
+from signal_panel import (LONG_SCORE_ROWS, THRESHOLD_MULTIPLIERS, build_price_panel,
+                          last_valid_rows, panel_indicators, panel_long_scores)
 from bs4 import BeautifulSoup
 import traceback
 import argparse
@@ -175,11 +183,18 @@ CONFIG = load_config()
 class SP500Strategy:
     """S&P 500 Trading Strategy"""
     
-    def __init__(self, api, config=None, mode='paper', backtest_mode=False, backtest_start_date=None, backtest_end_date=None):
-        """Initialize the strategy"""
+    def __init__(self, api, config=None, mode='paper', backtest_mode=False, backtest_start_date=None, backtest_end_date=None,
+                 data_store=None):
+        """Initialize the strategy
+        
+        data_store is an optional HistoricalDataStore; when given, historical
+        bars are loaded through it (batched and cached) instead of per-symbol
+        API calls.
+        """
         try:
             # Set API and mode
             self.api = api
+            self.data_store = data_store
             self.mode = mode
             self.backtest_mode = backtest_mode
             self.backtest_start_date = backtest_start_date
@@ -238,6 +253,13 @@ class SP500Strategy:
             # Signal thresholds
             self.long_signal_threshold = self.strategy_params.get('long_signal_threshold', 0.5)
             
+            # Score the whole universe at once instead of symbol by symbol
+            self.panel_scoring = self.strategy_params.get('panel_scoring', True)
+            
+            # Market and sector regimes are recomputed once per bar of this interval
+            self.regime_bar_interval = self.strategy_params.get('regime_bar_interval', '1D')
+            self.regime_service = RegimeService(self._compute_market_regime, self._compute_sector_performance)
+            
             # Define TOP 100 symbols as fallback
             self.TOP_100_SYMBOLS = [
                 'AAPL', 'MSFT', 'AMZN', 'GOOGL', 'GOOG', 'META', 'TSLA', 'NVDA', 'BRK.B', 'UNH',
@@ -252,20 +274,8 @@ class SP500Strategy:
                 'AMT', 'MRNA', 'LRCX', 'ELV', 'COP', 'CB', 'BDX', 'DUK', 'SO', 'EOG'
             ]
             
-            # Set up sector ETFs for market regime detection
-            self.sector_etfs = {
-                'XLK': 'Technology',
-                'XLF': 'Financials',
-                'XLV': 'Healthcare',
-                'XLE': 'Energy',
-                'XLI': 'Industrials',
-                'XLY': 'Consumer Discretionary',
-                'XLP': 'Consumer Staples',
-                'XLB': 'Materials',
-                'XLU': 'Utilities',
-                'XLRE': 'Real Estate',
-                'XLC': 'Communication Services'
-            }
+            # Sector and sector ETF metadata for market regime detection
+            self.sector_index = get_sector_index(config.get('paths', {}).get('sector_map'))
             
             # Initialize performance tracker
             self.performance_tracker = StrategyPerformanceTracker(
@@ -307,6 +317,13 @@ class SP500Strategy:
     
     def _backtest_get_historical_data(self, symbol, days=30, max_retries=3, retry_delay=2):
         """Backtest version of get_historical_data"""
+        # Use real bars when a data store is available
+        if self.data_store is not None:
+            data = self._original_get_historical_data(symbol, days=days)
+            if data is not None:
+                return self.calculate_technical_indicators(data.set_index('date'))
+            logger.warning(f"No cached bars for {symbol}, using synthetic backtest data")
+        
         try:
             # Generate dates from start_date to end_date
             start_date = pd.Timestamp(self.backtest_start_date)
@@ -639,48 +656,56 @@ class SP500Strategy:
         except Exception as e:
             logger.error(f"Error saving trades: {str(e)}")
     
+    def _historical_data_range(self, days):
+        """Start and end dates (YYYY-MM-DD) get_historical_data requests for ``days`` bars"""
+        if self.backtest_mode and self.backtest_start_date and self.backtest_end_date:
+            end_date = pd.Timestamp(self.backtest_end_date)
+            buffer_days = max(days * 2, 40)
+            start_date = pd.Timestamp(self.backtest_start_date) - pd.Timedelta(days=buffer_days)
+        else:
+            end_date = pd.Timestamp.now(tz='America/New_York')
+            start_date = end_date - pd.Timedelta(days=days*2)
+        return start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d')
+    
+    def _fetch_bars(self, symbol, start_str, end_str, timeframe):
+        """Bars for one symbol from the data store, or from the API without one"""
+        if self.data_store is not None:
+            bars = self.data_store.get_bars([symbol], start_str, end_str, timeframe).get(symbol)
+            return bars[['open', 'high', 'low', 'close', 'volume']] if bars is not None else None
+        
+        return self.api.get_bars(
+            symbol, 
+            timeframe, 
+            start=start_str,
+            end=end_str,
+            adjustment='raw'
+        ).df
+    
+    def prefetch_historical_data(self, symbols, days=30, timeframe='1D'):
+        """Load bars for many symbols in batched requests ahead of per-symbol calls
+        
+        Only has an effect with a data store: later get_historical_data calls
+        for these symbols are then served from its cache.
+        """
+        if self.data_store is None:
+            return
+        start_str, end_str = self._historical_data_range(days)
+        try:
+            self.data_store.get_bars(symbols, start_str, end_str, timeframe)
+        except Exception as e:
+            logger.warning(f"Error prefetching historical data: {str(e)}")
+    
     def get_historical_data(self, symbol, days=20, timeframe='1D'):
         """Get historical data for a symbol"""
         try:
-            if self.backtest_mode and self.backtest_start_date and self.backtest_end_date:
-                # For backtesting, use the specified date range
-                end_date = pd.Timestamp(self.backtest_end_date)
-                # Calculate start date based on required days plus buffer
-                buffer_days = max(days * 2, 40)
-                start_date = pd.Timestamp(self.backtest_start_date) - pd.Timedelta(days=buffer_days)
-                
-                logger.debug(f"Fetching backtest data for {symbol} from {start_date} to {end_date}")
-                
-                # Format dates for Alpaca API
-                start_str = start_date.strftime('%Y-%m-%d')
-                end_str = end_date.strftime('%Y-%m-%d')
-                
-                # Get historical data from Alpaca
-                bars = self.api.get_bars(
-                    symbol, 
-                    timeframe, 
-                    start=start_str,
-                    end=end_str,
-                    adjustment='raw'
-                ).df
-                
-            else:
-                # For live/paper trading, get the most recent data
-                end_date = pd.Timestamp.now(tz='America/New_York')
-                start_date = end_date - pd.Timedelta(days=days*2)
-                
-                # Format dates for Alpaca API
-                start_str = start_date.strftime('%Y-%m-%d')
-                end_str = end_date.strftime('%Y-%m-%d')
-                
-                # Get historical data from Alpaca
-                bars = self.api.get_bars(
-                    symbol, 
-                    timeframe, 
-                    start=start_str,
-                    end=end_str,
-                    adjustment='raw'
-                ).df
+            # Backtests cover the backtest period plus a warm-up buffer,
+            # live/paper trading the most recent days
+            start_str, end_str = self._historical_data_range(days)
+            
+            logger.debug(f"Fetching data for {symbol} from {start_str} to {end_str}")
+            
+            # Get historical data from Alpaca
+            bars = self._fetch_bars(symbol, start_str, end_str, timeframe)
             
             # Check if we have enough data
             if bars is None or len(bars) < days:
@@ -724,39 +749,108 @@ class SP500Strategy:
         """
         if symbols is None:
             symbols = self.get_symbols()
+        
+        # Load the whole universe (plus SPY and sector ETFs) in batched requests
+        self.prefetch_historical_data(list(symbols) + ['SPY'] + list(self.sector_etfs))
             
         if market_regime is None:
             market_regime = self.detect_market_regime()
             
         if sector_regimes is None:
             sector_regimes = self.get_sector_performance() if self.sector_performance_enabled else {}
-            
-        signals = []
         
         # Get thresholds from config
         long_signal_threshold = self.config.get('long_signal_threshold', 0.5)
         
         # Adjust thresholds based on market regime
-        if market_regime == 'STRONG_BULLISH':
-            long_threshold_multiplier = 0.9
-        elif market_regime == 'BULLISH':
-            long_threshold_multiplier = 0.95
-        elif market_regime == 'NEUTRAL':
-            long_threshold_multiplier = 1.0
-        elif market_regime == 'BEARISH':
-            long_threshold_multiplier = 1.1
-        elif market_regime == 'STRONG_BEARISH':
-            long_threshold_multiplier = 1.2
-        else:
-            long_threshold_multiplier = 1.0
+        long_threshold_multiplier = THRESHOLD_MULTIPLIERS.get(market_regime, 1.0)
         
         # Apply thresholds
         long_threshold = long_signal_threshold * long_threshold_multiplier
         
         logger.info(f"Generated signals: calculating for {len(symbols)} symbols")
         
+        # Backtests read precomputed indicator frames, which only the per-symbol path handles
+        if self.panel_scoring and not self.backtest_mode:
+            signals = self._panel_trade_signals(symbols, market_regime, sector_regimes, long_threshold)
+        else:
+            signals = self._symbol_trade_signals(symbols, market_regime, sector_regimes, long_threshold)
+        
         # Track signal scores for analysis
-        long_scores = []
+        long_scores = [signal['score'] for signal in signals]
+        
+        # Log signal statistics
+        logger.info(f"Generated {len(signals)} LONG signals")
+        
+        if long_scores:
+            avg_long_score = sum(long_scores) / len(long_scores)
+            logger.info(f"Average LONG score: {avg_long_score:.3f}")
+        
+        # Sort signals by score
+        signals = sorted(signals, key=lambda x: x['score'], reverse=True)
+        
+        # Log top signals
+        if signals:
+            top_long = signals[:5]
+            logger.info(f"Top LONG signals: {', '.join([f'{s['symbol']} ({s['score']:.3f})' for s in top_long])}")
+        
+        return signals
+    
+    def _load_price_panel(self, symbols, days=20):
+        """Most recent ``days`` bars of every symbol as one price panel"""
+        if self.data_store is not None:
+            start_str, end_str = self._historical_data_range(days)
+            bars = self.data_store.get_bars(list(symbols), start_str, end_str, '1D')
+        else:
+            bars = {}
+            for symbol in symbols:
+                data = self.get_historical_data(symbol, days=days)
+                if data is not None:
+                    bars[symbol] = data.set_index('date')
+        return build_price_panel(bars, days, symbols)
+    
+    def _panel_trade_signals(self, symbols, market_regime, sector_regimes, long_threshold):
+        """LONG signals for the whole universe from one (bar x symbol) panel
+        
+        Gives the same signals as _symbol_trade_signals, with indicators and
+        scores computed for all symbols at once.
+        """
+        panel = self._load_price_panel(symbols, days=20)
+        if not len(panel):
+            return []
+        
+        indicators = panel_indicators(panel, self.rsi_period, self.macd_fast, self.macd_slow, self.macd_signal,
+                                      self.bb_period, self.bb_std_dev, self.atr_period)
+        rows, valid_count = last_valid_rows(indicators, LONG_SCORE_ROWS)
+        latest_close, latest_volume = rows['close'][-1], rows['volume'][-1]
+        
+        # Sector regime of every symbol through its sector ETF
+        symbol_sectors = self.sector_index.sectors(panel.symbols, 'Unknown')
+        symbol_regimes = np.array([sector_regimes.get(etf, 'NEUTRAL') if etf else 'NEUTRAL'
+                                   for etf in self.sector_index.etfs(symbol_sectors)], dtype=object)
+        
+        scores = panel_long_scores(rows, valid_count, market_regime, symbol_regimes)
+        
+        # Enough data, at least $1M traded on the latest bar and above the threshold
+        selected = (valid_count >= 5) & (latest_close * latest_volume >= 1000000) & (scores > long_threshold)
+        
+        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        return [{
+            'symbol': panel.symbols[i],
+            'direction': 'LONG',
+            'score': float(scores[i]),
+            'price': latest_close[i],
+            'volume': latest_volume[i],
+            'market_cap': latest_close[i] * latest_volume[i],
+            'timestamp': timestamp,
+            'sector': symbol_sectors[i],
+            'sector_regime': symbol_regimes[i],
+            'market_regime': market_regime
+        } for i in np.flatnonzero(selected)]
+    
+    def _symbol_trade_signals(self, symbols, market_regime, sector_regimes, long_threshold):
+        """LONG signals computed one symbol at a time"""
+        signals = []
         
         # Process each symbol
         for symbol in symbols:
@@ -784,29 +878,7 @@ class SP500Strategy:
                 symbol_sector = self.get_symbol_sector(symbol)
                 
                 # Find the corresponding sector ETF
-                sector_etf = None
-                if symbol_sector == 'Technology':
-                    sector_etf = 'XLK'
-                elif symbol_sector == 'Financials':
-                    sector_etf = 'XLF'
-                elif symbol_sector == 'Healthcare':
-                    sector_etf = 'XLV'
-                elif symbol_sector == 'Energy':
-                    sector_etf = 'XLE'
-                elif symbol_sector == 'Industrials':
-                    sector_etf = 'XLI'
-                elif symbol_sector == 'Consumer Discretionary':
-                    sector_etf = 'XLY'
-                elif symbol_sector == 'Consumer Staples':
-                    sector_etf = 'XLP'
-                elif symbol_sector == 'Materials':
-                    sector_etf = 'XLB'
-                elif symbol_sector == 'Utilities':
-                    sector_etf = 'XLU'
-                elif symbol_sector == 'Real Estate':
-                    sector_etf = 'XLRE'
-                elif symbol_sector == 'Communication Services':
-                    sector_etf = 'XLC'
+                sector_etf = self.sector_index.etf(symbol_sector)
                 
                 sector_regime = sector_regimes.get(sector_etf, 'NEUTRAL') if sector_etf else 'NEUTRAL'
                 
@@ -827,26 +899,10 @@ class SP500Strategy:
                         'sector_regime': sector_regime,
                         'market_regime': market_regime
                     })
-                    long_scores.append(long_score)
                 
             except Exception as e:
                 logger.warning(f"Error processing {symbol}: {str(e)}")
         
-        # Log signal statistics
-        logger.info(f"Generated {len(signals)} LONG signals")
-        
-        if long_scores:
-            avg_long_score = sum(long_scores) / len(long_scores)
-            logger.info(f"Average LONG score: {avg_long_score:.3f}")
-        
-        # Sort signals by score
-        signals = sorted(signals, key=lambda x: x['score'], reverse=True)
-        
-        # Log top signals
-        if signals:
-            top_long = signals[:5]
-            logger.info(f"Top LONG signals: {', '.join([f'{s['symbol']} ({s['score']:.3f})' for s in top_long])}")
-        
         return signals
     
     def summarize_signals(self, signals):
@@ -948,29 +1004,7 @@ class SP500Strategy:
             
             # Get sector and market regimes
             sector = signal['sector']
-            sector_etf = None
-            if sector == 'Technology':
-                sector_etf = 'XLK'
-            elif sector == 'Financials':
-                sector_etf = 'XLF'
-            elif sector == 'Healthcare':
-                sector_etf = 'XLV'
-            elif sector == 'Energy':
-                sector_etf = 'XLE'
-            elif sector == 'Industrials':
-                sector_etf = 'XLI'
-            elif sector == 'Consumer Discretionary':
-                sector_etf = 'XLY'
-            elif sector == 'Consumer Staples':
-                sector_etf = 'XLP'
-            elif sector == 'Materials':
-                sector_etf = 'XLB'
-            elif sector == 'Utilities':
-                sector_etf = 'XLU'
-            elif sector == 'Real Estate':
-                sector_etf = 'XLRE'
-            elif sector == 'Communication Services':
-                sector_etf = 'XLC'
+            sector_etf = self.sector_index.etf(sector)
             
             sector_regime = sector_performance.get(sector_etf, 'NEUTRAL') if sector_etf else 'NEUTRAL'
             market_regime = signal['market_regime']
@@ -1319,29 +1353,7 @@ class SP500Strategy:
                     symbol_sector = self.get_symbol_sector(symbol)
                     
                     # Find corresponding sector ETF
-                    sector_etf = None
-                    if symbol_sector == 'Technology':
-                        sector_etf = 'XLK'
-                    elif symbol_sector == 'Financials':
-                        sector_etf = 'XLF'
-                    elif symbol_sector == 'Healthcare':
-                        sector_etf = 'XLV'
-                    elif symbol_sector == 'Energy':
-                        sector_etf = 'XLE'
-                    elif symbol_sector == 'Industrials':
-                        sector_etf = 'XLI'
-                    elif symbol_sector == 'Consumer Discretionary':
-                        sector_etf = 'XLY'
-                    elif symbol_sector == 'Consumer Staples':
-                        sector_etf = 'XLP'
-                    elif symbol_sector == 'Materials':
-                        sector_etf = 'XLB'
-                    elif symbol_sector == 'Utilities':
-                        sector_etf = 'XLU'
-                    elif symbol_sector == 'Real Estate':
-                        sector_etf = 'XLRE'
-                    elif symbol_sector == 'Communication Services':
-                        sector_etf = 'XLC'
+                    sector_etf = self.sector_index.etf(symbol_sector)
                     
                     sector_regime = sector_performance.get(sector_etf, 'NEUTRAL') if sector_etf else 'NEUTRAL'
                     
@@ -1627,427 +1639,6 @@ class SP500Strategy:
             logger.error(f"Error checking stop-loss conditions: {str(e)}")
             return []
     
-    def detect_market_regime(self):
-        """
-        Detect the current market regime by analyzing SPY ETF and sector ETFs
-        Returns: STRONG_BULLISH, BULLISH, NEUTRAL, BEARISH, or STRONG_BEARISH
-        """
-        try:
-            # Get SPY data
-            spy_data = self.get_historical_data('SPY', days=30)
-            
-            if spy_data is None or len(spy_data) < 20:
-                logger.warning("Not enough SPY data to detect market regime")
-                return 'NEUTRAL'
-            
-            # Calculate SMAs
-            spy_data['sma5'] = spy_data['close'].rolling(window=5).mean()
-            spy_data['sma10'] = spy_data['close'].rolling(window=10).mean()
-            spy_data['sma20'] = spy_data['close'].rolling(window=20).mean()
-            spy_data['sma50'] = spy_data['close'].rolling(window=min(50, len(spy_data))).mean()
-            
-            # Calculate percentage changes
-            spy_data['change_1d'] = spy_data['close'].pct_change(periods=1) * 100
-            spy_data['change_3d'] = spy_data['close'].pct_change(periods=3) * 100
-            spy_data['change_5d'] = spy_data['close'].pct_change(periods=5) * 100
-            spy_data['change_10d'] = spy_data['close'].pct_change(periods=10) * 100
-            spy_data['change_20d'] = spy_data['close'].pct_change(periods=20) * 100
-            
-            # Calculate volume metrics
-            spy_data['volume_sma10'] = spy_data['volume'].rolling(window=10).mean()
-            spy_data['volume_ratio'] = spy_data['volume'] / spy_data['volume_sma10']
-            
-            # Calculate volatility (ATR)
-            if 'atr' not in spy_data.columns:
-                # Calculate ATR
-                spy_data['tr'] = np.maximum(
-                    spy_data['high'] - spy_data['low'],
-                    np.maximum(
-                        abs(spy_data['high'] - spy_data['close'].shift()),
-                        abs(spy_data['low'] - spy_data['close'].shift())
-                    )
-                )
-                spy_data['atr'] = spy_data['tr'].rolling(window=10).mean()
-            
-            # Calculate volatility ratio (current ATR vs historical)
-            spy_data['atr_ratio'] = spy_data['atr'] / spy_data['atr'].rolling(window=20).mean()
-            
-            # Calculate RSI for overbought/oversold conditions
-            delta = spy_data['close'].diff()
-            gain = delta.where(delta > 0, 0)
-            loss = -delta.where(delta < 0, 0)
-            
-            avg_gain = gain.rolling(window=14).mean()
-            avg_loss = loss.rolling(window=14).mean()
-            
-            rs = avg_gain / avg_loss.where(loss != 0, 1)
-            spy_data['rsi'] = 100 - (100 / (1 + rs))
-            
-            # Get latest data
-            latest = spy_data.iloc[-1]
-            
-            # Determine market regime based on multiple factors
-            regime_score = 0
-            
-            # 1. SMA relationships (weight: high)
-            if latest['close'] > latest['sma5'] > latest['sma10'] > latest['sma20'] > latest['sma50']:
-                regime_score += 3
-            elif latest['close'] > latest['sma5'] > latest['sma10'] > latest['sma20']:
-                regime_score += 2
-            elif latest['close'] > latest['sma5'] and latest['sma5'] > latest['sma20']:
-                regime_score += 1
-            elif latest['close'] < latest['sma5'] < latest['sma10'] < latest['sma20'] < latest['sma50']:
-                regime_score -= 3
-            elif latest['close'] < latest['sma5'] < latest['sma10'] < latest['sma20']:
-                regime_score -= 2
-            elif latest['close'] < latest['sma5'] and latest['sma5'] < latest['sma20']:
-                regime_score -= 1
-                
-            # 2. Recent performance (weight: medium)
-            if latest['change_1d'] > 1.5:
-                regime_score += 1
-            elif latest['change_1d'] < -1.5:
-                regime_score -= 1
-                
-            if latest['change_3d'] > 2.5:
-                regime_score += 1
-            elif latest['change_3d'] < -2.5:
-                regime_score -= 1
-                
-            if latest['change_5d'] > 3.5:
-                regime_score += 1
-            elif latest['change_5d'] < -3.5:
-                regime_score -= 1
-                
-            if latest['change_10d'] > 5:
-                regime_score += 1
-            elif latest['change_10d'] < -5:
-                regime_score -= 1
-                
-            if latest['change_20d'] > 8:
-                regime_score += 1
-            elif latest['change_20d'] < -8:
-                regime_score -= 1
-            
-            # 3. Volume analysis (weight: medium)
-            # High volume on up days is bullish, high volume on down days is bearish
-            recent_volume_days = min(5, len(spy_data) - 1)
-            up_days_volume = 0
-            up_days_count = 0
-            down_days_volume = 0
-            down_days_count = 0
-            
-            for i in range(-recent_volume_days, 0):
-                if spy_data['change_1d'].iloc[i] > 0:
-                    up_days_volume += spy_data['volume'].iloc[i]
-                    up_days_count += 1
-                else:
-                    down_days_volume += spy_data['volume'].iloc[i]
-                    down_days_count += 1
-            
-            # Calculate average volume for up and down days
-            avg_up_volume = up_days_volume / max(1, up_days_count)
-            avg_down_volume = down_days_volume / max(1, down_days_count)
-            
-            # Compare volume on up vs down days
-            if up_days_count > 0 and down_days_count > 0:
-                if avg_up_volume > avg_down_volume * 1.5:
-                    regime_score += 1
-                elif avg_down_volume > avg_up_volume * 1.5:
-                    regime_score -= 1
-            
-            # 4. Volatility assessment (weight: medium)
-            # Higher volatility in downtrends is bearish, lower volatility in uptrends is bullish
-            if 'atr_ratio' in latest:
-                if latest['atr_ratio'] > 1.5 and latest['change_5d'] < 0:
-                    regime_score -= 1
-                elif latest['atr_ratio'] < 0.7 and latest['change_5d'] > 0:
-                    regime_score += 1
-            
-            # 5. RSI analysis
-            if 'rsi' in latest:
-                if latest['rsi'] > 70:  # Overbought
-                    regime_score -= 1
-                elif latest['rsi'] < 30:  # Oversold
-                    regime_score += 1
-                elif latest['rsi'] > 60 and latest['change_5d'] > 0:  # Strong momentum
-                    regime_score += 1
-                elif latest['rsi'] < 40 and latest['change_5d'] < 0:  # Weak momentum
-                    regime_score -= 1
-            
-            # 6. Sector breadth analysis (weight: high)
-            # Check how many sectors are bullish/bearish
-            sector_performance = self.get_sector_performance() if self.sector_performance_enabled else {}
-            
-            if sector_performance:
-                bullish_sectors = 0
-                bearish_sectors = 0
-                strong_bullish_sectors = 0
-                strong_bearish_sectors = 0
-                
-                for etf, data in sector_performance.items():
-                    if data['status'] == 'STRONG_BULLISH':
-                        strong_bullish_sectors += 1
-                        bullish_sectors += 1
-                    elif data['status'] == 'BULLISH':
-                        bullish_sectors += 1
-                    elif data['status'] == 'STRONG_BEARISH':
-                        strong_bearish_sectors += 1
-                        bearish_sectors += 1
-                    elif data['status'] == 'BEARISH':
-                        bearish_sectors += 1
-                
-                # Adjust score based on sector breadth
-                if bullish_sectors >= 8:  # Most sectors bullish
-                    regime_score += 2
-                elif bullish_sectors >= 6:  # Many sectors bullish
-                    regime_score += 1
-                elif bearish_sectors >= 8:  # Most sectors bearish
-                    regime_score -= 2
-                elif bearish_sectors >= 6:  # Many sectors bearish
-                    regime_score -= 1
-                
-                # Give extra weight to strongly trending sectors
-                regime_score += strong_bullish_sectors * 0.5
-                regime_score -= strong_bearish_sectors * 0.5
-            
-            # 7. SMA crossovers
-            # Check for recent SMA crossovers (last 3 days)
-            recent_crossover_days = min(3, len(spy_data) - 1)
-            for i in range(-recent_crossover_days, 0):
-                # 5-day SMA crossing above 20-day SMA (bullish)
-                if (spy_data['sma5'].iloc[i-1] <= spy_data['sma20'].iloc[i-1] and 
-                    spy_data['sma5'].iloc[i] > spy_data['sma20'].iloc[i]):
-                    regime_score += 2
-                # 5-day SMA crossing below 20-day SMA (bearish)
-                elif (spy_data['sma5'].iloc[i-1] >= spy_data['sma20'].iloc[i-1] and 
-                      spy_data['sma5'].iloc[i] < spy_data['sma20'].iloc[i]):
-                    regime_score -= 2
-            
-            # Classify market regime
-            if regime_score >= 7:
-                market_regime = 'STRONG_BULLISH'
-            elif regime_score >= 3:
-                market_regime = 'BULLISH'
-            elif regime_score > -3:
-                market_regime = 'NEUTRAL'
-            elif regime_score > -7:
-                market_regime = 'BEARISH'
-            else:
-                market_regime = 'STRONG_BEARISH'
-                
-            logger.info(f"Market regime: {market_regime} (score: {regime_score})")
-            
-            # Log detailed regime factors
-            logger.info(f"SMA relationships: Close={latest['close']:.2f}, SMA5={latest['sma5']:.2f}, SMA10={latest['sma10']:.2f}, SMA20={latest['sma20']:.2f}, SMA50={latest['sma50']:.2f}")
-            logger.info(f"Recent performance: {latest['change_1d']:.2f}% (1d), {latest['change_3d']:.2f}% (3d), {latest['change_5d']:.2f}% (5d), {latest['change_10d']:.2f}% (10d), {latest['change_20d']:.2f}% (20d)")
-            if 'rsi' in latest:
-                logger.info(f"RSI: {latest['rsi']:.2f}")
-            logger.debug(f"Volume analysis: Up vol: {avg_up_volume:.2f}, Down vol: {avg_down_volume:.2f}, Today's vol ratio: {latest.get('volume_ratio', 0):.2f}")
-            if 'atr_ratio' in latest:
-                logger.debug(f"Volatility (ATR ratio): {latest['atr_ratio']:.2f}")
-            if sector_performance:
-                logger.debug(f"Sector breadth: {bullish_sectors} bullish, {bearish_sectors} bearish")
-            
-            return market_regime
-            
-        except Exception as e:
-            logger.error(f"Error detecting market regime: {str(e)}")
-            return 'NEUTRAL'
-    
-    def get_sector_performance(self):
-        """
-        Get performance data for major sector ETFs and determine their regimes
-        Returns: Dictionary mapping sector ETF symbols to their market regimes
-        """
-        try:
-            # List of sector ETFs
-            sector_etfs = [
-                'XLK',  # Technology
-                'XLF',  # Financials
-                'XLV',  # Healthcare
-                'XLE',  # Energy
-                'XLI',  # Industrials
-                'XLY',  # Consumer Discretionary
-                'XLP',  # Consumer Staples
-                'XLB',  # Materials
-                'XLU',  # Utilities
-                'XLRE', # Real Estate
-                'XLC'   # Communication Services
-            ]
-            
-            # Get data for each sector ETF
-            sector_regimes = {}
-            
-            for etf in sector_etfs:
-                try:
-                    # Get historical data
-                    etf_data = self.get_historical_data(etf, days=20)
-                    
-                    if etf_data is None or len(etf_data) < 10:
-                        logger.warning(f"Not enough data for {etf}, skipping")
-                        continue
-                    
-                    # Calculate SMAs
-                    etf_data['sma5'] = etf_data['close'].rolling(window=5).mean()
-                    etf_data['sma20'] = etf_data['close'].rolling(window=20).mean()
-                    
-                    # Calculate percentage changes
-                    etf_data['change_5d'] = etf_data['close'].pct_change(periods=5) * 100
-                    
-                    # Get latest data
-                    latest = etf_data.iloc[-1]
-                    
-                    # Determine regime
-                    regime_score = 0
-                    
-                    # SMA relationships
-                    if latest['close'] > latest['sma5'] > latest['sma20']:
-                        regime_score += 2
-                    elif latest['close'] > latest['sma5']:
-                        regime_score += 1
-                    elif latest['close'] < latest['sma5'] < latest['sma20']:
-                        regime_score -= 2
-                    elif latest['close'] < latest['sma5']:
-                        regime_score -= 1
-                    
-                    # Recent performance
-                    if latest['change_5d'] > 5:
-                        regime_score += 2
-                    elif latest['change_5d'] > 2:
-                        regime_score += 1
-                    elif latest['change_5d'] < -5:
-                        regime_score -= 2
-                    elif latest['change_5d'] < -2:
-                        regime_score -= 1
-                    
-                    # Classify regime
-                    if regime_score >= 3:
-                        status = 'STRONG_BULLISH'
-                    elif regime_score > 0:
-                        status = 'BULLISH'
-                    elif regime_score == 0:
-                        status = 'NEUTRAL'
-                    elif regime_score > -3:
-                        status = 'BEARISH'
-                    else:
-                        status = 'STRONG_BEARISH'
-                    
-                    # Store regime data
-                    sector_regimes[etf] = {
-                        'status': status,
-                        'score': regime_score,
-                        'change_5d': latest['change_5d']
-                    }
-                    
-                except Exception as e:
-                    logger.error(f"Error analyzing sector ETF {etf}: {str(e)}")
-            
-            # Log sector analysis
-            bullish_sectors = [etf for etf, data in sector_regimes.items() if data['status'] in ['BULLISH', 'STRONG_BULLISH']]
-            bearish_sectors = [etf for etf, data in sector_regimes.items() if data['status'] in ['BEARISH', 'STRONG_BEARISH']]
-            strong_bullish_sectors = [etf for etf, data in sector_regimes.items() if data['status'] == 'STRONG_BULLISH']
-            strong_bearish_sectors = [etf for etf, data in sector_regimes.items() if data['status'] == 'STRONG_BEARISH']
-            
-            logger.info(f"Sector analysis: {len(strong_bullish_sectors)} strong bullish, {len(bullish_sectors) - len(strong_bullish_sectors)} bullish, "
-                       f"{len(bearish_sectors) - len(strong_bearish_sectors)} bearish, {len(strong_bearish_sectors)} strong bearish")
-            
-            if strong_bullish_sectors:
-                logger.info(f"Strong bullish sectors: {', '.join(strong_bullish_sectors)}")
-            if strong_bearish_sectors:
-                logger.info(f"Strong bearish sectors: {', '.join(strong_bearish_sectors)}")
-            
-            return sector_regimes
-            
-        except Exception as e:
-            logger.error(f"Error getting sector performance: {str(e)}")
-            return {}
-    
-    def get_symbol_sector(self, symbol):
-        """
-        Get the sector for a symbol using a simple mapping based on common knowledge
-        This is a simplified approach - in a production system, you would use a more comprehensive database
-        """
-        # Technology companies
-        tech_companies = ['AAPL', 'MSFT', 'GOOGL', 'GOOG', 'META', 'AMZN', 'NVDA', 'AMD', 'INTC', 'CSCO', 'ORCL', 'IBM', 'ADBE', 'CRM', 
-                         'AVGO', 'TXN', 'QCOM', 'AMAT', 'MU', 'LRCX', 'NOW', 'INTU', 'PYPL', 'NFLX', 'TWTR', 'SNAP', 'PINS', 'SPOT', 'ZM', 'TEAM', 'WDAY', 'SPLK', 'DDOG']
-        
-        # Financial companies
-        financial_companies = ['JPM', 'BAC', 'WFC', 'C', 'GS', 'MS', 'AXP', 'V', 'MA', 'BLK', 'SCHW', 'PNC', 'USB', 'TFC', 'COF', 'SPGI', 'MCO', 
-                              'ICE', 'CME', 'CB', 'MMC', 'PGR', 'TRV', 'ALL', 'AIG', 'MET', 'PRU', 'BK', 'STT', 'TROW', 'NTRS', 'AMP', 'DFS', 'FITB', 'RF', 'KEY', 'CFG']
-        
-        # Healthcare companies
-        healthcare_companies = ['JNJ', 'PFE', 'MRK', 'ABBV', 'ABT', 'UNH', 'CVS', 'AMGN', 'MDT', 'GILD', 'ISRG', 'ELV', 'LLY', 'BMY', 'TMO', 'DHR', 
-                               'SYK', 'ZTS', 'REGN', 'VRTX', 'MRNA', 'BIIB', 'IDXX', 'BSX', 'BDX', 'A', 'BAX', 'CI', 'HUM', 'CNC', 'ANTM', 'ILMN', 'IQV', 'DXCM', 'ALGN', 'RMD', 'MTD', 'WAT']
-        
-        # Energy companies
-        energy_companies = ['XOM', 'CVX', 'COP', 'EOG', 'SLB', 'PXD', 'OXY', 'PSX', 'VLO', 'MPC', 'KMI', 'WMB', 'OKE', 'DVN', 'HAL', 
-                           'BKR', 'MRO', 'APA', 'HES', 'FANG', 'CTRA', 'EQT', 'LNG', 'CVI', 'TRGP', 'PDCE', 'SM', 'CHK', 'AR', 'RRC']
-        
-        # Industrial companies
-        industrial_companies = ['GE', 'HON', 'MMM', 'CAT', 'DE', 'BA', 'LMT', 'RTX', 'UPS', 'FDX', 'UNP', 'CSX', 'NSC', 'LHX', 'GD', 'EMR', 'ETN', 
-                               'ITW', 'CMI', 'PH', 'ROK', 'IR', 'TT', 'CARR', 'OTIS', 'PCAR', 'URI', 'FAST', 'GWW', 'SWK', 'CTAS', 'RSG', 'WM', 'JCI', 'AME', 'TDG', 'CPRT', 'DAL', 'UAL', 'LUV']
-        
-        # Consumer Discretionary
-        consumer_disc_companies = ['AMZN', 'TSLA', 'HD', 'MCD', 'NKE', 'SBUX', 'TGT', 'LOW', 'BKNG', 'MAR', 'DIS', 'CMCSA', 'NFLX', 'TJX', 'EBAY', 
-                                  'BBY', 'DG', 'DLTR', 'ROST', 'ORLY', 'AZO', 'ULTA', 'LVS', 'MGM', 'WYNN', 'RCL', 'CCL', 'HLT', 'F', 'GM', 'TSCO', 'DPZ', 'YUM', 'QSR', 'DRI', 'CMG', 'APTV', 'EXPE', 'ETSY', 'LULU']
-        
-        # Consumer Staples
-        consumer_staples_companies = ['PG', 'KO', 'PEP', 'WMT', 'COST', 'PM', 'MO', 'EL', 'CL', 'KMB', 'GIS', 'K', 'SYY', 'ADM', 'KHC', 'STZ', 
-                                     'MDLZ', 'HSY', 'KR', 'CLX', 'CAG', 'CPB', 'HRL', 'SJM', 'TAP', 'BG', 'MNST', 'COTY', 'CHD', 'MKC', 'TSN', 'LW']
-        
-        # Materials companies
-        materials_companies = ['LIN', 'APD', 'SHW', 'FCX', 'NEM', 'ECL', 'DD', 'DOW', 'PPG', 'NUE', 'CTVA', 'VMC', 'MLM', 'ALB', 'FMC', 
-                              'IFF', 'EMN', 'CF', 'MOS', 'IP', 'PKG', 'SEE', 'AVY', 'BLL', 'AMCR', 'WRK', 'CE', 'GOLD', 'AA', 'X', 'CLF', 'MT']
-        
-        # Utilities companies
-        utilities_companies = ['NEE', 'DUK', 'SO', 'D', 'AEP', 'EXC', 'SRE', 'PCG', 'XEL', 'ED', 'ES', 'WEC', 'PEG', 'DTE', 'AEE', 'CMS', 
-                              'ETR', 'FE', 'LNT', 'EVRG', 'AES', 'CNP', 'NI', 'PPL', 'AWK', 'CEG', 'EIX', 'PNW', 'ATO', 'NRG', 'OGE', 'POR', 'NWE', 'SR', 'AVA']
-        
-        # Real Estate companies
-        real_estate_companies = ['AMT', 'PLD', 'CCI', 'EQIX', 'PSA', 'O', 'DLR', 'WELL', 'SBAC', 'AVB', 'EQR', 'SPG', 'VICI', 'VTR', 'ESS', 
-                                'ARE', 'INVH', 'UDR', 'EXR', 'MAA', 'KIM', 'REG', 'FRT', 'BXP', 'HST', 'VNO', 'CPT', 'PEAK', 'IRM', 'SLG', 'AIV', 'DEI']
-        
-        # Communication Services
-        communication_companies = ['GOOGL', 'GOOG', 'META', 'NFLX', 'DIS', 'CMCSA', 'VZ', 'T', 'TMUS', 'CHTR', 'ATVI', 'EA', 'TTWO', 'OMC', 'IPG', 
-                                  'LYV', 'PARA', 'FOXA', 'FOX', 'DISH', 'LUMN', 'WBD', 'NWSA', 'NWS', 'TWTR', 'SNAP', 'PINS', 'MTCH', 'SPOT', 'ZM', 'RBLX']
-        
-        # Determine sector based on symbol
-        if symbol in tech_companies:
-            return 'Technology'
-        elif symbol in financial_companies:
-            return 'Financials'
-        elif symbol in healthcare_companies:
-            return 'Healthcare'
-        elif symbol in energy_companies:
-            return 'Energy'
-        elif symbol in industrial_companies:
-            return 'Industrials'
-        elif symbol in consumer_disc_companies:
-            return 'Consumer Discretionary'
-        elif symbol in consumer_staples_companies:
-            return 'Consumer Staples'
-        elif symbol in materials_companies:
-            return 'Materials'
-        elif symbol in utilities_companies:
-            return 'Utilities'
-        elif symbol in real_estate_companies:
-            return 'Real Estate'
-        elif symbol in communication_companies:
-            return 'Communication Services'
-        else:
-            # Try to infer sector from symbol prefix or common patterns
-            if symbol.startswith(('AAPL', 'MSFT', 'IBM', 'CSCO', 'ORCL', 'HPQ', 'DELL', 'NVDA', 'AMD', 'INTC')):
-                return 'Technology'
-            elif symbol.startswith(('JPM', 'BAC', 'WFC', 'C', 'GS', 'MS', 'AXP', 'V', 'MA')):
-                return 'Financials'
-            elif symbol.startswith(('JNJ', 'PFE', 'MRK', 'ABBV', 'ABT', 'UNH', 'CVS')):
-                return 'Healthcare'
-            elif symbol.startswith(('XOM', 'CVX', 'COP', 'EOG', 'SLB', 'PXD', 'OXY')):
-                return 'Energy'
-            else:
-                return 'Unknown'
-    
     def calculate_long_signal_score(self, symbol, data, market_regime=None, sector_regime=None):
         """
         Calculate a score for a LONG signal based on technical indicators
@@ -2073,28 +1664,7 @@ class SP500Strategy:
                 symbol_sector = self.get_symbol_sector(symbol)
                 if symbol_sector:
                     # Find corresponding sector ETF
-                    if symbol_sector == 'Technology':
-                        sector_etf = 'XLK'
-                    elif symbol_sector == 'Financials':
-                        sector_etf = 'XLF'
-                    elif symbol_sector == 'Healthcare':
-                        sector_etf = 'XLV'
-                    elif symbol_sector == 'Energy':
-                        sector_etf = 'XLE'
-                    elif symbol_sector == 'Industrials':
-                        sector_etf = 'XLI'
-                    elif symbol_sector == 'Consumer Discretionary':
-                        sector_etf = 'XLY'
-                    elif symbol_sector == 'Consumer Staples':
-                        sector_etf = 'XLP'
-                    elif symbol_sector == 'Materials':
-                        sector_etf = 'XLB'
-                    elif symbol_sector == 'Utilities':
-                        sector_etf = 'XLU'
-                    elif symbol_sector == 'Real Estate':
-                        sector_etf = 'XLRE'
-                    elif symbol_sector == 'Communication Services':
-                        sector_etf = 'XLC'
+                    sector_etf = self.sector_index.etf(symbol_sector)
                     
                     # Get sector performance
                     sector_performance = self.get_sector_performance() if self.sector_performance_enabled else {}
@@ -2267,20 +1837,14 @@ class SP500Strategy:
         if not simulated_trades:
             return {}
         
-        # Basic metrics
+        # Basic and P&L metrics
         total_trades = len(simulated_trades)
-        winning_trades = [t for t in simulated_trades if t['is_win']]
-        losing_trades = [t for t in simulated_trades if not t['is_win']]
-        
-        win_rate = len(winning_trades) / total_trades * 100 if total_trades > 0 else 0
-        
-        # P&L metrics
-        total_profit = sum([t['profit_loss'] for t in winning_trades])
-        total_loss = abs(sum([t['profit_loss'] for t in losing_trades]))
-        profit_factor = total_profit / total_loss if total_loss > 0 else float('inf')
-        
-        avg_win = sum([t['profit_loss'] for t in winning_trades]) / len(winning_trades) if winning_trades else 0
-        avg_loss = sum([t['profit_loss'] for t in losing_trades]) / len(losing_trades) if losing_trades else 0
+        stats = trade_statistics([t['profit_loss'] for t in simulated_trades],
+                                 wins=[t['is_win'] for t in simulated_trades])
+        win_rate = stats['win_rate'] * 100
+        profit_factor = stats['profit_factor']
+        avg_win = stats['avg_win']
+        avg_loss = stats['avg_loss']
         
         # Holding period
         if 'holding_period' in simulated_trades[0]:
@@ -2341,8 +1905,8 @@ class SP500Strategy:
             'long_win_rate': long_win_rate,
             'tier_metrics': tier_metrics,
             'total_trades': total_trades,
-            'winning_trades': len(winning_trades),
-            'losing_trades': len(losing_trades)
+            'winning_trades': stats['winning_trades'],
+            'losing_trades': stats['losing_trades']
         }
     
     def run_strategy(self):
@@ -2382,11 +1946,32 @@ class SP500Strategy:
             logger.error(f"Error running strategy: {str(e)}")
             return []
     
+    def _regime_timestamp(self):
+        """Timestamp of the bar the market and sector regimes are computed for"""
+        if self.backtest_mode and self.backtest_end_date:
+            return pd.Timestamp(self.backtest_end_date)
+        return pd.Timestamp.now(tz='America/New_York').floor(self.regime_bar_interval)
+    
     def detect_market_regime(self):
         """
         Detect the current market regime by analyzing SPY ETF and sector ETFs
         Returns: STRONG_BULLISH, BULLISH, NEUTRAL, BEARISH, or STRONG_BEARISH
+        
+        Computed once per bar and shared by all callers (see regime_service).
         """
+        return self.regime_service.market_regime(self._regime_timestamp())
+    
+    def get_sector_performance(self):
+        """
+        Get performance data for major sector ETFs and determine their regimes
+        Returns: Dictionary mapping sector ETF symbols to their market regimes
+        
+        Computed once per bar and shared by all callers; do not modify the result.
+        """
+        return self.regime_service.sector_regimes(self._regime_timestamp())
+    
+    def _compute_market_regime(self):
+        """Market regime from SPY and sector breadth, see detect_market_regime"""
         try:
             # Get SPY data
             spy_data = self.get_historical_data('SPY', days=30)
@@ -2610,11 +2195,8 @@ class SP500Strategy:
             logger.error(f"Error detecting market regime: {str(e)}")
             return 'NEUTRAL'
     
-    def get_sector_performance(self):
-        """
-        Get performance data for major sector ETFs and determine their regimes
-        Returns: Dictionary mapping sector ETF symbols to their market regimes
-        """
+    def _compute_sector_performance(self):
+        """Regime of every sector ETF, see get_sector_performance"""
         try:
             # List of sector ETFs
             sector_etfs = [
@@ -2719,89 +2301,13 @@ class SP500Strategy:
             return {}
     
     def get_symbol_sector(self, symbol):
-        """
-        Get the sector for a symbol using a simple mapping based on common knowledge
-        This is a simplified approach - in a production system, you would use a more comprehensive database
-        """
-        # Technology companies
-        tech_companies = ['AAPL', 'MSFT', 'GOOGL', 'GOOG', 'META', 'AMZN', 'NVDA', 'AMD', 'INTC', 'CSCO', 'ORCL', 'IBM', 'ADBE', 'CRM', 
-                         'AVGO', 'TXN', 'QCOM', 'AMAT', 'MU', 'LRCX', 'NOW', 'INTU', 'PYPL', 'NFLX', 'TWTR', 'SNAP', 'PINS', 'SPOT', 'ZM', 'TEAM', 'WDAY', 'SPLK', 'DDOG']
-        
-        # Financial companies
-        financial_companies = ['JPM', 'BAC', 'WFC', 'C', 'GS', 'MS', 'AXP', 'V', 'MA', 'BLK', 'SCHW', 'PNC', 'USB', 'TFC', 'COF', 'SPGI', 'MCO', 
-                              'ICE', 'CME', 'CB', 'MMC', 'PGR', 'TRV', 'ALL', 'AIG', 'MET', 'PRU', 'BK', 'STT', 'TROW', 'NTRS', 'AMP', 'DFS', 'FITB', 'RF', 'KEY', 'CFG']
-        
-        # Healthcare companies
-        healthcare_companies = ['JNJ', 'PFE', 'MRK', 'ABBV', 'ABT', 'UNH', 'CVS', 'AMGN', 'MDT', 'GILD', 'ISRG', 'ELV', 'LLY', 'BMY', 'TMO', 'DHR', 
-                               'SYK', 'ZTS', 'REGN', 'VRTX', 'MRNA', 'BIIB', 'IDXX', 'BSX', 'BDX', 'A', 'BAX', 'CI', 'HUM', 'CNC', 'ANTM', 'ILMN', 'IQV', 'DXCM', 'ALGN', 'RMD', 'MTD', 'WAT']
-        
-        # Energy companies
-        energy_companies = ['XOM', 'CVX', 'COP', 'EOG', 'SLB', 'PXD', 'OXY', 'PSX', 'VLO', 'MPC', 'KMI', 'WMB', 'OKE', 'DVN', 'HAL', 
-                           'BKR', 'MRO', 'APA', 'HES', 'FANG', 'CTRA', 'EQT', 'LNG', 'CVI', 'TRGP', 'PDCE', 'SM', 'CHK', 'AR', 'RRC']
-        
-        # Industrial companies
-        industrial_companies = ['GE', 'HON', 'MMM', 'CAT', 'DE', 'BA', 'LMT', 'RTX', 'UPS', 'FDX', 'UNP', 'CSX', 'NSC', 'LHX', 'GD', 'EMR', 'ETN', 
-                               'ITW', 'CMI', 'PH', 'ROK', 'IR', 'TT', 'CARR', 'OTIS', 'PCAR', 'URI', 'FAST', 'GWW', 'SWK', 'CTAS', 'RSG', 'WM', 'JCI', 'AME', 'TDG', 'CPRT', 'DAL', 'UAL', 'LUV']
-        
-        # Consumer Discretionary
-        consumer_disc_companies = ['AMZN', 'TSLA', 'HD', 'MCD', 'NKE', 'SBUX', 'TGT', 'LOW', 'BKNG', 'MAR', 'DIS', 'CMCSA', 'NFLX', 'TJX', 'EBAY', 
-                                  'BBY', 'DG', 'DLTR', 'ROST', 'ORLY', 'AZO', 'ULTA', 'LVS', 'MGM', 'WYNN', 'RCL', 'CCL', 'HLT', 'F', 'GM', 'TSCO', 'DPZ', 'YUM', 'QSR', 'DRI', 'CMG', 'APTV', 'EXPE', 'ETSY', 'LULU']
-        
-        # Consumer Staples
-        consumer_staples_companies = ['PG', 'KO', 'PEP', 'WMT', 'COST', 'PM', 'MO', 'EL', 'CL', 'KMB', 'GIS', 'K', 'SYY', 'ADM', 'KHC', 'STZ', 
-                                     'MDLZ', 'HSY', 'KR', 'CLX', 'CAG', 'CPB', 'HRL', 'SJM', 'TAP', 'BG', 'MNST', 'COTY', 'CHD', 'MKC', 'TSN', 'LW']
-        
-        # Materials companies
-        materials_companies = ['LIN', 'APD', 'SHW', 'FCX', 'NEM', 'ECL', 'DD', 'DOW', 'PPG', 'NUE', 'CTVA', 'VMC', 'MLM', 'ALB', 'FMC', 
-                              'IFF', 'EMN', 'CF', 'MOS', 'IP', 'PKG', 'SEE', 'AVY', 'BLL', 'AMCR', 'WRK', 'CE', 'GOLD', 'AA', 'X', 'CLF', 'MT']
-        
-        # Utilities companies
-        utilities_companies = ['NEE', 'DUK', 'SO', 'D', 'AEP', 'EXC', 'SRE', 'PCG', 'XEL', 'ED', 'ES', 'WEC', 'PEG', 'DTE', 'AEE', 'CMS', 
-                              'ETR', 'FE', 'LNT', 'EVRG', 'AES', 'CNP', 'NI', 'PPL', 'AWK', 'CEG', 'EIX', 'PNW', 'ATO', 'NRG', 'OGE', 'POR', 'NWE', 'SR', 'AVA']
-        
-        # Real Estate companies
-        real_estate_companies = ['AMT', 'PLD', 'CCI', 'EQIX', 'PSA', 'O', 'DLR', 'WELL', 'SBAC', 'AVB', 'EQR', 'SPG', 'VICI', 'VTR', 'ESS', 
-                                'ARE', 'INVH', 'UDR', 'EXR', 'MAA', 'KIM', 'REG', 'FRT', 'BXP', 'HST', 'VNO', 'CPT', 'PEAK', 'IRM', 'SLG', 'AIV', 'DEI']
-        
-        # Communication Services
-        communication_companies = ['GOOGL', 'GOOG', 'META', 'NFLX', 'DIS', 'CMCSA', 'VZ', 'T', 'TMUS', 'CHTR', 'ATVI', 'EA', 'TTWO', 'OMC', 'IPG', 
-                                  'LYV', 'PARA', 'FOXA', 'FOX', 'DISH', 'LUMN', 'WBD', 'NWSA', 'NWS', 'TWTR', 'SNAP', 'PINS', 'MTCH', 'SPOT', 'ZM', 'RBLX']
-        
-        # Determine sector based on symbol
-        if symbol in tech_companies:
-            return 'Technology'
-        elif symbol in financial_companies:
-            return 'Financials'
-        elif symbol in healthcare_companies:
-            return 'Healthcare'
-        elif symbol in energy_companies:
-            return 'Energy'
-        elif symbol in industrial_companies:
-            return 'Industrials'
-        elif symbol in consumer_disc_companies:
-            return 'Consumer Discretionary'
-        elif symbol in consumer_staples_companies:
-            return 'Consumer Staples'
-        elif symbol in materials_companies:
-            return 'Materials'
-        elif symbol in utilities_companies:
-            return 'Utilities'
-        elif symbol in real_estate_companies:
-            return 'Real Estate'
-        elif symbol in communication_companies:
-            return 'Communication Services'
-        else:
-            # Try to infer sector from symbol prefix or common patterns
-            if symbol.startswith(('AAPL', 'MSFT', 'IBM', 'CSCO', 'ORCL', 'HPQ', 'DELL', 'NVDA', 'AMD', 'INTC')):
-                return 'Technology'
-            elif symbol.startswith(('JPM', 'BAC', 'WFC', 'C', 'GS', 'MS', 'AXP', 'V', 'MA')):
-                return 'Financials'
-            elif symbol.startswith(('JNJ', 'PFE', 'MRK', 'ABBV', 'ABT', 'UNH', 'CVS')):
-                return 'Healthcare'
-            elif symbol.startswith(('XOM', 'CVX', 'COP', 'EOG', 'SLB', 'PXD', 'OXY')):
-                return 'Energy'
-            else:
-                return 'Unknown'
+        """Get the sector for a symbol from the shared sector index ('Unknown' if not listed)"""
+        return self.sector_index.sector(symbol, 'Unknown')
+    
+    @property
+    def sector_etfs(self):
+        """Sector ETF -> sector name"""
+        return self.sector_index.sector_etfs
     
     def run(self):
         """Run the strategy"""
@@ -2850,100 +2356,158 @@ class SP500Strategy:
             logger.warning("Falling back to TOP 100 symbols")
             return self.TOP_100_SYMBOLS
     
-def run_backtest(start_date, end_date, mode='backtest', max_signals=None, initial_capital=300, random_seed=42):
-    """Run a backtest for a specified period with specified initial capital"""
+def prefetch_backtest_data(start_date, end_date, config_path='sp500_config.yaml'):
+    """
+    Load bars for the whole trading universe over a backtest span in one go
+    
+    Backtests of sub-periods of [start_date, end_date] (e.g. quarters) then
+    read their bars from the Parquet cache instead of the network.
+    """
     try:
-        # Load configuration
-        config_path = 'sp500_config.yaml'
         with open(config_path, 'r') as file:
             config = yaml.safe_load(file)
         
-        logger.info(f"Running backtest from {start_date} to {end_date} with initial capital ${initial_capital} (Seed: {random_seed})")
-        
-        # Create output directories if they don't exist
-        for path_key in ['backtest_results', 'plots', 'trades', 'performance']:
-            os.makedirs(config['paths'][path_key], exist_ok=True)
-        
-        # Load Alpaca credentials
-        with open('alpaca_credentials.json', 'r') as f:
-            credentials = json.load(f)
-        
-        # Use paper trading credentials for backtesting
-        paper_credentials = credentials['paper']
+        credentials = load_alpaca_credentials('paper')
+        if not credentials:
+            return
         
-        # Initialize Alpaca API
-        api = tradeapi.REST(
-            paper_credentials['api_key'],
-            paper_credentials['api_secret'],
-            paper_credentials['base_url'],
-            api_version='v2'
+        data_store = get_data_store(
+            credentials['api_key'],
+            credentials['api_secret'],
+            cache_dir=config['paths'].get('data_cache', 'data_cache'),
+            adjustment='raw'
         )
         
-        # Initialize strategy in backtest mode
         strategy = SP500Strategy(
-            api=api,
+            api=None,
             config=config,
-            mode=mode,
+            mode='backtest',
             backtest_mode=True,
             backtest_start_date=start_date,
-            backtest_end_date=end_date
+            backtest_end_date=end_date,
+            data_store=data_store
         )
         
-        # Run the strategy
-        signals = strategy.run_strategy()
-        
-        # Get max signals from config if not specified
-        if max_signals is None:
-            max_signals = config.get('strategy', {}).get('max_trades_per_run', 40)
+        symbols = strategy.get_symbols() + ['SPY'] + list(strategy.sector_etfs)
+        logger.info(f"Prefetching bars for {len(symbols)} symbols from {start_date} to {end_date}")
+        strategy.prefetch_historical_data(symbols)
         
-        # Count mid-cap and large-cap signals
-        midcap_signals = [s for s in signals if s.get('is_midcap', False)]
-        largecap_signals = [s for s in signals if not s.get('is_midcap', False)]
+    except Exception as e:
+        logger.error(f"Error prefetching backtest data: {str(e)}")
+
+def prepare_backtest(start_date, end_date, mode='backtest', max_signals=None):
+    """Generate and select the signals of a backtest period
+    
+    Returns:
+        tuple: (config, strategy, signals) with signals sorted by score
+    """
+    # Load configuration
+    config_path = 'sp500_config.yaml'
+    with open(config_path, 'r') as file:
+        config = yaml.safe_load(file)
+    
+    # Create output directories if they don't exist
+    for path_key in ['backtest_results', 'plots', 'trades', 'performance']:
+        os.makedirs(config['paths'][path_key], exist_ok=True)
+    
+    # Load Alpaca credentials
+    with open('alpaca_credentials.json', 'r') as f:
+        credentials = json.load(f)
+    
+    # Use paper trading credentials for backtesting
+    paper_credentials = credentials['paper']
+    
+    # Initialize Alpaca API
+    api = tradeapi.REST(
+        paper_credentials['api_key'],
+        paper_credentials['api_secret'],
+        paper_credentials['base_url'],
+        api_version='v2'
+    )
+    
+    # Shared data layer: batched requests and an on-disk Parquet cache
+    data_store = get_data_store(
+        paper_credentials['api_key'],
+        paper_credentials['api_secret'],
+        cache_dir=config['paths'].get('data_cache', 'data_cache'),
+        adjustment='raw'
+    )
+    
+    # Initialize strategy in backtest mode
+    strategy = SP500Strategy(
+        api=api,
+        config=config,
+        mode=mode,
+        backtest_mode=True,
+        backtest_start_date=start_date,
+        backtest_end_date=end_date,
+        data_store=data_store
+    )
+    
+    # Run the strategy
+    signals = strategy.run_strategy()
+    
+    # Get max signals from config if not specified
+    if max_signals is None:
+        max_signals = config.get('strategy', {}).get('max_trades_per_run', 40)
+    
+    # Count mid-cap and large-cap signals
+    midcap_signals = [s for s in signals if s.get('is_midcap', False)]
+    largecap_signals = [s for s in signals if not s.get('is_midcap', False)]
+    
+    logger.info(f"Generated {len(signals)} total signals: {len(largecap_signals)} large-cap, {len(midcap_signals)} mid-cap")
+    
+    # Ensure a balanced mix of LONG trades
+    if len(signals) > max_signals:
+        logger.info(f"Limiting signals to top {max_signals} (from {len(signals)} total)")
+        
+        # Get large-cap percentage from config
+        large_cap_percentage = config.get('strategy', {}).get('midcap_stocks', {}).get('large_cap_percentage', 70)
+        
+        # Calculate how many large-cap and mid-cap signals to include
+        large_cap_count = int(max_signals * (large_cap_percentage / 100))
+        mid_cap_count = max_signals - large_cap_count
+        
+        # Ensure we don't exceed available signals
+        large_cap_count = min(large_cap_count, len(largecap_signals))
+        mid_cap_count = min(mid_cap_count, len(midcap_signals))
+        
+        # If we don't have enough of one type, allocate more to the other
+        if large_cap_count < int(max_signals * (large_cap_percentage / 100)):
+            additional_mid_cap = min(mid_cap_count + (int(max_signals * (large_cap_percentage / 100)) - large_cap_count), len(midcap_signals))
+            mid_cap_count = additional_mid_cap
+        
+        if mid_cap_count < (max_signals - int(max_signals * (large_cap_percentage / 100))):
+            additional_large_cap = min(large_cap_count + ((max_signals - int(max_signals * (large_cap_percentage / 100))) - mid_cap_count), len(largecap_signals))
+            large_cap_count = additional_large_cap
+        
+        # Get the top N signals of each type
+        # Sort signals deterministically by score and then by symbol (for tiebreaking)
+        largecap_signals = sorted(largecap_signals, key=lambda x: (x['score'], x['symbol']), reverse=True)
+        midcap_signals = sorted(midcap_signals, key=lambda x: (x['score'], x['symbol']), reverse=True)
+        
+        selected_large_cap = largecap_signals[:large_cap_count]
+        selected_mid_cap = midcap_signals[:mid_cap_count]
+        
+        # Combine and re-sort by score and symbol (for deterministic ordering)
+        signals = selected_large_cap + selected_mid_cap
+        signals = sorted(signals, key=lambda x: (x['score'], x['symbol']), reverse=True)
+        
+        logger.info(f"Final signals: {len(signals)} total ({len(selected_large_cap)} large-cap, {len(selected_mid_cap)} mid-cap)")
+    else:
+        # If no max_signals specified or we have fewer signals than max, still log the signal count
+        # Sort signals deterministically by score and then by symbol (for tiebreaking)
+        signals = sorted(signals, key=lambda x: (x['score'], x['symbol']), reverse=True)
+        logger.info(f"Using all {len(signals)} signals ({len(largecap_signals)} large-cap, {len(midcap_signals)} mid-cap)")
+    
+    return config, strategy, signals
+
+def run_backtest(start_date, end_date, mode='backtest', max_signals=None, initial_capital=300, random_seed=42):
+    """Run a backtest for a specified period with specified initial capital"""
+    try:
+        logger.info(f"Running backtest from {start_date} to {end_date} with initial capital ${initial_capital} (Seed: {random_seed})")
         
-        logger.info(f"Generated {len(signals)} total signals: {len(largecap_signals)} large-cap, {len(midcap_signals)} mid-cap")
-        
-        # Ensure a balanced mix of LONG trades
-        if len(signals) > max_signals:
-            logger.info(f"Limiting signals to top {max_signals} (from {len(signals)} total)")
-            
-            # Get large-cap percentage from config
-            large_cap_percentage = config.get('strategy', {}).get('midcap_stocks', {}).get('large_cap_percentage', 70)
-            
-            # Calculate how many large-cap and mid-cap signals to include
-            large_cap_count = int(max_signals * (large_cap_percentage / 100))
-            mid_cap_count = max_signals - large_cap_count
-            
-            # Ensure we don't exceed available signals
-            large_cap_count = min(large_cap_count, len(largecap_signals))
-            mid_cap_count = min(mid_cap_count, len(midcap_symbols))
-            
-            # If we don't have enough of one type, allocate more to the other
-            if large_cap_count < int(max_signals * (large_cap_percentage / 100)):
-                additional_mid_cap = min(mid_cap_count + (int(max_signals * (large_cap_percentage / 100)) - large_cap_count), len(midcap_symbols))
-                mid_cap_count = additional_mid_cap
-            
-            if mid_cap_count < (max_signals - int(max_signals * (large_cap_percentage / 100))):
-                additional_large_cap = min(large_cap_count + ((max_signals - int(max_signals * (large_cap_percentage / 100))) - mid_cap_count), len(largecap_symbols))
-                large_cap_count = additional_large_cap
-            
-            # Get the top N signals of each type
-            # Sort signals deterministically by score and then by symbol (for tiebreaking)
-            largecap_signals = sorted(largecap_signals, key=lambda x: (x['score'], x['symbol']), reverse=True)
-            midcap_signals = sorted(midcap_signals, key=lambda x: (x['score'], x['symbol']), reverse=True)
-            
-            selected_large_cap = largecap_signals[:large_cap_count]
-            selected_mid_cap = midcap_signals[:mid_cap_count]
-            
-            # Combine and re-sort by score and symbol (for deterministic ordering)
-            signals = selected_large_cap + selected_mid_cap
-            signals = sorted(signals, key=lambda x: (x['score'], x['symbol']), reverse=True)
-            
-            logger.info(f"Final signals: {len(signals)} total ({len(selected_large_cap)} large-cap, {len(selected_mid_cap)} mid-cap)")
-        else:
-            # If no max_signals specified or we have fewer signals than max, still log the signal count
-            # Sort signals deterministically by score and then by symbol (for tiebreaking)
-            signals = sorted(signals, key=lambda x: (x['score'], x['symbol']), reverse=True)
-            logger.info(f"Using all {len(signals)} signals ({len(largecap_signals)} large-cap, {len(midcap_signals)} mid-cap)")
+        config, strategy, signals = prepare_backtest(start_date, end_date, mode, max_signals)
         
         # Simulate trade outcomes for performance metrics
         if signals:
@@ -2953,25 +2517,8 @@ def run_backtest(start_date, end_date, mode='backtest', max_signals=None, initia
             # Set random seed for reproducibility
             np.random.seed(random_seed)
             
-            # Define win rates based on historical performance and market regime
-            base_long_win_rate = 0.62
-            
-            # Define win rate adjustments based on market regime
-            market_regime_adjustments = {
-                'STRONG_BULLISH': {'LONG': 0.15},
-                'BULLISH': {'LONG': 0.10},
-                'NEUTRAL': {'LONG': 0.00},
-                'BEARISH': {'LONG': -0.10},
-                'STRONG_BEARISH': {'LONG': -0.20}
-            }
-            
-            # Define average gains and losses
-            avg_long_win = 0.05
-            avg_long_loss = -0.02
-            
-            # Define average holding periods
-            avg_holding_period_win = 12
-            avg_holding_period_loss = 5
+            # Win rates, gains, losses and holding periods (shared with the Monte Carlo mode)
+            model = TradeOutcomeModel()
             
             # Parse the start date
             start_datetime = datetime.strptime(start_date, "%Y-%m-%d")
@@ -3024,30 +2571,25 @@ def run_backtest(start_date, end_date, mode='backtest', max_signals=None, initia
                     'sector': strategy.get_symbol_sector(signal['symbol']),
                 }
                 
-                # Adjust win rate based on market regime
-                regime_adjustment = market_regime_adjustments.get(market_regime, {'LONG': 0})
-                
-                # Calculate adjusted win rate
-                win_rate = base_long_win_rate + regime_adjustment['LONG']
-                # Adjust win rate based on signal score
-                win_rate = min(0.95, win_rate + (signal['score'] - 0.7) * 0.5)
+                # Win rate adjusted for market regime and signal score
+                win_rate = float(model.win_rate(signal['score'], market_regime))
                 
                 # Determine if trade is a winner based on adjusted win rate
                 is_winner = np.random.random() < win_rate
                 
                 # Calculate exit price based on outcome
-                pct_change = avg_long_win if is_winner else avg_long_loss
+                pct_change = model.avg_long_win if is_winner else model.avg_long_loss
                 
                 # Add some randomness to the outcome
-                pct_change += np.random.normal(0, 0.01)
+                pct_change += np.random.normal(0, model.outcome_noise)
                 
                 # Calculate exit price
                 exit_price = signal['price'] * (1 + pct_change)
                 
                 # Calculate holding period
                 holding_period = int(np.random.normal(
-                    avg_holding_period_win if is_winner else avg_holding_period_loss, 
-                    3
+                    model.avg_holding_period_win if is_winner else model.avg_holding_period_loss, 
+                    model.holding_period_noise
                 ))
                 holding_period = max(1, holding_period)
                 
@@ -3133,6 +2675,12 @@ def run_backtest(start_date, end_date, mode='backtest', max_signals=None, initia
             signals_df = pd.DataFrame(signals)
             signals_df.to_csv(results_path, index=False)
             logger.info(f"Backtest results saved to {results_path}")
+            record_backtest_run(
+                config['paths'].get('results_catalog',
+                                    os.path.join(config['paths']['backtest_results'], 'results_catalog.db')),
+                results_path,
+                summary
+            )
         
         # Log summary
         logger.info(f"Backtest Summary: {summary}")
@@ -3155,3 +2703,60 @@ def run_backtest(start_date, end_date, mode='backtest', max_signals=None, initia
         logger.error(f"Error running backtest: {str(e)}")
         traceback.print_exc()
         return None, []
+
+def run_monte_carlo_backtest(start_date, end_date, num_paths=10000, mode='backtest', max_signals=None,
+                             initial_capital=300, random_seed=42, confidence=0.95):
+    """Generate the signals of a period once and simulate many trade outcome paths
+    
+    Returns the same summary keys as run_backtest (averaged over the paths,
+    with *_std spreads) plus 'distributions': percentiles and confidence
+    intervals of win rate, profit factor, return and drawdown.
+    """
+    try:
+        logger.info(f"Running Monte Carlo backtest from {start_date} to {end_date} with {num_paths} paths (Seed: {random_seed})")
+        
+        config, strategy, signals = prepare_backtest(start_date, end_date, mode, max_signals)
+        if not signals:
+            return None, []
+        
+        position_sizing = config.get('strategy', {}).get('position_sizing', {})
+        plan = build_trade_plan(
+            signals,
+            strategy.detect_market_regime(),
+            base_position_pct=position_sizing.get('base_position_pct', 5),
+            midcap_factor=config.get('strategy', {}).get('midcap_stocks', {}).get('position_factor', 0.8)
+        )
+        result = simulate_outcomes(plan, num_paths=num_paths, initial_capital=initial_capital, random_seed=random_seed)
+        distributions = result.summary(confidence)
+        
+        long_scores = [s['score'] for s in signals if s['direction'] == 'LONG']
+        summary = {
+            'start_date': start_date,
+            'end_date': end_date,
+            'total_signals': len(signals),
+            'long_signals': len(long_scores),
+            'avg_score': sum(s['score'] for s in signals) / len(signals),
+            'avg_long_score': sum(long_scores) / len(long_scores) if long_scores else 0,
+            'total_trades': len(plan),
+            'initial_capital': initial_capital,
+            'num_paths': num_paths,
+            'confidence': confidence,
+            'probability_of_profit': result.probability('total_return', 0),
+            'distributions': distributions
+        }
+        for metric, stats in distributions.items():
+            summary[metric] = stats['mean']
+            summary[f"{metric}_std"] = stats['std']
+        summary['long_win_rate'] = summary['win_rate']
+        
+        logger.info(f"Monte Carlo Summary ({num_paths} paths, {len(plan)} trades): "
+                    f"return {distributions['total_return']['median']:.2f}% "
+                    f"[{distributions['total_return']['ci_low']:.2f}, {distributions['total_return']['ci_high']:.2f}], "
+                    f"max drawdown {distributions['max_drawdown']['median']:.2f}%")
+        
+        return summary, signals
+        
+    except Exception as e:
+        logger.error(f"Error running Monte Carlo backtest: {str(e)}")
+        traceback.print_exc()
+        return None, []
@@ -0,0 +1,348 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Historical Data Store
+-------------------------------------
+Shared data layer for historical bars. Requests for many symbols are batched
+into multi-symbol calls to the Alpaca bars endpoint, and every result is kept
+in an on-disk Parquet cache partitioned by symbol, timeframe and year:
+
+    <cache_dir>/adjustment=<adj>/symbol=<SYM>/timeframe=<tf>/year=<yyyy>.parquet
+
+Each symbol/timeframe directory also records which calendar days have already
+been fetched (``_coverage.json``), so later runs only request the missing date
+ranges - including days that legitimately have no bars (weekends, holidays).
+
+Usage:
+    store = get_data_store(api_key, api_secret)
+    bars = store.get_bars(["AAPL", "MSFT"], "2023-01-01", "2023-12-31", "1Day")
+    bars["AAPL"]  # DataFrame indexed by UTC timestamp
+"""
+
+import datetime as dt
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+import requests
+
+logger = logging.getLogger("HistoricalDataStore")
+
+# Alpaca multi-symbol bars endpoint
+ALPACA_BARS_URL = "https://data.alpaca.markets/v2/stocks/bars"
+
+# Calendar days are those of the exchange
+MARKET_TIMEZONE = "America/New_York"
+
+# Columns kept for every bar
+BAR_COLUMNS = ["open", "high", "low", "close", "volume", "trade_count", "vwap"]
+
+# Timeframe spellings used across the code base -> Alpaca timeframe strings
+TIMEFRAME_ALIASES = {
+    "1D": "1Day", "D": "1Day", "DAY": "1Day", "1DAY": "1Day",
+    "1H": "1Hour", "H": "1Hour", "HOUR": "1Hour", "1HOUR": "1Hour",
+    "1MIN": "1Min", "MIN": "1Min", "MINUTE": "1Min", "1T": "1Min",
+    "5MIN": "5Min", "5T": "5Min",
+    "15MIN": "15Min", "15T": "15Min",
+    "30MIN": "30Min", "30T": "30Min",
+    "1W": "1Week", "1WEEK": "1Week", "1M": "1Month", "1MONTH": "1Month",
+}
+
+_stores: Dict[Tuple, "HistoricalDataStore"] = {}
+_stores_lock = threading.Lock()
+
+
+def normalize_timeframe(timeframe) -> str:
+    """Map '1D', 'Day', TimeFrame.Day, ... to the Alpaca timeframe string"""
+    text = str(timeframe).strip()
+    return TIMEFRAME_ALIASES.get(text.upper().replace("TIMEFRAME.", ""), text)
+
+
+def _to_date(value) -> dt.date:
+    """Calendar date of a date, datetime, Timestamp or 'YYYY-MM-DD' string"""
+    timestamp = pd.Timestamp(value)
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.tz_convert(MARKET_TIMEZONE)
+    return timestamp.date()
+
+
+def _merge_ranges(ranges: Iterable[Tuple[dt.date, dt.date]]) -> List[Tuple[dt.date, dt.date]]:
+    """Merge overlapping or adjacent inclusive date ranges"""
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + dt.timedelta(days=1):
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _subtract_ranges(start: dt.date, end: dt.date,
+                     covered: List[Tuple[dt.date, dt.date]]) -> List[Tuple[dt.date, dt.date]]:
+    """Parts of [start, end] not inside any covered range"""
+    missing = []
+    cursor = start
+    for covered_start, covered_end in covered:
+        if covered_end < cursor:
+            continue
+        if covered_start > end:
+            break
+        if covered_start > cursor:
+            missing.append((cursor, covered_start - dt.timedelta(days=1)))
+        cursor = max(cursor, covered_end + dt.timedelta(days=1))
+        if cursor > end:
+            break
+    if cursor <= end:
+        missing.append((cursor, end))
+    return missing
+
+
+class AlpacaBarsClient:
+    """Batched client for the Alpaca multi-symbol bars endpoint"""
+
+    def __init__(self, api_key: str, api_secret: str, feed: Optional[str] = None,
+                 symbols_per_request: int = 100, page_limit: int = 10000, pause: float = 0.0):
+        """Initialize the client
+
+        Args:
+            api_key (str): Alpaca API key
+            api_secret (str): Alpaca API secret
+            feed (str): Data feed ('iex', 'sip'); account default when None
+            symbols_per_request (int): Symbols per request (keeps URLs short)
+            page_limit (int): Bars per page
+            pause (float): Seconds to sleep between pages to respect rate limits
+        """
+        self.headers = {"APCA-API-KEY-ID": api_key, "APCA-API-SECRET-KEY": api_secret}
+        self.feed = feed
+        self.symbols_per_request = symbols_per_request
+        self.page_limit = page_limit
+        self.pause = pause
+        self.session = requests.Session()
+
+    def get_bars(self, symbols: List[str], start: dt.date, end: dt.date, timeframe: str,
+                 adjustment: str = "all") -> Dict[str, pd.DataFrame]:
+        """Fetch bars for several symbols over an inclusive range of calendar days
+
+        Returns:
+            dict: Symbol -> DataFrame indexed by UTC timestamp (symbols without
+                bars are omitted)
+        """
+        start_ts = pd.Timestamp(start, tz=MARKET_TIMEZONE)
+        end_ts = pd.Timestamp(end, tz=MARKET_TIMEZONE) + pd.Timedelta(days=1) - pd.Timedelta(seconds=1)
+
+        rows: Dict[str, List[dict]] = {}
+        for i in range(0, len(symbols), self.symbols_per_request):
+            chunk = symbols[i:i + self.symbols_per_request]
+            params = {
+                "symbols": ",".join(chunk),
+                "timeframe": timeframe,
+                "start": start_ts.isoformat(),
+                "end": end_ts.isoformat(),
+                "adjustment": adjustment,
+                "limit": self.page_limit,
+            }
+            if self.feed:
+                params["feed"] = self.feed
+
+            while True:
+                response = self.session.get(ALPACA_BARS_URL, headers=self.headers, params=params, timeout=60)
+                if response.status_code != 200:
+                    raise RuntimeError(f"Alpaca bars request failed: {response.status_code} - {response.text}")
+                payload = response.json()
+                for symbol, bars in (payload.get("bars") or {}).items():
+                    rows.setdefault(symbol, []).extend(bars)
+
+                page_token = payload.get("next_page_token")
+                if not page_token:
+                    break
+                params["page_token"] = page_token
+                if self.pause:
+                    time.sleep(self.pause)
+            params.pop("page_token", None)
+
+        frames = {}
+        for symbol, bars in rows.items():
+            df = pd.DataFrame(bars).rename(columns={
+                "t": "timestamp", "o": "open", "h": "high", "l": "low",
+                "c": "close", "v": "volume", "n": "trade_count", "vw": "vwap"
+            })
+            df["timestamp"] = pd.to_datetime(df["timestamp"], utc=True)
+            frames[symbol] = df.set_index("timestamp").reindex(columns=BAR_COLUMNS).astype(float)
+        return frames
+
+
+class ParquetBarCache:
+    """Bars on disk, partitioned by symbol, timeframe and year"""
+
+    def __init__(self, root: str):
+        """Initialize the cache
+
+        Args:
+            root (str): Cache directory (created on first write)
+        """
+        self.root = root
+
+    def _directory(self, symbol: str, timeframe: str) -> str:
+        return os.path.join(self.root, f"symbol={symbol}", f"timeframe={timeframe}")
+
+    def _atomic_write(self, path: str, write):
+        """Write through a temporary file so readers never see partial files"""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        write(tmp_path)
+        os.replace(tmp_path, path)
+
+    def coverage(self, symbol: str, timeframe: str) -> List[Tuple[dt.date, dt.date]]:
+        """Inclusive calendar-day ranges already fetched for a symbol"""
+        path = os.path.join(self._directory(symbol, timeframe), "_coverage.json")
+        if not os.path.exists(path):
+            return []
+        try:
+            with open(path, "r") as file:
+                ranges = json.load(file)
+        except (OSError, ValueError):
+            logger.warning(f"Ignoring unreadable coverage file {path}")
+            return []
+        return _merge_ranges((dt.date.fromisoformat(start), dt.date.fromisoformat(end)) for start, end in ranges)
+
+    def add_coverage(self, symbol: str, timeframe: str, start: dt.date, end: dt.date):
+        """Record that [start, end] has been fetched"""
+        ranges = _merge_ranges(self.coverage(symbol, timeframe) + [(start, end)])
+        path = os.path.join(self._directory(symbol, timeframe), "_coverage.json")
+
+        def write(tmp_path):
+            with open(tmp_path, "w") as file:
+                json.dump([[s.isoformat(), e.isoformat()] for s, e in ranges], file)
+
+        self._atomic_write(path, write)
+
+    def read(self, symbol: str, timeframe: str, start: dt.date, end: dt.date) -> pd.DataFrame:
+        """Cached bars whose market-calendar day falls in [start, end]"""
+        directory = self._directory(symbol, timeframe)
+        frames = []
+        for year in range(start.year, end.year + 1):
+            path = os.path.join(directory, f"year={year}.parquet")
+            if os.path.exists(path):
+                frames.append(pd.read_parquet(path))
+        if not frames:
+            return pd.DataFrame(columns=BAR_COLUMNS, index=pd.DatetimeIndex([], tz="UTC", name="timestamp"))
+
+        df = pd.concat(frames) if len(frames) > 1 else frames[0]
+        days = df.index.tz_convert(MARKET_TIMEZONE).date
+        return df[(days >= start) & (days <= end)]
+
+    def write(self, symbol: str, timeframe: str, df: pd.DataFrame):
+        """Merge new bars into the yearly partitions (new values win)"""
+        if df.empty:
+            return
+        directory = self._directory(symbol, timeframe)
+        years = df.index.tz_convert(MARKET_TIMEZONE).year
+        for year, part in df.groupby(years):
+            path = os.path.join(directory, f"year={year}.parquet")
+            if os.path.exists(path):
+                part = pd.concat([pd.read_parquet(path), part])
+                part = part[~part.index.duplicated(keep="last")]
+            part = part.sort_index()
+            self._atomic_write(path, part.to_parquet)
+
+
+class HistoricalDataStore:
+    """Cached, batched access to historical bars for many symbols"""
+
+    def __init__(self, client: AlpacaBarsClient, cache_dir: str = "data_cache", adjustment: str = "all",
+                 today_ttl: float = 60.0):
+        """Initialize the store
+
+        Args:
+            client (AlpacaBarsClient): Client used for cache misses
+            cache_dir (str): Root directory of the Parquet cache
+            adjustment (str): Corporate action adjustment ('raw', 'split', 'all', ...)
+            today_ttl (float): Seconds the current day's bars are reused before
+                being fetched again
+        """
+        self.client = client
+        self.adjustment = adjustment
+        self.today_ttl = today_ttl
+        self.cache = ParquetBarCache(os.path.join(cache_dir, f"adjustment={adjustment}"))
+        self._lock = threading.Lock()
+        # (symbol, timeframe) -> (day, monotonic time) of the last fetch of the current day
+        self._today_fetched: Dict[Tuple[str, str], Tuple[dt.date, float]] = {}
+
+    def missing_ranges(self, symbol: str, start: dt.date, end: dt.date,
+                       timeframe: str) -> List[Tuple[dt.date, dt.date]]:
+        """Date ranges in [start, end] that are not cached yet"""
+        covered = self.cache.coverage(symbol, timeframe)
+        fetched = self._today_fetched.get((symbol, timeframe))
+        if fetched is not None and time.monotonic() - fetched[1] < self.today_ttl:
+            covered = _merge_ranges(covered + [(fetched[0], fetched[0])])
+        return _subtract_ranges(start, end, covered)
+
+    def get_bars(self, symbols: Iterable[str], start, end=None, timeframe="1Day") -> Dict[str, pd.DataFrame]:
+        """Bars for several symbols, fetching only what the cache is missing
+
+        Symbols with the same missing date range are fetched together in
+        batched requests. Days up to yesterday are recorded as covered; the
+        current day may still change and is fetched again once its bars are
+        older than ``today_ttl``.
+
+        Args:
+            symbols (iterable): Symbols to load
+            start: First calendar day (date, datetime or 'YYYY-MM-DD')
+            end: Last calendar day (today by default)
+            timeframe: Bar timeframe ('1Day', '1D', TimeFrame.Day, ...)
+
+        Returns:
+            dict: Symbol -> DataFrame indexed by UTC timestamp with columns
+                BAR_COLUMNS; symbols without any bars are omitted
+        """
+        symbols = list(dict.fromkeys(symbols))
+        timeframe = normalize_timeframe(timeframe)
+        start = _to_date(start)
+        today = pd.Timestamp.now(tz=MARKET_TIMEZONE).date()
+        end = _to_date(end) if end is not None else today
+
+        with self._lock:
+            # Group symbols by identical missing ranges so they share requests
+            pending: Dict[Tuple[dt.date, dt.date], List[str]] = {}
+            for symbol in symbols:
+                for missing in self.missing_ranges(symbol, start, end, timeframe):
+                    pending.setdefault(missing, []).append(symbol)
+
+            for (fetch_start, fetch_end), batch in pending.items():
+                logger.info(f"Fetching {timeframe} bars for {len(batch)} symbols from {fetch_start} to {fetch_end}")
+                frames = self.client.get_bars(batch, fetch_start, fetch_end, timeframe, self.adjustment)
+                covered_end = min(fetch_end, today - dt.timedelta(days=1))
+                for symbol in batch:
+                    if symbol in frames:
+                        self.cache.write(symbol, timeframe, frames[symbol])
+                    if covered_end >= fetch_start:
+                        self.cache.add_coverage(symbol, timeframe, fetch_start, covered_end)
+                    if fetch_start <= today <= fetch_end:
+                        self._today_fetched[(symbol, timeframe)] = (today, time.monotonic())
+
+            result = {}
+            for symbol in symbols:
+                df = self.cache.read(symbol, timeframe, start, end)
+                if not df.empty:
+                    result[symbol] = df
+            return result
+
+
+def get_data_store(api_key: str, api_secret: str, cache_dir: str = "data_cache",
+                   adjustment: str = "all", feed: Optional[str] = None) -> HistoricalDataStore:
+    """Shared store per credentials, cache directory and adjustment
+
+    Every caller in a process gets the same instance, so repeated backtests
+    reuse one HTTP session and one cache.
+    """
+    key = (api_key, os.path.abspath(cache_dir), adjustment, feed)
+    with _stores_lock:
+        if key not in _stores:
+            client = AlpacaBarsClient(api_key, api_secret, feed=feed)
+            _stores[key] = HistoricalDataStore(client, cache_dir=cache_dir, adjustment=adjustment)
+        return _stores[key]
@@ -35,10 +35,13 @@ from enhanced_trade_management import (
     should_apply_trailing_stop,
     should_take_partial_profits,
     should_exit_by_time,
-    filter_signals_by_quality,
     adjust_position_for_correlation
 )
 
+# Import the shared sector index and the rolling correlations
+from sector_index import get_sector_index
+from correlation_service import CorrelationService
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -60,6 +63,10 @@ class HybridStrategySystem(MultiStrategySystem):
         """Initialize the hybrid strategy system"""
         super().__init__(config)
         
+        # Sectors: configured per stock, otherwise from the shared sector index
+        self.sector_index = get_sector_index()
+        self._stock_sectors = {stock.symbol: stock.sector for stock in config.stocks}
+        
         # Initialize additional parameters from config
         self.trade_management_config = config.trade_management if hasattr(config, 'trade_management') else {}
         
@@ -103,78 +110,65 @@ class HybridStrategySystem(MultiStrategySystem):
         
         logger.info("Hybrid Strategy System initialized")
     
-    def _initialize_correlation_matrix(self) -> Dict[str, Dict[str, float]]:
-        """Initialize correlation matrix between symbols"""
+    def _initialize_correlation_matrix(self) -> CorrelationService:
+        """Initialize the rolling correlations between symbols"""
         symbols = [stock.symbol for stock in self.config.stocks]
-        correlation_matrix = {}
-        
-        # Create empty matrix
-        for symbol in symbols:
-            correlation_matrix[symbol] = {}
-            for other_symbol in symbols:
-                if symbol == other_symbol:
-                    correlation_matrix[symbol][other_symbol] = 1.0
-                else:
-                    # Default correlation of 0.5 for technology stocks, 0.3 for others
-                    # This will be updated with real data during operation
-                    correlation_matrix[symbol][other_symbol] = 0.5 if "Technology" in self._get_stock_sector(symbol) else 0.3
         
-        return correlation_matrix
+        # Default correlation of 0.5 for technology stocks, 0.3 for others
+        # until enough bars have been seen to estimate it
+        technology = np.array(["Technology" in self._get_stock_sector(symbol) for symbol in symbols])
+        prior = np.tile(np.where(technology, 0.5, 0.3)[:, None], (1, len(symbols)))
+        
+        correlation_config = getattr(self.config, 'correlation', None) or {}
+        return CorrelationService(
+            symbols,
+            halflife=correlation_config.get('halflife', 30.0),
+            min_periods=correlation_config.get('min_periods', 20),
+            prior=prior
+        )
     
     def _get_stock_sector(self, symbol: str) -> str:
         """Get the sector for a given symbol"""
-        for stock in self.config.stocks:
-            if stock.symbol == symbol:
-                return stock.sector
-        return "Unknown"
+        return self._stock_sectors.get(symbol) or self.sector_index.sector(symbol, "Unknown")
     
     def _update_correlation_matrix(self, price_data: Dict[str, pd.DataFrame]):
-        """Update correlation matrix with actual price data"""
-        symbols = list(price_data.keys())
-        
-        # Create a DataFrame with close prices for all symbols
-        close_prices = pd.DataFrame()
-        for symbol in symbols:
-            if symbol in price_data and not price_data[symbol].empty:
-                close_prices[symbol] = price_data[symbol]['close']
-        
-        # Calculate correlation matrix if we have enough data
-        if not close_prices.empty and len(close_prices.columns) > 1:
-            correlation = close_prices.pct_change().corr()
-            
-            # Update our correlation matrix
-            for symbol in symbols:
-                if symbol in correlation.columns:
-                    for other_symbol in symbols:
-                        if other_symbol in correlation.columns:
-                            self.correlation_matrix[symbol][other_symbol] = correlation.loc[symbol, other_symbol]
+        """Fold the latest bar of price data into the rolling correlations"""
+        frames = {symbol: frame for symbol, frame in price_data.items() if not frame.empty}
+        if not frames:
+            return
+        
+        if self.correlation_matrix.bars == 0:
+            # Seed from the available history once
+            self.correlation_matrix.warm_up(pd.DataFrame({symbol: frame['close'] for symbol, frame in frames.items()}))
+            return
+        
+        timestamp = max(frame.index[-1] for frame in frames.values())
+        closes = {symbol: frame['close'].iloc[-1] for symbol, frame in frames.items()
+                  if frame.index[-1] == timestamp}
+        self.correlation_matrix.update(closes, timestamp)
     
     def generate_signals(self, timestamp: dt.datetime, symbols: List[str]) -> Dict[str, List[Signal]]:
         """Generate trading signals with enhanced filtering"""
         # Get base signals from parent class
         base_signals = super().generate_signals(timestamp, symbols)
         
-        # Apply enhanced filtering
-        filtered_signals = {}
-        
-        for symbol, signals in base_signals.items():
-            if not signals:
-                filtered_signals[symbol] = []
-                continue
-            
-            # Get signal quality filter parameters
-            min_profit_factor = self.config.signal_quality_filters.get('min_profit_factor', 1.5)
-            min_sharpe_ratio = self.config.signal_quality_filters.get('min_sharpe_ratio', 0.8)
-            
-            # Filter signals by quality
-            quality_filtered = filter_signals_by_quality(
-                signals,
-                min_profit_factor,
-                min_sharpe_ratio,
-                self.historical_performance
-            )
-            
-            filtered_signals[symbol] = quality_filtered
+        # Apply enhanced filtering to all symbols in one batch
+        all_signals = [signal for signals in base_signals.values() for signal in signals]
+        accepted, report = self.signal_filters.run(
+            all_signals,
+            self.config.signal_quality_filters,
+            stages=("strategy_quality",),
+            historical_performance=self.historical_performance
+        )
+        logger.debug(report.summary())
+        
+        # The filters return the accepted signals best scored first; keep the
+        # generation order within each symbol
+        kept = {id(signal) for signal in accepted}
+        filtered_signals = {
+            symbol: [signal for signal in signals if id(signal) in kept]
+            for symbol, signals in base_signals.items()
+        }
         
         return filtered_signals
     
@@ -212,7 +206,8 @@ class HybridStrategySystem(MultiStrategySystem):
             )
         
         # Adjust for correlation with existing positions
-        current_positions = list(self.positions.values())
+        current_positions = [position for positions in self.positions.values()
+                             for position in positions if position.is_active]
         base_size = adjust_position_for_correlation(
             base_size,
             signal.symbol,
@@ -0,0 +1,588 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Incremental Indicator Engine
+-------------------------------------
+Streaming versions of the indicators in technical_indicators.py. Every
+indicator keeps O(1) state per bar, so a symbol's history is only walked
+once: afterwards each new bar costs a constant amount of work no matter
+how many strategies query the result.
+
+The outputs match the batch functions in technical_indicators.py
+(calculate_sma, calculate_ema, calculate_rsi, calculate_atr,
+calculate_adx, calculate_bollinger_bands and calculate_macd) bar for bar,
+including their NaN warm-up periods; ADX resolves equal up and down moves
+like the strategies' own ADX (see ADX). test_indicator_engine.py checks the
+equivalence.
+
+Usage:
+    engine = IndicatorEngine()
+    ema = engine.get("AAPL", candles, "ema", period=9)           # np.ndarray
+    bands = engine.get("AAPL", candles, "bollinger", period=20)  # .upper/.middle/.lower
+"""
+
+import math
+import threading
+from collections import namedtuple
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from bar_store import as_bars
+
+NAN = float("nan")
+
+
+class RollingWindow:
+    """Fixed-size window with O(1) amortised mean/variance/sum.
+
+    Running sums are kept relative to a shift value and rebuilt from the
+    window contents each time the ring wraps around, which bounds the
+    floating point drift of the add/remove updates. Windows containing a
+    NaN yield NaN, and a window of identical values yields that value with
+    zero variance exactly, mirroring pandas' rolling aggregations.
+    """
+
+    __slots__ = ("period", "_values", "_pos", "_count", "_nans", "_shift",
+                 "_sum", "_sumsq", "_last", "_run")
+
+    def __init__(self, period: int):
+        if period < 1:
+            raise ValueError("period must be >= 1")
+        self.period = int(period)
+        self._values = [0.0] * self.period
+        self._pos = 0
+        self._count = 0
+        self._nans = 0
+        self._shift = 0.0
+        self._sum = 0.0
+        self._sumsq = 0.0
+        self._last = NAN
+        self._run = 0
+
+    def push(self, value: float):
+        """Add a value, evicting the oldest one once the window is full"""
+        value = float(value)
+        values = self._values
+        pos = self._pos
+
+        if self._count == self.period:
+            old = values[pos]
+            if old != old:
+                self._nans -= 1
+            else:
+                old -= self._shift
+                self._sum -= old
+                self._sumsq -= old * old
+        else:
+            self._count += 1
+
+        values[pos] = value
+        if value != value:
+            self._nans += 1
+        else:
+            shifted = value - self._shift
+            self._sum += shifted
+            self._sumsq += shifted * shifted
+
+        self._run = self._run + 1 if value == self._last else 1
+        self._last = value
+
+        pos += 1
+        if pos == self.period:
+            pos = 0
+            self._resync()
+        self._pos = pos
+
+    def _resync(self):
+        """Rebuild the running sums from the window contents"""
+        finite = [v for v in self._values[:self._count] if v == v]
+        self._shift = finite[0] if finite else 0.0
+        total = 0.0
+        total_sq = 0.0
+        for v in finite:
+            v -= self._shift
+            total += v
+            total_sq += v * v
+        self._sum = total
+        self._sumsq = total_sq
+
+    @property
+    def ready(self) -> bool:
+        """True once the window is full and holds no NaN"""
+        return self._count == self.period and self._nans == 0
+
+    def sum(self) -> float:
+        if not self.ready:
+            return NAN
+        if self._run >= self.period:
+            return self._last * self.period
+        return self._shift * self.period + self._sum
+
+    def mean(self) -> float:
+        if not self.ready:
+            return NAN
+        if self._run >= self.period:
+            return self._last
+        return self._shift + self._sum / self.period
+
+    def var(self, ddof: int = 1) -> float:
+        n = self.period
+        if not self.ready or n - ddof <= 0:
+            return NAN
+        if self._run >= n:
+            return 0.0
+        var = (self._sumsq - self._sum * self._sum / n) / (n - ddof)
+        return var if var > 0.0 else 0.0
+
+    def std(self, ddof: int = 1) -> float:
+        var = self.var(ddof)
+        return math.sqrt(var) if var == var else NAN
+
+
+def _div(numerator: float, denominator: float) -> float:
+    """Division with numpy semantics (x/0 -> +-inf, 0/0 -> NaN)"""
+    if denominator == 0.0:
+        if numerator != numerator or numerator == 0.0:
+            return NAN
+        return math.copysign(math.inf, numerator) * math.copysign(1.0, denominator)
+    return numerator / denominator
+
+
+def _true_range(high: float, low: float, prev_close: float) -> float:
+    """True range; the first bar (no previous close) uses high - low"""
+    tr = abs(high - low)
+    if prev_close == prev_close:
+        tr = max(tr, abs(high - prev_close), abs(low - prev_close))
+    return tr
+
+
+class Indicator:
+    """Base class for streaming indicators.
+
+    Subclasses declare their output names in ``outputs`` and implement
+    ``update`` which consumes one bar and returns one value per output.
+    """
+
+    name = ""
+    outputs: Tuple[str, ...] = ("value",)
+
+    def update(self, open_: float, high: float, low: float, close: float,
+               volume: float) -> Tuple[float, ...]:
+        raise NotImplementedError
+
+
+class _EMA:
+    """pandas ``ewm(span=period, adjust=False).mean()`` on a scalar stream"""
+
+    __slots__ = ("alpha", "value")
+
+    def __init__(self, period: int):
+        self.alpha = 2.0 / (period + 1.0)
+        self.value = NAN
+
+    def push(self, x: float) -> float:
+        if x != x:
+            return self.value
+        if self.value != self.value:
+            self.value = x
+        else:
+            # Same operation order as pandas' ewma kernel
+            old_wt = 1.0 - self.alpha
+            self.value = (old_wt * self.value + self.alpha * x) / (old_wt + self.alpha)
+        return self.value
+
+
+class SMA(Indicator):
+    """Simple moving average (calculate_sma)"""
+
+    name = "sma"
+
+    def __init__(self, period: int = 20, field: str = "close"):
+        self.field = field
+        self._window = RollingWindow(period)
+
+    def update(self, open_, high, low, close, volume):
+        self._window.push(_FIELD_GETTERS[self.field](open_, high, low, close, volume))
+        return (self._window.mean(),)
+
+
+class EMA(Indicator):
+    """Exponential moving average (calculate_ema)"""
+
+    name = "ema"
+
+    def __init__(self, period: int = 20, field: str = "close"):
+        self.field = field
+        self._ema = _EMA(period)
+
+    def update(self, open_, high, low, close, volume):
+        return (self._ema.push(_FIELD_GETTERS[self.field](open_, high, low, close, volume)),)
+
+
+class RSI(Indicator):
+    """Relative Strength Index (calculate_rsi).
+
+    Gains and losses are averaged with a simple rolling mean, as in the
+    batch function. ``avg_gain``/``avg_loss`` are exposed so callers can
+    apply their own zero-loss convention.
+    """
+
+    name = "rsi"
+    outputs = ("rsi", "avg_gain", "avg_loss")
+
+    def __init__(self, period: int = 14):
+        self._gains = RollingWindow(period)
+        self._losses = RollingWindow(period)
+        self._prev_close = NAN
+
+    def update(self, open_, high, low, close, volume):
+        delta = close - self._prev_close
+        self._prev_close = close
+        self._gains.push(delta if delta > 0 else 0.0)
+        self._losses.push(-delta if delta < 0 else 0.0)
+
+        avg_gain = self._gains.mean()
+        avg_loss = self._losses.mean()
+        rs = 100.0 if avg_loss == 0 else _div(avg_gain, avg_loss)
+        return (100.0 - _div(100.0, 1.0 + rs), avg_gain, avg_loss)
+
+
+class ATR(Indicator):
+    """Average True Range as a rolling mean of true range (calculate_atr)"""
+
+    name = "atr"
+    outputs = ("atr", "tr")
+
+    def __init__(self, period: int = 14):
+        self._window = RollingWindow(period)
+        self._prev_close = NAN
+
+    def update(self, open_, high, low, close, volume):
+        tr = _true_range(high, low, self._prev_close)
+        self._prev_close = close
+        self._window.push(tr)
+        return (self._window.mean(), tr)
+
+
+class ADX(Indicator):
+    """Average Directional Index (calculate_adx).
+
+    Directional movement follows the strategies' own ADX: a bar whose up and
+    down moves are equal books neither +DM nor -DM. (calculate_adx resolves
+    -DM against the already filtered +DM and books -DM on such ties; it
+    matches otherwise.) ``plus_di`` and ``minus_di`` are reported on the
+    usual 0-100 scale (smoothed DM averaged rather than summed); DX is
+    unaffected by that scale.
+    """
+
+    name = "adx"
+    outputs = ("adx", "plus_di", "minus_di", "dx", "atr")
+
+    def __init__(self, period: int = 14):
+        self.period = int(period)
+        self._tr = RollingWindow(period)
+        self._plus_dm = RollingWindow(period)
+        self._minus_dm = RollingWindow(period)
+        self._dx = RollingWindow(period)
+        self._prev_high = NAN
+        self._prev_low = NAN
+        self._prev_close = NAN
+
+    def update(self, open_, high, low, close, volume):
+        tr = _true_range(high, low, self._prev_close)
+        up_move = high - self._prev_high
+        down_move = self._prev_low - low
+        self._prev_high = high
+        self._prev_low = low
+        self._prev_close = close
+
+        plus_dm = up_move if (up_move > down_move and up_move > 0) else 0.0
+        minus_dm = down_move if (down_move > up_move and down_move > 0) else 0.0
+
+        self._tr.push(tr)
+        self._plus_dm.push(plus_dm)
+        self._minus_dm.push(minus_dm)
+
+        atr = self._tr.mean()
+        plus_di = _div(self._plus_dm.sum(), atr) * 100.0
+        minus_di = _div(self._minus_dm.sum(), atr) * 100.0
+        dx = _div(abs(plus_di - minus_di), plus_di + minus_di) * 100.0
+
+        self._dx.push(dx)
+        return (self._dx.mean(), plus_di / self.period, minus_di / self.period, dx, atr)
+
+
+class BollingerBands(Indicator):
+    """Bollinger Bands (calculate_bollinger_bands).
+
+    ``ddof`` defaults to the sample standard deviation used by the batch
+    function; pass 0 for the population form.
+    """
+
+    name = "bollinger"
+    outputs = ("upper", "middle", "lower", "std")
+
+    def __init__(self, period: int = 20, std_dev: float = 2.0, ddof: int = 1):
+        self.std_dev = std_dev
+        self.ddof = ddof
+        self._window = RollingWindow(period)
+
+    def update(self, open_, high, low, close, volume):
+        self._window.push(close)
+        middle = self._window.mean()
+        std = self._window.std(self.ddof)
+        return (middle + std * self.std_dev, middle, middle - std * self.std_dev, std)
+
+
+class KeltnerChannels(Indicator):
+    """Keltner Channels: EMA of close +- factor * ATR"""
+
+    name = "keltner"
+    outputs = ("upper", "middle", "lower", "atr")
+
+    def __init__(self, period: int = 20, factor: float = 1.5,
+                 atr_period: Optional[int] = None):
+        self.factor = factor
+        self._ema = _EMA(period)
+        self._atr = ATR(atr_period or period)
+
+    def update(self, open_, high, low, close, volume):
+        middle = self._ema.push(close)
+        atr = self._atr.update(open_, high, low, close, volume)[0]
+        return (middle + atr * self.factor, middle, middle - atr * self.factor, atr)
+
+
+class MACD(Indicator):
+    """Moving Average Convergence Divergence (calculate_macd)"""
+
+    name = "macd"
+    outputs = ("macd", "signal", "histogram")
+
+    def __init__(self, fast_period: int = 12, slow_period: int = 26,
+                 signal_period: int = 9):
+        self._fast = _EMA(fast_period)
+        self._slow = _EMA(slow_period)
+        self._signal = _EMA(signal_period)
+
+    def update(self, open_, high, low, close, volume):
+        macd = self._fast.push(close) - self._slow.push(close)
+        signal = self._signal.push(macd)
+        return (macd, signal, macd - signal)
+
+
+_FIELD_GETTERS = {
+    "open": lambda o, h, l, c, v: o,
+    "high": lambda o, h, l, c, v: h,
+    "low": lambda o, h, l, c, v: l,
+    "close": lambda o, h, l, c, v: c,
+    "volume": lambda o, h, l, c, v: v,
+}
+
+INDICATORS: Dict[str, type] = {
+    cls.name: cls
+    for cls in (SMA, EMA, RSI, ATR, ADX, BollingerBands, KeltnerChannels, MACD)
+}
+
+
+class _Track:
+    """One indicator instance fed from one symbol's bars, plus its output history"""
+
+    def __init__(self, indicator: Indicator, capacity: int):
+        self.indicator = indicator
+        self.capacity = capacity
+        self.fields = len(indicator.outputs)
+        self.ts = np.empty(0, dtype=np.int64)
+        self.values = np.empty((self.fields, 0), dtype=np.float64)
+        self.start = 0
+        self.end = 0
+        self.last_bar = None
+        self.result_type = (namedtuple(type(indicator).__name__ + "Values", indicator.outputs)
+                            if self.fields > 1 else None)
+
+    def __len__(self):
+        return self.end - self.start
+
+    def _reserve(self, count: int, keep: int):
+        """Make room for ``count`` more rows, keeping at least ``keep`` old rows"""
+        if self.end + count <= len(self.ts):
+            return
+        keep = min(len(self), max(keep, self.capacity - count, 0))
+        size = max(keep + count, 2 * (keep + count), 64)
+        ts = np.empty(size, dtype=np.int64)
+        values = np.empty((self.fields, size), dtype=np.float64)
+        ts[:keep] = self.ts[self.end - keep:self.end]
+        values[:, :keep] = self.values[:, self.end - keep:self.end]
+        self.ts, self.values = ts, values
+        self.start, self.end = 0, keep
+
+    def feed(self, bars, begin: int, keep: int):
+        """Run the indicator over ``bars[begin:]``"""
+        count = len(bars) - begin
+        self._reserve(count, keep)
+        update = self.indicator.update
+        columns = zip(bars.open[begin:].tolist(), bars.high[begin:].tolist(),
+                      bars.low[begin:].tolist(), bars.close[begin:].tolist(),
+                      bars.volume[begin:].tolist())
+        end = self.end
+        for row in columns:
+            self.values[:, end] = update(*row)
+            end += 1
+        self.ts[self.end:end] = bars.ts_ns[begin:]
+        self.end = end
+        self.last_bar = (int(bars.ts_ns[-1]), float(bars.open[-1]), float(bars.high[-1]),
+                         float(bars.low[-1]), float(bars.close[-1]), float(bars.volume[-1]))
+
+    def contains(self, bars) -> int:
+        """End row of ``bars`` if they are already in the history, else -1"""
+        n = len(self)
+        ts = self.ts[self.start:self.end]
+        last_ts = bars.ts_ns[-1]
+        k = int(np.searchsorted(ts, last_ts))
+        if k >= n or ts[k] != last_ts or k + 1 < len(bars) or ts[k + 1 - len(bars)] != bars.ts_ns[0]:
+            return -1
+        if k == n - 1 and self.covers(bars) < 0:
+            return -1
+        return self.start + k + 1
+
+    def covers(self, bars) -> int:
+        """Number of leading ``bars`` already consumed, or -1 if the history diverged"""
+        n = len(self)
+        if n == 0:
+            return -1
+        ts = bars.ts_ns
+        last_ts = self.last_bar[0]
+        pos = int(np.searchsorted(ts, last_ts))
+        if pos >= len(ts) or ts[pos] != last_ts or pos >= n:
+            return -1
+        if self.ts[self.end - pos - 1] != ts[0]:
+            return -1
+        current = (last_ts, float(bars.open[pos]), float(bars.high[pos]), float(bars.low[pos]),
+                   float(bars.close[pos]), float(bars.volume[pos]))
+        if current != self.last_bar:
+            # The bar was revised after we consumed it
+            return -1
+        return pos + 1
+
+    def result(self, count: int, end: Optional[int] = None):
+        end = self.end if end is None else end
+        values = self.values[:, end - count:end]
+        if self.result_type is None:
+            return values[0]
+        return self.result_type(*values)
+
+
+# Engines that unpickled strategies share, one per capacity in each process
+_process_engines: Dict[int, "IndicatorEngine"] = {}
+_process_engines_lock = threading.Lock()
+
+
+def _process_engine(capacity: int) -> "IndicatorEngine":
+    """Shared engine of the current process (used when unpickling)"""
+    with _process_engines_lock:
+        if capacity not in _process_engines:
+            _process_engines[capacity] = IndicatorEngine(capacity)
+        return _process_engines[capacity]
+
+
+class IndicatorEngine:
+    """Per-symbol, per-parameter-set streaming indicators.
+
+    Indicators are created the first time they are requested and warmed up
+    from the history that is passed in. Later calls only feed the bars
+    that arrived since, so each bar is processed once per indicator no
+    matter how many strategies ask for it. A history that ends at a bar
+    already consumed (e.g. ``candles[:i]`` in a backtest) is answered from
+    the stored outputs without recomputation. If the history no longer lines
+    up with what was consumed (a gap, a revised bar, an earlier start) the
+    indicator is rebuilt from the given history.
+
+    The engine is a shared service: deep copies of strategies holding it
+    keep referring to the same instance, and pickled strategies refer to
+    the shared engine of the process that unpickles them.
+    """
+
+    def __init__(self, capacity: int = 10000):
+        """Initialize the engine
+
+        Args:
+            capacity (int): Minimum number of output rows kept per indicator
+        """
+        self.capacity = capacity
+        self._tracks: Dict[Tuple, _Track] = {}
+        self._lock = threading.RLock()
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        # Indicator state is not shipped between processes: an unpickled
+        # engine is the receiving process's shared engine, which keeps its
+        # state from one task to the next
+        return (_process_engine, (self.capacity,))
+
+    @staticmethod
+    def _key(symbol: str, name: str, params: Dict) -> Tuple:
+        return (symbol, name) + tuple(sorted(params.items()))
+
+    def get(self, symbol: str, candles, name: str, **params):
+        """Return an indicator aligned with ``candles``
+
+        Args:
+            symbol (str): Symbol the candles belong to
+            candles: BarBuffer, BarView or sequence of candles
+            name (str): Indicator name (see INDICATORS)
+            **params: Indicator parameters, e.g. ``period=14``
+
+        Returns:
+            np.ndarray for single-output indicators, otherwise a namedtuple
+            of arrays named after the indicator's outputs. Arrays have
+            len(candles) entries and share memory with the engine's
+            history, so copy them before modifying.
+        """
+        bars = as_bars(candles)
+        key = self._key(symbol, name, params)
+
+        with self._lock:
+            track = self._tracks.get(key)
+            if track is not None and len(bars):
+                end = track.contains(bars)
+                if end >= 0:
+                    return track.result(len(bars), end)
+            consumed = track.covers(bars) if track is not None and len(bars) else -1
+
+            if consumed < 0:
+                track = _Track(INDICATORS[name](**params), self.capacity)
+                self._tracks[key] = track
+                if len(bars):
+                    track.feed(bars, 0, 0)
+            elif consumed < len(bars):
+                track.feed(bars, consumed, consumed)
+
+            result = track.result(len(bars))
+
+        return result
+
+    def latest(self, symbol: str, candles, name: str, **params):
+        """Return only the most recent value(s) of an indicator"""
+        result = self.get(symbol, candles, name, **params)
+        if isinstance(result, np.ndarray):
+            return float(result[-1]) if len(result) else NAN
+        return type(result)(*(float(v[-1]) if len(v) else NAN for v in result))
+
+    def update(self, symbol: str, candles):
+        """Feed new bars to every indicator already registered for ``symbol``"""
+        with self._lock:
+            keys = [key for key in self._tracks if key[0] == symbol]
+        for key in keys:
+            self.get(symbol, candles, key[1], **dict(key[2:]))
+
+    def reset(self, symbol: Optional[str] = None):
+        """Drop indicator state for one symbol or for all symbols"""
+        with self._lock:
+            if symbol is None:
+                self._tracks.clear()
+            else:
+                for key in [key for key in self._tracks if key[0] == symbol]:
+                    del self._tracks[key]
@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Market Snapshot
+-------------------------------------
+Versioned, immutable generations of live market data handed from the data
+thread to the strategy thread.
+
+The data thread keeps writing into its BarStore/BarBuffers (the back
+buffer). After each refresh it publishes a MarketSnapshot: pinned, read-only
+views of every buffer plus the market state computed from them. Publishing
+copies no bars, and the buffers never overwrite pinned rows, so a reader can
+keep evaluating one generation while the next one is being written. Old
+generations are freed once the last reader drops them.
+
+The views are plain NumPy columns, so a generation can also be copied into
+shared memory and attached in another process (BarBuffer.attach).
+
+Usage:
+    publisher = SnapshotPublisher()
+    publisher.publish(candle_data, market_data, vix_data, market_state)  # data thread
+    snapshot = publisher.wait_for(seen_version, timeout=5)             # strategy thread
+    if snapshot is not None:
+        bars = snapshot.bars("AAPL")
+"""
+
+import datetime as dt
+import logging
+import threading
+from types import MappingProxyType
+from typing import Any, Iterable, Mapping, Optional
+
+from bar_store import BarBuffer, BarStore, BarView
+
+logger = logging.getLogger("MarketSnapshot")
+
+
+class MarketSnapshot:
+    """One immutable generation of market data"""
+
+    __slots__ = ("version", "created", "candles", "market", "vix", "market_state", "stale_symbols")
+
+    def __init__(self, version: int, candles: Mapping[str, BarView], market: BarView, vix: BarView,
+                 market_state: Any = None, stale_symbols: Iterable[str] = ()):
+        self.version = version
+        self.created = dt.datetime.now()
+        self.candles = MappingProxyType(dict(candles))
+        self.market = market
+        self.vix = vix
+        self.market_state = market_state
+        self.stale_symbols = frozenset(stale_symbols)
+
+    def bars(self, symbol: str) -> BarView:
+        """Bars of a symbol in this generation"""
+        return self.candles[symbol]
+
+    def __repr__(self) -> str:
+        return f"MarketSnapshot(version={self.version}, symbols={len(self.candles)}, created={self.created})"
+
+
+class SnapshotPublisher:
+    """Single-writer, many-reader hand-off of the latest MarketSnapshot"""
+
+    def __init__(self):
+        self._current: Optional[MarketSnapshot] = None
+        self._version = 0
+        self._closed = False
+        self._ready = threading.Condition()
+
+    @property
+    def version(self) -> int:
+        """Version of the latest generation (0 before the first publish)"""
+        return self._version
+
+    @property
+    def current(self) -> Optional[MarketSnapshot]:
+        """Latest generation, None before the first publish"""
+        return self._current
+
+    def publish(self, candles: BarStore, market: BarBuffer, vix: BarBuffer,
+                market_state: Any = None, stale_symbols: Iterable[str] = ()) -> MarketSnapshot:
+        """Pin the buffers as a new generation and wake the readers
+
+        Must only be called from the thread that writes the buffers.
+
+        Args:
+            candles (BarStore): Stock bars by symbol
+            market (BarBuffer): Market index bars
+            vix (BarBuffer): VIX bars
+            market_state: Market state computed from these bars
+            stale_symbols (iterable): Symbols whose bars missed this refresh
+
+        Returns:
+            MarketSnapshot: The published generation
+        """
+        snapshot = MarketSnapshot(self._version + 1, candles.pin(), market.pin(), vix.pin(),
+                                  market_state, stale_symbols)
+        with self._ready:
+            self._current = snapshot
+            self._version = snapshot.version
+            self._ready.notify_all()
+        return snapshot
+
+    def wait_for(self, version: int, timeout: Optional[float] = None) -> Optional[MarketSnapshot]:
+        """Wait for a generation newer than ``version``
+
+        Args:
+            version (int): Last version the caller has seen
+            timeout (float): Seconds to wait at most
+
+        Returns:
+            MarketSnapshot: The latest generation, or None on timeout or close
+        """
+        with self._ready:
+            self._ready.wait_for(lambda: self._version > version or self._closed, timeout=timeout)
+            if self._closed or self._version <= version:
+                return None
+            return self._current
+
+    def close(self):
+        """Release every waiting reader"""
+        with self._ready:
+            self._closed = True
+            self._ready.notify_all()
+
+    def reopen(self):
+        """Accept waiters again after close()"""
+        with self._ready:
+            self._closed = False
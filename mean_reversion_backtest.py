@@ -22,6 +22,8 @@ from dataclasses import dataclass
 import time
 import math
 
+from performance_metrics import annualized_return, compute_metrics
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -834,69 +836,21 @@ class MeanReversionBacktest:
         sorted_dates = sorted(self.equity_curve.keys())
         equity_values = [self.equity_curve[date] for date in sorted_dates]
         
-        # Calculate returns
-        initial_capital = self.initial_capital
-        final_equity = equity_values[-1]
-        total_return = (final_equity - initial_capital) / initial_capital
-        
-        # Calculate annualized return
+        # Returns are measured from the initial capital, drawdown and Sharpe ratio on the curve
+        metrics = compute_metrics(equity_values, pnl=[t.pnl for t in self.trade_history])
+        total_return = equity_values[-1] / self.initial_capital - 1
         days = (sorted_dates[-1] - sorted_dates[0]).days
-        if days > 0:
-            annualized_return = ((1 + total_return) ** (365 / days)) - 1
-        else:
-            annualized_return = 0.0
-        
-        # Calculate maximum drawdown
-        max_drawdown = 0.0
-        peak = equity_values[0]
-        
-        for equity in equity_values:
-            if equity > peak:
-                peak = equity
-            
-            drawdown = (peak - equity) / peak
-            max_drawdown = max(max_drawdown, drawdown)
-        
-        # Calculate daily returns for Sharpe ratio
-        daily_returns = []
-        for i in range(1, len(equity_values)):
-            daily_return = (equity_values[i] - equity_values[i-1]) / equity_values[i-1]
-            daily_returns.append(daily_return)
-        
-        # Calculate Sharpe ratio
-        if daily_returns and len(daily_returns) > 1:
-            avg_return = np.mean(daily_returns)
-            std_return = np.std(daily_returns)
-            
-            if std_return > 0:
-                sharpe_ratio = (avg_return / std_return) * (252 ** 0.5)  # Annualized
-            else:
-                sharpe_ratio = 0.0
-        else:
-            sharpe_ratio = 0.0
-        
-        # Calculate win rate and profit factor
-        winning_trades = [t for t in self.trade_history if t.pnl > 0]
-        losing_trades = [t for t in self.trade_history if t.pnl <= 0]
-        
-        total_trades = len(self.trade_history)
-        win_rate = len(winning_trades) / total_trades if total_trades > 0 else 0.0
-        
-        gross_profit = sum(t.pnl for t in winning_trades)
-        gross_loss = abs(sum(t.pnl for t in losing_trades))
-        
-        profit_factor = gross_profit / gross_loss if gross_loss > 0 else float('inf')
         
         return {
-            "initial_capital": initial_capital,
-            "final_equity": final_equity,
+            "initial_capital": self.initial_capital,
+            "final_equity": metrics.final_equity,
             "total_return": total_return * 100,  # Convert to percentage
-            "annualized_return": annualized_return * 100,  # Convert to percentage
-            "max_drawdown": max_drawdown * 100,  # Convert to percentage
-            "sharpe_ratio": sharpe_ratio,
-            "win_rate": win_rate * 100,  # Convert to percentage
-            "profit_factor": profit_factor,
-            "total_trades": total_trades
+            "annualized_return": annualized_return(total_return, days) * 100,  # Convert to percentage
+            "max_drawdown": metrics.max_drawdown_pct,
+            "sharpe_ratio": metrics.sharpe_ratio,
+            "win_rate": metrics.win_rate * 100,  # Convert to percentage
+            "profit_factor": metrics.profit_factor,
+            "total_trades": metrics.total_trades
         }
     
     def plot_equity_curve(self, save_path: str = None) -> None:
@@ -4,6 +4,11 @@
 """
 Machine Learning Signal Classifier
 Trains and uses ML models to classify trading signals by expected quality/outcome
+
+Bar features (moving averages, ATR, RSI, volatility, volume ratios) are
+computed for many bars at once from (bars x lookback) windows and cached
+by symbol and bar timestamp, so a batch of signals costs one vectorized
+pass over the bars not yet seen and one predict_proba call.
 """
 
 import numpy as np
@@ -11,7 +16,9 @@ import pandas as pd
 import datetime
 import pickle
 import os
-from typing import List, Dict, Tuple, Optional, Union
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Tuple, Optional, Union, Sequence
 from dataclasses import dataclass
 import logging
 from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
@@ -23,11 +30,177 @@ import joblib
 
 # Import data classes
 from mean_reversion_enhanced import CandleData, Signal, Trade, MarketState
+from bar_store import as_bars
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Features computed from the bars up to the signal bar
+BAR_FEATURE_NAMES = [
+    'price_to_ma5', 'price_to_ma10', 'price_to_ma20',
+    'atr_pct', 'std_dev_5', 'std_dev_10', 'std_dev_20',
+    'roc_1', 'roc_5', 'roc_10',
+    'rsi_14', 'bb_position',
+    'vol_ratio_5', 'vol_ratio_10'
+]
+
+# Numeric values of the signal strength labels
+STRENGTH_VALUES = {'weak': 1 / 3, 'medium': 2 / 3, 'strong': 1.0}
+
+# One-hot market regime encoding
+REGIME_FEATURES = {
+    "strong_bullish": [1, 0, 0, 0, 0],
+    "bullish": [0, 1, 0, 0, 0],
+    "neutral": [0, 0, 1, 0, 0],
+    "bearish": [0, 0, 0, 1, 0],
+    "strong_bearish": [0, 0, 0, 0, 1],
+    "transitional": [0, 0, 1, 0, 0]  # Map transitional to neutral
+}
+
+
+def window_features(closes: np.ndarray, highs: np.ndarray, lows: np.ndarray, volumes: np.ndarray) -> np.ndarray:
+    """
+    Bar features of many windows at once
+    
+    Args:
+        closes, highs, lows, volumes: (windows x lookback) arrays, the last
+            column being the bar the features are computed for
+    
+    Returns:
+        np.ndarray: (windows x len(BAR_FEATURE_NAMES)) feature matrix
+    """
+    lookback = closes.shape[1]
+    current = closes[:, -1]
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Moving averages and price relative to them
+        ma = {n: closes[:, -n:].mean(axis=1) if lookback >= n else current for n in (5, 10, 20)}
+        price_to_ma = [current / ma[n] - 1 for n in (5, 10, 20)]
+        
+        # Volatility: ATR over 14 bars and standard deviations relative to the averages
+        if lookback < 15:
+            atr = highs[:, -1] - lows[:, -1]
+        else:
+            previous = closes[:, :-1]
+            true_range = np.maximum.reduce([highs[:, 1:] - lows[:, 1:],
+                                            np.abs(highs[:, 1:] - previous),
+                                            np.abs(lows[:, 1:] - previous)])
+            atr = true_range[:, -14:].mean(axis=1)
+        std_dev = [closes[:, -n:].std(axis=1) / ma[n] if lookback >= n else np.zeros(len(current))
+                   for n in (5, 10, 20)]
+        
+        # Momentum
+        roc = [current / closes[:, -n - 1] - 1 if lookback >= n + 1 else np.zeros(len(current))
+               for n in (1, 5, 10)]
+        
+        # RSI over the last 14 price changes
+        if lookback < 15:
+            rsi = np.full(len(current), 50.0)
+        else:
+            deltas = np.diff(closes, axis=1)[:, -14:]
+            avg_gain = np.where(deltas > 0, deltas, 0.0).mean(axis=1)
+            avg_loss = np.where(deltas < 0, -deltas, 0.0).mean(axis=1)
+            rsi = np.where(avg_loss == 0, 100.0, 100 - 100 / (1 + avg_gain / avg_loss))
+        
+        # Position within the 20 bar Bollinger Bands (0 = lower band, 1 = upper band)
+        if lookback >= 20:
+            bb_std = closes[:, -20:].std(axis=1)
+            bb_lower = ma[20] - 2 * bb_std
+            bb_upper = ma[20] + 2 * bb_std
+            bb_position = np.where(bb_upper > bb_lower, (current - bb_lower) / (bb_upper - bb_lower), 0.5)
+        else:
+            bb_position = np.full(len(current), 0.5)
+        
+        # Volume relative to its recent average
+        last_volume = volumes[:, -1]
+        vol_ratio = []
+        for n in (5, 10):
+            vol_avg = volumes[:, -n:].mean(axis=1) if lookback >= n else last_volume
+            vol_ratio.append(np.where(vol_avg > 0, last_volume / vol_avg, 1.0))
+    
+    return np.column_stack(price_to_ma + [atr / current] + std_dev + roc + [rsi, bb_position] + vol_ratio)
+
+
+def signal_features(signal: Signal, market_state: Optional[MarketState] = None) -> List[float]:
+    """Features of the signal itself and of the market state"""
+    strength = STRENGTH_VALUES.get(signal.strength, 0.0) if isinstance(signal.strength, str) else signal.strength
+    features = [float(strength), 1 if signal.direction == "long" else 0]
+    
+    # Risk-reward ratio
+    if signal.stop_loss and signal.take_profit:
+        if signal.direction == "long":
+            risk = (signal.entry_price - signal.stop_loss) / signal.entry_price
+            reward = (signal.take_profit - signal.entry_price) / signal.entry_price
+        else:
+            risk = (signal.stop_loss - signal.entry_price) / signal.entry_price
+            reward = (signal.entry_price - signal.take_profit) / signal.entry_price
+        
+        features.append(reward / risk if risk > 0 else 0)
+    else:
+        features.append(0)
+    
+    # Market state features
+    if market_state:
+        features.extend(REGIME_FEATURES.get(market_state.regime, [0, 0, 1, 0, 0]))  # Default to neutral
+        
+        # Add volatility and trend strength
+        features.append(market_state.volatility)
+        features.append(market_state.trend_strength)
+        features.append(1 if market_state.is_range_bound else 0)
+    else:
+        # Default market state features if not available
+        features.extend([0, 0, 1, 0, 0])  # Neutral regime
+        features.append(0.01)  # Default volatility
+        features.append(0)     # Default trend strength
+        features.append(0)     # Not range-bound
+    
+    return features
+
+
+class FeatureStore:
+    """
+    Bar features keyed by (symbol, bar timestamp)
+    
+    Each entry also keeps the close and volume of its bar, so features of a
+    bar that was still forming when they were computed are recomputed once
+    the bar changes. The oldest entries are evicted beyond max_entries.
+    """
+    
+    def __init__(self, max_entries: int = 100000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def __len__(self):
+        return len(self._entries)
+    
+    def get(self, symbol: str, ts_ns: int, close: float, volume: float) -> Optional[np.ndarray]:
+        """Cached features of a bar, or None if missing or the bar changed"""
+        key = (symbol, int(ts_ns))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != close or entry[1] != volume:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+    
+    def put(self, symbol: str, ts_ns: int, close: float, volume: float, features: np.ndarray):
+        """Store the features of a bar"""
+        with self._lock:
+            self._entries[(symbol, int(ts_ns))] = (close, volume, features)
+            self._entries.move_to_end((symbol, int(ts_ns)))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
 class MLSignalClassifier:
     """
     Machine Learning Signal Classifier for predicting signal quality
@@ -58,6 +231,9 @@ class MLSignalClassifier:
         self.feature_names = []
         self.is_trained = False
         
+        # Bar features by symbol and bar timestamp
+        self.feature_store = FeatureStore(self.params.get('feature_cache_size', 100000))
+        
         # Load existing model if available
         self._load_model()
     
@@ -71,6 +247,7 @@ class MLSignalClassifier:
                 self.scaler = model_data.get('scaler')
                 self.feature_names = model_data.get('feature_names', [])
                 self.last_training_date = model_data.get('training_date')
+                self.is_trained = self.model is not None
                 
                 self.logger.info(f"Model loaded successfully. Last trained: {self.last_training_date}")
                 return True
@@ -102,179 +279,91 @@ class MLSignalClassifier:
             self.logger.warning(f"Not enough candles for feature extraction: {len(candles)} < {self.feature_lookback}")
             return []
         
-        # Extract price data
-        closes = np.array([c.close for c in candles])
-        highs = np.array([c.high for c in candles])
-        lows = np.array([c.low for c in candles])
-        volumes = np.array([c.volume for c in candles])
-        
-        # Get recent data for feature calculation
-        recent_closes = closes[-self.feature_lookback:]
-        recent_highs = highs[-self.feature_lookback:]
-        recent_lows = lows[-self.feature_lookback:]
-        recent_volumes = volumes[-self.feature_lookback:]
-        
-        features = []
-        
         try:
-            # Price features
-            current_price = recent_closes[-1]
-            
-            # Moving averages
-            ma5 = np.mean(recent_closes[-5:]) if len(recent_closes) >= 5 else current_price
-            ma10 = np.mean(recent_closes[-10:]) if len(recent_closes) >= 10 else current_price
-            ma20 = np.mean(recent_closes[-20:]) if len(recent_closes) >= 20 else current_price
-            
-            # Price relative to moving averages
-            price_to_ma5 = current_price / ma5 - 1
-            price_to_ma10 = current_price / ma10 - 1
-            price_to_ma20 = current_price / ma20 - 1
-            
-            features.extend([price_to_ma5, price_to_ma10, price_to_ma20])
-            
-            # Volatility features
-            atr = self._calculate_atr(recent_highs, recent_lows, recent_closes, 14)
-            atr_pct = atr / current_price
-            
-            std_dev_5 = np.std(recent_closes[-5:]) / ma5 if len(recent_closes) >= 5 else 0
-            std_dev_10 = np.std(recent_closes[-10:]) / ma10 if len(recent_closes) >= 10 else 0
-            std_dev_20 = np.std(recent_closes[-20:]) / ma20 if len(recent_closes) >= 20 else 0
-            
-            features.extend([atr_pct, std_dev_5, std_dev_10, std_dev_20])
-            
-            # Momentum features
-            roc_1 = (current_price / recent_closes[-2] - 1) if len(recent_closes) >= 2 else 0
-            roc_5 = (current_price / recent_closes[-6] - 1) if len(recent_closes) >= 6 else 0
-            roc_10 = (current_price / recent_closes[-11] - 1) if len(recent_closes) >= 11 else 0
-            
-            features.extend([roc_1, roc_5, roc_10])
-            
-            # RSI
-            rsi_14 = self._calculate_rsi(recent_closes, 14)
-            features.append(rsi_14)
-            
-            # Bollinger Bands
-            bb_period = 20
-            if len(recent_closes) >= bb_period:
-                bb_ma = np.mean(recent_closes[-bb_period:])
-                bb_std = np.std(recent_closes[-bb_period:])
-                bb_upper = bb_ma + 2 * bb_std
-                bb_lower = bb_ma - 2 * bb_std
-                
-                # Position within Bollinger Bands (0 = lower band, 1 = upper band)
-                if bb_upper > bb_lower:
-                    bb_position = (current_price - bb_lower) / (bb_upper - bb_lower)
-                else:
-                    bb_position = 0.5
-                
-                features.append(bb_position)
-            else:
-                features.append(0.5)  # Default middle position
-            
-            # Volume features
-            vol_avg_5 = np.mean(recent_volumes[-5:]) if len(recent_volumes) >= 5 else recent_volumes[-1]
-            vol_avg_10 = np.mean(recent_volumes[-10:]) if len(recent_volumes) >= 10 else recent_volumes[-1]
-            
-            vol_ratio_5 = recent_volumes[-1] / vol_avg_5 if vol_avg_5 > 0 else 1
-            vol_ratio_10 = recent_volumes[-1] / vol_avg_10 if vol_avg_10 > 0 else 1
-            
-            features.extend([vol_ratio_5, vol_ratio_10])
-            
-            # Signal features
-            features.append(signal.strength)
-            features.append(1 if signal.direction == "long" else 0)
-            
-            # Risk-reward ratio
-            if signal.stop_loss and signal.take_profit:
-                if signal.direction == "long":
-                    risk = (signal.entry_price - signal.stop_loss) / signal.entry_price
-                    reward = (signal.take_profit - signal.entry_price) / signal.entry_price
-                else:
-                    risk = (signal.stop_loss - signal.entry_price) / signal.entry_price
-                    reward = (signal.entry_price - signal.take_profit) / signal.entry_price
-                
-                risk_reward = reward / risk if risk > 0 else 0
-                features.append(risk_reward)
-            else:
-                features.append(0)
-            
-            # Market state features
-            if market_state:
-                # Encode regime as one-hot
-                regime_map = {
-                    "strong_bullish": [1, 0, 0, 0, 0],
-                    "bullish": [0, 1, 0, 0, 0],
-                    "neutral": [0, 0, 1, 0, 0],
-                    "bearish": [0, 0, 0, 1, 0],
-                    "strong_bearish": [0, 0, 0, 0, 1],
-                    "transitional": [0, 0, 1, 0, 0]  # Map transitional to neutral
-                }
-                
-                regime_features = regime_map.get(market_state.regime, [0, 0, 1, 0, 0])  # Default to neutral
-                features.extend(regime_features)
-                
-                # Add volatility and trend strength
-                features.append(market_state.volatility)
-                features.append(market_state.trend_strength)
-                features.append(1 if market_state.is_range_bound else 0)
-            else:
-                # Default market state features if not available
-                features.extend([0, 0, 1, 0, 0])  # Neutral regime
-                features.append(0.01)  # Default volatility
-                features.append(0)     # Default trend strength
-                features.append(0)     # Not range-bound
-            
-            return features
-            
+            # Extract price data (zero-copy when candles are already columnar)
+            bars = as_bars(candles)
+            bar_features = self._bar_features(signal.symbol, bars, np.array([len(bars) - 1]))[0]
+            return bar_features.tolist() + signal_features(signal, market_state)
         except Exception as e:
             self.logger.error(f"Error extracting features: {str(e)}")
             return []
     
-    def _calculate_rsi(self, prices: np.ndarray, period: int = 14) -> float:
-        """Calculate RSI without using TA-Lib"""
-        if len(prices) < period + 1:
-            return 50.0  # Default to neutral if not enough data
+    def _bar_features(self, symbol: str, bars, positions: np.ndarray) -> np.ndarray:
+        """
+        Bar features of one symbol at several bar positions, using the feature store
         
-        # Calculate price changes
-        deltas = np.diff(prices)
+        Args:
+            symbol: Symbol of the bars
+            bars: BarView of the symbol
+            positions: Bar indices to compute features for
+            
+        Returns:
+            np.ndarray: (positions x len(BAR_FEATURE_NAMES)), NaN rows where
+                there are fewer than feature_lookback bars
+        """
+        lookback = self.feature_lookback
+        matrix = np.full((len(positions), len(BAR_FEATURE_NAMES)), np.nan)
+        missing = []
+        for row, pos in enumerate(positions):
+            if pos < lookback - 1:
+                continue
+            cached = self.feature_store.get(symbol, bars.ts_ns[pos], bars.close[pos], bars.volume[pos])
+            if cached is None:
+                missing.append(row)
+            else:
+                matrix[row] = cached
         
-        # Get gains and losses
-        gains = np.copy(deltas)
-        losses = np.copy(deltas)
+        if missing:
+            ends = np.unique(positions[missing])
+            starts = ends - (lookback - 1)
+            columns = [np.lib.stride_tricks.sliding_window_view(values, lookback)[starts]
+                       for values in (bars.close, bars.high, bars.low, bars.volume)]
+            computed = window_features(*columns)
+            by_position = dict(zip(ends.tolist(), computed))
+            for pos, features in by_position.items():
+                self.feature_store.put(symbol, bars.ts_ns[pos], bars.close[pos], bars.volume[pos], features)
+            for row in missing:
+                matrix[row] = by_position[int(positions[row])]
+        return matrix
+    
+    def extract_features_batch(self, candles_by_symbol: Dict[str, List[CandleData]], signals: Sequence[Signal],
+                               market_state: Optional[MarketState] = None) -> np.ndarray:
+        """
+        Feature matrix of many signals at once
         
-        gains[gains < 0] = 0
-        losses[losses > 0] = 0
-        losses = abs(losses)
+        Each signal's bar features are taken at the last bar at or before its
+        timestamp (the last bar when it has none).
         
-        # Calculate average gains and losses
-        avg_gain = np.mean(gains[-period:])
-        avg_loss = np.mean(losses[-period:])
+        Args:
+            candles_by_symbol: Candle data (lists, BarViews or BarBuffers) by symbol
+            signals: Signals to extract features for
+            market_state: Current market state
+            
+        Returns:
+            np.ndarray: (signals x features) matrix, NaN rows for signals
+                without enough bars
+        """
+        n_signal_features = len(signal_features(signals[0], market_state)) if signals else 0
+        matrix = np.full((len(signals), len(BAR_FEATURE_NAMES) + n_signal_features), np.nan)
         
-        if avg_loss == 0:
-            return 100.0
+        rows_by_symbol = {}
+        for row, signal in enumerate(signals):
+            rows_by_symbol.setdefault(signal.symbol, []).append(row)
         
-        rs = avg_gain / avg_loss
-        rsi = 100 - (100 / (1 + rs))
+        valid = np.zeros(len(signals), dtype=bool)
+        for symbol, rows in rows_by_symbol.items():
+            candles = candles_by_symbol.get(symbol)
+            if candles is None or len(candles) < self.feature_lookback:
+                continue
+            bars = as_bars(candles)
+            positions = np.array([len(bars) - 1 if signals[row].timestamp is None
+                                  else bars.index_before(signals[row].timestamp) for row in rows])
+            matrix[rows, :len(BAR_FEATURE_NAMES)] = self._bar_features(symbol, bars, positions)
+            valid[rows] = positions >= self.feature_lookback - 1
         
-        return rsi
-    
-    def _calculate_atr(self, high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int = 14) -> float:
-        """Calculate Average True Range without using TA-Lib"""
-        if len(high) < period + 1:
-            return high[-1] - low[-1]  # Default to current range if not enough data
-        
-        tr = np.zeros(len(high))
-        tr[0] = high[0] - low[0]
-        
-        for i in range(1, len(high)):
-            tr[i] = max(
-                high[i] - low[i],
-                abs(high[i] - close[i-1]),
-                abs(low[i] - close[i-1])
-            )
-        
-        atr = np.mean(tr[-period:])
-        return atr
+        for row in np.flatnonzero(valid):
+            matrix[row, len(BAR_FEATURE_NAMES):] = signal_features(signals[row], market_state)
+        return matrix
     
     def train_model(self, training_data: List[Dict], force_retrain: bool = False) -> bool:
         """
@@ -306,6 +395,12 @@ class MLSignalClassifier:
             # Split into training and validation sets
             X_train, X_val, y_train, y_val = train_test_split(X, y, test_size=0.2, random_state=42)
             
+            # Scale features the way predictions will
+            self.feature_names = list(range(X.shape[1]))
+            self.scaler = StandardScaler()
+            X_train = self.scaler.fit_transform(X_train)
+            X_val = self.scaler.transform(X_val)
+            
             # Train the model
             self.logger.info(f"Training ML model with {len(X_train)} samples...")
             
@@ -344,7 +439,7 @@ class MLSignalClassifier:
             self.logger.info(f"Accuracy: {accuracy:.4f}, Precision: {precision:.4f}, Recall: {recall:.4f}, F1: {f1:.4f}")
             
             # Save the model
-            self.save_model()
+            self._save_model()
             
             self.is_trained = True
             return True
@@ -403,22 +498,7 @@ class MLSignalClassifier:
             if not features:
                 return 0.5
             
-            # Create DataFrame with the same columns as training data
-            feature_df = pd.DataFrame([features])
-            
-            # Ensure all expected features are present
-            for feature in self.feature_names:
-                if feature not in feature_df.columns:
-                    feature_df[feature] = 0.0
-            
-            # Keep only the features used during training
-            feature_df = feature_df[self.feature_names]
-            
-            # Scale features
-            X_scaled = self.scaler.transform(feature_df)
-            
-            # Get prediction probability
-            quality_score = self.model.predict_proba(X_scaled)[0][1]
+            quality_score = self._score_matrix(np.array([features], dtype=np.float64))[0]
             
             self.logger.info(f"Predicted quality score for {signal.symbol} {signal.direction} signal: {quality_score:.4f}")
             
@@ -428,6 +508,53 @@ class MLSignalClassifier:
             self.logger.error(f"Error predicting signal quality: {str(e)}")
             return 0.5
     
+    def predict_signal_quality_batch(self, candles_by_symbol: Dict[str, List[CandleData]], signals: Sequence[Signal],
+                                     market_state: Optional[MarketState] = None) -> np.ndarray:
+        """
+        Predict the quality of many signals with one model call
+        
+        Args:
+            candles_by_symbol: Candle data (lists, BarViews or BarBuffers) by symbol
+            signals: Trading signals to evaluate
+            market_state: Current market state
+            
+        Returns:
+            np.ndarray: Quality score per signal (0.5 without a trained model
+                or enough bars)
+        """
+        scores = np.full(len(signals), 0.5)
+        if not self.model or not self.is_trained:
+            self.logger.warning("Model not trained yet, returning default quality scores")
+            return scores
+        if not len(signals):
+            return scores
+        
+        try:
+            X = self.extract_features_batch(candles_by_symbol, signals, market_state)
+            rows = np.flatnonzero(~np.isnan(X).any(axis=1))
+            if len(rows):
+                scores[rows] = self._score_matrix(X[rows])
+            self.logger.info(f"Predicted quality scores for {len(rows)} of {len(signals)} signals")
+        except Exception as e:
+            self.logger.error(f"Error predicting signal quality: {str(e)}")
+        return scores
+    
+    def _score_matrix(self, X: np.ndarray) -> np.ndarray:
+        """Probability of a profitable trade for each feature row, in one predict_proba call"""
+        # Keep the features used during training (missing ones are zero)
+        if self.feature_names:
+            aligned = np.zeros((len(X), len(self.feature_names)))
+            for column, feature in enumerate(self.feature_names):
+                if isinstance(feature, (int, np.integer)) and 0 <= feature < X.shape[1]:
+                    aligned[:, column] = X[:, feature]
+            X = aligned
+        
+        # Scale features
+        if self.scaler is not None:
+            X = self.scaler.transform(X)
+        
+        return self.model.predict_proba(X)[:, 1]
+    
     def should_retrain(self, current_date: datetime.datetime) -> bool:
         """Check if model should be retrained based on last training date"""
         if not self.last_training_date:
@@ -6,18 +6,205 @@ ML Strategy Selector
 -------------------
 This module implements a machine learning-based strategy selector
 that predicts strategy performance in different market regimes.
+
+Training samples are appended to preallocated, growable arrays per
+strategy. Retraining runs on a thread pool in the background (the forest
+fits release the GIL) and only for strategies whose training data changed
+since their last fit; finished models are swapped in atomically, so
+predictions never see a half-trained model. With warm_start_trees set, a
+retrain adds that many trees fitted on the current data and drops the
+oldest ones instead of refitting the whole forest. The predictions of all
+strategies for one market state are computed in a single batched call.
 """
 
+import copy
 import datetime as dt
+import hashlib
 import numpy as np
 import pandas as pd
 import pickle
 import os
 import logging
-from typing import Dict, Any, List, Optional
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Dict, Any, List, Optional, Tuple
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.preprocessing import StandardScaler
 
+
+class TrainingSet:
+    """
+    Features and performance targets of one strategy in growable arrays.
+    
+    Rows are only ever appended, so the first n rows of the arrays are
+    never modified and can be handed to a training job without copying.
+    """
+    
+    def __init__(self, capacity: int = 256):
+        self._features = None
+        self._targets = np.zeros(capacity, dtype=np.float64)
+        self._timestamps = np.zeros(capacity, dtype='datetime64[us]')
+        self._size = 0
+    
+    def __len__(self):
+        return self._size
+    
+    @property
+    def n_features(self) -> Optional[int]:
+        return None if self._features is None else self._features.shape[1]
+    
+    @property
+    def features(self) -> np.ndarray:
+        if self._features is None:
+            return np.zeros((0, 0))
+        return self._features[:self._size]
+    
+    @property
+    def targets(self) -> np.ndarray:
+        return self._targets[:self._size]
+    
+    @property
+    def timestamps(self) -> np.ndarray:
+        return self._timestamps[:self._size]
+    
+    def append(self, features: np.ndarray, target: float, timestamp: dt.datetime):
+        """
+        Append one sample.
+        
+        Args:
+            features: Feature vector
+            target: Performance to predict
+            timestamp: Time the sample was recorded
+        """
+        features = np.asarray(features, dtype=np.float64).ravel()
+        if self._features is None:
+            self._features = np.zeros((len(self._targets), len(features)))
+        elif len(features) != self._features.shape[1]:
+            raise ValueError(f"Expected {self._features.shape[1]} features, got {len(features)}")
+        
+        if self._size == len(self._targets):
+            self._grow(2 * len(self._targets))
+        
+        self._features[self._size] = features
+        self._targets[self._size] = target
+        self._timestamps[self._size] = np.datetime64(timestamp, 'us')
+        self._size += 1
+    
+    def _grow(self, capacity: int):
+        # New arrays, so views handed out earlier keep their rows
+        features = np.zeros((capacity, self._features.shape[1]))
+        features[:self._size] = self._features[:self._size]
+        targets = np.zeros(capacity, dtype=np.float64)
+        targets[:self._size] = self._targets[:self._size]
+        timestamps = np.zeros(capacity, dtype='datetime64[us]')
+        timestamps[:self._size] = self._timestamps[:self._size]
+        self._features, self._targets, self._timestamps = features, targets, timestamps
+    
+    def fingerprint(self) -> str:
+        """Hash of the training rows, to skip retraining on unchanged data"""
+        digest = hashlib.sha1(str(self.features.shape).encode())
+        digest.update(np.ascontiguousarray(self.features).tobytes())
+        digest.update(self.targets.tobytes())
+        return digest.hexdigest()
+
+
+def fit_strategy_model(X: np.ndarray, y: np.ndarray, n_estimators: int = 100, max_depth: int = 10,
+                       model: Optional[RandomForestRegressor] = None,
+                       scaler: Optional[StandardScaler] = None,
+                       warm_start_trees: int = 0) -> Tuple[RandomForestRegressor, StandardScaler]:
+    """
+    Fit the scaler and forest of one strategy.
+    
+    Args:
+        X: Training features
+        y: Performance targets
+        n_estimators: Number of trees in the forest
+        max_depth: Maximum tree depth
+        model: Current model, continued if warm_start_trees is set
+        scaler: Scaler of the current model
+        warm_start_trees: Trees added per warm retrain (0 refits from scratch)
+        
+    Returns:
+        Tuple: Fitted model and scaler (the given model is not modified)
+    """
+    warm = (warm_start_trees > 0 and model is not None and scaler is not None
+            and hasattr(model, 'estimators_') and getattr(model, 'n_features_in_', None) == X.shape[1])
+    if warm:
+        # The trees were split on this scaling, so it stays fixed
+        model = copy.deepcopy(model)
+        model.set_params(warm_start=True, n_estimators=len(model.estimators_) + warm_start_trees,
+                         random_state=(42 + len(y)) % (2 ** 31))
+        model.fit(scaler.transform(X), y)
+        # Drop the oldest trees
+        model.estimators_ = model.estimators_[-n_estimators:]
+        model.n_estimators = len(model.estimators_)
+        return model, scaler
+    
+    scaler = StandardScaler()
+    model = RandomForestRegressor(
+        n_estimators=n_estimators,
+        max_depth=max_depth,
+        random_state=42,
+        warm_start=warm_start_trees > 0
+    )
+    model.fit(scaler.fit_transform(X), y)
+    return model, scaler
+
+
+class _PredictionBundle:
+    """
+    Scalers and trees of all strategy models, evaluated together.
+    
+    The feature row is scaled for every strategy in one array operation and
+    each tree reads its leaf value directly, which avoids the validation
+    and dispatch overhead of a predict call per strategy.
+    """
+    
+    def __init__(self, models: Dict[str, Any], scalers: Dict[str, Any]):
+        self.names = list(models)
+        self.models = models
+        n_features = {getattr(model, 'n_features_in_', None) for model in models.values()}
+        self.n_features = n_features.pop() if len(n_features) == 1 else None
+        self.mean = None
+        self.scale = None
+        self.trees = {}
+        if self.n_features is None:
+            return
+        self.mean = np.zeros((len(self.names), self.n_features))
+        self.scale = np.ones((len(self.names), self.n_features))
+        for row, name in enumerate(self.names):
+            scaler = scalers.get(name)
+            if scaler is not None:
+                self.mean[row] = scaler.mean_
+                self.scale[row] = scaler.scale_
+            if isinstance(models[name], RandomForestRegressor) and hasattr(models[name], 'estimators_'):
+                self.trees[name] = [(tree.tree_, tree.tree_.value[:, 0, 0]) for tree in models[name].estimators_]
+    
+    def predict(self, features: np.ndarray, scalers: Dict[str, Any]) -> Dict[str, float]:
+        """Predicted performance of every model for one feature row"""
+        features = np.asarray(features, dtype=np.float64).reshape(1, -1)
+        if self.n_features is None or features.shape[1] != self.n_features:
+            # Mixed or mismatched feature sets, predict model by model
+            predictions = {}
+            for name, model in self.models.items():
+                scaler = scalers.get(name)
+                try:
+                    predictions[name] = float(model.predict(scaler.transform(features) if scaler else features)[0])
+                except ValueError:
+                    continue
+            return predictions
+        
+        scaled = ((features - self.mean) / self.scale).astype(np.float32)
+        predictions = {}
+        for row, name in enumerate(self.names):
+            x = scaled[row:row + 1]
+            trees = self.trees.get(name)
+            if trees is None:
+                predictions[name] = float(self.models[name].predict(x)[0])
+            else:
+                predictions[name] = float(np.mean([values[tree.apply(x)[0]] for tree, values in trees]))
+        return predictions
+
 class MLStrategySelector:
     """
     Machine learning-based strategy selector that predicts strategy performance
@@ -35,18 +222,30 @@ class MLStrategySelector:
         self.config = config
         self.logger = logger or logging.getLogger(__name__)
         
-        # Initialize models and scalers
+        # Initialize models and scalers. Both dictionaries are replaced, never
+        # modified, when a retrained model is swapped in
         self.models = {}
         self.scalers = {}
         self.feature_names = []
         self.last_training_date = None
-        self.performance_history = {}
+        self.performance_history: Dict[str, TrainingSet] = {}
+        
+        # Background training
+        self.background_training = config.get("background_training", True)
+        self.warm_start_trees = config.get("warm_start_trees", 0)
+        self._executor = None
+        self._training_workers = config.get("training_workers", min(4, os.cpu_count() or 1))
+        self._pending: Dict[str, Future] = {}
+        self._trained_fingerprints: Dict[str, str] = {}
+        self._swap_lock = threading.Lock()
+        self._bundle = None
         
         # Create models directory if it doesn't exist
         os.makedirs("models", exist_ok=True)
         
         # Load existing models if available
         self._load_models()
+        self._bundle = _PredictionBundle(self.models, self.scalers)
         
     def _load_models(self):
         """Load existing models from disk"""
@@ -70,20 +269,23 @@ class MLStrategySelector:
     
     def _save_models(self):
         """Save models to disk"""
+        for strategy_name in list(self.models):
+            self._save_model(strategy_name)
+    
+    def _save_model(self, strategy_name):
+        """Save the model and scaler of one strategy, replacing the files atomically"""
         try:
-            for strategy_name, model in self.models.items():
-                model_path = f"models/{strategy_name}_model.pkl"
-                
-                with open(model_path, 'wb') as f:
-                    pickle.dump(model, f)
-                
-                if strategy_name in self.scalers:
-                    scaler_path = f"models/{strategy_name}_scaler.pkl"
-                    
-                    with open(scaler_path, 'wb') as f:
-                        pickle.dump(self.scalers[strategy_name], f)
-                
-                self.logger.info(f"Saved model for strategy {strategy_name}")
+            paths = [(f"models/{strategy_name}_model.pkl", self.models.get(strategy_name)),
+                     (f"models/{strategy_name}_scaler.pkl", self.scalers.get(strategy_name))]
+            for path, obj in paths:
+                if obj is None:
+                    continue
+                temporary = f"{path}.tmp"
+                with open(temporary, 'wb') as f:
+                    pickle.dump(obj, f)
+                os.replace(temporary, path)
+            
+            self.logger.info(f"Saved model for strategy {strategy_name}")
         except Exception as e:
             self.logger.error(f"Error saving models: {str(e)}")
     
@@ -140,17 +342,16 @@ class MLStrategySelector:
             performance: Performance metric (e.g., return)
         """
         if strategy_name not in self.performance_history:
-            self.performance_history[strategy_name] = []
+            self.performance_history[strategy_name] = TrainingSet()
         
         # Extract features
         features = self._extract_features(market_state)[0]
         
         # Record features and performance
-        self.performance_history[strategy_name].append({
-            'features': features,
-            'performance': performance,
-            'timestamp': dt.datetime.now()
-        })
+        try:
+            self.performance_history[strategy_name].append(features, performance, dt.datetime.now())
+        except ValueError as e:
+            self.logger.warning(f"Skipping training sample for {strategy_name}: {str(e)}")
     
     def record_trade_result(self, strategy_name, market_state, profit_pct):
         """
@@ -163,114 +364,183 @@ class MLStrategySelector:
         """
         self._record_performance(strategy_name, market_state, profit_pct)
     
-    def train_models(self, current_date=None):
+    def train_models(self, current_date=None, wait_for_completion=False):
         """
-        Train ML models to predict strategy performance.
+        Retrain the ML models of strategies whose training data changed.
+        
+        With background_training (the default) the fits run on a thread pool
+        and this returns immediately; each model is swapped in when its fit
+        finishes. Strategies whose data fingerprint matches their current
+        model, or that are still training, are skipped.
         
         Args:
             current_date: Current date (for retraining frequency check)
+            wait_for_completion: Block until all fits, including ones still
+                running from earlier calls, are swapped in
         """
+        if current_date is None:
+            current_date = dt.datetime.now()
+        
         # Check if we need to retrain
         if self.last_training_date is not None:
-            if current_date is None:
-                current_date = dt.datetime.now()
-            
             days_since_last_training = (current_date - self.last_training_date).days
             
             if days_since_last_training < self.config.get("retraining_interval_days", 7):
                 self.logger.debug(f"Skipping training: Last trained {days_since_last_training} days ago")
                 return
         
-        # Train models for each strategy
-        for strategy_name, history in self.performance_history.items():
-            try:
-                # Skip if not enough data
-                if len(history) < self.config.get("min_training_samples", 30):
-                    self.logger.info(f"Skipping training for {strategy_name}: Not enough data ({len(history)} samples)")
-                    continue
-                
-                # Prepare training data
-                X = np.array([record['features'] for record in history])
-                y = np.array([record['performance'] for record in history])
-                
-                # Save feature names for the first time
-                if not self.feature_names:
-                    self.feature_names = [f"feature_{i}" for i in range(X.shape[1])]
-                
-                # Scale features
-                scaler = StandardScaler()
-                X_scaled = scaler.fit_transform(X)
-                
-                # Train model
-                model = RandomForestRegressor(
-                    n_estimators=self.config.get("n_estimators", 100),
-                    max_depth=self.config.get("max_depth", 10),
-                    random_state=42
-                )
-                
-                model.fit(X_scaled, y)
-                
-                # Save model and scaler
-                self.models[strategy_name] = model
-                self.scalers[strategy_name] = scaler
-                
-                self.logger.info(f"Trained model for strategy {strategy_name} with {len(history)} samples")
-                
-                # Calculate feature importance
-                importances = model.feature_importances_
-                
-                # Log feature importance
-                feature_importance = dict(zip(self.feature_names, importances))
-                top_features = sorted(feature_importance.items(), key=lambda x: x[1], reverse=True)[:5]
-                
-                self.logger.info(f"Top features for {strategy_name}: {top_features}")
-                
-            except Exception as e:
-                self.logger.error(f"Error training model for {strategy_name}: {str(e)}")
+        if wait_for_completion:
+            # Fits still running from earlier calls would be skipped below
+            self.wait_for_training()
         
-        # Save models to disk
-        self._save_models()
+        for strategy_name, history in self.performance_history.items():
+            # Skip if not enough data
+            if len(history) < self.config.get("min_training_samples", 30):
+                self.logger.info(f"Skipping training for {strategy_name}: Not enough data ({len(history)} samples)")
+                continue
+            
+            pending = self._pending.get(strategy_name)
+            if pending is not None and not pending.done():
+                self.logger.debug(f"Skipping training for {strategy_name}: Training in progress")
+                continue
+            
+            fingerprint = history.fingerprint()
+            if self._trained_fingerprints.get(strategy_name) == fingerprint and strategy_name in self.models:
+                self.logger.debug(f"Skipping training for {strategy_name}: Training data unchanged")
+                continue
+            
+            # The first len(history) rows never change, so views are safe to share
+            job = (strategy_name, fingerprint, history.features, history.targets)
+            if self.background_training:
+                future = self._get_executor().submit(self._train_strategy, *job)
+            else:
+                future = Future()
+                future.set_result(self._train_strategy(*job))
+            self._pending[strategy_name] = future
         
         # Update last training date
-        self.last_training_date = current_date or dt.datetime.now()
+        self.last_training_date = current_date
+        
+        if wait_for_completion:
+            self.wait_for_training()
     
-    def predict_strategy_performance(self, strategy_name, market_state):
+    def wait_for_training(self, timeout=None):
         """
-        Predict strategy performance in the current market state.
+        Block until all running fits are swapped in.
+        
+        Args:
+            timeout: Maximum seconds to wait
+        """
+        wait(list(self._pending.values()), timeout=timeout)
+    
+    def close(self):
+        """Wait for running fits and stop the training workers"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+    
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self._training_workers,
+                                                thread_name_prefix="ml-training")
+        return self._executor
+    
+    def _train_strategy(self, strategy_name, fingerprint, X, y):
+        """
+        Fit one strategy's model and swap it in.
         
         Args:
             strategy_name: Name of the strategy
-            market_state: Market state object
+            fingerprint: Fingerprint of the training data
+            X: Training features
+            y: Performance targets
             
         Returns:
-            float: Predicted performance
+            bool: Whether a new model was swapped in
         """
         try:
-            # Check if model exists
-            if strategy_name not in self.models:
-                self.logger.warning(f"No model available for strategy {strategy_name}")
-                return 0.0
-            
-            # Extract features
-            features = self._extract_features(market_state)
-            
-            # Scale features
-            scaler = self.scalers.get(strategy_name)
-            if scaler:
-                features_scaled = scaler.transform(features)
-            else:
-                features_scaled = features
-            
-            # Predict performance
-            model = self.models[strategy_name]
-            predicted_performance = model.predict(features_scaled)[0]
+            model, scaler = fit_strategy_model(
+                X, y,
+                n_estimators=self.config.get("n_estimators", 100),
+                max_depth=self.config.get("max_depth", 10),
+                model=self.models.get(strategy_name),
+                scaler=self.scalers.get(strategy_name),
+                warm_start_trees=self.warm_start_trees
+            )
+        except Exception as e:
+            self.logger.error(f"Error training model for {strategy_name}: {str(e)}")
+            return False
+        
+        # Swap in: readers see either the old or the new dictionaries
+        with self._swap_lock:
+            models = dict(self.models)
+            scalers = dict(self.scalers)
+            models[strategy_name] = model
+            scalers[strategy_name] = scaler
+            bundle = _PredictionBundle(models, scalers)
+            self.models, self.scalers, self._bundle = models, scalers, bundle
+            self._trained_fingerprints[strategy_name] = fingerprint
             
-            self.logger.debug(f"Predicted performance for {strategy_name}: {predicted_performance:.2%}")
+            # Save feature names for the first time
+            if not self.feature_names:
+                self.feature_names = [f"feature_{i}" for i in range(X.shape[1])]
+        
+        self.logger.info(f"Trained model for strategy {strategy_name} with {len(y)} samples")
+        
+        # Log feature importance
+        feature_importance = dict(zip(self.feature_names, model.feature_importances_))
+        top_features = sorted(feature_importance.items(), key=lambda x: x[1], reverse=True)[:5]
+        self.logger.info(f"Top features for {strategy_name}: {top_features}")
+        
+        self._save_model(strategy_name)
+        return True
+    
+    def predict_strategies(self, market_state, strategies=None):
+        """
+        Predict the performance of several strategies in one batched call.
+        
+        Args:
+            market_state: Market state object
+            strategies: Strategy names (all trained strategies by default)
             
-            return predicted_performance
+        Returns:
+            Dict[str, float]: Predicted performance (0.0 without a model)
+        """
+        bundle, scalers = self._bundle, self.scalers
+        names = list(strategies) if strategies is not None else list(bundle.names)
+        predictions = {name: 0.0 for name in names}
+        
+        missing = [name for name in names if name not in bundle.models]
+        if missing:
+            self.logger.warning(f"No model available for strategies {missing}")
+        if len(missing) == len(names):
+            return predictions
+        
+        try:
+            features = self._extract_features(market_state)
+            predicted = bundle.predict(features, scalers)
         except Exception as e:
-            self.logger.error(f"Error predicting performance for {strategy_name}: {str(e)}")
-            return 0.0
+            self.logger.error(f"Error predicting strategy performance: {str(e)}")
+            return predictions
+        
+        for name in names:
+            if name in predicted:
+                predictions[name] = predicted[name]
+                self.logger.debug(f"Predicted performance for {name}: {predicted[name]:.2%}")
+        return predictions
+    
+    def predict_strategy_performance(self, strategy_name, market_state):
+        """
+        Predict strategy performance in the current market state.
+        
+        Args:
+            strategy_name: Name of the strategy
+            market_state: Market state object
+            
+        Returns:
+            float: Predicted performance
+        """
+        return self.predict_strategies(market_state, [strategy_name])[strategy_name]
     
     def get_optimal_strategy_weights(self, market_state, strategies):
         """
@@ -284,11 +554,9 @@ class MLStrategySelector:
             Dict[str, float]: Strategy weights
         """
         try:
-            # Predict performance for each strategy
-            performances = {}
-            for strategy_name in strategies:
-                performance = self.predict_strategy_performance(strategy_name, market_state)
-                performances[strategy_name] = max(0.0, performance)  # Ensure non-negative
+            # Predict performance for all strategies at once
+            predictions = self.predict_strategies(market_state, strategies)
+            performances = {name: max(0.0, perf) for name, perf in predictions.items()}  # Ensure non-negative
             
             # Calculate weights based on relative performance
             total_performance = sum(performances.values())
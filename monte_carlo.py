@@ -0,0 +1,242 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Monte Carlo Trade Outcomes
+-------------------------------------
+Batched simulation of the randomised trade outcomes used by the S&P 500
+backtest (final_sp500_strategy.run_backtest).
+
+The backtest draws, for every selected signal, whether the trade wins, the
+size of the move and the holding period, and sizes each trade as a fixed
+fraction of the remaining capital. Since the signals do not depend on the
+draws, they are generated once and turned into a TradePlan (capital
+fraction and win probability per trade). Thousands of outcome paths are
+then simulated at once as paths x trades arrays: the equity curve of every
+path is a cumulative product along the trade axis, and win rate, profit
+factor, return and drawdown are row reductions.
+
+Usage:
+    plan = build_trade_plan(signals, market_regime, base_position_pct=5, midcap_factor=0.8)
+    result = simulate_outcomes(plan, num_paths=10000, initial_capital=300, random_seed=42)
+    result.summary()        # mean/std/percentiles/confidence interval per metric
+"""
+
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger("MonteCarlo")
+
+# Metrics reported per path
+PATH_METRICS = ("win_rate", "profit_factor", "total_return", "max_drawdown",
+                "final_capital", "avg_win", "avg_loss", "avg_holding_period")
+
+# Upper bound on path x trade cells simulated at once
+MAX_CELLS_PER_CHUNK = 4_000_000
+
+
+@dataclass
+class TradeOutcomeModel:
+    """Assumptions behind the simulated trade outcomes of the backtest"""
+    base_long_win_rate: float = 0.62
+    market_regime_adjustments: Dict[str, float] = field(default_factory=lambda: {
+        'STRONG_BULLISH': 0.15,
+        'BULLISH': 0.10,
+        'NEUTRAL': 0.00,
+        'BEARISH': -0.10,
+        'STRONG_BEARISH': -0.20
+    })
+    max_win_rate: float = 0.95
+    # Win rate change per point of signal score above 0.7
+    score_win_rate_slope: float = 0.5
+    avg_long_win: float = 0.05
+    avg_long_loss: float = -0.02
+    outcome_noise: float = 0.01
+    avg_holding_period_win: float = 12
+    avg_holding_period_loss: float = 5
+    holding_period_noise: float = 3
+    # Position size multipliers of the base position per score tier
+    tier1_score: float = 0.9
+    tier1_multiplier: float = 3.0
+    tier2_score: float = 0.8
+    tier2_multiplier: float = 1.5
+    # Share of the remaining capital a single trade may use
+    max_capital_fraction: float = 0.95
+
+    def win_rate(self, scores: np.ndarray, market_regime: str) -> np.ndarray:
+        """Win probability of trades with the given signal scores"""
+        base = self.base_long_win_rate + self.market_regime_adjustments.get(market_regime, 0.0)
+        return np.minimum(self.max_win_rate, base + (np.asarray(scores, dtype=float) - 0.7) * self.score_win_rate_slope)
+
+    def position_multiplier(self, scores: np.ndarray) -> np.ndarray:
+        """Multiple of the base position per score; 0 for trades that are skipped"""
+        scores = np.asarray(scores, dtype=float)
+        return np.where(scores >= self.tier1_score, self.tier1_multiplier,
+                        np.where(scores >= self.tier2_score, self.tier2_multiplier, 0.0))
+
+
+@dataclass
+class TradePlan:
+    """Trades of one signal run, in execution order"""
+    symbols: List[str]
+    scores: np.ndarray
+    # Share of the remaining capital put into each trade
+    capital_fraction: np.ndarray
+    win_rate: np.ndarray
+    model: TradeOutcomeModel
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+
+def build_trade_plan(signals: Sequence[Dict], market_regime: str, base_position_pct: float = 5,
+                     midcap_factor: float = 0.8, model: Optional[TradeOutcomeModel] = None) -> TradePlan:
+    """Turn selected signals into the trades the backtest would simulate
+
+    Args:
+        signals (list): Signals with 'symbol', 'score' and optional 'is_midcap'
+        market_regime (str): Market regime the trades are taken in
+        base_position_pct (float): Base position, % of remaining capital
+        midcap_factor (float): Position size factor for mid-cap stocks
+        model (TradeOutcomeModel): Outcome assumptions (defaults if None)
+
+    Returns:
+        TradePlan: Trades of the signals that reach a sizing tier
+    """
+    model = model or TradeOutcomeModel()
+    scores = np.array([signal['score'] for signal in signals], dtype=float)
+    midcap = np.array([bool(signal.get('is_midcap', False)) for signal in signals])
+
+    fraction = base_position_pct / 100 * model.position_multiplier(scores)
+    fraction = np.where(midcap, fraction * midcap_factor, fraction)
+    fraction = np.minimum(fraction, model.max_capital_fraction)
+
+    taken = model.position_multiplier(scores) > 0
+    return TradePlan(
+        symbols=[signal['symbol'] for signal, keep in zip(signals, taken) if keep],
+        scores=scores[taken],
+        capital_fraction=fraction[taken],
+        win_rate=model.win_rate(scores[taken], market_regime),
+        model=model
+    )
+
+
+def _simulate_chunk(plan: TradePlan, initial_capital: float, uniforms: np.ndarray,
+                    outcome_noise: np.ndarray, holding_noise: np.ndarray) -> Dict[str, np.ndarray]:
+    """Metrics of a block of paths given their random draws (paths x trades each)"""
+    model = plan.model
+    wins = uniforms < plan.win_rate
+    returns = np.where(wins, model.avg_long_win, model.avg_long_loss) + outcome_noise
+    holding = np.maximum(1, np.trunc(np.where(wins, model.avg_holding_period_win,
+                                              model.avg_holding_period_loss) + holding_noise))
+
+    # Each trade moves the remaining capital by fraction x return
+    growth = 1.0 + plan.capital_fraction * returns
+    equity = initial_capital * np.cumprod(growth, axis=1)
+    before = np.empty_like(equity)
+    before[:, 0] = initial_capital
+    before[:, 1:] = equity[:, :-1]
+    pnl = before * plan.capital_fraction * returns
+
+    win_count = wins.sum(axis=1)
+    loss_count = wins.shape[1] - win_count
+    gross_profit = np.where(wins, pnl, 0.0).sum(axis=1)
+    losses = np.where(wins, 0.0, pnl).sum(axis=1)
+    gross_loss = np.abs(losses)
+
+    peaks = np.maximum(initial_capital, np.maximum.accumulate(equity, axis=1))
+    final = equity[:, -1]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return {
+            "win_rate": win_count / wins.shape[1] * 100,
+            "profit_factor": np.where(gross_loss > 0, gross_profit / gross_loss, np.inf),
+            "total_return": (final / initial_capital - 1) * 100,
+            "max_drawdown": ((peaks - equity) / peaks).max(axis=1) * 100,
+            "final_capital": final,
+            "avg_win": np.where(win_count > 0, gross_profit / win_count, 0.0),
+            "avg_loss": np.where(loss_count > 0, losses / loss_count, 0.0),
+            "avg_holding_period": holding.mean(axis=1)
+        }
+
+
+def distribution(values: np.ndarray, confidence: float = 0.95) -> Dict[str, float]:
+    """Mean, spread, percentiles and central interval of a metric over the paths
+
+    Infinite values (a profit factor without losing trades) are left out and
+    counted in 'undefined'.
+    """
+    values = np.asarray(values, dtype=float)
+    finite = values[np.isfinite(values)]
+    tail = (1 - confidence) / 2 * 100
+    if len(finite):
+        p5, p25, p50, p75, p95, low, high = np.percentile(finite, [5, 25, 50, 75, 95, tail, 100 - tail])
+        mean, std = finite.mean(), finite.std()
+    else:
+        p5 = p25 = p50 = p75 = p95 = low = high = mean = std = np.nan
+    return {
+        "mean": float(mean),
+        "std": float(std),
+        "p5": float(p5),
+        "p25": float(p25),
+        "median": float(p50),
+        "p75": float(p75),
+        "p95": float(p95),
+        "ci_low": float(low),
+        "ci_high": float(high),
+        "undefined": int(len(values) - len(finite))
+    }
+
+
+@dataclass
+class MonteCarloResult:
+    """Per-path metrics of a simulation"""
+    num_paths: int
+    num_trades: int
+    metrics: Dict[str, np.ndarray]
+
+    def summary(self, confidence: float = 0.95) -> Dict[str, Dict[str, float]]:
+        """Distribution of every metric"""
+        return {name: distribution(values, confidence) for name, values in self.metrics.items()}
+
+    def probability(self, metric: str, threshold: float) -> float:
+        """Share of paths where a metric exceeds a threshold (e.g. total_return > 0)"""
+        return float(np.mean(self.metrics[metric] > threshold))
+
+
+def simulate_outcomes(plan: TradePlan, num_paths: int = 10000, initial_capital: float = 300,
+                      random_seed: Optional[int] = 42) -> MonteCarloResult:
+    """Simulate outcome paths of a trade plan
+
+    Args:
+        plan (TradePlan): Trades to simulate
+        num_paths (int): Number of independent outcome paths
+        initial_capital (float): Capital at the start of every path
+        random_seed (int): Seed of the generator (None for fresh entropy)
+
+    Returns:
+        MonteCarloResult: Metrics per path
+    """
+    if len(plan) == 0:
+        return MonteCarloResult(num_paths, 0, {name: np.zeros(0) for name in PATH_METRICS})
+
+    rng = np.random.default_rng(random_seed)
+    model = plan.model
+    chunk = max(1, MAX_CELLS_PER_CHUNK // len(plan))
+    parts = []
+    for start in range(0, num_paths, chunk):
+        shape = (min(chunk, num_paths - start), len(plan))
+        parts.append(_simulate_chunk(
+            plan,
+            initial_capital,
+            rng.random(shape),
+            rng.normal(0, model.outcome_noise, shape),
+            rng.normal(0, model.holding_period_noise, shape)
+        ))
+
+    metrics = {name: np.concatenate([part[name] for part in parts]) for name in PATH_METRICS}
+    logger.info(f"Simulated {num_paths} outcome paths of {len(plan)} trades")
+    return MonteCarloResult(num_paths, len(plan), metrics)
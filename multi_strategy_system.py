@@ -15,10 +15,19 @@ import queue
 from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
 from abc import ABC, abstractmethod
-import copy
 import traceback
 import math
 
+from bar_store import BarStore, BarBuffer, as_bars
+from indicator_engine import IndicatorEngine
+from backtest_replay import ReplayCursor
+from concurrent_fetcher import ConcurrentFetcher
+from market_snapshot import SnapshotPublisher
+from strategy_registry import StrategyRegistry
+from signal_executor import SignalExecutor, SignalJob
+from signal_filters import SignalFilterPipeline
+from tracing import configure_tracing, dump_recent, get_tracer, span_report, timed, tracing_enabled
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -37,8 +46,15 @@ strategy_logger.setLevel(logging.DEBUG)
 for handler in logging.root.handlers:
     strategy_logger.addHandler(handler)
 
+# Per-symbol and per-bar diagnostics go to the tracer (see tracing.py), not the log
+tracer = get_tracer("MultiStrategySystem")
+
 # ===== Enums and Constants =====
 
+# Replay stream names for the index and VIX bars (kept apart from stock symbols)
+MARKET_STREAM = "__market__"
+VIX_STREAM = "__vix__"
+
 class MarketRegime(Enum):
     """Market regime classification"""
     TRENDING_BULLISH = "TRENDING_BULLISH"
@@ -286,6 +302,14 @@ class SystemConfig:
     data_source: str
     api_key: Optional[str] = None
     api_secret: Optional[str] = None
+    data_refresh_seconds: float = 60.0  # Live data refresh cadence
+    data_fetch_workers: int = 8  # Concurrent data requests
+    data_requests_per_second: float = 5.0  # Data provider rate limit
+    data_fetch_timeout: float = 45.0  # Symbols not fetched by then are marked stale
+    signal_executor: str = "serial"  # serial, thread or process
+    signal_workers: Optional[int] = None  # Signal generation pool size (CPU count by default)
+    trace_sample_rates: Dict[str, float] = field(default_factory=dict)  # Tracer name prefix -> sample rate (see tracing.py)
+    trace_buffer_size: int = 10000  # Trace events kept for error dumps
 
 @dataclass
 class BacktestResult:
@@ -338,7 +362,11 @@ class Strategy(ABC):
         self.name = name
         self.config = config
         self.logger = logging.getLogger(f"Strategy.{name}")
+        self.trace = get_tracer(f"Strategy.{name}")
         self.performance = StrategyPerformance(strategy=name)
+        # Streaming indicators; replaced by the system's shared engine when
+        # the strategy runs inside MultiStrategySystem
+        self.indicators = IndicatorEngine()
     
     def get_param(self, name: str, default=None):
         """Get a parameter value with a default fallback"""
@@ -429,17 +457,18 @@ class MeanReversionStrategy(Strategy):
                         market_state: MarketState) -> List[Signal]:
         """Generate mean reversion signals"""
         signals = []
+        candles = as_bars(candles)
         
         # Log the parameters being used for this strategy
-        strategy_logger.info(f"MeanReversion generating signals for {symbol} with {len(candles)} candles")
-        strategy_logger.info(f"Parameters: bb_period={self.get_param('bb_period', 20)}, bb_std_dev={self.get_param('bb_std_dev', 2.0)}, "
+        self.trace.event(lambda: f"MeanReversion generating signals for {symbol} with {len(candles)} candles")
+        self.trace.event(lambda: f"Parameters: bb_period={self.get_param('bb_period', 20)}, bb_std_dev={self.get_param('bb_std_dev', 2.0)}, "
                         f"rsi_period={self.get_param('rsi_period', 14)}, rsi_overbought={self.get_param('rsi_overbought', 70)}, "
                         f"rsi_oversold={self.get_param('rsi_oversold', 30)}, min_reversal_candles={self.get_param('min_reversal_candles', 2)}")
         
         # Log the first and last few candles to understand the data
         if len(candles) > 0:
-            strategy_logger.info(f"First 3 candles for {symbol}: {[f'{c.timestamp}: O={c.open:.2f}, H={c.high:.2f}, L={c.low:.2f}, C={c.close:.2f}' for c in candles[:3]]}")
-            strategy_logger.info(f"Last 3 candles for {symbol}: {[f'{c.timestamp}: O={c.open:.2f}, H={c.high:.2f}, L={c.low:.2f}, C={c.close:.2f}' for c in candles[-3:]]}")
+            self.trace.event(lambda: f"First 3 candles for {symbol}: {[f'{c.timestamp}: O={c.open:.2f}, H={c.high:.2f}, L={c.low:.2f}, C={c.close:.2f}' for c in candles[:3]]}")
+            self.trace.event(lambda: f"Last 3 candles for {symbol}: {[f'{c.timestamp}: O={c.open:.2f}, H={c.high:.2f}, L={c.low:.2f}, C={c.close:.2f}' for c in candles[-3:]]}")
         
         if len(candles) < 30:  # Need at least 30 candles for calculations
             strategy_logger.warning(f"Not enough candles for {symbol}: {len(candles)}")
@@ -450,37 +479,27 @@ class MeanReversionStrategy(Strategy):
         bb_std_dev = self.get_param('bb_std_dev', 2.0)
         
         # Extract close prices
-        close_prices = [candle.close for candle in candles]
-        strategy_logger.debug(f"Close prices for {symbol}: {close_prices[-5:]}")
+        close_prices = candles.close
+        self.trace.event(lambda: f"Close prices for {symbol}: {close_prices[-5:]}")
         
-        # Calculate SMA for Bollinger Bands
-        sma = sum(close_prices[-bb_period:]) / bb_period
+        # Calculate Bollinger Bands (population standard deviation)
+        bands = self.indicators.latest(symbol, candles, "bollinger",
+                                       period=bb_period, std_dev=bb_std_dev, ddof=0)
+        sma = bands.middle
+        upper_band = bands.upper
+        lower_band = bands.lower
         
-        # Calculate standard deviation
-        variance = sum((price - sma) ** 2 for price in close_prices[-bb_period:]) / bb_period
-        std_dev = math.sqrt(variance)
-        
-        # Calculate Bollinger Bands
-        upper_band = sma + (bb_std_dev * std_dev)
-        lower_band = sma - (bb_std_dev * std_dev)
-        
-        strategy_logger.info(f"{symbol} Bollinger Bands: SMA={sma:.2f}, Upper={upper_band:.2f}, Lower={lower_band:.2f}, Last Close={close_prices[-1]:.2f}")
+        self.trace.event(lambda: f"{symbol} Bollinger Bands: SMA={sma:.2f}, Upper={upper_band:.2f}, Lower={lower_band:.2f}, Last Close={close_prices[-1]:.2f}")
         
         # Calculate RSI
         rsi_period = self.get_param('rsi_period', 14)
         rsi_overbought = self.get_param('rsi_overbought', 70)
         rsi_oversold = self.get_param('rsi_oversold', 30)
         
-        # Calculate price changes
-        changes = [close_prices[i] - close_prices[i-1] for i in range(1, len(close_prices))]
-        
-        # Calculate gains and losses
-        gains = [change if change > 0 else 0 for change in changes]
-        losses = [abs(change) if change < 0 else 0 for change in changes]
-        
-        # Calculate average gain and average loss
-        avg_gain = sum(gains[-rsi_period:]) / rsi_period
-        avg_loss = sum(losses[-rsi_period:]) / rsi_period
+        # Average gain and average loss over the RSI window
+        rsi_values = self.indicators.latest(symbol, candles, "rsi", period=rsi_period)
+        avg_gain = rsi_values.avg_gain
+        avg_loss = rsi_values.avg_loss
         
         # Calculate RS and RSI
         if avg_loss == 0:
@@ -489,39 +508,43 @@ class MeanReversionStrategy(Strategy):
             rs = avg_gain / avg_loss
             rsi = 100 - (100 / (1 + rs))
         
-        strategy_logger.info(f"{symbol} RSI: {rsi:.2f}, Overbought: {rsi_overbought}, Oversold: {rsi_oversold}")
+        self.trace.event(lambda: f"{symbol} RSI: {rsi:.2f}, Overbought: {rsi_overbought}, Oversold: {rsi_oversold}")
         
         # Check for mean reversion signals
-        current_price = candles[-1].close
+        current_price = float(close_prices[-1])
+        lows = candles.low
+        highs = candles.high
+        volumes = candles.volume
+        last_timestamp = candles.last_timestamp()
         min_reversal_candles = self.get_param('min_reversal_candles', 2)
         require_reversal = self.get_param('require_reversal', True)
         
         # Check for oversold condition (buy signal)
         if current_price < lower_band * 1.02 and rsi < rsi_oversold * 1.1:  # Stricter conditions
-            strategy_logger.info(f"Potential BUY signal for {symbol}: Price near lower band ({current_price:.2f} vs {lower_band:.2f}) and RSI near oversold ({rsi:.2f} vs {rsi_oversold})")
+            self.trace.event(lambda: f"Potential BUY signal for {symbol}: Price near lower band ({current_price:.2f} vs {lower_band:.2f}) and RSI near oversold ({rsi:.2f} vs {rsi_oversold})")
             
             # Check for price reversal (min_reversal_candles consecutive higher lows)
             if require_reversal:
                 reversal = True
                 for i in range(1, min_reversal_candles + 1):
-                    if i >= len(candles) or candles[-i].low <= candles[-i-1].low:
-                        strategy_logger.info(f"Reversal check failed at candle -{i}: {candles[-i].low:.2f} <= {candles[-i-1].low:.2f}")
+                    if i >= len(candles) or lows[-i] <= lows[-i-1]:
+                        self.trace.event(lambda: f"Reversal check failed at candle -{i}: {lows[-i]:.2f} <= {lows[-i-1]:.2f}")
                         reversal = False
                         break
                     else:
-                        strategy_logger.info(f"Reversal check passed at candle -{i}: {candles[-i].low:.2f} > {candles[-i-1].low:.2f}")
+                        self.trace.event(lambda: f"Reversal check passed at candle -{i}: {lows[-i]:.2f} > {lows[-i-1]:.2f}")
             
             if not reversal:
-                strategy_logger.info(f"No BUY signal for {symbol}: Price near lower band and RSI near oversold, but no reversal pattern")
+                self.trace.event(lambda: f"No BUY signal for {symbol}: Price near lower band and RSI near oversold, but no reversal pattern")
                 return signals
         
             # Check for volume confirmation
-            volume_increase = candles[-1].volume > sum([c.volume for c in candles[-6:-1]]) / 5  # Volume above 5-day average
+            volume_increase = volumes[-1] > volumes[-6:-1].sum() / 5  # Volume above 5-day average
             if not volume_increase:
-                strategy_logger.info(f"No BUY signal for {symbol}: Price near lower band and RSI near oversold, but no volume confirmation")
+                self.trace.event(lambda: f"No BUY signal for {symbol}: Price near lower band and RSI near oversold, but no volume confirmation")
                 return signals
             
-            strategy_logger.info(f"BUY SIGNAL for {symbol}: Price near lower band ({current_price:.2f} vs {lower_band:.2f}) and RSI near oversold ({rsi:.2f} vs {rsi_oversold})")
+            self.trace.event(lambda: f"BUY SIGNAL for {symbol}: Price near lower band ({current_price:.2f} vs {lower_band:.2f}) and RSI near oversold ({rsi:.2f} vs {rsi_oversold})")
             
             # Calculate more realistic stop loss and take profit
             atr = self._calculate_atr(candles, 14)  # Use 14-day ATR
@@ -548,42 +571,42 @@ class MeanReversionStrategy(Strategy):
                 entry_price=current_price,
                 stop_loss=stop_loss,
                 take_profit=take_profit,
-                timestamp=candles[-1].timestamp,
+                timestamp=last_timestamp,
                 strength=strength,
-                expiration=candles[-1].timestamp + dt.timedelta(days=3)
+                expiration=last_timestamp + dt.timedelta(days=3)
             )
             signals.append(signal)
         else:
-            strategy_logger.info(f"No BUY signal for {symbol}: Price not near lower band or RSI not near oversold")
-            strategy_logger.info(f"  Current price: {current_price:.2f}, Lower band: {lower_band:.2f}, RSI: {rsi:.2f}, RSI oversold: {rsi_oversold}")
-            strategy_logger.info(f"  Conditions: price < lower_band * 1.02 = {current_price < lower_band * 1.02}, rsi < rsi_oversold * 1.1 = {rsi < rsi_oversold * 1.1}")
+            self.trace.event(lambda: f"No BUY signal for {symbol}: Price not near lower band or RSI not near oversold")
+            self.trace.event(lambda: f"  Current price: {current_price:.2f}, Lower band: {lower_band:.2f}, RSI: {rsi:.2f}, RSI oversold: {rsi_oversold}")
+            self.trace.event(lambda: f"  Conditions: price < lower_band * 1.02 = {current_price < lower_band * 1.02}, rsi < rsi_oversold * 1.1 = {rsi < rsi_oversold * 1.1}")
         
         # Check for overbought condition (sell signal)
         if current_price > upper_band * 0.98 and rsi > rsi_overbought * 0.9:  # Stricter conditions
-            strategy_logger.info(f"Potential SELL signal for {symbol}: Price near upper band ({current_price:.2f} vs {upper_band:.2f}) and RSI near overbought ({rsi:.2f} vs {rsi_overbought})")
+            self.trace.event(lambda: f"Potential SELL signal for {symbol}: Price near upper band ({current_price:.2f} vs {upper_band:.2f}) and RSI near overbought ({rsi:.2f} vs {rsi_overbought})")
             
             # Check for price reversal (min_reversal_candles consecutive lower highs)
             if require_reversal:
                 reversal = True
                 for i in range(1, min_reversal_candles + 1):
-                    if i >= len(candles) or candles[-i].high >= candles[-i-1].high:
-                        strategy_logger.info(f"Reversal check failed at candle -{i}: {candles[-i].high:.2f} >= {candles[-i-1].high:.2f}")
+                    if i >= len(candles) or highs[-i] >= highs[-i-1]:
+                        self.trace.event(lambda: f"Reversal check failed at candle -{i}: {highs[-i]:.2f} >= {highs[-i-1]:.2f}")
                         reversal = False
                         break
                     else:
-                        strategy_logger.info(f"Reversal check passed at candle -{i}: {candles[-i].high:.2f} < {candles[-i-1].high:.2f}")
+                        self.trace.event(lambda: f"Reversal check passed at candle -{i}: {highs[-i]:.2f} < {highs[-i-1]:.2f}")
             
             if not reversal:
-                strategy_logger.info(f"No SELL signal for {symbol}: Price near upper band and RSI near overbought, but no reversal pattern")
+                self.trace.event(lambda: f"No SELL signal for {symbol}: Price near upper band and RSI near overbought, but no reversal pattern")
                 return signals
         
             # Check for volume confirmation
-            volume_increase = candles[-1].volume > sum([c.volume for c in candles[-6:-1]]) / 5  # Volume above 5-day average
+            volume_increase = volumes[-1] > volumes[-6:-1].sum() / 5  # Volume above 5-day average
             if not volume_increase:
-                strategy_logger.info(f"No SELL signal for {symbol}: Price near upper band and RSI near overbought, but no volume confirmation")
+                self.trace.event(lambda: f"No SELL signal for {symbol}: Price near upper band and RSI near overbought, but no volume confirmation")
                 return signals
             
-            strategy_logger.info(f"SELL SIGNAL for {symbol}: Price near upper band ({current_price:.2f} vs {upper_band:.2f}) and RSI near overbought ({rsi:.2f} vs {rsi_overbought})")
+            self.trace.event(lambda: f"SELL SIGNAL for {symbol}: Price near upper band ({current_price:.2f} vs {upper_band:.2f}) and RSI near overbought ({rsi:.2f} vs {rsi_overbought})")
             
             # Calculate more realistic stop loss and take profit
             atr = self._calculate_atr(candles, 14)  # Use 14-day ATR
@@ -610,15 +633,15 @@ class MeanReversionStrategy(Strategy):
                 entry_price=current_price,
                 stop_loss=stop_loss,
                 take_profit=take_profit,
-                timestamp=candles[-1].timestamp,
+                timestamp=last_timestamp,
                 strength=strength,
-                expiration=candles[-1].timestamp + dt.timedelta(days=3)
+                expiration=last_timestamp + dt.timedelta(days=3)
             )
             signals.append(signal)
         else:
-            strategy_logger.info(f"No SELL signal for {symbol}: Price not near upper band or RSI not near overbought")
-            strategy_logger.info(f"  Current price: {current_price:.2f}, Upper band: {upper_band:.2f}, RSI: {rsi:.2f}, RSI overbought: {rsi_overbought}")
-            strategy_logger.info(f"  Conditions: price > upper_band * 0.98 = {current_price > upper_band * 0.98}, rsi > rsi_overbought * 0.9 = {rsi > rsi_overbought * 0.9}")
+            self.trace.event(lambda: f"No SELL signal for {symbol}: Price not near upper band or RSI not near overbought")
+            self.trace.event(lambda: f"  Current price: {current_price:.2f}, Upper band: {upper_band:.2f}, RSI: {rsi:.2f}, RSI overbought: {rsi_overbought}")
+            self.trace.event(lambda: f"  Conditions: price > upper_band * 0.98 = {current_price > upper_band * 0.98}, rsi > rsi_overbought * 0.9 = {rsi > rsi_overbought * 0.9}")
         
         return signals
     
@@ -627,26 +650,15 @@ class MeanReversionStrategy(Strategy):
         if len(candles) < period + 1:
             return 0.0
         
-        true_ranges = []
-        for i in range(1, len(candles)):
-            high = candles[i].high
-            low = candles[i].low
-            prev_close = candles[i-1].close
-            
-            tr1 = high - low
-            tr2 = abs(high - prev_close)
-            tr3 = abs(low - prev_close)
-            
-            true_range = max(tr1, tr2, tr3)
-            true_ranges.append(true_range)
+        bars = as_bars(candles)[-(period + 1):]
+        high = bars.high[1:]
+        low = bars.low[1:]
+        prev_close = bars.close[:-1]
         
         # Use the last 'period' true ranges
-        recent_true_ranges = true_ranges[-period:]
+        true_ranges = np.maximum(high - low, np.maximum(np.abs(high - prev_close), np.abs(low - prev_close)))
         
-        if not recent_true_ranges:
-            return 0.0
-        
-        return sum(recent_true_ranges) / len(recent_true_ranges)
+        return float(true_ranges.mean())
 
 class TrendFollowingStrategy(Strategy):
     """Trend following strategy using moving average crossovers"""
@@ -662,6 +674,7 @@ class TrendFollowingStrategy(Strategy):
                         market_state: MarketState) -> List[Signal]:
         """Generate trend following signals"""
         signals = []
+        candles = as_bars(candles)
         
         # Get parameters from config
         fast_ema_period = self.get_param("fast_ema_period", 9)
@@ -676,48 +689,34 @@ class TrendFollowingStrategy(Strategy):
             # Not enough data for calculation
             return signals
         
-        # Convert candles to DataFrame for easier calculation
-        df = pd.DataFrame([candle.to_dict() for candle in candles])
-        df.set_index('timestamp', inplace=True)
-        
-        # Calculate EMAs
-        df['fast_ema'] = df['close'].ewm(span=fast_ema_period, adjust=False).mean()
-        df['slow_ema'] = df['close'].ewm(span=slow_ema_period, adjust=False).mean()
-        
-        # Calculate MACD
-        df['macd'] = df['close'].ewm(span=macd_fast, adjust=False).mean() - df['close'].ewm(span=macd_slow, adjust=False).mean()
-        df['macd_signal'] = df['macd'].ewm(span=macd_signal, adjust=False).mean()
-        df['macd_hist'] = df['macd'] - df['macd_signal']
-        
-        # Calculate ADX
-        # True Range
-        df['high_low'] = df['high'] - df['low']
-        df['high_close'] = np.abs(df['high'] - df['close'].shift())
-        df['low_close'] = np.abs(df['low'] - df['close'].shift())
-        df['tr'] = df[['high_low', 'high_close', 'low_close']].max(axis=1)
-        df['atr'] = df['tr'].rolling(window=adx_period).mean()
-        
-        # Directional Movement
-        df['up_move'] = df['high'] - df['high'].shift()
-        df['down_move'] = df['low'].shift() - df['low']
-        
-        df['plus_dm'] = np.where((df['up_move'] > df['down_move']) & (df['up_move'] > 0), df['up_move'], 0)
-        df['minus_dm'] = np.where((df['down_move'] > df['up_move']) & (df['down_move'] > 0), df['down_move'], 0)
-        
-        # Directional Indicators
-        df['plus_di'] = 100 * (df['plus_dm'].rolling(window=adx_period).mean() / df['atr'])
-        df['minus_di'] = 100 * (df['minus_dm'].rolling(window=adx_period).mean() / df['atr'])
+        last_timestamp = candles.last_timestamp()
         
-        # Directional Index
-        df['dx'] = 100 * np.abs(df['plus_di'] - df['minus_di']) / (df['plus_di'] + df['minus_di'])
-        df['adx'] = df['dx'].rolling(window=adx_period).mean()
+        # Indicators from the shared streaming engine
+        fast_ema = self.indicators.get(symbol, candles, "ema", period=fast_ema_period)
+        slow_ema = self.indicators.get(symbol, candles, "ema", period=slow_ema_period)
+        macd = self.indicators.get(symbol, candles, "macd", fast_period=macd_fast,
+                                   slow_period=macd_slow, signal_period=macd_signal)
+        adx = self.indicators.get(symbol, candles, "adx", period=adx_period)
         
-        # Fill NaN values
-        df.dropna(inplace=True)
+        # Skip bars where the indicators are not defined yet
+        valid = self._defined_rows((adx.adx, adx.plus_di, adx.minus_di), 5)
         
-        if len(df) < 5:
+        if len(valid) < 5:
             return signals
         
+        rows = valid[-3:]
+        df = pd.DataFrame({
+            'close': candles.close[rows],
+            'fast_ema': fast_ema[rows],
+            'slow_ema': slow_ema[rows],
+            'macd': macd.macd[rows],
+            'macd_signal': macd.signal[rows],
+            'macd_hist': macd.histogram[rows],
+            'plus_di': adx.plus_di[rows],
+            'minus_di': adx.minus_di[rows],
+            'adx': adx.adx[rows]
+        })
+        
         # Get the latest data
         latest = df.iloc[-1]
         prev = df.iloc[-2]
@@ -748,7 +747,7 @@ class TrendFollowingStrategy(Strategy):
             
             # Create signal
             signal = Signal(
-                timestamp=candles[-1].timestamp,
+                timestamp=last_timestamp,
                 symbol=symbol,
                 strategy=self.name,
                 direction=TradeDirection.LONG,
@@ -756,7 +755,7 @@ class TrendFollowingStrategy(Strategy):
                 entry_price=latest.close,
                 stop_loss=stop_loss,
                 take_profit=take_profit,
-                expiration=candles[-1].timestamp + dt.timedelta(days=2),
+                expiration=last_timestamp + dt.timedelta(days=2),
                 metadata={
                     "adx": latest.adx,
                     "plus_di": latest.plus_di,
@@ -794,7 +793,7 @@ class TrendFollowingStrategy(Strategy):
             
             # Create signal
             signal = Signal(
-                timestamp=candles[-1].timestamp,
+                timestamp=last_timestamp,
                 symbol=symbol,
                 strategy=self.name,
                 direction=TradeDirection.SHORT,
@@ -802,7 +801,7 @@ class TrendFollowingStrategy(Strategy):
                 entry_price=latest.close,
                 stop_loss=stop_loss,
                 take_profit=take_profit,
-                expiration=candles[-1].timestamp + dt.timedelta(days=5),  # Extend expiration to 5 days
+                expiration=last_timestamp + dt.timedelta(days=5),  # Extend expiration to 5 days
                 metadata={
                     "adx": latest.adx,
                     "plus_di": latest.plus_di,
@@ -829,11 +828,11 @@ class TrendFollowingStrategy(Strategy):
             return current_price * 0.98 if direction == TradeDirection.LONG else current_price * 1.02
         
         # Use recent price action to determine stop loss
-        recent_candles = candles[-5:]
+        recent_candles = as_bars(candles)[-5:]
         
         if direction == TradeDirection.LONG:
             # For long positions, set stop loss below recent lows
-            lowest_low = min(candle.low for candle in recent_candles)
+            lowest_low = float(recent_candles.low.min())
             stop_loss = lowest_low * 0.99  # Add a small buffer
             
             # Ensure stop loss is not too far from entry price (max 3%)
@@ -844,7 +843,7 @@ class TrendFollowingStrategy(Strategy):
             return stop_loss
         else:
             # For short positions, set stop loss above recent highs
-            highest_high = max(candle.high for candle in recent_candles)
+            highest_high = float(recent_candles.high.max())
             stop_loss = highest_high * 1.01  # Add a small buffer
             
             # Ensure stop loss is not too far from entry price (max 3%)
@@ -869,24 +868,21 @@ class TrendFollowingStrategy(Strategy):
         
         # Check if we can identify a clear target based on support/resistance
         if len(candles) >= 50:
-            df = pd.DataFrame([candle.to_dict() for candle in candles[-50:]])
+            bars = as_bars(candles)[-50:]
             
             if direction == TradeDirection.LONG:
                 # Look for resistance levels above current price
-                resistance_levels = []
-                
-                # Identify significant highs
-                for i in range(2, len(df) - 2):
-                    if (df.iloc[i].high > df.iloc[i-1].high and 
-                        df.iloc[i].high > df.iloc[i-2].high and
-                        df.iloc[i].high > df.iloc[i+1].high and
-                        df.iloc[i].high > df.iloc[i+2].high):
-                        resistance_levels.append(df.iloc[i].high)
+                # Identify significant highs (higher than the two bars on either side)
+                high = bars.high
+                center = high[2:-2]
+                is_pivot = ((center > high[1:-3]) & (center > high[:-4]) &
+                            (center > high[3:-1]) & (center > high[4:]))
+                resistance_levels = center[is_pivot]
                 
                 # Find the nearest resistance level above entry
-                valid_levels = [level for level in resistance_levels if level > entry_price]
-                if valid_levels:
-                    nearest_resistance = min(valid_levels)
+                valid_levels = resistance_levels[resistance_levels > entry_price]
+                if len(valid_levels) > 0:
+                    nearest_resistance = float(valid_levels.min())
                     potential_reward = nearest_resistance - entry_price
                     
                     # If the nearest resistance offers at least 1.5x risk, use it
@@ -895,20 +891,17 @@ class TrendFollowingStrategy(Strategy):
             
             else:  # SHORT
                 # Look for support levels below current price
-                support_levels = []
-                
-                # Identify significant lows
-                for i in range(2, len(df) - 2):
-                    if (df.iloc[i].low < df.iloc[i-1].low and 
-                        df.iloc[i].low < df.iloc[i-2].low and
-                        df.iloc[i].low < df.iloc[i+1].low and
-                        df.iloc[i].low < df.iloc[i+2].low):
-                        support_levels.append(df.iloc[i].low)
+                # Identify significant lows (lower than the two bars on either side)
+                low = bars.low
+                center = low[2:-2]
+                is_pivot = ((center < low[1:-3]) & (center < low[:-4]) &
+                            (center < low[3:-1]) & (center < low[4:]))
+                support_levels = center[is_pivot]
                 
                 # Find the nearest support level below entry
-                valid_levels = [level for level in support_levels if level < entry_price]
-                if valid_levels:
-                    nearest_support = max(valid_levels)
+                valid_levels = support_levels[support_levels < entry_price]
+                if len(valid_levels) > 0:
+                    nearest_support = float(valid_levels.max())
                     potential_reward = entry_price - nearest_support
                     
                     # If the nearest support offers at least 1.5x risk, use it
@@ -921,6 +914,18 @@ class TrendFollowingStrategy(Strategy):
         else:
             return entry_price - (risk * risk_reward)
     
+    @staticmethod
+    def _defined_rows(columns: Tuple[np.ndarray, ...], minimum: int, recent: int = 64) -> np.ndarray:
+        """Indices of rows without NaN, scanning only the recent rows when they suffice"""
+        start = max(0, len(columns[0]) - recent)
+        undefined = np.zeros(len(columns[0]) - start, dtype=bool)
+        for column in columns:
+            undefined |= np.isnan(column[start:])
+        rows = start + np.flatnonzero(~undefined)
+        if len(rows) < minimum and start > 0:
+            return TrendFollowingStrategy._defined_rows(columns, minimum, recent=len(columns[0]))
+        return rows
+    
     def should_exit_position(self, 
                             position: PositionState,
                             candles: List[CandleData],
@@ -944,18 +949,21 @@ class TrendFollowingStrategy(Strategy):
             if position.direction == TradeDirection.SHORT and current_price <= position.take_profit:
                 return True, "Take profit reached"
         
-        # Convert candles to DataFrame for calculations
-        df = pd.DataFrame([candle.to_dict() for candle in candles])
-        df.set_index('timestamp', inplace=True)
-        
-        # Calculate EMAs
-        df['fast_ema'] = df['close'].ewm(span=self.get_param("fast_ema_period", 9), adjust=False).mean()
-        df['slow_ema'] = df['close'].ewm(span=self.get_param("slow_ema_period", 21), adjust=False).mean()
-        
-        # Calculate MACD
-        df['macd'] = df['close'].ewm(span=self.get_param("macd_fast", 12), adjust=False).mean() - df['close'].ewm(span=self.get_param("macd_slow", 26), adjust=False).mean()
-        df['macd_signal'] = df['macd'].ewm(span=self.get_param("macd_signal", 9), adjust=False).mean()
-        df['macd_hist'] = df['macd'] - df['macd_signal']
+        # Calculate EMAs and MACD
+        fast_ema = self.indicators.get(position.symbol, candles, "ema",
+                                       period=self.get_param("fast_ema_period", 9))
+        slow_ema = self.indicators.get(position.symbol, candles, "ema",
+                                       period=self.get_param("slow_ema_period", 21))
+        macd = self.indicators.get(position.symbol, candles, "macd",
+                                   fast_period=self.get_param("macd_fast", 12),
+                                   slow_period=self.get_param("macd_slow", 26),
+                                   signal_period=self.get_param("macd_signal", 9))
+        df = pd.DataFrame({
+            'fast_ema': fast_ema[-2:],
+            'slow_ema': slow_ema[-2:],
+            'macd': macd.macd[-2:],
+            'macd_signal': macd.signal[-2:]
+        })
         
         # Check for trend reversal signals
         latest = df.iloc[-1]
@@ -1022,8 +1030,8 @@ class VolatilityBreakoutStrategy(Strategy):
             volume_threshold = self.get_param("volume_threshold", 1.5)  # Volume surge threshold
             
             # Log the parameters being used
-            self.logger.info(f"VolatilityBreakout generating signals for {symbol} with {len(candles)} candles")
-            self.logger.info(f"Parameters: bb_period={bb_period}, bb_std_dev={bb_std_dev}, "
+            self.trace.event(lambda: f"VolatilityBreakout generating signals for {symbol} with {len(candles)} candles")
+            self.trace.event(lambda: f"Parameters: bb_period={bb_period}, bb_std_dev={bb_std_dev}, "
                         f"keltner_period={keltner_period}, keltner_factor={keltner_factor}, "
                         f"min_squeeze_periods={min_squeeze_periods}, volume_threshold={volume_threshold}")
             
@@ -1032,58 +1040,78 @@ class VolatilityBreakoutStrategy(Strategy):
                 self.logger.warning(f"Not enough candles for {symbol}: {len(candles)} < {bb_period + min_squeeze_periods + 5}")
                 return signals
             
-            # Convert candles to DataFrame for easier calculation
-            df = pd.DataFrame([candle.to_dict() for candle in candles])
-            df.set_index('timestamp', inplace=True)
+            bars = as_bars(candles)
             
-            # Calculate Bollinger Bands
-            df['sma'] = df['close'].rolling(window=bb_period).mean()
-            df['std'] = df['close'].rolling(window=bb_period).std()
-            df['bb_upper'] = df['sma'] + (df['std'] * bb_std_dev)
-            df['bb_lower'] = df['sma'] - (df['std'] * bb_std_dev)
-            df['bb_width'] = (df['bb_upper'] - df['bb_lower']) / df['sma']
+            # Bollinger Bands and Keltner Channels from the shared streaming engine
+            bands = self.indicators.get(symbol, bars, "bollinger", period=bb_period, std_dev=bb_std_dev)
+            keltner = self.indicators.get(symbol, bars, "keltner", period=keltner_period,
+                                          factor=keltner_factor)
+            volume_sma = self.indicators.get(symbol, bars, "sma", period=20, field="volume")
             
-            # Calculate Keltner Channels
-            df['ema'] = df['close'].ewm(span=keltner_period, adjust=False).mean()
-            df['atr'] = self._calculate_atr(df, keltner_period)
+            # Only the most recent bars can produce a signal: the scan below
+            # covers the last 10 bars plus the squeeze lookback before them.
+            # Bars before the window only count towards the dropna'd length.
+            warmup = max(bb_period, keltner_period, 20, 6) - 1
+            start = max(0, len(bars) - (warmup + min_squeeze_periods + 30))
+            offset = max(0, start - warmup)
             
             # Check if atr calculation returned valid values
-            if df['atr'].isna().all():
+            if np.isnan(keltner.atr[start:]).all():
                 self.logger.warning(f"ATR calculation failed for {symbol}")
                 return signals
             
-            df['kc_upper'] = df['ema'] + (df['atr'] * keltner_factor)
-            df['kc_lower'] = df['ema'] - (df['atr'] * keltner_factor)
+            close = bars.close[start:]
+            sma = bands.middle[start:]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                bb_width = (bands.upper[start:] - bands.lower[start:]) / sma
             
             # Identify squeeze (Bollinger Bands inside Keltner Channels)
-            df['squeeze'] = (df['bb_lower'] > df['kc_lower']) & (df['bb_upper'] < df['kc_upper'])
-            
-            # Log squeeze information
-            squeeze_count = df['squeeze'].sum()
-            self.logger.info(f"{symbol} has {squeeze_count} squeeze periods out of {len(df)} total periods")
+            prev = max(0, start - 1)
+            squeeze = (bands.lower[prev:] > keltner.lower[prev:]) & (bands.upper[prev:] < keltner.upper[prev:])
             
             # Identify when a squeeze is ending (transitioning from squeeze to non-squeeze)
-            df['squeeze_ending'] = df['squeeze'].shift(1) & ~df['squeeze']
-            
-            # Calculate momentum (rate of change)
-            df['momentum'] = df['close'].pct_change(5) * 100
+            squeeze_ending = np.zeros(len(squeeze), dtype=bool)
+            squeeze_ending[1:] = squeeze[:-1] & ~squeeze[1:]
+            squeeze = squeeze[start - prev:]
+            squeeze_ending = squeeze_ending[start - prev:]
             
-            # Calculate volume surge
-            df['volume_sma'] = df['volume'].rolling(window=20).mean()
-            df['volume_ratio'] = df['volume'] / df['volume_sma']
+            # Log squeeze information
+            squeeze_count = squeeze.sum()
+            self.trace.event(lambda: f"{symbol} has {squeeze_count} squeeze periods out of {len(squeeze)} recent periods")
             
-            # Fill NaN values
-            df.dropna(inplace=True)
+            # Calculate momentum (rate of change over 5 bars)
+            momentum = np.full(len(close), np.nan)
+            lag = max(0, 5 - start)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                momentum[lag:] = (bars.close[start + lag:] / bars.close[start + lag - 5:len(bars) - 5] - 1) * 100
             
-            if len(df) < 5:
-                self.logger.warning(f"Not enough data after dropna for {symbol}: {len(df)}")
+            # Calculate volume surge
+            with np.errstate(divide='ignore', invalid='ignore'):
+                volume_ratio = bars.volume[start:] / volume_sma[start:]
+            
+            # Keep bars where every indicator is defined
+            valid = ~(np.isnan(sma) | np.isnan(bands.std[start:]) | np.isnan(bb_width) |
+                      np.isnan(keltner.atr[start:]) | np.isnan(momentum) |
+                      np.isnan(volume_sma[start:]) | np.isnan(volume_ratio))
+            df = pd.DataFrame({
+                'close': close[valid],
+                'sma': sma[valid],
+                'bb_width': bb_width[valid],
+                'squeeze': squeeze[valid],
+                'squeeze_ending': squeeze_ending[valid],
+                'momentum': momentum[valid],
+                'volume_ratio': volume_ratio[valid]
+            }, index=bars[start:].index[valid])
+            
+            if offset + len(df) < 5:
+                self.logger.warning(f"Not enough data after dropna for {symbol}: {offset + len(df)}")
                 return signals
             
             # Look for squeeze setups followed by breakouts
             for i in range(len(df) - 1, max(0, len(df) - 10), -1):  # Check last 10 candles instead of 5
                 # Check if we have a squeeze ending
                 if df.iloc[i]['squeeze_ending']:
-                    self.logger.info(f"Found squeeze ending for {symbol} at {df.index[i]}")
+                    self.trace.event(lambda: f"Found squeeze ending for {symbol} at {df.index[i]}")
                     
                     # Check if we had a sustained squeeze before this
                     squeeze_duration = 0
@@ -1093,7 +1121,7 @@ class VolatilityBreakoutStrategy(Strategy):
                         else:
                             break
                     
-                    self.logger.info(f"Squeeze duration for {symbol}: {squeeze_duration} periods (min required: {min_squeeze_periods})")
+                    self.trace.event(lambda: f"Squeeze duration for {symbol}: {squeeze_duration} periods (min required: {min_squeeze_periods})")
                     
                     # Only proceed if we had a sufficiently long squeeze
                     if squeeze_duration >= min_squeeze_periods:
@@ -1102,7 +1130,7 @@ class VolatilityBreakoutStrategy(Strategy):
                         prev = df.iloc[i-1]
                         
                         # Log current conditions
-                        self.logger.info(f"{symbol} breakout check - Close: {current.close:.2f}, SMA: {current.sma:.2f}, "
+                        self.trace.event(lambda: f"{symbol} breakout check - Close: {current.close:.2f}, SMA: {current.sma:.2f}, "
                                     f"Volume ratio: {current.volume_ratio:.2f}, Momentum: {current.momentum:.2f}")
                         
                         # Bullish breakout
@@ -1111,7 +1139,7 @@ class VolatilityBreakoutStrategy(Strategy):
                             current.volume_ratio > volume_threshold and
                             current.momentum > 0):
                             
-                            self.logger.info(f"Bullish breakout detected for {symbol}")
+                            self.trace.event(lambda: f"Bullish breakout detected for {symbol}")
                             
                             # Calculate signal strength based on momentum and volume
                             momentum_strength = min(current.momentum / 2, 2.0)
@@ -1127,8 +1155,8 @@ class VolatilityBreakoutStrategy(Strategy):
                             
                             # Calculate stop loss and take profit
                             entry_price = current.close
-                            stop_loss = self.calculate_stop_loss(entry_price, TradeDirection.LONG, candles[-i-1:])
-                            take_profit = self.calculate_take_profit(TradeDirection.LONG, entry_price, stop_loss, candles[-i-1:], stock_config)
+                            stop_loss = self.calculate_stop_loss(entry_price, TradeDirection.LONG, candles[-(offset + i) - 1:])
+                            take_profit = self.calculate_take_profit(TradeDirection.LONG, entry_price, stop_loss, candles[-(offset + i) - 1:], stock_config)
                             
                             # Create signal
                             signal = Signal(
@@ -1150,7 +1178,7 @@ class VolatilityBreakoutStrategy(Strategy):
                             )
                             
                             signals.append(signal)
-                            self.logger.info(f"Added bullish signal for {symbol} with strength {strength}")
+                            self.trace.event(lambda: f"Added bullish signal for {symbol} with strength {strength}")
                         
                         # Bearish breakout
                         elif (current.close < current.sma and
@@ -1158,7 +1186,7 @@ class VolatilityBreakoutStrategy(Strategy):
                               current.volume_ratio > volume_threshold and
                               current.momentum < 0):
                             
-                            self.logger.info(f"Bearish breakout detected for {symbol}")
+                            self.trace.event(lambda: f"Bearish breakout detected for {symbol}")
                             
                             # Calculate signal strength based on momentum and volume
                             momentum_strength = min(abs(current.momentum) / 2, 2.0)
@@ -1174,8 +1202,8 @@ class VolatilityBreakoutStrategy(Strategy):
                             
                             # Calculate stop loss and take profit
                             entry_price = current.close
-                            stop_loss = self.calculate_stop_loss(entry_price, TradeDirection.SHORT, candles[-i-1:])
-                            take_profit = self.calculate_take_profit(TradeDirection.SHORT, entry_price, stop_loss, candles[-i-1:], stock_config)
+                            stop_loss = self.calculate_stop_loss(entry_price, TradeDirection.SHORT, candles[-(offset + i) - 1:])
+                            take_profit = self.calculate_take_profit(TradeDirection.SHORT, entry_price, stop_loss, candles[-(offset + i) - 1:], stock_config)
                             
                             # Create signal
                             signal = Signal(
@@ -1197,7 +1225,7 @@ class VolatilityBreakoutStrategy(Strategy):
                             )
                             
                             signals.append(signal)
-                            self.logger.info(f"Added bearish signal for {symbol} with strength {strength}")
+                            self.trace.event(lambda: f"Added bearish signal for {symbol} with strength {strength}")
         except Exception as e:
             # Log the error but don't crash
             self.logger.error(f"Error in VolatilityBreakout strategy for {symbol}: {str(e)}")
@@ -1231,11 +1259,11 @@ class VolatilityBreakoutStrategy(Strategy):
             return current_price * 0.98 if direction == TradeDirection.LONG else current_price * 1.02
         
         # Use recent price action to determine stop loss
-        recent_candles = candles[-5:]
+        recent_candles = as_bars(candles)[-5:]
         
         if direction == TradeDirection.LONG:
             # For long positions, set stop loss below recent lows
-            lowest_low = min(candle.low for candle in recent_candles)
+            lowest_low = float(recent_candles.low.min())
             stop_loss = lowest_low * 0.99  # Add a small buffer
             
             # Ensure stop loss is not too far from entry price (max 3%)
@@ -1246,7 +1274,7 @@ class VolatilityBreakoutStrategy(Strategy):
             return stop_loss
         else:
             # For short positions, set stop loss above recent highs
-            highest_high = max(candle.high for candle in recent_candles)
+            highest_high = float(recent_candles.high.max())
             stop_loss = highest_high * 1.01  # Add a small buffer
             
             # Ensure stop loss is not too far from entry price (max 3%)
@@ -1263,9 +1291,8 @@ class VolatilityBreakoutStrategy(Strategy):
                              candles: List[CandleData],
                              stock_config: StockConfig) -> float:
         """Calculate take profit price based on ATR and recent volatility"""
-        # Convert candles to DataFrame
-        df = pd.DataFrame([candle.to_dict() for candle in candles])
-        df.set_index('timestamp', inplace=True)
+        # Only the bars of the last ATR window are needed
+        df = as_bars(candles)[-15:].to_frame()
         
         # Calculate ATR
         atr = self._calculate_atr(df, 14).iloc[-1]
@@ -1300,8 +1327,7 @@ class VolatilityBreakoutStrategy(Strategy):
                 return True, "Take profit reached"
         
         # Convert candles to DataFrame
-        df = pd.DataFrame([candle.to_dict() for candle in candles[-20:]])
-        df.set_index('timestamp', inplace=True)
+        df = as_bars(candles)[-20:].to_frame()
         
         # Calculate momentum (rate of change)
         df['momentum'] = df['close'].pct_change(5) * 100
@@ -1365,9 +1391,8 @@ class GapTradingStrategy(Strategy):
         if len(candles) < 390 + consolidation_periods:  # 390 minutes in a trading day
             return signals
         
-        # Convert candles to DataFrame for easier calculation
-        df = pd.DataFrame([candle.to_dict() for candle in candles])
-        df.set_index('timestamp', inplace=True)
+        # Only the previous and the current session are needed
+        df = as_bars(candles).last_sessions(2).to_frame()
         
         # Identify the current day
         current_day = df.index[-1].date()
@@ -1526,11 +1551,11 @@ class GapTradingStrategy(Strategy):
             return current_price * 0.98 if direction == TradeDirection.LONG else current_price * 1.02
         
         # Use recent price action to determine stop loss
-        recent_candles = candles[-5:]
+        recent_candles = as_bars(candles)[-5:]
         
         if direction == TradeDirection.LONG:
             # For long positions, set stop loss below recent lows
-            lowest_low = min(candle.low for candle in recent_candles)
+            lowest_low = float(recent_candles.low.min())
             stop_loss = lowest_low * 0.99  # Add a small buffer
             
             # Ensure stop loss is not too far from entry price (max 3%)
@@ -1541,7 +1566,7 @@ class GapTradingStrategy(Strategy):
             return stop_loss
         else:
             # For short positions, set stop loss above recent highs
-            highest_high = max(candle.high for candle in recent_candles)
+            highest_high = float(recent_candles.high.max())
             stop_loss = highest_high * 1.01  # Add a small buffer
             
             # Ensure stop loss is not too far from entry price (max 3%)
@@ -1558,9 +1583,8 @@ class GapTradingStrategy(Strategy):
                              candles: List[CandleData],
                              stock_config: StockConfig) -> float:
         """Calculate take profit price based on gap fill and risk-reward ratio"""
-        # Convert candles to DataFrame
-        df = pd.DataFrame([candle.to_dict() for candle in candles])
-        df.set_index('timestamp', inplace=True)
+        # Only the previous and the current session are needed
+        df = as_bars(candles).last_sessions(2).to_frame()
         
         # Identify the current day
         current_day = df.index[-1].date()
@@ -1622,8 +1646,7 @@ class GapTradingStrategy(Strategy):
                 return True, "Take profit reached"
         
         # Convert candles to DataFrame
-        df = pd.DataFrame([candle.to_dict() for candle in candles[-20:]])
-        df.set_index('timestamp', inplace=True)
+        df = as_bars(candles)[-20:].to_frame()
         
         # Calculate momentum (rate of change)
         df['momentum'] = df['close'].pct_change(5) * 100
@@ -1683,6 +1706,7 @@ class MarketAnalyzer:
         self.regime_history = []
         self.max_history = 20
     
+    @timed("regime", tracer)
     def analyze_market(self, market_data: List[CandleData], vix_data: List[CandleData],
                       sector_data: Dict[str, List[CandleData]] = None,
                       breadth_data: Dict[str, List[float]] = None,
@@ -1710,12 +1734,15 @@ class MarketAnalyzer:
                 sub_regime=""
             )
         
-        # Convert market data to DataFrame
-        market_df = pd.DataFrame([candle.to_dict() for candle in market_data])
-        market_df.set_index('timestamp', inplace=True)
+        # Convert market data to DataFrame. Only the most recent bars affect
+        # the results: ADX needs two periods plus the previous close and the
+        # regime checks look back 20 bars.
+        market_bars = as_bars(market_data)
+        window = max(2 * self.adx_period + 1, self.lookback_period, 20) + 1
+        market_df = market_bars[-window:].to_frame()
         
         # Get current VIX value
-        current_vix = vix_data[-1].close
+        current_vix = float(as_bars(vix_data).close[-1])
         
         # Calculate ADX for trend strength
         adx, plus_di, minus_di = self._calculate_adx(market_df)
@@ -1774,7 +1801,7 @@ class MarketAnalyzer:
         
         # Create market state
         market_state = MarketState(
-            timestamp=market_data[-1].timestamp,
+            timestamp=market_bars.last_timestamp(),
             regime=regime,
             vix=current_vix,
             market_adx=adx,
@@ -2229,13 +2256,14 @@ class MultiStrategySystem:
         self.logger = logging.getLogger("MultiStrategySystem")
         self.positions = {}  # Active positions by symbol
         self.historical_positions = []  # Closed positions history
-        self.candle_data = {}  # Historical candle data by symbol
-        self.market_data = []  # Market index data
-        self.vix_data = []  # VIX data
+        self.candle_data = BarStore(capacity=10000, candle_factory=CandleData)  # Historical candle data by symbol
+        self.market_data = BarBuffer(capacity=10000, candle_factory=CandleData)  # Market index data
+        self.vix_data = BarBuffer(capacity=10000, candle_factory=CandleData)  # VIX data
         self.market_state = None  # Current market state
         self.strategy_weights = config.strategy_weights.copy()  # Strategy weights
         self.signals = []  # Current active signals
         self.equity_curve = []  # Historical equity values
+        self.initial_capital = config.initial_capital
         self.current_equity = config.initial_capital
         self.peak_equity = config.initial_capital
         self.last_rebalance_time = None
@@ -2243,7 +2271,14 @@ class MultiStrategySystem:
         self.data_thread = None
         self.strategy_thread = None
         self.alert_queue = queue.Queue()
+        # Live data: the data thread writes the bar buffers and publishes
+        # immutable generations; the strategy thread evaluates one at a time
+        self.snapshots = SnapshotPublisher()
+        self.snapshot = None  # Generation pinned by the strategy thread
         self.data_source = None
+        self.backtest_mode = False
+        self.current_backtest_time = None  # Replay clock while backtesting
+        self.backtest_data_attached = False  # Bars supplied through attach_backtest_data
         self.ml_strategy_selector = MLStrategySelector({
             "ml_lookback_window": 30,
             "ml_min_training_samples": 100,
@@ -2303,9 +2338,24 @@ class MultiStrategySystem:
             })
         }
         
+        # Share one indicator engine so each bar is processed once per indicator
+        self.indicators = IndicatorEngine(capacity=10000)
+        for strategy in self.strategies.values():
+            strategy.indicators = self.indicators
+        
+        # Strategies bound to per-stock parameters, reused across ticks
+        self.strategy_registry = StrategyRegistry()
+        
+        # Runs the per-(symbol, strategy) signal generation
+        self.signal_executor = SignalExecutor(config.signal_executor, config.signal_workers)
+        
+        # Hot-path tracing is process-wide; only reconfigure it when asked to
+        if config.trace_sample_rates:
+            configure_tracing(config.trace_sample_rates, config.trace_buffer_size)
+        
         # Initialize stock data
         for stock in config.stocks:
-            self.candle_data[stock.symbol] = []
+            self.candle_data.add_symbol(stock.symbol)
             self.positions[stock.symbol] = []
         
         self.logger.info(f"Multi-Strategy System initialized with {len(config.stocks)} stocks and {len(self.strategies)} strategies")
@@ -2322,8 +2372,11 @@ class MultiStrategySystem:
             "min_regime_weight": 0.3,
             "max_signals_per_regime": 5,
             "max_sector_exposure": 0.3,
-            "max_signals_per_day": 10
+            "max_signals_per_day": 10,
+            "min_relative_volume": 0.5
         }
+        self.signal_filters = SignalFilterPipeline(config.stocks)
+        self.last_filter_report = None
         
         # Initialize adaptive position sizing parameters
         self.position_sizing_config = {
@@ -2346,6 +2399,7 @@ class MultiStrategySystem:
             return
         
         self.is_running = True
+        self.snapshots.reopen()
         self.logger.info("Starting multi-strategy trading system")
         
         # Start data fetching thread
@@ -2374,6 +2428,9 @@ class MultiStrategySystem:
         self.is_running = False
         self.logger.info("Stopping trading system")
         
+        # Wake the strategy worker if it is waiting for data
+        self.snapshots.close()
+        
         # Wait for threads to finish
         if self.data_thread:
             self.data_thread.join(timeout=5)
@@ -2382,6 +2439,8 @@ class MultiStrategySystem:
         if self.alert_thread:
             self.alert_thread.join(timeout=5)
         
+        self.signal_executor.close()
+        
         self.logger.info("Trading system stopped")
     
     def _initialize_data_source(self):
@@ -2399,129 +2458,145 @@ class MultiStrategySystem:
             self.logger.warning(f"Unsupported data source: {self.config.data_source}")
             self.data_source = None
     
-    def _fetch_market_data(self):
-        """Fetch market index and VIX data"""
-        try:
-            if not self.data_source:
-                raise ValueError("No data source initialized")
-            
-            # Fetch S&P 500 data
-            sp500_df = self.data_source.get_market_index_data(
-                index_symbol="^GSPC", 
-                period="5d",  # Get last 5 days
-                interval="1m"  # 1-minute data
-            )
-            
-            if not sp500_df.empty:
-                # Convert to candle data objects
-                market_candles = self.data_source.convert_to_candle_data(sp500_df)
-                
-                # Update market data with most recent data
-                if market_candles:
-                    # If we already have data, only add new candles
-                    if self.market_data:
-                        last_timestamp = self.market_data[-1].timestamp
-                        new_candles = [c for c in market_candles if c.timestamp > last_timestamp]
-                        
-                        if new_candles:
-                            self.market_data.extend(new_candles)
-                            self.logger.info(f"Added {len(new_candles)} new market candles")
-                    else:
-                        # Initialize with all candles
-                        self.market_data = market_candles
-                        self.logger.info(f"Initialized market data with {len(market_candles)} candles")
-                    
-                    # Keep only recent data
-                    if len(self.market_data) > 10000:
-                        self.market_data = self.market_data[-10000:]
-            
-            # Fetch VIX data
-            vix_df = self.data_source.get_vix_data(
-                period="5d",  # Get last 5 days
-                interval="1m"  # 1-minute data
-            )
-            
-            if not vix_df.empty:
-                # Convert to candle data objects
-                vix_candles = self.data_source.convert_to_candle_data(vix_df)
-                
-                # Update VIX data with most recent data
-                if vix_candles:
-                    # If we already have data, only add new candles
-                    if self.vix_data:
-                        last_timestamp = self.vix_data[-1].timestamp
-                        new_candles = [c for c in vix_candles if c.timestamp > last_timestamp]
-                        
-                        if new_candles:
-                            self.vix_data.extend(new_candles)
-                            self.logger.info(f"Added {len(new_candles)} new VIX candles")
-                    else:
-                        # Initialize with all candles
-                        self.vix_data = vix_candles
-                        self.logger.info(f"Initialized VIX data with {len(vix_candles)} candles")
-                    
-                    # Keep only recent data
-                    if len(self.vix_data) > 10000:
-                        self.vix_data = self.vix_data[-10000:]
-                
-        except Exception as e:
-            self.logger.error(f"Error fetching market data: {str(e)}")
-            time.sleep(120)  # Wait longer on error
-    
-    def _fetch_stock_data(self, symbol: str):
-        """Fetch historical and real-time data for a stock"""
-        try:
-            if not self.data_source:
-                raise ValueError("No data source initialized")
-            
-            # Fetch most recent data for the stock
-            stock_df = self.data_source.get_latest_data(
-                symbol=symbol,
-                lookback_days=self.config.data_lookback_days
-            )
-            
-            if not stock_df.empty:
-                # Convert to candle data objects
-                stock_candles = self.data_source.convert_to_candle_data(stock_df)
-                
-                # Update stock data with most recent data
-                if stock_candles:
-                    # If we already have data, only add new candles
-                    if self.candle_data[symbol]:
-                        last_timestamp = self.candle_data[symbol][-1].timestamp
-                        new_candles = [c for c in stock_candles if c.timestamp > last_timestamp]
-                        
-                        if new_candles:
-                            self.candle_data[symbol].extend(new_candles)
-                            self.logger.info(f"Added {len(new_candles)} new candles for {symbol}")
-                    else:
-                        # Initialize with all candles
-                        self.candle_data[symbol] = stock_candles
-                        self.logger.info(f"Initialized {symbol} data with {len(stock_candles)} candles")
-                    
-                    # Keep only recent data
-                    if len(self.candle_data[symbol]) > 10000:
-                        self.candle_data[symbol] = self.candle_data[symbol][-10000:]
+    def _download_index_candles(self, request, stream: str) -> List[CandleData]:
+        """Download the last 5 days of 1-minute S&P 500 or VIX bars
+        
+        Args:
+            request (callable): Rate-limited request helper of the fetcher
+            stream (str): MARKET_STREAM or VIX_STREAM
             
-            # If we don't have enough data, fetch more history
-            if len(self.candle_data[symbol]) < 100:  # Arbitrary threshold
-                self.logger.info(f"Not enough data for {symbol}, fetching more history")
-                
-                history_df = self.data_source.get_historical_data(
-                    symbol=symbol,
-                    period="1mo",  # 1 month of data
-                    interval="1m"  # 1-minute data
-                )
-                
-                if not history_df.empty:
-                    history_candles = self.data_source.convert_to_candle_data(history_df)
-                    
-                    # Replace existing data
-                    self.candle_data[symbol] = history_candles
-                    self.logger.info(f"Replaced {symbol} data with {len(history_candles)} historical candles")
-                    
-        except Exception as e:
-            self.logger.error(f"Error fetching data for {symbol}: {str(e)}")
+        Returns:
+            List[CandleData]: Downloaded candles
+        """
+        if stream == MARKET_STREAM:
+            df = request(self.data_source.get_market_index_data, index_symbol="^GSPC", period="5d", interval="1m")
+        else:
+            df = request(self.data_source.get_vix_data, period="5d", interval="1m")
+        
+        return self.data_source.convert_to_candle_data(df) if not df.empty else []
+    
+    def _download_stock_candles(self, request, symbol: str) -> Tuple[List[CandleData], bool]:
+        """Download the bars a stock is missing
+        
+        Only reads the current candles; the result is applied later by
+        _apply_stock_candles so that a refresh is applied all at once.
+        
+        Args:
+            request (callable): Rate-limited request helper of the fetcher
+            symbol (str): Stock symbol
+            
+        Returns:
+            Tuple[List[CandleData], bool]: Candles and whether they replace
+            the existing data (otherwise they are appended)
+        """
+        stock_df = request(self.data_source.get_latest_data, symbol=symbol,
+                           lookback_days=self.config.data_lookback_days)
+        stock_candles = self.data_source.convert_to_candle_data(stock_df) if not stock_df.empty else []
+        
+        # If we already have data, only add new candles
+        existing = self.candle_data[symbol]
+        if existing:
+            last_timestamp = existing.last_timestamp()
+            candles = [c for c in stock_candles if c.timestamp > last_timestamp]
+            replace = False
+            available = len(existing) + len(candles)
+        else:
+            candles = stock_candles
+            replace = bool(stock_candles)
+            available = len(stock_candles)
+        
+        # If we don't have enough data, fetch more history
+        if available < 100:  # Arbitrary threshold
+            self.logger.info(f"Not enough data for {symbol}, fetching more history")
+            history_df = request(self.data_source.get_historical_data, symbol=symbol,
+                                 period="1mo", interval="1m")
+            if not history_df.empty:
+                return self.data_source.convert_to_candle_data(history_df), True
+        
+        return candles, replace
+    
+    def _apply_index_candles(self, buffer: BarBuffer, candles: List[CandleData], name: str):
+        """Add downloaded market index or VIX candles newer than the buffer's last bar"""
+        if not candles:
+            return
+        
+        if buffer:
+            last_timestamp = buffer.last_timestamp()
+            new_candles = [c for c in candles if c.timestamp > last_timestamp]
+            if new_candles:
+                buffer.extend(new_candles)
+                self.logger.info(f"Added {len(new_candles)} new {name} candles")
+        else:
+            # Initialize with all candles
+            buffer.replace(candles)
+            self.logger.info(f"Initialized {name} data with {len(candles)} candles")
+    
+    def _apply_stock_candles(self, symbol: str, candles: List[CandleData], replace: bool):
+        """Store downloaded stock candles and advance its indicators"""
+        if replace:
+            self.candle_data[symbol] = candles
+            self.logger.info(f"Replaced {symbol} data with {len(candles)} candles")
+        elif candles:
+            self.candle_data[symbol].extend(candles)
+            self.logger.info(f"Added {len(candles)} new candles for {symbol}")
+        
+        # Advance streaming indicators so strategies only read cached values
+        self.indicators.update(symbol, self.candle_data[symbol])
+    
+    @timed("data", tracer)
+    def _refresh_data(self, fetcher: ConcurrentFetcher):
+        """Fetch the market index, VIX and every stock concurrently
+        
+        Downloads run on the fetcher's pool without touching shared state.
+        The results are then applied to the bar buffers and published as a
+        new snapshot generation, so the strategy worker sees either the
+        previous refresh or this one, never a mix. Symbols that failed or
+        missed the deadline keep their previous data and are listed as stale
+        in the snapshot until a later refresh succeeds.
+        
+        Args:
+            fetcher (ConcurrentFetcher): Fetcher to run the downloads on
+        """
+        if not self.data_source:
+            raise ValueError("No data source initialized")
+        
+        tasks = {
+            MARKET_STREAM: lambda request: self._download_index_candles(request, MARKET_STREAM),
+            VIX_STREAM: lambda request: self._download_index_candles(request, VIX_STREAM)
+        }
+        for symbol in self.candle_data.keys():
+            tasks[symbol] = lambda request, symbol=symbol: self._download_stock_candles(request, symbol)
+        
+        refresh = fetcher.run(tasks, provider=self.config.data_source.upper(),
+                              timeout=self.config.data_fetch_timeout)
+        for key, error in refresh.errors.items():
+            self.logger.error(f"Error fetching data for {key}: {error}")
+        
+        self._apply_index_candles(self.market_data, refresh.results.get(MARKET_STREAM), "market")
+        self._apply_index_candles(self.vix_data, refresh.results.get(VIX_STREAM), "VIX")
+        
+        # Market state of this generation (the previous one if it cannot be computed)
+        market_state = self.snapshots.current.market_state if self.snapshots.current else None
+        if len(self.market_data) > 0 and len(self.vix_data) > 0:
+            market_state = self.market_analyzer.analyze_market(self.market_data, self.vix_data)
+            self.logger.info(f"Market regime: {market_state.regime.value}, ADX: {market_state.market_adx:.1f}, VIX: {market_state.vix:.1f}")
+        
+        for symbol in self.candle_data.keys():
+            if symbol in refresh.results:
+                try:
+                    self._apply_stock_candles(symbol, *refresh.results[symbol])
+                except Exception as e:
+                    self.logger.error(f"Error updating data for {symbol}: {str(e)}")
+                    refresh.errors[symbol] = str(e)
+        
+        stale_symbols = refresh.missing - {MARKET_STREAM, VIX_STREAM}
+        if stale_symbols:
+            self.logger.warning(f"Stale data for {len(stale_symbols)} symbols: {sorted(stale_symbols)}")
+        
+        snapshot = self.snapshots.publish(self.candle_data, self.market_data, self.vix_data,
+                                          market_state, stale_symbols)
+        
+        self.logger.info(f"Data refresh {snapshot.version} took {refresh.duration:.1f}s")
     
     def _data_worker(self):
         """Worker function to fetch and process data"""
@@ -2530,137 +2605,109 @@ class MultiStrategySystem:
         # Initialize data source
         self._initialize_data_source()
         
-        while self.is_running:
-            try:
-                # Fetch market data (S&P 500 and VIX)
-                self._fetch_market_data()
-                
-                # Update market state
-                if len(self.market_data) > 0 and len(self.vix_data) > 0:
-                    self.market_state = self.market_analyzer.analyze_market(self.market_data, self.vix_data)
-                    self.logger.info(f"Market regime: {self.market_state.regime.value}, ADX: {self.market_state.market_adx:.1f}, VIX: {self.market_state.vix:.1f}")
-                
-                # Fetch stock data for all symbols
-                for symbol in self.candle_data.keys():
-                    self._fetch_stock_data(symbol)
-                
-                # Sleep to avoid overwhelming data sources
-                time.sleep(60)  # Update data every minute
-                
-            except Exception as e:
-                self.logger.error(f"Error in data worker: {str(e)}")
-                time.sleep(120)  # Wait longer on error
+        fetcher = ConcurrentFetcher(
+            max_workers=self.config.data_fetch_workers,
+            rate_limits={self.config.data_source.upper(): self.config.data_requests_per_second}
+        )
+        try:
+            while self.is_running:
+                started = time.monotonic()
+                try:
+                    self._refresh_data(fetcher)
+                    
+                    # Refresh on a fixed cadence, however long the fetch took
+                    time.sleep(max(0.0, self.config.data_refresh_seconds - (time.monotonic() - started)))
+                    
+                except Exception as e:
+                    dump_recent(self.logger, "data worker error")
+                    self.logger.error(f"Error in data worker: {str(e)}")
+                    time.sleep(120)  # Wait longer on error
+        finally:
+            fetcher.close()
     
     def _strategy_worker(self):
         """Worker function to execute trading strategies"""
         self.logger.info("Strategy worker started")
         
+        seen_version = 0
         while self.is_running:
             try:
+                # Run once per data refresh, on a pinned generation
+                snapshot = self.snapshots.wait_for(seen_version, timeout=5)
+                if snapshot is None:
+                    continue
+                seen_version = snapshot.version
+                self.snapshot = snapshot
+                self.market_state = snapshot.market_state
+                
                 # Skip if market state is unknown
                 if not self.market_state or self.market_state.regime == MarketRegime.UNKNOWN:
-                    time.sleep(5)
                     continue
                 
-                # Update strategy weights based on market regime
-                self._update_strategy_weights()
-                
-                # Clear old signals
-                self.signals = []
-                
-                # Generate signals for each stock
-                for stock_config in self.config.stocks:
-                    symbol = stock_config.symbol
-                    
-                    # Skip if not enough data
-                    if len(self.candle_data[symbol]) < 20:
-                        continue
-                    
-                    # Debug log for market state
-                    self.logger.info(f"Current market state: {self.market_state}")
-                    
-                    # Debug log for candle data
-                    self.logger.info(f"Generating signals for {symbol} with {len(self.candle_data[symbol])} candles")
-                    if len(self.candle_data[symbol]) > 0:
-                        latest_candle = self.candle_data[symbol][-1]
-                        self.logger.info(f"Latest candle for {symbol}: {latest_candle.timestamp}, Open: {latest_candle.open}, Close: {latest_candle.close}")
-                    
-                    # Debug log for number of candles being processed
-                    self.logger.info(f"Processing {symbol} with {len(self.candle_data[symbol])} candles at {dt.datetime.now()}")
-                    
-                    # Generate signals from each strategy
-                    for name, strategy in self.strategies.items():
-                        try:
-                            # Apply stock-specific strategy parameters if available
-                            if name == "MeanReversion" and hasattr(stock_config, "mean_reversion_params"):
-                                # Create a copy of the original strategy
-                                strategy_copy = copy.deepcopy(strategy)
-                                # Update strategy parameters with stock-specific ones
-                                strategy_copy.config.update(stock_config.mean_reversion_params)
-                                strategy_to_use = strategy_copy
-                            elif name == "TrendFollowing" and hasattr(stock_config, "trend_following_params"):
-                                strategy_copy = copy.deepcopy(strategy)
-                                strategy_copy.config.update(stock_config.trend_following_params)
-                                strategy_to_use = strategy_copy
-                            elif name == "VolatilityBreakout" and hasattr(stock_config, "volatility_breakout_params"):
-                                strategy_copy = copy.deepcopy(strategy)
-                                strategy_copy.config.update(stock_config.volatility_breakout_params)
-                                strategy_to_use = strategy_copy
-                            elif name == "GapTrading" and hasattr(stock_config, "gap_trading_params"):
-                                strategy_copy = copy.deepcopy(strategy)
-                                strategy_copy.config.update(stock_config.gap_trading_params)
-                                strategy_to_use = strategy_copy
-                            else:
-                                strategy_to_use = strategy
-                            
-                            # Generate signals
-                            new_signals = strategy_to_use.generate_signals(
-                                symbol=symbol,
-                                candles=self.candle_data[symbol],
-                                stock_config=stock_config,
-                                market_state=self.market_state
-                            )
-                            
-                            # Ensure new_signals is a list, not None
-                            if new_signals is None:
-                                new_signals = []
-                            
-                            # Log signal generation results
-                            self.logger.info(f"Strategy {name} for {symbol} generated {len(new_signals)} signals")
-                            
-                            if new_signals:  # Check if signals were returned
-                                # Add strategy weight to signal metadata
-                                for signal in new_signals:
-                                    signal.metadata["strategy_weight"] = self.strategy_weights.get(name, 0.25)
-                                
-                                # Add to signals list
-                                self.signals.extend(new_signals)
-                        except Exception as e:
-                            self.logger.error(f"Error generating signals for {symbol} with strategy {name}: {str(e)}")
-                            self.logger.error(traceback.format_exc())
-                
-                # Manage active positions
-                self._manage_positions()
-                
-                # Check for new entry opportunities
-                self._check_entries()
-                
-                # Update equity curve
-                self._update_equity()
-                
-                # Rebalance if needed
-                now = dt.datetime.now()
-                if (not self.last_rebalance_time or 
-                    now - self.last_rebalance_time > self.config.rebalance_interval):
-                    self._rebalance_portfolio()
-                    self.last_rebalance_time = now
-                
-                # Sleep to avoid excessive CPU usage
-                time.sleep(5)
+                self._run_strategy_cycle()
                 
             except Exception as e:
+                dump_recent(self.logger, "strategy worker error")
                 self.logger.error(f"Error in strategy worker: {str(e)}")
                 time.sleep(30)  # Wait longer on error
+        
+        # Later backtests read the bar store again
+        self.snapshot = None
+    
+    def _bars(self, symbol: str):
+        """Bars strategies evaluate: the pinned snapshot when trading live, the bar store otherwise"""
+        if self.snapshot is not None:
+            return self.snapshot.bars(symbol)
+        return self.candle_data[symbol]
+    
+    def _run_strategy_cycle(self):
+        """Generate signals on the pinned snapshot and act on them"""
+        # Update strategy weights based on market regime
+        self._update_strategy_weights()
+        
+        # Clear old signals
+        self.signals = []
+        
+        # Generate signals for each stock
+        jobs = []
+        for stock_config in self.config.stocks:
+            symbol = stock_config.symbol
+            candles = self._bars(symbol)
+            
+            # Skip if not enough data, or if the last refresh missed it
+            if len(candles) < 20 or symbol in self.snapshot.stale_symbols:
+                continue
+            
+            # Trace market state and candle data
+            tracer.event(lambda: f"Current market state: {self.market_state}")
+            tracer.event(lambda: f"Generating signals for {symbol} with {len(candles)} candles")
+            tracer.event(lambda: f"Latest candle for {symbol}: {candles[-1].timestamp}, Open: {candles[-1].open}, Close: {candles[-1].close}")
+            
+            # Queue signal generation for each strategy
+            for name, strategy in self.strategies.items():
+                # Apply stock-specific strategy parameters if available
+                strategy_to_use = self.strategy_registry.bind(name, strategy, stock_config)
+                jobs.append(SignalJob(symbol, name, strategy_to_use, candles, stock_config))
+        
+        # Generate signals, merged in symbol/strategy order
+        for signals in self._evaluate_signals(jobs).values():
+            self.signals.extend(signals)
+        
+        # Manage active positions
+        self._manage_positions()
+        
+        # Check for new entry opportunities
+        self._check_entries()
+        
+        # Update equity curve
+        self._update_equity()
+        
+        # Rebalance if needed
+        now = dt.datetime.now()
+        if (not self.last_rebalance_time or 
+            now - self.last_rebalance_time > self.config.rebalance_interval):
+            self._rebalance_portfolio()
+            self.last_rebalance_time = now
     
     def _alert_worker(self):
         """Worker function to handle alerts"""
@@ -2698,65 +2745,17 @@ class MultiStrategySystem:
             except Exception as e:
                 self.logger.error(f"Error in alert worker: {str(e)}")
     
+    @timed("filter", tracer)
     def _filter_signals(self, signals: List[Signal]) -> List[Signal]:
         """Apply enhanced quality filters to signals"""
         if not signals:
             return []
-            
-        filtered_signals = []
-        signals_by_sector = {}
-        signals_today = 0
         
-        # Sort signals by score (descending)
-        sorted_signals = sorted(signals, key=lambda s: getattr(s, 'score', 0.5), reverse=True)
-        
-        for signal in sorted_signals:
-            try:
-                # Skip if we've reached the daily signal limit
-                if signals_today >= self.signal_quality_filters["max_signals_per_day"]:
-                    self.logger.info(f"Daily signal limit reached, skipping {signal.symbol}")
-                    continue
-                
-                # Basic price filter
-                if signal.entry_price < self.signal_quality_filters["min_price"]:
-                    self.logger.info(f"Signal for {signal.symbol} rejected: price {signal.entry_price} below minimum")
-                    continue
-                
-                # Check volume if data is available
-                if signal.symbol in self.candle_data and len(self.candle_data[signal.symbol]) > 0:
-                    volume_data = [candle.volume for candle in self.candle_data[signal.symbol][-20:]]
-                    if volume_data:
-                        current_volume = volume_data[-1]
-                        avg_volume = sum(volume_data) / len(volume_data)
-                        
-                        if avg_volume > 0 and current_volume < avg_volume * 0.5:
-                            self.logger.info(f"Signal for {signal.symbol} rejected: volume {current_volume} below threshold")
-                            continue
-                
-                # Check sector exposure
-                sector = "Unknown"
-                for stock in self.config.stocks:
-                    if stock.symbol == signal.symbol:
-                        sector = stock.sector
-                        break
-                
-                if sector not in signals_by_sector:
-                    signals_by_sector[sector] = 0
-                
-                max_sector_signals = int(self.signal_quality_filters["max_sector_exposure"] * self.signal_quality_filters["max_signals_per_day"])
-                if signals_by_sector[sector] >= max_sector_signals:
-                    self.logger.info(f"Signal for {signal.symbol} rejected: sector {sector} exposure limit reached")
-                    continue
-                
-                # Signal passed all filters
-                filtered_signals.append(signal)
-                signals_by_sector[sector] = signals_by_sector.get(sector, 0) + 1
-                signals_today += 1
-                
-                self.logger.info(f"Signal for {signal.symbol} accepted")
-                
-            except Exception as e:
-                self.logger.error(f"Error filtering signal for {signal.symbol}: {str(e)}")
+        # A "filter_stages" entry in signal_quality_filters overrides the stage order
+        self.signal_filters.set_stocks(self.config.stocks)
+        filtered_signals, report = self.signal_filters.run(signals, self.signal_quality_filters, bars=self._bars)
+        self.last_filter_report = report
+        self.logger.info(report.summary())
         
         return filtered_signals
     
@@ -2804,10 +2803,11 @@ class MultiStrategySystem:
         # Clear expired signals
         self.signals = [s for s in self.signals if s.expiration >= dt.datetime.now()]
         
-        # Debug log for market state
-        self.logger.info(f"Current market state: {self.market_state}")
+        # Trace market state
+        tracer.event(lambda: f"Current market state: {self.market_state}")
         
         # Generate signals for each stock
+        jobs = []
         for stock_config in self.config.stocks:
             symbol = stock_config.symbol
             
@@ -2815,66 +2815,55 @@ class MultiStrategySystem:
             if len(self.candle_data[symbol]) < 20:
                 continue
             
-            # Debug log for candle data
-            self.logger.info(f"Generating signals for {symbol} with {len(self.candle_data[symbol])} candles")
-            if len(self.candle_data[symbol]) > 0:
-                latest_candle = self.candle_data[symbol][-1]
-                self.logger.info(f"Latest candle for {symbol}: {latest_candle.timestamp}, Open: {latest_candle.open}, Close: {latest_candle.close}")
-            
-            # Debug log for number of candles being processed
-            self.logger.info(f"Processing {symbol} with {len(self.candle_data[symbol])} candles at {dt.datetime.now()}")
+            # Trace candle data
+            tracer.event(lambda: f"Generating signals for {symbol} with {len(self.candle_data[symbol])} candles")
+            tracer.event(lambda: f"Latest candle for {symbol}: {self.candle_data[symbol][-1].timestamp}, Open: {self.candle_data[symbol][-1].open}, Close: {self.candle_data[symbol][-1].close}")
             
-            # Generate signals from each strategy
+            # Queue signal generation for each strategy
             for name, strategy in self.strategies.items():
-                try:
-                    # Apply stock-specific strategy parameters if available
-                    if name == "MeanReversion" and hasattr(stock_config, "mean_reversion_params"):
-                        # Create a copy of the original strategy
-                        strategy_copy = copy.deepcopy(strategy)
-                        # Update strategy parameters with stock-specific ones
-                        strategy_copy.config.update(stock_config.mean_reversion_params)
-                        strategy_to_use = strategy_copy
-                    elif name == "TrendFollowing" and hasattr(stock_config, "trend_following_params"):
-                        strategy_copy = copy.deepcopy(strategy)
-                        strategy_copy.config.update(stock_config.trend_following_params)
-                        strategy_to_use = strategy_copy
-                    elif name == "VolatilityBreakout" and hasattr(stock_config, "volatility_breakout_params"):
-                        strategy_copy = copy.deepcopy(strategy)
-                        strategy_copy.config.update(stock_config.volatility_breakout_params)
-                        strategy_to_use = strategy_copy
-                    elif name == "GapTrading" and hasattr(stock_config, "gap_trading_params"):
-                        strategy_copy = copy.deepcopy(strategy)
-                        strategy_copy.config.update(stock_config.gap_trading_params)
-                        strategy_to_use = strategy_copy
-                    else:
-                        strategy_to_use = strategy
-                            
-                    # Generate signals
-                    new_signals = strategy_to_use.generate_signals(
-                        symbol=symbol,
-                        candles=self.candle_data[symbol],
-                        stock_config=stock_config,
-                        market_state=self.market_state
-                    )
-                    
-                    # Ensure new_signals is a list, not None
-                    if new_signals is None:
-                        new_signals = []
-                    
-                    # Log signal generation results
-                    self.logger.info(f"Strategy {name} for {symbol} generated {len(new_signals)} signals")
-                    
-                    if new_signals:  # Check if signals were returned
-                        # Add strategy weight to signal metadata
-                        for signal in new_signals:
-                            signal.metadata["strategy_weight"] = self.strategy_weights.get(name, 0.25)
-                        
-                        # Add to signals list
-                        self.signals.extend(new_signals)
-                except Exception as e:
-                    self.logger.error(f"Error generating signals for {symbol} with strategy {name}: {str(e)}")
-                    self.logger.error(traceback.format_exc())
+                # Apply stock-specific strategy parameters if available
+                strategy_to_use = self.strategy_registry.bind(name, strategy, stock_config)
+                jobs.append(SignalJob(symbol, name, strategy_to_use, self.candle_data[symbol], stock_config))
+        
+        # Generate signals, merged in symbol/strategy order
+        for signals in self._evaluate_signals(jobs).values():
+            self.signals.extend(signals)
+    
+    @timed("signal", tracer)
+    def _evaluate_signals(self, jobs: List[SignalJob],
+                          expiration: Optional[dt.datetime] = None) -> Dict[str, List[Signal]]:
+        """Run the queued generate_signals calls on the signal executor
+        
+        Args:
+            jobs (List[SignalJob]): Calls in symbol/strategy order
+            expiration (datetime): Expiration to set on every signal (backtests)
+            
+        Returns:
+            Dict[str, List[Signal]]: Signals by symbol, in job order
+        """
+        merged = {}
+        for result in self.signal_executor.run(jobs, self.market_state):
+            symbol_signals = merged.setdefault(result.symbol, [])
+            if result.error is not None:
+                dump_recent(self.logger, f"error in {result.name} for {result.symbol}")
+                self.logger.error(f"Error generating signals for {result.symbol} with strategy {result.name}: {result.error}")
+                self.logger.error(result.traceback)
+                continue
+            
+            # Trace signal generation results
+            tracer.event(lambda: f"Strategy {result.name} for {result.symbol} generated {len(result.signals)} signals")
+            
+            # Add strategy weight to signal metadata
+            for signal in result.signals:
+                signal.metadata["strategy_weight"] = self.strategy_weights.get(result.name, 0.25)
+                if expiration is not None:
+                    signal.expiration = expiration
+            
+            symbol_signals.extend(result.signals)
+        
+        return merged
     
+    @timed("execution", tracer)
     def _manage_positions(self):
         """Manage all active positions"""
         if not self.market_state:
@@ -2882,8 +2871,10 @@ class MultiStrategySystem:
         
         # Iterate through all active positions
         for symbol, positions in self.positions.items():
+            candles = self._bars(symbol)
+            
             # Skip if no positions or not enough data
-            if not positions or len(self.candle_data[symbol]) < 5:
+            if not positions or len(candles) < 5:
                 continue
             
             for position in positions:
@@ -2891,7 +2882,7 @@ class MultiStrategySystem:
                     continue
                 
                 # Update current price and unrealized P&L
-                current_price = self.candle_data[symbol][-1].close
+                current_price = candles[-1].close
                 
                 # Calculate unrealized P&L
                 if position.direction == TradeDirection.LONG:
@@ -2907,7 +2898,7 @@ class MultiStrategySystem:
                 # Check if position should be exited
                 should_exit, reason = strategy.should_exit_position(
                     position=position,
-                    candles=self.candle_data[symbol],
+                    candles=candles,
                     market_state=self.market_state
                 )
                 
@@ -2915,6 +2906,7 @@ class MultiStrategySystem:
                     # Exit position
                     self._exit_position(position, current_price, reason)
     
+    @timed("execution", tracer)
     def _check_entries(self):
         """Check for new entry opportunities"""
         if not self.market_state:
@@ -2927,7 +2919,7 @@ class MultiStrategySystem:
             return
         
         # Log the number of signals being processed
-        self.logger.info(f"Processing {len(self.signals)} signals in _check_entries")
+        tracer.event(lambda: f"Processing {len(self.signals)} signals in _check_entries")
         
         # Sort signals by strength and strategy weight
         scored_signals = []
@@ -2941,7 +2933,7 @@ class MultiStrategySystem:
             # Skip signals where we already have max positions for that symbol
             symbol_positions = len([p for p in self.positions[signal.symbol] if p.is_active])
             if symbol_positions >= self.config.max_positions_per_symbol:
-                self.logger.info(f"Max positions reached for {signal.symbol}: {symbol_positions}/{self.config.max_positions_per_symbol}")
+                tracer.event(lambda: f"Max positions reached for {signal.symbol}: {symbol_positions}/{self.config.max_positions_per_symbol}")
                 continue
             
             # Score based on signal strength and strategy weight
@@ -2949,7 +2941,7 @@ class MultiStrategySystem:
             strategy_weight = signal.metadata.get("strategy_weight", 0.25)
             score = strength_value * strategy_weight
             
-            self.logger.info(f"Scored signal for {signal.symbol}: Direction={signal.direction}, Strength={strength_value}, Weight={strategy_weight}, Score={score}")
+            tracer.event(lambda: f"Scored signal for {signal.symbol}: Direction={signal.direction}, Strength={strength_value}, Weight={strategy_weight}, Score={score}")
             scored_signals.append((signal, score))
         
         # Sort signals by score (descending)
@@ -3037,7 +3029,7 @@ class MultiStrategySystem:
             stop_loss=signal.stop_loss,
             take_profit=signal.take_profit,
             position_size=position_size,
-            entry_time=dt.datetime.now(),
+            entry_time=self.current_backtest_time or dt.datetime.now(),
             is_active=True,
             strategy=signal.strategy,
             current_price=signal.entry_price,
@@ -3077,7 +3069,7 @@ class MultiStrategySystem:
         # Mark position as inactive
         position.is_active = False
         position.exit_price = exit_price
-        position.exit_time = dt.datetime.now()
+        position.exit_time = self.current_backtest_time or dt.datetime.now()
         
         # Calculate realized P&L
         if position.direction == TradeDirection.LONG:
@@ -3202,11 +3194,9 @@ class MultiStrategySystem:
         self.positions = {symbol: [] for symbol in self.candle_data.keys()}
         self.historical_positions = []
         
-        # Generate synthetic data for backtesting
-        self._generate_backtest_data(start_date, end_date)
-        
-        # Process each day in the backtest period
-        current_date = start_date
+        # Generate synthetic data for backtesting unless bars were attached
+        if not self.backtest_data_attached:
+            self.load_backtest_data(start_date, end_date)
         
         # Initialize starting prices
         market_price = 4500.0
@@ -3214,139 +3204,94 @@ class MultiStrategySystem:
         stock_prices = {symbol: 100.0 + np.random.normal(0, 20) for symbol in self.candle_data.keys()}
         
         # Ensure we have at least some data
-        if current_date > end_date:
+        if start_date > end_date:
             self.logger.error("Start date is after end date")
             return
-
-        while current_date <= end_date:
+        
+        # Replay index, VIX and stock bars in timestamp order. Every stream is
+        # cut at the current timestamp, so strategies never see future bars.
+        cursor = ReplayCursor(self.backtest_streams(), start=start_date, end=end_date)
+        
+        # Process-mode signal workers read the replayed bars from shared
+        # memory instead of receiving each symbol's history with every job
+        self.signal_executor.share_bars(dict(self.candle_data.items()))
+        
+        symbol_signals = {}
+        current_date = None
+        
+        for timestamp in cursor:
             # Skip weekends
-            if current_date.weekday() >= 5:  # 5 = Saturday, 6 = Sunday
-                current_date += dt.timedelta(days=1)
+            if timestamp.weekday() >= 5:  # 5 = Saturday, 6 = Sunday
                 continue
             
-            self.logger.info(f"Backtesting {current_date}")
-            
-            # Get data for this day
-            market_data = [c for c in self.market_data if c.timestamp.date() == current_date]
-            vix_data = [c for c in self.vix_data if c.timestamp.date() == current_date]
+            if cursor.date != current_date:
+                current_date = cursor.date
+                self.logger.info(f"Backtesting {current_date}")
             
-            if not market_data or not vix_data:
-                current_date += dt.timedelta(days=1)
-                continue
+            self.current_backtest_time = timestamp
             
-            # For each time step in the day
-            # For each time step in the day
-            for i in range(len(market_data)):
-                try:
-                    # Get indices safely
-                    market_idx = self._find_index_before(self.market_data, market_data[i].timestamp)
-                    vix_idx = self._find_index_before(self.vix_data, vix_data[i].timestamp)
-                    
-                    if market_idx < 0 or vix_idx < 0:
-                        self.logger.warning(f"Skipping timestep due to missing data: {market_data[i].timestamp}")
-                        continue
-                    
-                    # Update market state
+            try:
+                # Update market state when a new index or VIX bar arrives
+                if cursor.count(MARKET_STREAM) == 0 or cursor.count(VIX_STREAM) == 0:
+                    self.logger.warning(f"Skipping timestep due to missing data: {timestamp}")
+                    continue
+                
+                if self.market_state is None or cursor.updated(MARKET_STREAM) or cursor.updated(VIX_STREAM):
                     self.market_state = self.market_analyzer.analyze_market(
-                        self.market_data[:market_idx+1],  # Include the current index
-                        self.vix_data[:vix_idx+1]  # Include the current index
+                        cursor.view(MARKET_STREAM),
+                        cursor.view(VIX_STREAM)
                     )
+                    tracer.event(lambda: f"Current market state: {self.market_state}")
+                
+                # Update strategy weights
+                self._update_strategy_weights()
+                
+                # Generate signals for stocks with a new bar at this timestamp
+                jobs = []
+                for stock_config in self.config.stocks:
+                    symbol = stock_config.symbol
                     
-                    # Update strategy weights
-                    self._update_strategy_weights()
+                    if not cursor.updated(symbol):
+                        continue
                     
-                    # Clear old signals
-                    self.signals = []
+                    candles = cursor.view(symbol)
+                    symbol_signals[symbol] = []
                     
-                    # Generate signals for each stock
-                    for stock_config in self.config.stocks:
-                        symbol = stock_config.symbol
-                        
-                        # Skip if not enough data
-                        if len(self.candle_data[symbol]) < 20:
-                            continue
-                        
-                        # Debug log for market state
-                        self.logger.info(f"Current market state: {self.market_state}")
-                        
-                        # Debug log for candle data
-                        self.logger.info(f"Generating signals for {symbol} with {len(self.candle_data[symbol])} candles")
-                        if len(self.candle_data[symbol]) > 0:
-                            latest_candle = self.candle_data[symbol][-1]
-                            self.logger.info(f"Latest candle for {symbol}: {latest_candle.timestamp}, Open: {latest_candle.open}, Close: {latest_candle.close}")
-                        
-                        # Debug log for number of candles being processed
-                        self.logger.info(f"Processing {symbol} with {len(self.candle_data[symbol])} candles at {market_data[i].timestamp}")
-                        
-                        # Generate signals from each strategy
-                        for name, strategy in self.strategies.items():
-                            try:
-                                # Apply stock-specific strategy parameters if available
-                                if name == "MeanReversion" and hasattr(stock_config, "mean_reversion_params"):
-                                    # Create a copy of the original strategy
-                                    strategy_copy = copy.deepcopy(strategy)
-                                    # Update strategy parameters with stock-specific ones
-                                    strategy_copy.config.update(stock_config.mean_reversion_params)
-                                    strategy_to_use = strategy_copy
-                                elif name == "TrendFollowing" and hasattr(stock_config, "trend_following_params"):
-                                    strategy_copy = copy.deepcopy(strategy)
-                                    strategy_copy.config.update(stock_config.trend_following_params)
-                                    strategy_to_use = strategy_copy
-                                elif name == "VolatilityBreakout" and hasattr(stock_config, "volatility_breakout_params"):
-                                    strategy_copy = copy.deepcopy(strategy)
-                                    strategy_copy.config.update(stock_config.volatility_breakout_params)
-                                    strategy_to_use = strategy_copy
-                                elif name == "GapTrading" and hasattr(stock_config, "gap_trading_params"):
-                                    strategy_copy = copy.deepcopy(strategy)
-                                    strategy_copy.config.update(stock_config.gap_trading_params)
-                                    strategy_to_use = strategy_copy
-                                else:
-                                    strategy_to_use = strategy
-                                
-                                # Generate signals
-                                new_signals = strategy_to_use.generate_signals(
-                                    symbol=symbol,
-                                    candles=self.candle_data[symbol],
-                                    stock_config=stock_config,
-                                    market_state=self.market_state
-                                )
-                                
-                                # Ensure new_signals is a list, not None
-                                if new_signals is None:
-                                    new_signals = []
-                                
-                                # Log signal generation results
-                                self.logger.info(f"Strategy {name} for {symbol} generated {len(new_signals)} signals")
-                                
-                                if new_signals:  # Check if signals were returned
-                                    # Add strategy weight to signal metadata
-                                    for signal in new_signals:
-                                        signal.metadata["strategy_weight"] = self.strategy_weights.get(name, 0.25)
-                                        # For backtesting, set the expiration date based on the current backtest timestamp
-                                        if market_data and i < len(market_data):
-                                            signal.expiration = market_data[i].timestamp + dt.timedelta(days=2)
-                                    
-                                    # Add to signals list
-                                    self.signals.extend(new_signals)
-                            except Exception as e:
-                                self.logger.error(f"Error generating signals for {symbol} with strategy {name}: {str(e)}")
-                                self.logger.error(traceback.format_exc())
+                    # Skip if not enough data
+                    if len(candles) < 20:
+                        continue
+                    
+                    # Trace candle data
+                    tracer.event(lambda: f"Generating signals for {symbol} with {len(candles)} candles")
+                    tracer.event(lambda: f"Latest candle for {symbol}: {timestamp}, Open: {candles.open[-1]}, Close: {candles.close[-1]}")
                     
-                    # Manage existing positions
+                    # Queue signal generation for each strategy
+                    for name, strategy in self.strategies.items():
+                        # Apply stock-specific strategy parameters if available
+                        strategy_to_use = self.strategy_registry.bind(name, strategy, stock_config)
+                        jobs.append(SignalJob(symbol, name, strategy_to_use, candles, stock_config))
+                
+                # Generate signals, merged in symbol/strategy order. For
+                # backtesting, signals expire relative to the backtest timestamp
+                symbol_signals.update(self._evaluate_signals(jobs, expiration=timestamp + dt.timedelta(days=2)))
+                
+                # Signals stay current until their symbol's next bar
+                self.signals = [signal for signals in symbol_signals.values() for signal in signals]
+                
+                # Manage existing positions
+                with tracer.span("execution"):
                     for symbol, positions in self.positions.items():
                         for position in positions:
                             if not position.is_active:
                                 continue
                             
                             # Get current data
-                            stock_data = self.candle_data[symbol]
-                            current_idx = self._find_index_before(stock_data, market_data[i].timestamp)
-                            
-                            if current_idx < 0:
+                            stock_data = cursor.view(symbol)
+                            if len(stock_data) == 0:
                                 continue
                             
                             # Update current price and unrealized P&L
-                            current_price = stock_data[current_idx].close
+                            current_price = float(stock_data.close[-1])
                             position.current_price = current_price
                             
                             # Calculate unrealized P&L
@@ -3363,7 +3308,7 @@ class MultiStrategySystem:
                             # Check if position should be exited
                             should_exit, reason = strategy.should_exit_position(
                                 position=position,
-                                candles=stock_data[:current_idx],
+                                candles=stock_data,
                                 market_state=self.market_state
                             )
                             
@@ -3377,57 +3322,46 @@ class MultiStrategySystem:
                                 
                                 # Add to trade history
                                 self.trade_history.append(position.to_dict())
+                
+                # Check for new entries
+                self._check_entries()
+                
+                # Update equity curve
+                portfolio_value = self.current_equity
+                for symbol, positions in self.positions.items():
+                    for position in positions:
+                        if position.is_active:
+                            portfolio_value += position.unrealized_pnl
+                
+                self.equity_curve.append((timestamp, portfolio_value))
+                drawdown = (self.peak_equity - portfolio_value) / self.peak_equity * 100 if self.peak_equity > 0 else 0
+                self.drawdown_curve.append((timestamp, drawdown))
+                
+                # Update monthly returns
+                month_key = timestamp.strftime("%Y-%m")
+                if month_key not in self.monthly_returns:
+                    self.monthly_returns[month_key] = 0
+                
+                if len(self.equity_curve) >= 2:
+                    daily_return = (portfolio_value / self.equity_curve[-2][1] - 1) * 100
+                    self.monthly_returns[month_key] += daily_return
                     
-                    # Check for new entries
-                    self._check_entries()
-                    
-                    # Update equity curve
-                    portfolio_value = self.current_equity
-                    for symbol, positions in self.positions.items():
-                        for position in positions:
-                            if position.is_active:
-                                portfolio_value += position.unrealized_pnl
-                    
-                    self.equity_curve.append((market_data[i].timestamp, portfolio_value))
-                    drawdown = (self.peak_equity - portfolio_value) / self.peak_equity * 100 if self.peak_equity > 0 else 0
-                    self.drawdown_curve.append((market_data[i].timestamp, drawdown))
-                    
-                    # Update monthly returns
-                    month_key = market_data[i].timestamp.strftime("%Y-%m")
-                    if month_key not in self.monthly_returns:
-                        self.monthly_returns[month_key] = 0
-                    
-                    if len(self.equity_curve) >= 2:
-                        daily_return = (portfolio_value / self.equity_curve[-2][1] - 1) * 100
-                        self.monthly_returns[month_key] += daily_return
-                        
-                except Exception as e:
-                    self.logger.error(f"Error processing timestep {i} at {market_data[i].timestamp}: {str(e)}")
-                    continue
-            
-            # Close any open positions at end of day
-            for symbol, positions in self.positions.items():
-                for position in positions:
-                    if position.is_active:
-                        # Get last price of the day
-                        stock_data = [c for c in self.candle_data[symbol] if c.timestamp.date() == current_date]
-                        if not stock_data:
-                            continue
-                            
-                        last_price = stock_data[-1].close
-                        
-                        # Exit position
-                        self._exit_position(position, last_price, "End of day")
-                        
-                        # Update capital
-                        self.current_equity += position.realized_pnl
-                        self.peak_equity = max(self.peak_equity, self.current_equity)
-                        
-                        # Add to trade history
-                        self.trade_history.append(position.to_dict())
+            except Exception as e:
+                dump_recent(self.logger, f"error at {timestamp}")
+                self.logger.error(f"Error processing timestep {cursor.step} at {timestamp}: {str(e)}")
             
-            # Move to next day
-            current_date += dt.timedelta(days=1)
+            finally:
+                if cursor.is_day_end:
+                    # Close any open positions at end of day
+                    self._close_positions_at_day_end(cursor)
+        
+        self.current_backtest_time = None
+        self.signal_executor.unshare_bars()
+        
+        if tracing_enabled():
+            timings = ", ".join(f"{stage}: {stats['count']} x {stats['mean_ms']:.2f} ms (max {stats['max_ms']:.1f} ms)"
+                                for stage, stats in span_report().items())
+            self.logger.info(f"Backtest stage timings - {timings}")
         
         # Calculate overall performance metrics
         total_trades = len(self.trade_history)
@@ -3492,6 +3426,73 @@ class MultiStrategySystem:
         
         return result
     
+    def backtest_streams(self) -> Dict[str, BarBuffer]:
+        """Bar buffers replayed by run_backtest: index, VIX and one per symbol"""
+        streams = {MARKET_STREAM: self.market_data, VIX_STREAM: self.vix_data}
+        streams.update(self.candle_data.items())
+        return streams
+    
+    @timed("data", tracer)
+    def load_backtest_data(self, start_date: dt.date, end_date: dt.date) -> Dict[str, BarBuffer]:
+        """Load (or generate) the bars for a backtest and keep all of them in memory
+        
+        Args:
+            start_date (date): First day of the backtest
+            end_date (date): Last day of the backtest
+            
+        Returns:
+            dict: Stream name -> BarBuffer, as returned by backtest_streams
+        """
+        # Keep the whole history in memory for the replay
+        self.candle_data.set_capacity(None)
+        self.market_data.set_capacity(None)
+        self.vix_data.set_capacity(None)
+        
+        self._generate_backtest_data(start_date, end_date)
+        return self.backtest_streams()
+    
+    def attach_backtest_data(self, columns: Dict[str, Tuple[np.ndarray, np.ndarray, Optional[dt.tzinfo]]]):
+        """Replay bars that were loaded elsewhere instead of loading them again
+        
+        The arrays are used in place (see BarBuffer.attach), so bars held in
+        shared memory are not copied into each process.
+        
+        Args:
+            columns (dict): Stream name -> (timestamps_ns, data block, tz), with
+                MARKET_STREAM and VIX_STREAM for the index and VIX bars
+        """
+        for name, (ts_ns, data, tz) in columns.items():
+            if name == MARKET_STREAM:
+                buffer = self.market_data
+            elif name == VIX_STREAM:
+                buffer = self.vix_data
+            else:
+                buffer = self.candle_data.add_symbol(name)
+            buffer.attach(ts_ns, data, tz)
+        self.backtest_data_attached = True
+    
+    def _close_positions_at_day_end(self, cursor: ReplayCursor):
+        """Close open backtest positions at the last price of the replayed day"""
+        for symbol, positions in self.positions.items():
+            for position in positions:
+                if position.is_active:
+                    # Get last price of the day
+                    stock_data = cursor.view(symbol, 1)
+                    if len(stock_data) == 0 or stock_data.last_timestamp().date() != cursor.date:
+                        continue
+                    
+                    last_price = float(stock_data.close[-1])
+                    
+                    # Exit position
+                    self._exit_position(position, last_price, "End of day")
+                    
+                    # Update capital
+                    self.current_equity += position.realized_pnl
+                    self.peak_equity = max(self.peak_equity, self.current_equity)
+                    
+                    # Add to trade history
+                    self.trade_history.append(position.to_dict())
+    
     def _generate_backtest_data(self, start_date: dt.date, end_date: dt.date):
         """Generate data for backtesting - either synthetic or from Yahoo Finance"""
         
@@ -3508,10 +3509,10 @@ class MultiStrategySystem:
         self.logger.info("Generating synthetic data for backtesting")
         
         # Clear existing data
-        self.market_data = []
-        self.vix_data = []
+        self.market_data.clear()
+        self.vix_data.clear()
         for symbol in self.candle_data.keys():
-            self.candle_data[symbol] = []
+            self.candle_data[symbol].clear()
         
         # Generate data for each day
         current_date = start_date
@@ -3733,10 +3734,10 @@ class MultiStrategySystem:
         self.logger.info(f"Fetching real market data from Yahoo Finance from {start_date} to {end_date}")
         
         # Clear existing data
-        self.market_data = []
-        self.vix_data = []
+        self.market_data.clear()
+        self.vix_data.clear()
         for symbol in self.candle_data.keys():
-            self.candle_data[symbol] = []
+            self.candle_data[symbol].clear()
         
         # Add buffer days for indicators calculation
         buffer_days = 30  # Add extra days for calculating indicators
@@ -3846,10 +3847,7 @@ class MultiStrategySystem:
         if not candles:  # Check for empty list
             return -1
             
-        for i in range(len(candles) - 1, -1, -1):
-            if candles[i].timestamp <= timestamp:
-                return i
-        return -1
+        return as_bars(candles).index_before(timestamp)
 
     def _calculate_position_size(self, signal: Signal) -> float:
         """Calculate adaptive position size based on signal strength and market conditions"""
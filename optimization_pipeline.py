@@ -27,9 +27,11 @@ from system_optimizer import (
     load_config, save_config, analyze_sharpe_ratio_factors,
     EnhancedMultiStrategySystem, run_backtest
 )
+import system_optimizer
 from ml_strategy_optimizer import optimize_ml_strategy_selector
 from signal_filter_optimizer import optimize_signal_filters
 from position_sizing_optimizer import optimize_position_sizing
+from walk_forward import WalkForward, grid_combinations, make_folds
 
 # Configure logging
 logging.basicConfig(
@@ -43,7 +45,8 @@ logging.basicConfig(
 
 logger = logging.getLogger("OptimizationPipeline")
 
-def run_optimization_pipeline(config_dict, start_date, end_date, output_file="optimized_config.yaml"):
+def run_optimization_pipeline(config_dict, start_date, end_date, output_file="optimized_config.yaml",
+                              backtest_sweep=False, max_workers=None):
     """
     Run the complete optimization pipeline
     
@@ -52,6 +55,9 @@ def run_optimization_pipeline(config_dict, start_date, end_date, output_file="op
         start_date: Start date for backtest
         end_date: End date for backtest
         output_file: Output file for optimized configuration
+        backtest_sweep: Optimize steps 2-4 with full-grid parallel backtest
+            sweeps (system_optimizer) instead of the signal-level optimizers
+        max_workers: Worker processes for backtest sweeps (CPU count by default)
         
     Returns:
         Dict: Optimized configuration dictionary
@@ -62,6 +68,42 @@ def run_optimization_pipeline(config_dict, start_date, end_date, output_file="op
     logger.info("Step 1: Analyzing Sharpe ratio factors")
     analyze_sharpe_ratio_factors(config_dict, start_date, end_date)
     
+    if backtest_sweep:
+        run_backtest_sweeps(config_dict, start_date, end_date, max_workers=max_workers)
+    else:
+        run_signal_optimizers(config_dict)
+    
+    # Step 5: Run final backtest with optimized configuration
+    logger.info("Step 5: Running final backtest with optimized configuration")
+    final_result = run_backtest(config_dict, start_date, end_date)
+    
+    if final_result:
+        logger.info("=== Final Optimization Results ===")
+        logger.info(f"Total Return: {final_result.total_return_pct:.2f}%")
+        logger.info(f"Annualized Return: {final_result.annualized_return_pct:.2f}%")
+        logger.info(f"Sharpe Ratio: {final_result.sharpe_ratio:.2f}")
+        logger.info(f"Max Drawdown: {final_result.max_drawdown_pct:.2f}%")
+        logger.info(f"Win Rate: {final_result.win_rate:.2f}%")
+        logger.info(f"Profit Factor: {final_result.profit_factor:.2f}")
+        logger.info(f"Total Trades: {final_result.total_trades}")
+    else:
+        logger.error("Final backtest failed")
+    
+    # Save optimized configuration
+    save_config(config_dict, output_file)
+    logger.info(f"Optimized configuration saved to {output_file}")
+    
+    logger.info("Trading System Optimization Pipeline completed")
+    
+    return config_dict
+
+def run_signal_optimizers(config_dict):
+    """
+    Steps 2-4 with the signal-level optimizers, updating config_dict in place
+    
+    Args:
+        config_dict: Configuration dictionary
+    """
     # Step 2: Optimize ML strategy selector
     logger.info("Step 2: Optimizing ML strategy selector")
     ml_config = optimize_ml_strategy_selector(config_dict)
@@ -91,30 +133,91 @@ def run_optimization_pipeline(config_dict, start_date, end_date, output_file="op
         logger.info("Position sizing optimization completed")
     else:
         logger.warning("Position sizing optimization failed, using original configuration")
+
+def run_backtest_sweeps(config_dict, start_date, end_date, max_workers=None):
+    """
+    Steps 2-4 with parallel backtest sweeps over the full parameter grids,
+    updating config_dict in place. Interrupted sweeps resume from their
+    results files in system_optimizer.SWEEP_RESULTS_DIR.
     
-    # Step 5: Run final backtest with optimized configuration
-    logger.info("Step 5: Running final backtest with optimized configuration")
-    final_result = run_backtest(config_dict, start_date, end_date)
+    Args:
+        config_dict: Configuration dictionary
+        start_date: Start date for backtest
+        end_date: End date for backtest
+        max_workers: Number of worker processes (CPU count by default)
+    """
+    # Step 2: Optimize ML strategy selector
+    logger.info("Step 2: Sweeping ML strategy selector parameters")
+    ml_params = system_optimizer.optimize_ml_strategy_selector(config_dict, start_date, end_date,
+                                                               max_workers=max_workers)
+    if ml_params:
+        config_dict["ml_strategy_selector"].update(ml_params)
+        logger.info("ML strategy selector optimization completed")
+    else:
+        logger.warning("ML strategy selector optimization failed, using original configuration")
     
-    if final_result:
-        logger.info("=== Final Optimization Results ===")
-        logger.info(f"Total Return: {final_result.total_return_pct:.2f}%")
-        logger.info(f"Annualized Return: {final_result.annualized_return_pct:.2f}%")
-        logger.info(f"Sharpe Ratio: {final_result.sharpe_ratio:.2f}")
-        logger.info(f"Max Drawdown: {final_result.max_drawdown_pct:.2f}%")
-        logger.info(f"Win Rate: {final_result.win_rate:.2f}%")
-        logger.info(f"Profit Factor: {final_result.profit_factor:.2f}")
-        logger.info(f"Total Trades: {final_result.total_trades}")
+    # Step 3: Optimize signal filtering
+    logger.info("Step 3: Sweeping signal filtering parameters")
+    filter_params = system_optimizer.optimize_signal_filtering(config_dict, start_date, end_date,
+                                                               max_workers=max_workers)
+    if filter_params:
+        config_dict["signal_quality_filters"].update(filter_params)
+        logger.info("Signal filtering optimization completed")
     else:
-        logger.error("Final backtest failed")
+        logger.warning("Signal filtering optimization failed, using original configuration")
     
-    # Save optimized configuration
-    save_config(config_dict, output_file)
-    logger.info(f"Optimized configuration saved to {output_file}")
+    # Step 4: Optimize position sizing
+    logger.info("Step 4: Sweeping position sizing parameters")
+    position_params = system_optimizer.optimize_position_sizing(config_dict, start_date, end_date,
+                                                                max_workers=max_workers)
+    if position_params:
+        config_dict["position_sizing_config"] = position_params
+        logger.info("Position sizing optimization completed")
+    else:
+        logger.warning("Position sizing optimization failed, using original configuration")
+
+def run_walk_forward(config_dict, start_date, end_date, train_days=180, test_days=60,
+                     anchored=False, max_workers=None, output_prefix="walk_forward"):
+    """
+    Walk-forward optimization of the signal filtering parameters. Each fold
+    picks its parameters on the training window and trades the following
+    test window with them. Completed folds are cached in walk_forward_results/,
+    so a re-run over a longer range only runs the new folds.
     
-    logger.info("Trading System Optimization Pipeline completed")
+    Args:
+        config_dict: Configuration dictionary
+        start_date: Start date of the first training window
+        end_date: End date of the last test window
+        train_days: Calendar days per training window
+        test_days: Calendar days per test window
+        anchored: Grow the training windows from start_date instead of rolling them
+        max_workers: Number of worker processes (CPU count by default)
+        output_prefix: Prefix of the fold summary and equity CSV files
+        
+    Returns:
+        WalkForwardResult: Folds and the stitched out-of-sample equity curve
+    """
+    param_grid = {
+        "min_score_threshold": [0.5, 0.6, 0.7, 0.8],
+        "max_signals_per_day": [5, 10, 20]
+    }
+    folds = make_folds(start_date, end_date, train_days, test_days, anchored=anchored)
+    if not folds:
+        logger.warning("Date range is too short for a single walk-forward fold")
+        return None
     
-    return config_dict
+    logger.info(f"Walk-forward optimization over {len(folds)} {'anchored' if anchored else 'rolling'} folds")
+    walk = WalkForward(system_optimizer.build_system,
+                       grid_combinations(config_dict, "signal_quality_filters", param_grid),
+                       max_workers=max_workers,
+                       initial_capital=config_dict.get("initial_capital", 100000))
+    result = walk.run(folds)
+    
+    result.summary().to_csv(f"{output_prefix}_folds.csv", index=False)
+    result.equity_curve.rename("equity").to_csv(f"{output_prefix}_equity.csv", index_label="timestamp")
+    logger.info(f"Walk-forward out-of-sample return: {result.total_return_pct:.2f}% "
+                f"({output_prefix}_folds.csv, {output_prefix}_equity.csv)")
+    return result
 
 def generate_performance_report(config_dict, start_date, end_date, output_file="performance_report.html"):
     """
@@ -351,6 +454,24 @@ def parse_arguments():
     parser.add_argument('--skip-position', action='store_true',
                         help='Skip position sizing optimization')
     
+    parser.add_argument('--backtest-sweep', action='store_true',
+                        help='Optimize with parallel full-grid backtest sweeps (resumable)')
+    
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Worker processes for backtest sweeps (default: CPU count)')
+    
+    parser.add_argument('--walk-forward', action='store_true',
+                        help='Run a walk-forward optimization instead of the pipeline')
+    
+    parser.add_argument('--train-days', type=int, default=180,
+                        help='Calendar days per walk-forward training window')
+    
+    parser.add_argument('--test-days', type=int, default=60,
+                        help='Calendar days per walk-forward test window')
+    
+    parser.add_argument('--anchored', action='store_true',
+                        help='Anchor the walk-forward training windows at the start date')
+    
     return parser.parse_args()
 
 def main():
@@ -380,12 +501,26 @@ def main():
             logger.error(f"Error parsing dates: {str(e)}")
             return
         
+        if args.walk_forward:
+            run_walk_forward(
+                config_dict=config_dict,
+                start_date=start_date,
+                end_date=end_date,
+                train_days=args.train_days,
+                test_days=args.test_days,
+                anchored=args.anchored,
+                max_workers=args.workers
+            )
+            return
+        
         # Run optimization pipeline
         optimized_config = run_optimization_pipeline(
             config_dict=config_dict,
             start_date=start_date,
             end_date=end_date,
-            output_file=args.output
+            output_file=args.output,
+            backtest_sweep=args.backtest_sweep,
+            max_workers=args.workers
         )
         
         # Generate performance report
@@ -1,12 +1,14 @@
 import subprocess
+import sys
 import yaml
 import json
 import os
 import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
-from datetime import datetime
+from datetime import datetime, timedelta
 import copy
+from exit_grid import ExitGrid, entries_from_trades, evaluate_exit_grid
 
 # Define market regimes for testing
 market_regimes = [
@@ -168,6 +170,55 @@ def run_optimization():
     
     return all_results
 
+# Exit rules crossed with every ATR combination in the grid mode
+trailing_settings = [None, (1.0, 1.5)]
+max_hold_periods = [5, 10, 20]
+
+# Function to load cached daily bars for the traded symbols
+def load_bars(symbols, start_date, end_date, max_hold):
+    from historical_data_store import get_data_store
+    
+    with open('alpaca_credentials.json', 'r') as file:
+        credentials = json.load(file)['paper']
+    store = get_data_store(credentials['api_key'], credentials['api_secret'])
+    
+    # Bars before the period for the entry ATR, after it for the exits
+    start = (datetime.strptime(start_date, '%Y-%m-%d') - timedelta(days=40)).strftime('%Y-%m-%d')
+    end = (datetime.strptime(end_date, '%Y-%m-%d') + timedelta(days=max_hold * 2)).strftime('%Y-%m-%d')
+    return store.get_bars(sorted(symbols), start, end)
+
+# Evaluate every ATR combination on the entries of one backtest per regime
+def run_grid_optimization():
+    grid = ExitGrid.from_combinations(atr_combinations, trailing=trailing_settings, max_hold=max_hold_periods)
+    summaries = []
+    
+    for regime in market_regimes:
+        print(f"\n===== Evaluating {len(grid)} exit rule sets for {regime['name']} =====")
+        
+        # One backtest provides the entries; exits are evaluated for the whole grid
+        output_file = f"{results_dir}/entries_{regime['name'].replace(' ', '_')}.json"
+        results = run_backtest(base_config, regime['start_date'], regime['end_date'], output_file)
+        if not results or not results.get('trade_history'):
+            print(f"No trades for {regime['name']}")
+            continue
+        
+        entries = entries_from_trades(results['trade_history'])
+        bars = load_bars(set(entries['symbol']), regime['start_date'], regime['end_date'], max(max_hold_periods))
+        summary = evaluate_exit_grid(entries, bars, grid).summary()
+        summary.insert(0, 'market_regime', regime['name'])
+        summaries.append(summary)
+        
+        best = summary.iloc[0]
+        print(f"Best: {best['name']} trailing={best['trailing_activation_atr']}/{best['trailing_distance_atr']} "
+              f"max_hold={best['max_hold']} - Total Return {best['total_return']:.2f}%, Win Rate {best['win_rate']:.2f}%")
+    
+    if not summaries:
+        return None
+    
+    all_summaries = pd.concat(summaries, ignore_index=True)
+    all_summaries.to_csv(f"{results_dir}/exit_grid_summary.csv", index=False)
+    return all_summaries
+
 # Function to analyze and visualize results
 def analyze_results(all_results):
     if not all_results:
@@ -314,8 +365,12 @@ if __name__ == "__main__":
     print(f"Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print("=" * 50)
     
-    results = run_optimization()
-    best_atr_combinations = analyze_results(results)
+    if "--grid" in sys.argv:
+        # Entries once per regime, every exit rule set in one vectorized pass
+        run_grid_optimization()
+    else:
+        results = run_optimization()
+        best_atr_combinations = analyze_results(results)
     
     print("\nOptimization complete! Results saved to:", results_dir)
     print("=" * 50)
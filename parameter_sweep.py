@@ -0,0 +1,329 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Parameter Sweep Runner
+-------------------------------------
+Runs one backtest per parameter combination on a process pool.
+
+The bars are loaded (or generated) once in the parent process and packed into
+a single shared memory block; every worker attaches to it and replays the
+same bars without copying or regenerating them. Each finished backtest is
+appended to a JSON lines results file as soon as it completes, so a sweep
+that is interrupted can be resumed: combinations already present in the file
+are skipped.
+
+Usage:
+    sweep = ParameterSweep(build_system, start_date, end_date,
+                           results_file="sweep_results/filters.jsonl")
+    records = sweep.run([(params, config_dict), ...])
+"""
+
+import datetime as dt
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from bar_store import BAR_FIELDS
+
+logger = logging.getLogger("ParameterSweep")
+
+# Metrics kept from each BacktestResult
+RESULT_METRICS = (
+    "total_return_pct", "annualized_return_pct", "sharpe_ratio", "max_drawdown_pct",
+    "win_rate", "profit_factor", "total_trades", "final_capital"
+)
+
+# Bars attached in each worker process: (shared memory block, stream columns)
+_worker_data = None
+
+
+class SharedBars:
+    """Bar streams packed into one shared memory block
+
+    The block holds, for each stream, its int64 timestamps followed by its
+    float64 (field, bar) block. ``handle`` is a small picklable description
+    that other processes pass to ``SharedBars.attach``.
+    """
+
+    def __init__(self, streams: Dict[str, Any]):
+        """Copy the streams into a new shared memory block
+
+        Args:
+            streams (dict): Stream name -> BarBuffer
+        """
+        layout = []
+        offset = 0
+        for name, buffer in streams.items():
+            count = len(buffer)
+            layout.append((name, offset, count, buffer.tz))
+            offset += count * 8 * (1 + len(BAR_FIELDS))
+
+        self.shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        self.handle = (self.shm.name, layout)
+
+        columns = self._columns(self.shm, layout)
+        for name, buffer in streams.items():
+            ts_ns, data = buffer.columns
+            columns[name][0][:] = ts_ns
+            columns[name][1][:] = data
+
+    @staticmethod
+    def _columns(shm: shared_memory.SharedMemory, layout) -> Dict[str, Tuple[np.ndarray, np.ndarray, Any]]:
+        """Array views of every stream inside the block"""
+        columns = {}
+        for name, offset, count, tz in layout:
+            ts_ns = np.ndarray((count,), dtype=np.int64, buffer=shm.buf, offset=offset)
+            data = np.ndarray((len(BAR_FIELDS), count), dtype=np.float64, buffer=shm.buf,
+                              offset=offset + count * 8)
+            columns[name] = (ts_ns, data, tz)
+        return columns
+
+    @classmethod
+    def attach(cls, handle) -> Tuple[shared_memory.SharedMemory, Dict[str, Tuple[np.ndarray, np.ndarray, Any]]]:
+        """Attach to a block created in another process
+
+        Args:
+            handle: ``SharedBars.handle`` of the creating process
+
+        Returns:
+            tuple: The shared memory block (keep it alive while the arrays
+                are in use) and stream name -> (timestamps_ns, data, tz)
+        """
+        name, layout = handle
+        shm = shared_memory.SharedMemory(name=name)
+        # The creating process owns the block: a worker with its own resource
+        # tracker (spawn/forkserver) must not unlink it when it exits. Forked
+        # workers share the parent's tracker and need no change.
+        if multiprocessing.get_start_method() != "fork":
+            resource_tracker.unregister(shm._name, "shared_memory")
+        columns = cls._columns(shm, layout)
+        for ts_ns, data, _ in columns.values():
+            ts_ns.setflags(write=False)
+            data.setflags(write=False)
+        return shm, columns
+
+    def close(self):
+        """Release and remove the block"""
+        self.shm.close()
+        self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def result_metrics(result) -> Dict[str, Any]:
+    """Summary metrics of a BacktestResult as plain JSON types"""
+    metrics = {}
+    for name in RESULT_METRICS:
+        value = getattr(result, name, None)
+        if isinstance(value, (np.integer, np.floating)):
+            value = value.item()
+        metrics[name] = value
+    return metrics
+
+
+def combination_key(config: Dict, start_date: dt.date, end_date: dt.date) -> str:
+    """Stable identifier of a backtest, used to resume a sweep"""
+    payload = json.dumps({"config": config, "start": str(start_date), "end": str(end_date)},
+                         sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def _init_worker(handle):
+    """Attach the shared bars once per worker process"""
+    global _worker_data
+    _worker_data = SharedBars.attach(handle)
+
+
+def run_backtest_on_bars(system_factory: Callable, config: Dict, start_date: dt.date,
+                         end_date: dt.date, columns=None):
+    """Run one backtest on preloaded bars
+
+    Args:
+        system_factory (callable): Config dictionary -> system
+        config (dict): Configuration of the run
+        start_date (date): Backtest start date
+        end_date (date): Backtest end date
+        columns (dict): Stream columns to replay (the bars attached to the
+            worker process if None)
+
+    Returns:
+        BacktestResult: Result of the run
+    """
+    if columns is None:
+        columns = _worker_data[1]
+    system = system_factory(config)
+    if system is None:
+        raise ValueError("system factory returned no system")
+    system.attach_backtest_data(columns)
+    result = system.run_backtest(start_date, end_date)
+    if result is None:
+        raise ValueError("backtest returned no result")
+    return result
+
+
+def _run_combination(system_factory: Callable, config: Dict, start_date: dt.date,
+                     end_date: dt.date, columns=None) -> Dict[str, Any]:
+    """Run one backtest on preloaded bars and return its metrics"""
+    return result_metrics(run_backtest_on_bars(system_factory, config, start_date, end_date, columns))
+
+
+def _safe_run_combination(system_factory: Callable, config: Dict, start_date: dt.date,
+                          end_date: dt.date, columns=None) -> Tuple[Optional[Dict], Optional[str]]:
+    """Like _run_combination but returns (metrics, error) instead of raising"""
+    try:
+        return _run_combination(system_factory, config, start_date, end_date, columns), None
+    except Exception as e:
+        return None, f"{e}\n{traceback.format_exc()}"
+
+
+class ParameterSweep:
+    """Parallel, resumable backtest sweep over parameter combinations"""
+
+    def __init__(self, system_factory: Callable, start_date: dt.date, end_date: dt.date,
+                 results_file: str, max_workers: Optional[int] = None):
+        """Initialize the sweep
+
+        Args:
+            system_factory (callable): Module-level function mapping a config
+                dictionary to a MultiStrategySystem (it must be picklable)
+            start_date (date): Backtest start date
+            end_date (date): Backtest end date
+            results_file (str): JSON lines file results are appended to
+            max_workers (int): Worker processes (CPU count by default, 1 runs
+                in the calling process)
+        """
+        self.system_factory = system_factory
+        self.start_date = start_date
+        self.end_date = end_date
+        self.results_file = results_file
+        self.max_workers = max_workers or os.cpu_count() or 1
+
+    def load_results(self) -> Dict[str, Dict]:
+        """Completed records in the results file, by combination key
+
+        Failed combinations and a partially written last line (from an
+        interrupted run) are ignored, so they are retried on resume.
+        """
+        records = {}
+        if not os.path.exists(self.results_file):
+            return records
+        with open(self.results_file, "r") as file:
+            for line in file:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if record.get("metrics") is not None:
+                    records[record["key"]] = record
+        return records
+
+    @staticmethod
+    def _end_partial_line(file):
+        """Terminate a line left unfinished by an interrupted run
+
+        Otherwise the next record would be appended to it and lost with it.
+        """
+        if file.tell() == 0:
+            return
+        file.seek(file.tell() - 1)
+        if file.read(1) != "\n":
+            file.write("\n")
+
+    def _write(self, file, record: Dict):
+        """Append one record and make sure it reaches the disk"""
+        file.write(json.dumps(record, default=str) + "\n")
+        file.flush()
+        os.fsync(file.fileno())
+
+    def run(self, combinations: List[Tuple[Dict, Dict]]) -> List[Dict]:
+        """Backtest every combination not already in the results file
+
+        All combinations replay the bars loaded for the first configuration,
+        so they should only differ in parameters that do not change the data
+        (symbols, data source).
+
+        Args:
+            combinations (list): (params, config_dict) pairs; params is what
+                gets recorded, config_dict is passed to the system factory
+
+        Returns:
+            list: Records {"key", "params", "metrics"} in the order of
+                ``combinations``, for every combination that succeeded
+        """
+        if not combinations:
+            return []
+
+        keys = [combination_key(config, self.start_date, self.end_date) for _, config in combinations]
+        done = self.load_results()
+        pending = [(key, params, config) for key, (params, config) in zip(keys, combinations)
+                   if key not in done]
+        logger.info(f"Sweep of {len(combinations)} combinations: {len(combinations) - len(pending)} "
+                    f"already in {self.results_file}, {len(pending)} to run")
+
+        if pending:
+            directory = os.path.dirname(self.results_file)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+            # Load the bars once for the whole sweep
+            system = self.system_factory(combinations[0][1])
+            streams = system.load_backtest_data(self.start_date, self.end_date)
+
+            with open(self.results_file, "a+") as file:
+                self._end_partial_line(file)
+                if self.max_workers == 1:
+                    columns = {name: (*buffer.columns, buffer.tz) for name, buffer in streams.items()}
+                    for key, params, config in pending:
+                        metrics, error = _safe_run_combination(self.system_factory, config, self.start_date,
+                                                               self.end_date, columns)
+                        done.update(self._record(file, key, params, metrics, error))
+                else:
+                    done.update(self._run_parallel(file, streams, pending))
+
+        return [done[key] for key in keys if key in done]
+
+    def _run_parallel(self, file, streams, pending) -> Dict[str, Dict]:
+        """Run pending combinations on a process pool over shared bars"""
+        completed = {}
+        with SharedBars(streams) as shared:
+            with ProcessPoolExecutor(max_workers=min(self.max_workers, len(pending)),
+                                     initializer=_init_worker, initargs=(shared.handle,)) as executor:
+                futures = {
+                    executor.submit(_safe_run_combination, self.system_factory, config,
+                                    self.start_date, self.end_date): (key, params)
+                    for key, params, config in pending
+                }
+                for future in as_completed(futures):
+                    key, params = futures[future]
+                    try:
+                        metrics, error = future.result()
+                    except Exception as e:
+                        # The worker itself died (e.g. killed or out of memory)
+                        metrics, error = None, str(e)
+                    completed.update(self._record(file, key, params, metrics, error))
+        return completed
+
+    def _record(self, file, key: str, params: Dict, metrics: Optional[Dict],
+                error: Optional[str]) -> Dict[str, Dict]:
+        """Write one finished combination; returns it if it succeeded"""
+        record = {"key": key, "params": params, "metrics": metrics}
+        if error:
+            record["error"] = error
+            logger.error(f"Backtest failed for {params}: {error.splitlines()[0]}")
+        else:
+            logger.info(f"Backtest finished for {params}: Sharpe {metrics.get('sharpe_ratio')}")
+        self._write(file, record)
+        return {key: record} if metrics is not None else {}
@@ -0,0 +1,367 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Performance Metrics
+-------------------------------------
+One set of NumPy implementations for the return, drawdown, Sharpe, Sortino,
+win rate and profit factor figures reported by the backtests, the portfolio
+and the optimizers.
+
+Metrics are computed from an equity array (one value per period) and an
+array of closed-trade profits. batch_metrics scores many equity curves of
+different lengths at once as a padded (runs x periods) matrix, and
+StreamingMetrics keeps running drawdown, Sharpe and Sortino ratios that
+are updated in O(1) per equity tick for live monitoring.
+
+Conventions: drawdowns are fractions of the running peak, Sharpe and
+Sortino ratios are annualized with sqrt(periods_per_year) at a zero
+risk-free rate, and standard deviations use ddof=0 (like np.std) unless
+stated otherwise.
+
+Usage:
+    metrics = compute_metrics(equity_values, pnl=trade_pnls, days=365)
+    metrics.sharpe_ratio, metrics.max_drawdown_pct
+
+    scores = batch_metrics([curve_1, curve_2, ...])    # DataFrame, one row per curve
+
+    live = StreamingMetrics()
+    for value in equity_ticks:
+        live.update(value)
+    live.current_drawdown, live.sharpe_ratio, live.sortino_ratio
+"""
+
+import logging
+import math
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger("PerformanceMetrics")
+
+TRADING_DAYS_PER_YEAR = 252
+
+ArrayLike = Union[Sequence[float], np.ndarray, pd.Series]
+
+
+def _as_matrix(curves) -> Tuple[np.ndarray, np.ndarray]:
+    """Equity curves as a (runs x periods) matrix and their lengths
+
+    Shorter curves are padded with their last value, which leaves their
+    drawdowns and total returns unchanged; the padded returns are masked.
+    """
+    if isinstance(curves, np.ndarray) and curves.ndim == 2:
+        matrix = curves.astype(float, copy=False)
+        return matrix, np.full(len(matrix), matrix.shape[1])
+    arrays = [np.asarray(curve, dtype=float) for curve in curves]
+    lengths = np.array([len(values) for values in arrays], dtype=int)
+    matrix = np.full((len(arrays), lengths.max() if len(arrays) else 0), np.nan)
+    for row, values in enumerate(arrays):
+        if len(values):
+            matrix[row, :len(values)] = values
+            matrix[row, len(values):] = values[-1]
+    return matrix, lengths
+
+
+def _drawdowns(equity: np.ndarray) -> np.ndarray:
+    """Fractional drawdown from the running peak along the last axis"""
+    peak = np.maximum.accumulate(equity, axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(peak > 0, (peak - equity) / peak, 0.0)
+
+
+def _returns(equity: np.ndarray) -> np.ndarray:
+    """Simple period returns along the last axis"""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = equity[..., 1:] / equity[..., :-1] - 1
+    return np.where(np.isfinite(returns), returns, 0.0)
+
+
+def _ratios(returns: np.ndarray, mask: np.ndarray, periods_per_year: int,
+            ddof: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Annualized Sharpe and Sortino ratios of the masked returns of each row"""
+    counts = mask.sum(axis=-1)
+    returns = np.where(mask, returns, 0.0)
+    scale = math.sqrt(periods_per_year)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = returns.sum(axis=-1) / counts
+        spread = np.where(mask, returns - mean[..., None], 0.0)
+        std = np.sqrt((spread ** 2).sum(axis=-1) / (counts - ddof))
+        downside = np.sqrt((np.minimum(returns, 0.0) ** 2).sum(axis=-1) / counts)
+        sharpe = np.where((counts > ddof) & (std > 0), mean / std * scale, 0.0)
+        sortino = np.where((counts > 0) & (downside > 0), mean / downside * scale, 0.0)
+    return sharpe, sortino
+
+
+def drawdown_curve(equity: ArrayLike) -> np.ndarray:
+    """Fractional drawdown of every equity value from its running peak"""
+    return _drawdowns(np.asarray(equity, dtype=float))
+
+
+def max_drawdown(equity: ArrayLike) -> float:
+    """Largest fractional drawdown of an equity curve (0 for an empty curve)"""
+    values = np.asarray(equity, dtype=float)
+    if values.size == 0:
+        return 0.0
+    return float(_drawdowns(values).max())
+
+
+def equity_returns(equity: ArrayLike) -> np.ndarray:
+    """Period returns of an equity curve"""
+    return _returns(np.asarray(equity, dtype=float))
+
+
+def sharpe_ratio(returns: ArrayLike, periods_per_year: int = TRADING_DAYS_PER_YEAR, ddof: int = 0) -> float:
+    """Annualized Sharpe ratio of period returns (0 without dispersion)"""
+    values = np.asarray(returns, dtype=float)
+    sharpe, _ = _ratios(values[None, :], np.ones((1, len(values)), dtype=bool), periods_per_year, ddof)
+    return float(sharpe[0])
+
+
+def sortino_ratio(returns: ArrayLike, periods_per_year: int = TRADING_DAYS_PER_YEAR) -> float:
+    """Annualized Sortino ratio: mean return over the downside deviation"""
+    values = np.asarray(returns, dtype=float)
+    _, sortino = _ratios(values[None, :], np.ones((1, len(values)), dtype=bool), periods_per_year, 0)
+    return float(sortino[0])
+
+
+def annualized_return(total_return: float, days: float) -> float:
+    """Compound annual return of a fractional total return over calendar days"""
+    if days <= 0:
+        return 0.0
+    return (1 + total_return) ** (365 / days) - 1
+
+
+def trade_statistics(pnl: ArrayLike, wins: Optional[ArrayLike] = None) -> Dict[str, float]:
+    """Win rate, profit factor and average win/loss of closed trades
+
+    Args:
+        pnl (array): Profit or loss of each trade
+        wins (array): Optional boolean winner flags (pnl > 0 by default);
+            every other trade counts as a loss, also for the gross figures
+
+    Returns:
+        dict: total_trades, winning_trades, losing_trades, win_rate (fraction),
+            gross_profit, gross_loss, profit_factor (inf without losses),
+            avg_win, avg_loss
+    """
+    values = np.asarray(pnl, dtype=float)
+    winners = values > 0 if wins is None else np.asarray(wins, dtype=bool)
+    total = len(values)
+    won = int(winners.sum())
+    gross_profit = float(values[winners].sum())
+    gross_loss = abs(float(values[~winners].sum()))
+    if gross_loss > 0:
+        profit_factor = gross_profit / gross_loss
+    else:
+        profit_factor = float('inf') if gross_profit > 0 else 0.0
+    return {
+        "total_trades": total,
+        "winning_trades": won,
+        "losing_trades": total - won,
+        "win_rate": won / total if total else 0.0,
+        "gross_profit": gross_profit,
+        "gross_loss": gross_loss,
+        "profit_factor": profit_factor,
+        "avg_win": float(values[winners].mean()) if won else 0.0,
+        "avg_loss": float(values[~winners].mean()) if total - won else 0.0
+    }
+
+
+@dataclass
+class PerformanceMetrics:
+    """Summary metrics of one equity curve and its trades"""
+    initial_equity: float
+    final_equity: float
+    total_return_pct: float
+    annualized_return_pct: float
+    max_drawdown_pct: float
+    sharpe_ratio: float
+    sortino_ratio: float
+    volatility_pct: float
+    win_rate: float
+    profit_factor: float
+    total_trades: int
+    avg_win: float
+    avg_loss: float
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def compute_metrics(equity: ArrayLike, pnl: Optional[ArrayLike] = None, days: Optional[float] = None,
+                    periods_per_year: int = TRADING_DAYS_PER_YEAR, ddof: int = 0,
+                    wins: Optional[ArrayLike] = None) -> PerformanceMetrics:
+    """All metrics of an equity curve and its closed trades
+
+    Args:
+        equity (array): Equity value per period, oldest first
+        pnl (array): Profit or loss of each closed trade
+        days (float): Calendar days covered, for the annualized return
+        periods_per_year (int): Periods of the equity curve per year
+        ddof (int): Degrees of freedom of the return standard deviation
+        wins (array): Optional winner flags of the trades (pnl > 0 by default)
+
+    Returns:
+        PerformanceMetrics: Returns, drawdown and volatility in percent,
+            win rate as a fraction
+    """
+    values = np.asarray(equity, dtype=float)
+    trades = trade_statistics(pnl if pnl is not None else [], wins)
+    if values.size == 0:
+        return PerformanceMetrics(0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, trades["win_rate"],
+                                  trades["profit_factor"], trades["total_trades"], trades["avg_win"],
+                                  trades["avg_loss"])
+
+    returns = _returns(values)
+    mask = np.ones((1, len(returns)), dtype=bool)
+    sharpe, sortino = _ratios(returns[None, :], mask, periods_per_year, ddof)
+    total_return = values[-1] / values[0] - 1 if values[0] else 0.0
+    volatility = float(np.std(returns, ddof=ddof)) * math.sqrt(periods_per_year) if len(returns) > ddof else 0.0
+    return PerformanceMetrics(
+        initial_equity=float(values[0]),
+        final_equity=float(values[-1]),
+        total_return_pct=total_return * 100,
+        annualized_return_pct=annualized_return(total_return, days or 0) * 100,
+        max_drawdown_pct=float(_drawdowns(values).max()) * 100,
+        sharpe_ratio=float(sharpe[0]),
+        sortino_ratio=float(sortino[0]),
+        volatility_pct=volatility * 100,
+        win_rate=trades["win_rate"],
+        profit_factor=trades["profit_factor"],
+        total_trades=trades["total_trades"],
+        avg_win=trades["avg_win"],
+        avg_loss=trades["avg_loss"]
+    )
+
+
+def batch_metrics(curves, periods_per_year: int = TRADING_DAYS_PER_YEAR, ddof: int = 0,
+                  index: Optional[Sequence] = None) -> pd.DataFrame:
+    """Score many equity curves at once
+
+    Args:
+        curves: List of equity arrays (lengths may differ) or a 2-D
+            (runs x periods) array
+        periods_per_year (int): Periods of the equity curves per year
+        ddof (int): Degrees of freedom of the return standard deviation
+        index (sequence): Optional row labels
+
+    Returns:
+        DataFrame: total_return_pct, max_drawdown_pct, sharpe_ratio,
+            sortino_ratio and periods per curve
+    """
+    matrix, lengths = _as_matrix(curves)
+    columns = ["total_return_pct", "max_drawdown_pct", "sharpe_ratio", "sortino_ratio", "periods"]
+    if matrix.size == 0:
+        frame = pd.DataFrame(0.0, index=range(len(lengths)), columns=columns)
+        frame["periods"] = lengths
+        return frame if index is None else frame.set_axis(list(index))
+
+    returns = _returns(matrix)
+    mask = np.arange(returns.shape[1]) < (lengths - 1)[:, None]
+    sharpe, sortino = _ratios(returns, mask, periods_per_year, ddof)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        total_return = np.where(matrix[:, 0] != 0, matrix[:, -1] / matrix[:, 0] - 1, 0.0)
+    empty = lengths == 0
+    frame = pd.DataFrame({
+        "total_return_pct": np.where(empty, 0.0, total_return * 100),
+        "max_drawdown_pct": np.where(empty, 0.0, _drawdowns(np.nan_to_num(matrix)).max(axis=1) * 100),
+        "sharpe_ratio": sharpe,
+        "sortino_ratio": sortino,
+        "periods": lengths
+    }, index=index)
+    return frame
+
+
+class StreamingMetrics:
+    """Running drawdown, Sharpe and Sortino ratios updated per equity tick
+
+    Keeps the running peak, the count, mean and sum of squared deviations
+    of the returns (Welford's method) and the sum of squared negative
+    returns, so each update and each read is O(1).
+    """
+
+    def __init__(self, initial_equity: Optional[float] = None,
+                 periods_per_year: int = TRADING_DAYS_PER_YEAR, ddof: int = 0):
+        """Initialize the tracker
+
+        Args:
+            initial_equity (float): Optional first equity value
+            periods_per_year (int): Ticks per year, to annualize the ratios
+            ddof (int): Degrees of freedom of the return standard deviation
+        """
+        self.periods_per_year = periods_per_year
+        self.ddof = ddof
+        self.initial_equity = None
+        self.last_equity = None
+        self.peak_equity = None
+        self.current_drawdown = 0.0
+        self.max_drawdown = 0.0
+        self.count = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._downside = 0.0
+        if initial_equity is not None:
+            self.update(initial_equity)
+
+    def update(self, equity: float) -> float:
+        """Add an equity value and return the current drawdown (fraction)"""
+        equity = float(equity)
+        if self.last_equity is None:
+            self.initial_equity = self.peak_equity = equity
+        else:
+            ret = equity / self.last_equity - 1 if self.last_equity else 0.0
+            self.count += 1
+            delta = ret - self._mean
+            self._mean += delta / self.count
+            self._m2 += delta * (ret - self._mean)
+            if ret < 0:
+                self._downside += ret * ret
+        self.last_equity = equity
+        if equity > self.peak_equity:
+            self.peak_equity = equity
+        self.current_drawdown = (self.peak_equity - equity) / self.peak_equity if self.peak_equity > 0 else 0.0
+        if self.current_drawdown > self.max_drawdown:
+            self.max_drawdown = self.current_drawdown
+        return self.current_drawdown
+
+    @property
+    def mean_return(self) -> float:
+        return self._mean
+
+    @property
+    def volatility(self) -> float:
+        """Standard deviation of the returns (not annualized)"""
+        if self.count <= self.ddof:
+            return 0.0
+        return math.sqrt(max(self._m2, 0.0) / (self.count - self.ddof))
+
+    @property
+    def sharpe_ratio(self) -> float:
+        std = self.volatility
+        return self._mean / std * math.sqrt(self.periods_per_year) if std > 0 else 0.0
+
+    @property
+    def sortino_ratio(self) -> float:
+        if not self.count or self._downside <= 0:
+            return 0.0
+        return self._mean / math.sqrt(self._downside / self.count) * math.sqrt(self.periods_per_year)
+
+    @property
+    def total_return(self) -> float:
+        if not self.initial_equity:
+            return 0.0
+        return self.last_equity / self.initial_equity - 1
+
+    def snapshot(self) -> Dict[str, float]:
+        """Current metrics, in the units of PerformanceMetrics"""
+        return {
+            "total_return_pct": self.total_return * 100,
+            "current_drawdown_pct": self.current_drawdown * 100,
+            "max_drawdown_pct": self.max_drawdown * 100,
+            "sharpe_ratio": self.sharpe_ratio,
+            "sortino_ratio": self.sortino_ratio,
+            "periods": self.count
+        }
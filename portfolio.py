@@ -12,6 +12,8 @@ import datetime
 import pandas as pd
 import numpy as np
 
+from performance_metrics import max_drawdown, trade_statistics
+
 logger = logging.getLogger(__name__)
 
 class Position:
@@ -147,39 +149,15 @@ class Portfolio:
     
     def get_win_rate(self):
         """Calculate win rate from closed positions"""
-        if not self.closed_positions:
-            return 0.0
-        
-        winners = sum(1 for p in self.closed_positions if p.profit_loss > 0)
-        return winners / len(self.closed_positions)
+        return trade_statistics([p.profit_loss for p in self.closed_positions])['win_rate']
     
     def get_profit_factor(self):
         """Calculate profit factor (gross profits / gross losses)"""
-        gross_profit = sum(p.profit_loss for p in self.closed_positions if p.profit_loss > 0)
-        gross_loss = sum(abs(p.profit_loss) for p in self.closed_positions if p.profit_loss < 0)
-        
-        if gross_loss == 0:
-            return float('inf') if gross_profit > 0 else 0.0
-        
-        return gross_profit / gross_loss
+        return trade_statistics([p.profit_loss for p in self.closed_positions])['profit_factor']
     
     def get_max_drawdown(self):
         """Calculate maximum drawdown from equity curve"""
-        if not self.equity_curve:
-            return 0.0
-        
-        equity_values = [eq for _, eq in self.equity_curve]
-        peak = equity_values[0]
-        max_dd = 0.0
-        
-        for equity in equity_values:
-            if equity > peak:
-                peak = equity
-            
-            dd = (peak - equity) / peak
-            max_dd = max(max_dd, dd)
-        
-        return max_dd
+        return max_drawdown([eq for _, eq in self.equity_curve])
     
     def get_performance_metrics(self):
         """Get all performance metrics"""
@@ -0,0 +1,179 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Process Log Buffer
+-------------------------------------
+Bounded output buffer of a subprocess started from the web interface.
+
+Every line gets a sequence number (its cursor). The buffer keeps only the
+newest ``max_lines`` lines in a ring (collections.deque), so a multi-day
+paper-trading session runs at constant memory. Readers pass the cursor of
+the last response and get only the lines added since; lines that fell out
+of the ring in the meantime are reported as dropped rather than resent.
+Waiting readers (the server-sent-events stream) block on a condition until
+a line arrives or the process ends.
+
+Usage:
+    buffer = ProcessLogBuffer(max_lines=5000)
+    buffer.append("Backtest started")             # producer thread
+    lines, cursor, dropped = buffer.read(cursor)  # poll for new lines
+    for event in sse_events(buffer, cursor):      # live tail as SSE
+        ...
+"""
+
+import logging
+import threading
+import uuid
+from collections import deque
+from itertools import islice
+from typing import Iterator, List, Optional, Tuple
+
+logger = logging.getLogger("ProcessLogBuffer")
+
+# Default number of lines kept per process
+DEFAULT_MAX_LINES = 5000
+
+# Default number of lines returned per read
+DEFAULT_READ_LIMIT = 1000
+
+
+class ProcessLogBuffer:
+    """Ring buffer of output lines with monotonically increasing cursors"""
+
+    def __init__(self, max_lines: int = DEFAULT_MAX_LINES):
+        """Initialize the buffer
+
+        Args:
+            max_lines (int): Number of newest lines kept
+        """
+        if max_lines < 1:
+            raise ValueError("max_lines must be at least 1")
+        self.max_lines = max_lines
+        # Identifies this run, so clients notice when a process was restarted
+        self.run_id = uuid.uuid4().hex[:12]
+        self._lines = deque(maxlen=max_lines)
+        self._total = 0
+        self._closed = False
+        self._condition = threading.Condition()
+
+    def __len__(self) -> int:
+        return len(self._lines)
+
+    @property
+    def cursor(self) -> int:
+        """Cursor after the newest line (number of lines ever appended)"""
+        return self._total
+
+    @property
+    def first_cursor(self) -> int:
+        """Cursor of the oldest line still in the buffer"""
+        return self._total - len(self._lines)
+
+    @property
+    def closed(self) -> bool:
+        """True once the producer has finished"""
+        return self._closed
+
+    def append(self, line: str) -> int:
+        """Add a line, evicting the oldest one when the buffer is full
+
+        Args:
+            line (str): Output line (without trailing newline)
+
+        Returns:
+            int: Cursor of the line
+        """
+        with self._condition:
+            self._lines.append(line)
+            self._total += 1
+            self._condition.notify_all()
+            return self._total - 1
+
+    def close(self):
+        """Mark the producer as finished and wake up waiting readers"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    def read(self, cursor: Optional[int] = None,
+             limit: Optional[int] = DEFAULT_READ_LIMIT) -> Tuple[List[str], int, int]:
+        """Lines added since a cursor
+
+        Args:
+            cursor (int): Cursor returned by the previous read; None for the
+                newest ``limit`` lines. A cursor beyond the end (from an
+                earlier run) reads from the oldest line kept.
+            limit (int): Maximum number of lines returned (None for all)
+
+        Returns:
+            tuple: (lines, cursor for the next read, lines dropped before
+                they could be read)
+        """
+        with self._condition:
+            first = self._total - len(self._lines)
+            if cursor is None:
+                start = first if limit is None else max(first, self._total - limit)
+                dropped = 0
+            else:
+                if cursor > self._total:
+                    cursor = first
+                start = max(cursor, first)
+                dropped = start - cursor
+            stop = self._total if limit is None else min(self._total, start + limit)
+            offset = start - first
+            lines = list(islice(self._lines, offset, offset + stop - start))
+            return lines, stop, dropped
+
+    def wait(self, cursor: int, timeout: Optional[float] = None) -> bool:
+        """Block until lines past a cursor exist or the buffer is closed
+
+        Args:
+            cursor (int): Cursor of the next line wanted
+            timeout (float): Maximum seconds to wait
+
+        Returns:
+            bool: True if new lines are available
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self._total > cursor or self._closed, timeout)
+            return self._total > cursor
+
+
+def sse_events(buffer: ProcessLogBuffer, cursor: Optional[int] = None, status=None,
+               heartbeat: float = 15.0, limit: int = DEFAULT_READ_LIMIT) -> Iterator[str]:
+    """Server-sent events tailing a buffer until its process ends
+
+    Every line is a ``message`` event whose id is the cursor after it, so an
+    EventSource reconnecting with Last-Event-ID resumes where it stopped.
+    Lines lost to the ring are announced by a ``dropped`` event, and the
+    stream finishes with an ``end`` event carrying the process status.
+
+    Args:
+        buffer (ProcessLogBuffer): Buffer to tail
+        cursor (int): Cursor to start from (None for the newest lines)
+        status (callable): Returns the process status for the end event
+        heartbeat (float): Seconds between keep-alive comments when idle
+        limit (int): Maximum lines read per wake-up
+
+    Yields:
+        str: Encoded SSE events
+    """
+    yield f"retry: 3000\nevent: run\ndata: {buffer.run_id}\n\n"
+    while True:
+        lines, next_cursor, dropped = buffer.read(cursor, limit)
+        if dropped:
+            yield f"event: dropped\ndata: {dropped}\n\n"
+        for offset, line in enumerate(lines):
+            data = "\ndata: ".join(line.splitlines() or [""])
+            yield f"id: {next_cursor - len(lines) + offset + 1}\ndata: {data}\n\n"
+        cursor = next_cursor
+        # Read the flag first: close() follows the last append
+        finished = buffer.closed
+        if cursor < buffer.cursor:
+            continue
+        if finished:
+            yield f"event: end\ndata: {status() if status else 'closed'}\n\n"
+            return
+        if not buffer.wait(cursor, heartbeat) and not buffer.closed:
+            yield ": keep-alive\n\n"
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Regime Service
+-------------------------------------
+Market and sector regimes computed once per bar.
+
+Detecting the regime downloads SPY and the sector ETFs and recomputes their
+indicators; within one trading cycle the same answer is needed by signal
+generation, stop-loss checks and position sizing. The service keeps the
+results in a small cache keyed by the bar timestamp they were computed for,
+so only the first consumer of a new bar pays for the computation. Hit and
+miss counters show how often the cache is used.
+
+Usage:
+    service = RegimeService(compute_market_regime, compute_sector_regimes)
+    regime = service.market_regime(bar_timestamp)
+    sectors = service.sector_regimes(bar_timestamp)
+    service.stats()   # {'market': {'hits': 3, 'misses': 1}, 'sectors': {...}}
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable
+
+logger = logging.getLogger("RegimeService")
+
+MARKET = "market"
+SECTORS = "sectors"
+
+
+class RegimeService:
+    """Timestamp-keyed cache in front of the regime computations
+
+    Cached values are shared by every consumer and must not be modified.
+    """
+
+    def __init__(self, compute_market: Callable[[], Any], compute_sectors: Callable[[], Any],
+                 max_entries: int = 16):
+        """Initialize the service
+
+        Args:
+            compute_market (callable): Computes the market regime of the current bar
+            compute_sectors (callable): Computes the sector regimes of the current bar
+            max_entries (int): Bar timestamps kept before the oldest is dropped
+        """
+        self._compute = {MARKET: compute_market, SECTORS: compute_sectors}
+        self.max_entries = max_entries
+        self._cache: "OrderedDict[Hashable, Dict[str, Any]]" = OrderedDict()
+        # Re-entrant: the market regime may itself ask for the sector regimes
+        self._lock = threading.RLock()
+        self.hits = {MARKET: 0, SECTORS: 0}
+        self.misses = {MARKET: 0, SECTORS: 0}
+
+    def _get(self, kind: str, timestamp: Hashable) -> Any:
+        with self._lock:
+            entry = self._cache.get(timestamp)
+            if entry is not None and kind in entry:
+                self.hits[kind] += 1
+                return entry[kind]
+
+            self.misses[kind] += 1
+            value = self._compute[kind]()
+
+            entry = self._cache.setdefault(timestamp, {})
+            entry[kind] = value
+            self._cache.move_to_end(timestamp)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+            return value
+
+    def market_regime(self, timestamp: Hashable) -> Any:
+        """Market regime for the bar at ``timestamp``"""
+        return self._get(MARKET, timestamp)
+
+    def sector_regimes(self, timestamp: Hashable) -> Any:
+        """Sector regimes for the bar at ``timestamp``"""
+        return self._get(SECTORS, timestamp)
+
+    def invalidate(self, timestamp: Hashable = None):
+        """Forget one bar, or every bar when no timestamp is given"""
+        with self._lock:
+            if timestamp is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(timestamp, None)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Hit and miss counts per regime kind"""
+        return {kind: {"hits": self.hits[kind], "misses": self.misses[kind]} for kind in self._compute}
@@ -0,0 +1,498 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Results Catalog
+-------------------------------------
+SQLite index of backtest result files and position snapshots for the web
+dashboard.
+
+The dashboard used to list the results and trades directories, stat every
+file and parse the newest positions CSV on each request. The catalog keeps
+one row per file (path, kind, modification time, size), the period and
+metrics of every backtest run, and the rows of every position snapshot.
+Files are indexed once when they appear or change: a CatalogWatcher
+refreshes the catalog in the background (filesystem events through
+watchdog when it is installed, otherwise a periodic scan that only parses
+new or modified files), and run_backtest records its metrics directly when
+it writes a run. Dashboard requests are then indexed queries with
+pagination and filters.
+
+Usage:
+    catalog = ResultsCatalog('backtest_results/results_catalog.db',
+                             roots={'backtest': 'backtest_results', 'positions': 'trades'})
+    catalog.refresh()                                  # index new/changed files
+    CatalogWatcher(catalog, interval=2.0).start()      # keep it current
+    page = catalog.backtest_runs(page=1, per_page=20, start_date='2023-01-01')
+    positions = catalog.latest_positions()
+"""
+
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+import pandas as pd
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+    WATCHDOG_AVAILABLE = True
+except ImportError:
+    WATCHDOG_AVAILABLE = False
+
+logger = logging.getLogger("ResultsCatalog")
+
+# Kinds of files indexed and the file names that belong to them
+FILE_KINDS: Dict[str, Callable[[str], bool]] = {
+    'backtest': lambda name: name.endswith('.csv'),
+    'positions': lambda name: 'position' in name.lower() and name.endswith('.csv')
+}
+
+# Backtest metrics stored in their own columns (filterable and sortable)
+RUN_METRICS = ("win_rate", "profit_factor", "total_return", "total_trades", "final_capital")
+
+# Columns backtest runs can be sorted by
+RUN_SORT_COLUMNS = {
+    'date': 'r.mtime',
+    'start_date': 'r.start_date',
+    'total_return': 'r.total_return',
+    'win_rate': 'r.win_rate',
+    'profit_factor': 'r.profit_factor'
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    kind TEXT NOT NULL,
+    name TEXT NOT NULL,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL,
+    rows INTEGER
+);
+CREATE INDEX IF NOT EXISTS files_kind_mtime ON files (kind, mtime DESC);
+CREATE TABLE IF NOT EXISTS backtest_runs (
+    file_id INTEGER PRIMARY KEY REFERENCES files (id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    mtime REAL NOT NULL,
+    start_date TEXT,
+    end_date TEXT,
+    win_rate REAL,
+    profit_factor REAL,
+    total_return REAL,
+    total_trades INTEGER,
+    final_capital REAL,
+    summary TEXT
+);
+CREATE INDEX IF NOT EXISTS backtest_runs_mtime ON backtest_runs (mtime);
+CREATE INDEX IF NOT EXISTS backtest_runs_period ON backtest_runs (start_date, end_date);
+CREATE INDEX IF NOT EXISTS backtest_runs_return ON backtest_runs (total_return);
+CREATE INDEX IF NOT EXISTS backtest_runs_win_rate ON backtest_runs (win_rate);
+CREATE INDEX IF NOT EXISTS backtest_runs_profit_factor ON backtest_runs (profit_factor);
+CREATE TABLE IF NOT EXISTS positions (
+    file_id INTEGER NOT NULL REFERENCES files (id) ON DELETE CASCADE,
+    row INTEGER NOT NULL,
+    symbol TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (file_id, row)
+);
+CREATE INDEX IF NOT EXISTS positions_symbol ON positions (symbol);
+"""
+
+# backtest_results_2023-01-01_to_2023-03-31_20240101_120000.csv, backtest_results_20230101_20230331.csv
+_PERIOD_PATTERN = re.compile(r"(\d{4}-?\d{2}-?\d{2})_(?:to_)?(\d{4}-?\d{2}-?\d{2})")
+
+
+def _iso_date(value: str) -> str:
+    value = value.replace('-', '')
+    return f"{value[:4]}-{value[4:6]}-{value[6:8]}"
+
+
+def parse_run_period(name: str) -> Tuple[Optional[str], Optional[str]]:
+    """Start and end date (YYYY-MM-DD) encoded in a result file name"""
+    match = _PERIOD_PATTERN.search(name)
+    if not match:
+        return None, None
+    return _iso_date(match.group(1)), _iso_date(match.group(2))
+
+
+def _count_rows(path: str) -> int:
+    """Data rows of a CSV file (lines after the header)"""
+    lines = 0
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(1 << 20), b''):
+            lines += chunk.count(b'\n')
+    return max(0, lines - 1)
+
+
+def _number(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class ResultsCatalog:
+    """SQLite catalog of result files, backtest metrics and position snapshots"""
+
+    def __init__(self, db_path: str, roots: Optional[Mapping[str, str]] = None):
+        """Initialize the catalog
+
+        Args:
+            db_path (str): SQLite database file (created if missing)
+            roots (dict): Directory per file kind ('backtest', 'positions')
+                scanned by refresh()
+        """
+        self.db_path = db_path
+        self.roots = {kind: os.path.abspath(root) for kind, root in (roots or {}).items()}
+        unknown = set(self.roots) - set(FILE_KINDS)
+        if unknown:
+            raise ValueError(f"Unknown file kinds: {sorted(unknown)}")
+
+        directory = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        with self._write_lock:
+            connection = self._connection()
+            connection.executescript(SCHEMA)
+            connection.commit()
+
+    def _connection(self) -> sqlite3.Connection:
+        """Connection of the calling thread"""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.db_path, timeout=30)
+            connection.row_factory = sqlite3.Row
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute("PRAGMA foreign_keys=ON")
+            self._local.connection = connection
+        return connection
+
+    def close(self):
+        """Close the connection of the calling thread"""
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    def kind_of(self, path: str) -> Optional[str]:
+        """Kind of a file under one of the roots (None if not indexed)"""
+        directory, name = os.path.split(os.path.abspath(path))
+        for kind, root in self.roots.items():
+            if directory == root and FILE_KINDS[kind](name):
+                return kind
+        return None
+
+    def index_file(self, path: str, kind: Optional[str] = None,
+                   metrics: Optional[Mapping[str, Any]] = None) -> bool:
+        """Index (or re-index) one file
+
+        Args:
+            path (str): File to index
+            kind (str): File kind; derived from the roots if None
+            metrics (dict): Summary of a backtest run, e.g. as returned by
+                run_backtest (stored with the run)
+
+        Returns:
+            bool: True if the file was indexed
+        """
+        path = os.path.abspath(path)
+        kind = kind or self.kind_of(path)
+        if kind is None:
+            return False
+        try:
+            stat = os.stat(path)
+            if kind == 'positions':
+                frame = pd.read_csv(path)
+                rows = json.loads(frame.to_json(orient='records'))
+            else:
+                rows = None
+            row_count = len(rows) if rows is not None else _count_rows(path)
+        except (OSError, ValueError, pd.errors.ParserError) as e:
+            # Files still being written are picked up by the next refresh
+            logger.debug(f"Could not index {path}: {str(e)}")
+            return False
+
+        name = os.path.basename(path)
+        with self._write_lock:
+            connection = self._connection()
+            with connection:
+                file_id = connection.execute(
+                    "INSERT INTO files (path, kind, name, mtime, size, rows) VALUES (?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (path) DO UPDATE SET kind = excluded.kind, mtime = excluded.mtime, "
+                    "size = excluded.size, rows = excluded.rows RETURNING id",
+                    (path, kind, name, stat.st_mtime, stat.st_size, row_count)
+                ).fetchone()[0]
+                if kind == 'backtest':
+                    start_date, end_date = parse_run_period(name)
+                    connection.execute(
+                        "INSERT INTO backtest_runs (file_id, name, mtime, start_date, end_date) "
+                        "VALUES (?, ?, ?, ?, ?) ON CONFLICT (file_id) DO UPDATE SET mtime = excluded.mtime, "
+                        "start_date = COALESCE(excluded.start_date, start_date), "
+                        "end_date = COALESCE(excluded.end_date, end_date)",
+                        (file_id, name, stat.st_mtime, start_date, end_date)
+                    )
+                    if metrics:
+                        self._store_metrics(connection, file_id, metrics)
+                else:
+                    connection.execute("DELETE FROM positions WHERE file_id = ?", (file_id,))
+                    connection.executemany(
+                        "INSERT INTO positions (file_id, row, symbol, data) VALUES (?, ?, ?, ?)",
+                        [(file_id, i, row.get('symbol'), json.dumps(row)) for i, row in enumerate(rows)]
+                    )
+        return True
+
+    @staticmethod
+    def _store_metrics(connection: sqlite3.Connection, file_id: int, metrics: Mapping[str, Any]):
+        summary = json.dumps(metrics, default=str)
+        values = [_number(metrics.get(name)) for name in RUN_METRICS]
+        start_date, end_date = metrics.get('start_date'), metrics.get('end_date')
+        connection.execute(
+            f"UPDATE backtest_runs SET {', '.join(f'{name} = ?' for name in RUN_METRICS)}, summary = ?, "
+            "start_date = COALESCE(?, start_date), end_date = COALESCE(?, end_date) WHERE file_id = ?",
+            (*values, summary, start_date, end_date, file_id)
+        )
+
+    def remove_file(self, path: str):
+        """Drop a file (and its run or positions) from the catalog"""
+        with self._write_lock:
+            connection = self._connection()
+            with connection:
+                connection.execute("DELETE FROM files WHERE path = ?", (os.path.abspath(path),))
+
+    def refresh(self) -> Dict[str, int]:
+        """Bring the catalog in line with the root directories
+
+        Only files that are new or whose size or modification time changed
+        are parsed; files that disappeared are removed.
+
+        Returns:
+            dict: Number of files 'indexed' and 'removed'
+        """
+        indexed = removed = 0
+        for kind, root in self.roots.items():
+            known = {row['path']: (row['mtime'], row['size']) for row in self._connection().execute(
+                "SELECT path, mtime, size FROM files WHERE kind = ?", (kind,))}
+            present = set()
+            if os.path.isdir(root):
+                with os.scandir(root) as entries:
+                    for entry in entries:
+                        if not entry.is_file() or not FILE_KINDS[kind](entry.name):
+                            continue
+                        present.add(entry.path)
+                        stat = entry.stat()
+                        if known.get(entry.path) != (stat.st_mtime, stat.st_size):
+                            indexed += self.index_file(entry.path, kind)
+            for path in set(known) - present:
+                self.remove_file(path)
+                removed += 1
+        if indexed or removed:
+            logger.info(f"Results catalog: indexed {indexed} files, removed {removed}")
+        return {'indexed': indexed, 'removed': removed}
+
+    @staticmethod
+    def _file_record(row: sqlite3.Row) -> Dict[str, Any]:
+        record = dict(row)
+        record['date'] = datetime.fromtimestamp(record.pop('mtime')).strftime('%Y-%m-%d %H:%M:%S')
+        return record
+
+    def backtest_runs(self, page: int = 1, per_page: int = 50, start_date: Optional[str] = None,
+                      end_date: Optional[str] = None, search: Optional[str] = None,
+                      min_return: Optional[float] = None, sort: str = 'date',
+                      descending: bool = True) -> Dict[str, Any]:
+        """One page of backtest runs
+
+        Args:
+            page (int): Page number, starting at 1
+            per_page (int): Runs per page
+            start_date (str): Only runs starting on or after this date
+            end_date (str): Only runs ending on or before this date
+            search (str): Only runs whose file name contains this text
+            min_return (float): Only runs with at least this total return (%)
+            sort (str): One of RUN_SORT_COLUMNS
+            descending (bool): Sort order
+
+        Returns:
+            dict: 'results' (name, path, date, period, rows and metrics per
+                run), 'total', 'page' and 'per_page'
+        """
+        if sort not in RUN_SORT_COLUMNS:
+            raise ValueError(f"Unknown sort column: {sort}")
+        page, per_page = max(1, int(page)), max(1, int(per_page))
+
+        conditions, parameters = [], []
+        if start_date:
+            conditions.append("r.start_date >= ?")
+            parameters.append(start_date)
+        if end_date:
+            conditions.append("r.end_date <= ?")
+            parameters.append(end_date)
+        if search:
+            conditions.append("r.name LIKE ? ESCAPE '\\'")
+            parameters.append('%' + re.sub(r"([%_\\])", r"\\\1", search) + '%')
+        if min_return is not None:
+            conditions.append("r.total_return >= ?")
+            parameters.append(float(min_return))
+        where = " AND ".join(conditions) or "1"
+        direction = 'DESC' if descending else 'ASC'
+        order = f"{RUN_SORT_COLUMNS[sort]} {direction}, r.file_id {direction}"
+
+        connection = self._connection()
+        total = connection.execute(f"SELECT COUNT(*) FROM backtest_runs r WHERE {where}", parameters).fetchone()[0]
+        # Page through the runs first, then look up the files of that page only
+        rows = connection.execute(
+            f"SELECT r.name, f.path, r.mtime, f.rows, r.start_date, r.end_date, "
+            f"{', '.join('r.' + name for name in RUN_METRICS)} "
+            f"FROM (SELECT * FROM backtest_runs r WHERE {where} ORDER BY {order} LIMIT ? OFFSET ?) r "
+            f"JOIN files f ON f.id = r.file_id ORDER BY {order}",
+            (*parameters, per_page, (page - 1) * per_page)).fetchall()
+        return {
+            'results': [self._file_record(row) for row in rows],
+            'total': total,
+            'page': page,
+            'per_page': per_page
+        }
+
+    def run_summary(self, path: str) -> Optional[Dict[str, Any]]:
+        """Full summary recorded for a backtest run (None if not recorded)"""
+        row = self._connection().execute(
+            "SELECT r.summary FROM backtest_runs r JOIN files f ON f.id = r.file_id WHERE f.path = ?",
+            (os.path.abspath(path),)).fetchone()
+        return json.loads(row['summary']) if row and row['summary'] else None
+
+    def position_snapshots(self, page: int = 1, per_page: int = 50) -> Dict[str, Any]:
+        """One page of position snapshot files, newest first"""
+        page, per_page = max(1, int(page)), max(1, int(per_page))
+        connection = self._connection()
+        total = connection.execute("SELECT COUNT(*) FROM files WHERE kind = 'positions'").fetchone()[0]
+        rows = connection.execute(
+            "SELECT name, path, mtime, rows FROM files WHERE kind = 'positions' "
+            "ORDER BY mtime DESC, path LIMIT ? OFFSET ?",
+            (per_page, (page - 1) * per_page)).fetchall()
+        return {
+            'results': [self._file_record(row) for row in rows],
+            'total': total,
+            'page': page,
+            'per_page': per_page
+        }
+
+    def latest_positions(self, symbol: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Positions of the newest snapshot
+
+        Args:
+            symbol (str): Only positions in this symbol
+
+        Returns:
+            list: One dict per position (the snapshot's CSV row)
+        """
+        query = ("SELECT data FROM positions WHERE file_id = (SELECT id FROM files WHERE kind = 'positions' "
+                 "ORDER BY mtime DESC, path DESC LIMIT 1)")
+        parameters = ()
+        if symbol:
+            query += " AND symbol = ?"
+            parameters = (symbol,)
+        rows = self._connection().execute(query + " ORDER BY row", parameters).fetchall()
+        return [json.loads(row['data']) for row in rows]
+
+
+class CatalogWatcher:
+    """Keeps a catalog current while files are written to its roots"""
+
+    def __init__(self, catalog: ResultsCatalog, interval: float = 2.0, use_watchdog: bool = True):
+        """Initialize the watcher
+
+        Args:
+            catalog (ResultsCatalog): Catalog to keep current
+            interval (float): Seconds between scans without watchdog
+            use_watchdog (bool): Use filesystem events when watchdog is installed
+        """
+        self.catalog = catalog
+        self.interval = interval
+        self.use_watchdog = use_watchdog and WATCHDOG_AVAILABLE
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._observer = None
+
+    def start(self) -> 'CatalogWatcher':
+        """Index the roots once and start watching them"""
+        self.catalog.refresh()
+        if self.use_watchdog:
+            self._observer = Observer()
+            handler = _CatalogEventHandler(self.catalog)
+            for root in self.catalog.roots.values():
+                os.makedirs(root, exist_ok=True)
+                self._observer.schedule(handler, root, recursive=False)
+            self._observer.daemon = True
+            self._observer.start()
+        else:
+            self._thread = threading.Thread(target=self._poll, name="ResultsCatalogWatcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def _poll(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.catalog.refresh()
+            except Exception as e:
+                logger.error(f"Error refreshing results catalog: {str(e)}")
+
+    def stop(self):
+        """Stop watching"""
+        self._stop.set()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+        if self._thread is not None:
+            self._thread.join()
+
+
+if WATCHDOG_AVAILABLE:
+    class _CatalogEventHandler(FileSystemEventHandler):
+        """Re-indexes files as watchdog reports them"""
+
+        def __init__(self, catalog: ResultsCatalog):
+            self.catalog = catalog
+
+        def on_created(self, event):
+            if not event.is_directory:
+                self.catalog.index_file(event.src_path)
+
+        on_modified = on_created
+
+        def on_deleted(self, event):
+            if not event.is_directory:
+                self.catalog.remove_file(event.src_path)
+
+        def on_moved(self, event):
+            if not event.is_directory:
+                self.catalog.remove_file(event.src_path)
+                self.catalog.index_file(event.dest_path)
+
+
+def record_backtest_run(db_path: str, results_path: str, summary: Mapping[str, Any]) -> bool:
+    """Index a backtest run with its metrics as soon as it is written
+
+    Args:
+        db_path (str): Catalog database
+        results_path (str): Result file of the run
+        summary (dict): Backtest summary (period and metrics)
+
+    Returns:
+        bool: True if the run was recorded
+    """
+    try:
+        catalog = ResultsCatalog(db_path)
+        try:
+            return catalog.index_file(results_path, 'backtest', metrics=summary)
+        finally:
+            catalog.close()
+    except sqlite3.Error as e:
+        logger.warning(f"Could not record backtest run in {db_path}: {str(e)}")
+        return False
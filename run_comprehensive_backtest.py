@@ -1,7 +1,7 @@
 import os
 import pandas as pd
 import alpaca_trade_api as tradeapi
-from final_sp500_strategy import run_backtest
+from final_sp500_strategy import run_backtest, prefetch_backtest_data
 from datetime import datetime
 import yaml
 import logging
@@ -86,7 +86,67 @@ def run_quarter_backtest(quarter, start_date, end_date, max_signals, initial_cap
     
     return results_file
 
-def run_multiple_backtests(quarter, start_date, end_date, max_signals=100, initial_capital=300, num_runs=5, random_seed=42):
+def run_monte_carlo_backtests(quarter, start_date, end_date, max_signals=100, initial_capital=300, num_paths=10000, random_seed=42):
+    """
+    Generate the signals of a quarter once and simulate many trade outcome paths
+    
+    Args:
+        quarter (str): Quarter identifier (e.g., 'Q1_2023')
+        start_date (str): Start date in YYYY-MM-DD format
+        end_date (str): End date in YYYY-MM-DD format
+        max_signals (int): Maximum number of signals to use
+        initial_capital (float): Initial capital for the backtest
+        num_paths (int): Number of outcome paths to simulate
+        random_seed (int): Random seed for reproducibility
+        
+    Returns:
+        dict: Averaged results with their distributions
+    """
+    print(f"\n{'=' * 50}")
+    print(f"Simulating {num_paths} outcome paths for {quarter}: {start_date} to {end_date}")
+    print(f"{'=' * 50}")
+    
+    from final_sp500_strategy import run_monte_carlo_backtest
+    
+    summary, _ = run_monte_carlo_backtest(
+        start_date,
+        end_date,
+        num_paths=num_paths,
+        mode='backtest',
+        max_signals=max_signals,
+        initial_capital=initial_capital,
+        random_seed=random_seed
+    )
+    if not summary:
+        return None
+    
+    # Save the distributions
+    results_dir = "./backtest_results/multiple_runs"
+    os.makedirs(results_dir, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    with open(f"{results_dir}/monte_carlo_{quarter}_{timestamp}.json", 'w') as f:
+        json.dump({
+            'avg_summary': summary,
+            'num_paths': num_paths,
+            'random_seed': random_seed
+        }, f, default=str)
+    
+    distributions = summary['distributions']
+    confidence = summary['confidence'] * 100
+    print(f"\n{'=' * 50}")
+    print(f"MONTE CARLO RESULTS ({num_paths} paths, {summary['total_trades']} trades)")
+    print(f"{'=' * 50}")
+    for metric, label, unit in (('win_rate', 'Win Rate', '%'), ('profit_factor', 'Profit Factor', ''),
+                                ('total_return', 'Total Return', '%'), ('max_drawdown', 'Max Drawdown', '%')):
+        stats = distributions[metric]
+        print(f"{label}: median {stats['median']:.2f}{unit}, mean {stats['mean']:.2f}{unit} "
+              f"({confidence:.0f}% interval {stats['ci_low']:.2f} to {stats['ci_high']:.2f})")
+    print(f"Probability of profit: {summary['probability_of_profit'] * 100:.1f}%")
+    
+    return summary
+
+def run_multiple_backtests(quarter, start_date, end_date, max_signals=100, initial_capital=300, num_runs=5, random_seed=42,
+                           monte_carlo=False):
     """
     Run multiple backtests and average the results to get a more stable assessment
     
@@ -98,10 +158,15 @@ def run_multiple_backtests(quarter, start_date, end_date, max_signals=100, initi
         initial_capital (float): Initial capital for the backtest
         num_runs (int): Number of backtest runs to perform
         random_seed (int): Base random seed for reproducibility
+        monte_carlo (bool): Generate signals once and simulate num_runs
+            outcome paths in one batch instead of rerunning the backtest
         
     Returns:
         dict: Averaged backtest results
     """
+    if monte_carlo:
+        return run_monte_carlo_backtests(quarter, start_date, end_date, max_signals, initial_capital, num_runs, random_seed)
+    
     print(f"\n{'=' * 50}")
     print(f"Running {num_runs} backtests for {quarter}: {start_date} to {end_date}")
     print(f"{'=' * 50}")
@@ -235,7 +300,8 @@ def run_multiple_backtests(quarter, start_date, end_date, max_signals=100, initi
     
     return None
 
-def run_comprehensive_backtest(quarter, max_signals=100, initial_capital=300, multiple_runs=False, num_runs=5):
+def run_comprehensive_backtest(quarter, max_signals=100, initial_capital=300, multiple_runs=False, num_runs=5,
+                               monte_carlo=False, random_seed=42):
     """Run a comprehensive backtest for a specific quarter with detailed signal analysis"""
     try:
         # Load configuration
@@ -263,7 +329,8 @@ def run_comprehensive_backtest(quarter, max_signals=100, initial_capital=300, mu
             for q, (start_date, end_date) in quarters.items():
                 if multiple_runs:
                     # Run multiple backtests and average results
-                    summary = run_multiple_backtests(q, start_date, end_date, max_signals, initial_capital, num_runs)
+                    summary = run_multiple_backtests(q, start_date, end_date, max_signals, initial_capital, num_runs,
+                                                     random_seed, monte_carlo)
                     signals = None  # Signals are not returned from multiple runs
                 else:
                     # Run a single backtest
@@ -476,7 +543,8 @@ def run_comprehensive_backtest(quarter, max_signals=100, initial_capital=300, mu
             start_date, end_date = quarters[quarter]
             if multiple_runs:
                 # Run multiple backtests and average results
-                summary = run_multiple_backtests(quarter, start_date, end_date, max_signals, initial_capital, num_runs)
+                summary = run_multiple_backtests(quarter, start_date, end_date, max_signals, initial_capital, num_runs,
+                                                 random_seed, monte_carlo)
                 signals = None  # Signals are not returned from multiple runs
             else:
                 # Run a single backtest
@@ -564,7 +632,8 @@ def run_comprehensive_backtest(quarter, max_signals=100, initial_capital=300, mu
     except Exception as e:
         logger.error(f"An error occurred: {e}")
 
-def run_all_quarters_backtest(max_signals=100, initial_capital=300, multiple_runs=False, num_runs=5):
+def run_all_quarters_backtest(max_signals=100, initial_capital=300, multiple_runs=False, num_runs=5,
+                              monte_carlo=False, random_seed=42):
     """Run comprehensive backtests for all quarters"""
     try:
         # Load configuration
@@ -586,10 +655,15 @@ def run_all_quarters_backtest(max_signals=100, initial_capital=300, multiple_run
         all_metrics = {}
         summary_data = []
         
+        # Fetch bars for all quarters at once; each quarter then reads the cache
+        prefetch_backtest_data(min(start for start, _ in quarters.values()),
+                               max(end for _, end in quarters.values()))
+        
         for q, (start_date, end_date) in quarters.items():
             if multiple_runs:
                 # Run multiple backtests and average results
-                summary = run_multiple_backtests(q, start_date, end_date, max_signals, initial_capital, num_runs)
+                summary = run_multiple_backtests(q, start_date, end_date, max_signals, initial_capital, num_runs,
+                                                 random_seed, monte_carlo)
                 signals = None  # Signals are not returned from multiple runs
             else:
                 # Run a single backtest
@@ -744,6 +818,7 @@ def main():
         parser.add_argument('--multiple_runs', action='store_true', help='Run multiple backtests and average results')
         parser.add_argument('--num_runs', type=int, default=5, help='Number of backtest runs to perform when using --multiple_runs')
         parser.add_argument('--random_seed', type=int, default=42, help='Base random seed for reproducibility')
+        parser.add_argument('--monte_carlo', action='store_true', help='With --multiple_runs, generate signals once and simulate --num_runs outcome paths')
         args = parser.parse_args()
         
         # Define quarters mapping
@@ -762,10 +837,17 @@ def main():
                 max_signals=args.max_signals, 
                 initial_capital=args.initial_capital,
                 multiple_runs=args.multiple_runs,
-                num_runs=args.num_runs
+                num_runs=args.num_runs,
+                monte_carlo=args.monte_carlo,
+                random_seed=args.random_seed
             )
             return
         
+        # Fetch bars for all requested quarters at once
+        spans = [quarters_map[quarter] for quarter in args.quarters if quarter in quarters_map]
+        if spans:
+            prefetch_backtest_data(min(start for start, _ in spans), max(end for _, end in spans))
+        
         # Run backtest for each quarter
         for quarter in args.quarters:
             run_comprehensive_backtest(
@@ -773,7 +855,9 @@ def main():
                 max_signals=args.max_signals, 
                 initial_capital=args.initial_capital,
                 multiple_runs=args.multiple_runs,
-                num_runs=args.num_runs
+                num_runs=args.num_runs,
+                monte_carlo=args.monte_carlo,
+                random_seed=args.random_seed
             )
     except Exception as e:
         logger.error(f"Error running comprehensive backtest: {str(e)}")
@@ -0,0 +1,180 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Seasonal Return Cube
+-------------------------------------
+Seasonal win rates and correlations of a whole universe as array reductions.
+
+The closes of all symbols are aligned on their last bar into one
+(bars x symbols) matrix, padded with NaN before each symbol's history, so
+a position counted back from the end means the same bar it does in the
+per-symbol ``iloc`` arithmetic of SeasonalityAnalyzer. Slicing that matrix
+at yearly anniversaries gives a (year x trading-day x symbol) cube: the
+forward returns of every past year, and with them the win rates and
+average returns of every lookback horizon, are cumulative sums over its
+first axis. The seasonal correlations of every horizon come from one
+gather of the historical windows.
+
+Usage:
+    cube = SeasonalReturnCube(analyzer.historical_data)
+    correlations = cube.seasonal_correlations([1, 3, 5], window_days=90)
+    stats = cube.win_rates([1, 3, 5], forward_days=90)
+"""
+
+import logging
+from typing import Dict, Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger("SeasonalReturnCube")
+
+TRADING_DAYS_PER_YEAR = 252
+
+DEFAULT_LOOKBACK_YEARS = [1, 3, 5, 10, 15, 25]
+
+
+class SeasonalReturnCube:
+    """Closes of a symbol universe aligned on their most recent bar"""
+
+    def __init__(self, historical_data: Mapping[str, pd.DataFrame],
+                 symbols: Optional[Sequence[str]] = None, column: str = 'close'):
+        """Initialize the cube
+
+        Args:
+            historical_data (dict): Symbol -> DataFrame of bars
+            symbols (list): Symbols to include (all with data if None)
+            column (str): Price column
+        """
+        if symbols is None:
+            symbols = list(historical_data)
+        self.symbols = [s for s in symbols if s in historical_data and not historical_data[s].empty]
+
+        prices = [historical_data[s][column].to_numpy(dtype=np.float64) for s in self.symbols]
+        self.lengths = np.array([len(p) for p in prices], dtype=np.int64)
+        self.bars = int(self.lengths.max()) if len(prices) else 0
+
+        self.closes = np.full((self.bars, len(prices)), np.nan)
+        for col, values in enumerate(prices):
+            self.closes[self.bars - len(values):, col] = values
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def year_cube(self, years: int, days: int = TRADING_DAYS_PER_YEAR,
+                  days_per_year: int = TRADING_DAYS_PER_YEAR) -> np.ndarray:
+        """Closes of the past years, starting at each yearly anniversary
+
+        Args:
+            years (int): Number of past years
+            days (int): Bars per year slice (may exceed days_per_year)
+            days_per_year (int): Bars between anniversaries
+
+        Returns:
+            np.ndarray: years x days x symbols; cube[i, d] is the bar
+                (i + 1) * days_per_year - d bars before the end, NaN before
+                the history or past the last bar
+        """
+        rows = self.bars - (np.arange(1, years + 1)[:, None] * days_per_year) + np.arange(days)[None, :]
+        inside = (rows >= 0) & (rows < self.bars)
+        cube = self.closes[np.clip(rows, 0, max(self.bars - 1, 0))]
+        cube[~inside] = np.nan
+        return cube
+
+    def win_rates(self, lookback_years: Sequence[int], forward_days: int = 90,
+                  days_per_year: int = TRADING_DAYS_PER_YEAR) -> Dict[str, np.ndarray]:
+        """Win rate and average forward return for every lookback horizon
+
+        Matches SeasonalityAnalyzer.calculate_win_rate: the forward return of
+        year i is taken from (i + 1) * days_per_year bars before the end, the
+        direction follows the sign of the mean return and the win rate counts
+        the years that moved in that direction.
+
+        Args:
+            lookback_years (list): Horizons in years
+            forward_days (int): Bars of each forward return
+            days_per_year (int): Bars between anniversaries
+
+        Returns:
+            dict: 'win_rate', 'avg_return' (absolute mean), 'long' (bool) and
+                'samples', each len(lookback_years) x symbols
+        """
+        horizons = np.maximum(np.asarray(lookback_years, dtype=np.int64), 0)
+        shape = (len(horizons), len(self.symbols))
+        years = int(horizons.max()) if len(horizons) else 0
+        if years == 0 or self.bars == 0:
+            return {'win_rate': np.zeros(shape), 'avg_return': np.zeros(shape),
+                    'long': np.ones(shape, dtype=bool), 'samples': np.zeros(shape, dtype=np.int64)}
+
+        cube = self.year_cube(years, forward_days + 1, days_per_year)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            returns = (cube[:, forward_days] - cube[:, 0]) / cube[:, 0]
+
+        # A year counts while a full forward window ends before the last bar
+        offsets = np.arange(1, years + 1)[:, None] * days_per_year
+        valid = (offsets + forward_days <= self.lengths[None, :]) & (offsets > forward_days)
+        returns = np.where(valid, returns, 0.0)
+
+        # Running totals over the years with a leading zero row; horizon h reads row h
+        def totals_by_horizon(values):
+            running = np.cumsum(values, axis=0)
+            return np.concatenate([np.zeros_like(running[:1]), running])[horizons]
+
+        samples = totals_by_horizon(valid.astype(np.int64))
+        totals = totals_by_horizon(returns)
+        ups = totals_by_horizon(valid & (returns > 0))
+        downs = totals_by_horizon(valid & (returns < 0))
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = totals / samples
+            long = mean > 0
+            win_rate = np.where(long, ups, downs) / samples
+        empty = samples == 0
+        return {
+            'win_rate': np.where(empty, 0.0, win_rate),
+            'avg_return': np.where(empty, 0.0, np.abs(mean)),
+            'long': long | empty,
+            'samples': samples,
+        }
+
+    def seasonal_correlations(self, lookback_years: Sequence[int], window_days: int = 90,
+                              days_per_lookback_year: int = 365) -> np.ndarray:
+        """Correlation of the latest window with the same window in past years
+
+        Matches SeasonalityAnalyzer.calculate_seasonal_correlation: the
+        historical window of a y-year lookback starts
+        days_per_lookback_year * y + window_days bars before the end.
+
+        Args:
+            lookback_years (list): Horizons in years
+            window_days (int): Bars per window
+            days_per_lookback_year (int): Bars per lookback year
+
+        Returns:
+            np.ndarray: len(lookback_years) x symbols correlations, NaN where
+                the history is too short or a window is flat
+        """
+        horizons = np.asarray(lookback_years, dtype=np.int64)
+        result = np.full((len(horizons), len(self.symbols)), np.nan)
+        if self.bars <= window_days or len(horizons) == 0:
+            return result
+
+        offsets = days_per_lookback_year * horizons + window_days
+        usable = offsets < self.bars
+        steps = np.arange(window_days)
+
+        current = self.closes[self.bars - window_days:]
+        history = self.closes[(self.bars - offsets[usable])[:, None] + steps[None, :]]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            # Normalized like the per-symbol windows (change since the first bar)
+            current = current / current[0] - 1
+            history = history / history[:, :1] - 1
+            x = current - current.mean(axis=0)
+            y = history - history.mean(axis=1, keepdims=True)
+            corr = (x[None] * y).sum(axis=1) / np.sqrt((x * x).sum(axis=0)[None] * (y * y).sum(axis=1))
+
+        # Lookbacks reaching before a symbol's first bar have no correlation
+        enough = self.lengths[None, :] > offsets[usable][:, None]
+        result[usable] = np.where(enough, np.clip(corr, -1.0, 1.0), np.nan)
+        return result
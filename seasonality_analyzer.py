@@ -18,6 +18,8 @@ import time
 from enum import Enum
 import os
 from typing import Dict, List, Tuple, Optional, Union
+from historical_data_store import get_data_store
+from seasonal_cube import SeasonalReturnCube, DEFAULT_LOOKBACK_YEARS
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -71,6 +73,9 @@ class SeasonalityAnalyzer:
             self.api_key = credentials['paper']['api_key']
             self.api_secret = credentials['paper']['api_secret']
             
+            # Shared batched data layer with an on-disk Parquet cache
+            self.data_store = get_data_store(self.api_key, self.api_secret)
+            
             logging.info("Successfully initialized Alpaca client")
             
         except Exception as e:
@@ -106,7 +111,10 @@ class SeasonalityAnalyzer:
                              start_date: str,
                              end_date: str = None,
                              timeframe: str = "1Day") -> Dict[str, pd.DataFrame]:
-        """Fetch historical data for all stocks in the universe using REST API
+        """Fetch historical data for all stocks in the universe
+        
+        Bars come from the shared historical data store, which batches symbols
+        into multi-symbol requests and only fetches days missing from its cache.
         
         Args:
             start_date (str): Start date in format 'YYYY-MM-DD'
@@ -126,121 +134,20 @@ class SeasonalityAnalyzer:
             
         logging.info(f"Fetching historical data from {start_date} to {end_date} for {len(self.universe)} symbols")
         
-        # Base URL for the Alpaca Data API
-        base_url = "https://data.alpaca.markets/v2"
-        
-        # Headers for authentication
-        headers = {
-            "APCA-API-KEY-ID": self.api_key,
-            "APCA-API-SECRET-KEY": self.api_secret
-        }
-        
-        # Format dates for API
-        start = pd.Timestamp(start_date, tz='America/New_York').isoformat()
-        end = pd.Timestamp(end_date, tz='America/New_York').isoformat()
+        try:
+            # One batched request for the whole universe; cached days are not fetched again
+            bars = self.data_store.get_bars(self.universe, start_date, end_date, timeframe)
+        except Exception as e:
+            logging.error(f"Exception fetching historical data: {e}")
+            bars = {}
         
-        # Process symbols one by one
         for symbol in self.universe:
-            try:
-                logging.info(f"Fetching data for {symbol}...")
-                
-                # Construct URL for bars endpoint
-                url = f"{base_url}/stocks/{symbol}/bars"
-                
-                # Parameters for the request
-                params = {
-                    "start": start,
-                    "end": end,
-                    "timeframe": timeframe,
-                    "adjustment": "all",
-                    "limit": 10000  # Maximum limit
-                }
-                
-                # Make the request
-                response = requests.get(url, headers=headers, params=params)
-                
-                # Check if request was successful
-                if response.status_code == 200:
-                    data = response.json()
-                    bars = data.get('bars', [])
-                    
-                    if bars:
-                        # Convert to DataFrame
-                        df = pd.DataFrame(bars)
-                        
-                        # Convert timestamp to datetime and set as index
-                        df['t'] = pd.to_datetime(df['t'])
-                        df = df.rename(columns={
-                            't': 'timestamp',
-                            'o': 'open',
-                            'h': 'high',
-                            'l': 'low',
-                            'c': 'close',
-                            'v': 'volume',
-                            'n': 'trade_count',
-                            'vw': 'vwap'
-                        })
-                        df.set_index('timestamp', inplace=True)
-                        
-                        # Store in cache
-                        self.historical_data[symbol] = df
-                        logging.info(f"Fetched {len(df)} bars for {symbol}")
-                        
-                        # Check if there's a next page token and fetch more data if needed
-                        next_page_token = data.get('next_page_token')
-                        while next_page_token:
-                            logging.info(f"Fetching more data for {symbol} (next_page_token: {next_page_token})")
-                            
-                            # Update params with next_page_token
-                            params['page_token'] = next_page_token
-                            
-                            # Make the request
-                            response = requests.get(url, headers=headers, params=params)
-                            
-                            if response.status_code == 200:
-                                data = response.json()
-                                more_bars = data.get('bars', [])
-                                
-                                if more_bars:
-                                    # Convert to DataFrame
-                                    more_df = pd.DataFrame(more_bars)
-                                    
-                                    # Convert timestamp to datetime and set as index
-                                    more_df['t'] = pd.to_datetime(more_df['t'])
-                                    more_df = more_df.rename(columns={
-                                        't': 'timestamp',
-                                        'o': 'open',
-                                        'h': 'high',
-                                        'l': 'low',
-                                        'c': 'close',
-                                        'v': 'volume',
-                                        'n': 'trade_count',
-                                        'vw': 'vwap'
-                                    })
-                                    more_df.set_index('timestamp', inplace=True)
-                                    
-                                    # Append to existing DataFrame
-                                    self.historical_data[symbol] = pd.concat([self.historical_data[symbol], more_df])
-                                    logging.info(f"Fetched additional {len(more_df)} bars for {symbol}")
-                                
-                                # Update next_page_token
-                                next_page_token = data.get('next_page_token')
-                            else:
-                                logging.error(f"Error fetching more data for {symbol}: {response.status_code} - {response.text}")
-                                break
-                            
-                            # Add a small delay to avoid rate limiting
-                            time.sleep(0.5)
-                    else:
-                        logging.warning(f"No bars returned for {symbol}")
-                else:
-                    logging.error(f"Error fetching data for {symbol}: {response.status_code} - {response.text}")
-            
-            except Exception as e:
-                logging.error(f"Exception fetching data for {symbol}: {e}")
-            
-            # Add a small delay to avoid rate limiting
-            time.sleep(1)
+            if symbol in bars:
+                # Store in cache
+                self.historical_data[symbol] = bars[symbol]
+                logging.info(f"Fetched {len(bars[symbol])} bars for {symbol}")
+            else:
+                logging.warning(f"No bars returned for {symbol}")
         
         # Check if we got any data
         if not self.historical_data:
@@ -295,7 +202,8 @@ class SeasonalityAnalyzer:
                 
                 # Calculate correlation
                 if len(current_norm) == len(historical_norm):
-                    correlation = current_norm.corr(historical_norm)
+                    # Compare day by day; the windows have different dates
+                    correlation = current_norm.reset_index(drop=True).corr(historical_norm.reset_index(drop=True))
                     correlations[years] = correlation
                 else:
                     logging.warning(f"Window size mismatch for {symbol} with {years} years lookback")
@@ -325,7 +233,7 @@ class SeasonalityAnalyzer:
             logging.warning(f"No historical data for {symbol}. Fetch data first.")
             return 0.0, 0.0, TradeDirection.LONG
             
-        df = self.historical_data[symbol].copy()
+        df = self.historical_data[symbol]
         
         # Calculate how many samples we can get
         days_per_year = 252  # Trading days
@@ -379,17 +287,83 @@ class SeasonalityAnalyzer:
     def analyze_seasonality(self, 
                            forward_days: int = 90,
                            min_correlation: float = 0.7,
-                           min_win_rate: float = 0.6) -> List[Dict]:
+                           min_win_rate: float = 0.6,
+                           batch: bool = True) -> List[Dict]:
         """Analyze seasonality for all stocks in the universe
         
         Args:
             forward_days (int, optional): Days to look forward for return calculation. Defaults to 90.
             min_correlation (float, optional): Minimum correlation to consider. Defaults to 0.7.
             min_win_rate (float, optional): Minimum win rate to consider. Defaults to 0.6.
+            batch (bool, optional): Analyze the whole universe at once with a
+                SeasonalReturnCube instead of symbol by symbol. Defaults to True.
             
         Returns:
             List[Dict]: List of dictionaries with seasonality analysis results
         """
+        if batch:
+            results = self._analyze_seasonality_batch(forward_days, min_correlation, min_win_rate)
+        else:
+            results = self._analyze_seasonality_per_symbol(forward_days, min_correlation, min_win_rate)
+            
+        # Sort by combined score (correlation * win_rate * avg_return)
+        for result in results:
+            result['score'] = (result['best_correlation'] * result['win_rate'] * result['avg_return']) / 10000
+            
+        results.sort(key=lambda x: x['score'], reverse=True)
+        
+        return results
+    
+    def _analyze_seasonality_batch(self,
+                                   forward_days: int,
+                                   min_correlation: float,
+                                   min_win_rate: float) -> List[Dict]:
+        """Seasonality results of the whole universe from array reductions
+        
+        Correlations and win rates of every lookback horizon are computed for
+        all symbols at once; the selection matches the per-symbol analysis.
+        """
+        cube = SeasonalReturnCube(self.historical_data, self.universe)
+        if not len(cube):
+            return []
+            
+        lookbacks = np.asarray(DEFAULT_LOOKBACK_YEARS)
+        correlations = cube.seasonal_correlations(lookbacks, window_days=forward_days)
+        stats = cube.win_rates(lookbacks, forward_days=forward_days)
+        
+        # Best horizon per symbol (first one on ties, like max())
+        has_correlation = ~np.isnan(correlations).all(axis=0)
+        best = np.argmax(np.where(np.isnan(correlations), -np.inf, correlations), axis=0)
+        columns = np.arange(len(cube))
+        best_correlation = correlations[best, columns]
+        win_rate = stats['win_rate'][best, columns]
+        avg_return = stats['avg_return'][best, columns]
+        long = stats['long'][best, columns]
+        
+        selected = has_correlation & (best_correlation >= min_correlation) & (win_rate >= min_win_rate)
+        logging.info(f"Analyzed seasonality of {len(cube)} symbols, {int(selected.sum())} meet the criteria")
+        
+        today = datetime.now()
+        open_date = today.strftime('%m/%d/%Y')
+        close_date = (today + timedelta(days=forward_days)).strftime('%m/%d/%Y')
+        
+        return [{
+            'symbol': cube.symbols[col],
+            'best_correlation': float(best_correlation[col]) * 100,
+            'correlation_years': int(lookbacks[best[col]]),
+            'direction': (TradeDirection.LONG if long[col] else TradeDirection.SHORT).value,
+            'win_rate': float(win_rate[col]) * 100,
+            'avg_return': float(avg_return[col]) * 100,
+            'open_date': open_date,
+            'close_date': close_date,
+            'forward_days': forward_days
+        } for col in np.flatnonzero(selected)]
+    
+    def _analyze_seasonality_per_symbol(self,
+                                        forward_days: int,
+                                        min_correlation: float,
+                                        min_win_rate: float) -> List[Dict]:
+        """Seasonality results computed symbol by symbol"""
         results = []
         
         for symbol in self.universe:
@@ -437,12 +411,6 @@ class SeasonalityAnalyzer:
             
             results.append(result)
             
-        # Sort by combined score (correlation * win_rate * avg_return)
-        for result in results:
-            result['score'] = (result['best_correlation'] * result['win_rate'] * result['avg_return']) / 10000
-            
-        results.sort(key=lambda x: x['score'], reverse=True)
-        
         return results
     
     def get_top_opportunities(self, 
@@ -524,7 +492,7 @@ class SeasonalityAnalyzer:
         historical_norm = (historical_window / historical_window.iloc[0]) - 1
         
         # Calculate correlation
-        correlation = current_norm.corr(historical_norm)
+        correlation = current_norm.reset_index(drop=True).corr(historical_norm.reset_index(drop=True))
         
         # Plot
         plt.figure(figsize=(12, 6))
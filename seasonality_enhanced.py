@@ -11,11 +11,15 @@ import numpy as np
 import logging
 import yaml
 import os
+import json
+import hashlib
 from datetime import datetime, timedelta
 import matplotlib.pyplot as plt
 import seaborn as sns
 from typing import Dict, List, Tuple, Optional, Union
 
+from seasonality_tensor import SeasonalityTensor, day_of_year_slots
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -139,6 +143,10 @@ class SeasonalityEnhanced:
         self.sector_data = SECTOR_MAPPING
         self.sector_seasonality = SECTOR_SEASONALITY
         
+        # Dense symbol x day-of-year scores, compiled on first batch query
+        self._score_tensor = None
+        self._score_tensor_inputs = None
+        
         logger.info(f"Initialized enhanced seasonality analyzer with data for {len(self.seasonality_data)} symbols")
         logger.debug(f"Using stock influence: {self.stock_influence}, sector influence: {self.sector_influence}")
     
@@ -272,6 +280,118 @@ class SeasonalityEnhanced:
         
         return combined_score
     
+    def _monthly_weight_multipliers(self) -> np.ndarray:
+        """
+        Score multiplier per month (index 0 = January) from the configured monthly weights.
+        
+        Returns:
+            np.ndarray: 12 multipliers (1.0 for months without a weight)
+        """
+        multipliers = np.ones(12)
+        if self.config and 'seasonality' in self.config:
+            monthly_weights = self.config['seasonality'].get('monthly_weights') or {}
+            for month in range(1, 13):
+                if month in monthly_weights:
+                    multipliers[month - 1] = monthly_weights.get(month, 1.0) / 0.4
+        return multipliers
+    
+    def _monthly_score_matrix(self, symbols: List[str]) -> np.ndarray:
+        """
+        Seasonal scores of symbols per month, computed like get_seasonal_score.
+        
+        Args:
+            symbols (list): Symbols to score
+            
+        Returns:
+            np.ndarray: (len(symbols) + 1) x 12 scores; the last row is the
+                score of a symbol without stock or sector data
+        """
+        stock = np.full((len(symbols) + 1, 12), 0.5)
+        sector = np.full((len(symbols) + 1, 12), 0.5)
+        for row, symbol in enumerate(symbols):
+            symbol_data = self.seasonality_data.get(symbol) or {}
+            symbol_sector = self.sector_data.get(symbol, None)
+            for month in range(1, 13):
+                monthly_data = symbol_data.get(str(month))
+                if monthly_data is not None:
+                    win_rate = monthly_data.get('win_rate', 0.5)
+                    avg_return = monthly_data.get('avg_return', 0)
+                    normalized_return = min(max(avg_return / 0.05 + 0.5, 0), 1)
+                    stock[row, month - 1] = (win_rate * 0.6) + (normalized_return * 0.4)
+                if symbol_sector and month in self.sector_seasonality:
+                    if symbol_sector in self.sector_seasonality[month]['best']:
+                        sector[row, month - 1] = 0.8
+                    elif symbol_sector in self.sector_seasonality[month]['worst']:
+                        sector[row, month - 1] = 0.2
+        
+        combined = (stock * self.stock_influence + sector * self.sector_influence) * self._monthly_weight_multipliers()
+        return np.clip(combined, 0, 1)
+    
+    def _score_tensor_key(self) -> str:
+        """
+        Key of everything the compiled scores depend on.
+        
+        Returns:
+            str: Hex digest; changes when the data, weights or mappings change
+        """
+        parts = [
+            self.seasonality_data,
+            float(self.stock_influence),
+            float(self.sector_influence),
+            self._monthly_weight_multipliers().tolist(),
+            self.sector_data,
+            self.sector_seasonality
+        ]
+        return hashlib.sha1(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()
+    
+    def _score_tensor_file(self) -> str:
+        """Path of the saved score tensor (configurable as seasonality.score_tensor_file)"""
+        if self.config and 'seasonality' in self.config and self.config['seasonality'].get('score_tensor_file'):
+            return self.config['seasonality']['score_tensor_file']
+        return os.path.splitext(str(self.seasonality_file))[0] + '_scores.npy'
+    
+    @property
+    def score_tensor(self) -> SeasonalityTensor:
+        """
+        Seasonal scores of all known symbols by day of year.
+        
+        Loaded memory-mapped from the score tensor file when it was compiled
+        from the same data and weights, otherwise compiled and saved there.
+        Recompiled when the data, influences or monthly weights change.
+        """
+        inputs = (id(self.seasonality_data), float(self.stock_influence), float(self.sector_influence),
+                  tuple(self._monthly_weight_multipliers()))
+        if self._score_tensor is not None and self._score_tensor_inputs == inputs:
+            return self._score_tensor
+        
+        key = self._score_tensor_key()
+        path = self._score_tensor_file()
+        tensor = SeasonalityTensor.load(path, key=key)
+        if tensor is None:
+            symbols = sorted(set(self.seasonality_data) | set(self.sector_data))
+            tensor = SeasonalityTensor.from_monthly(symbols, self._monthly_score_matrix(symbols), key)
+            try:
+                tensor.save(path)
+            except OSError as e:
+                logger.warning(f"Could not save seasonality scores to {path}: {e}")
+        self._score_tensor = tensor
+        self._score_tensor_inputs = inputs
+        return tensor
+    
+    def get_seasonal_scores(self, symbols: List[str], dates) -> np.ndarray:
+        """
+        Seasonal scores of many symbols on one or many dates in a single lookup.
+        
+        Args:
+            symbols (list): Stock symbols
+            dates: A date, or a sequence of dates (e.g. a DatetimeIndex)
+            
+        Returns:
+            np.ndarray: float32 scores between 0 and 1, shaped (symbols,) for
+                one date and (symbols, dates) otherwise
+        """
+        return self.score_tensor.scores(symbols, dates)
+    
     def _get_stock_seasonal_score(self, symbol: str, month: int, day: int) -> float:
         """
         Get seasonal score for a specific stock based on historical performance.
@@ -342,10 +462,7 @@ class SeasonalityEnhanced:
         Returns:
             list: List of tuples (symbol, score) for top seasonal stocks
         """
-        scores = []
-        for symbol in symbols:
-            score = self.get_seasonal_score(symbol, date)
-            scores.append((symbol, score))
+        scores = list(zip(symbols, self.get_seasonal_scores(symbols, date).tolist()))
         
         # Sort by score in descending order
         scores.sort(key=lambda x: x[1], reverse=True)
@@ -365,14 +482,10 @@ class SeasonalityEnhanced:
             list: Filtered list of signals
         """
         filtered_signals = []
+        signals = [signal for signal in signals if signal.get('symbol')]
+        scores = self.get_seasonal_scores([signal['symbol'] for signal in signals], date).tolist()
         
-        for signal in signals:
-            symbol = signal.get('symbol')
-            if not symbol:
-                continue
-                
-            score = self.get_seasonal_score(symbol, date)
-            
+        for signal, score in zip(signals, scores):
             # Add seasonality score to the signal
             signal['seasonality_score'] = score
             
@@ -393,13 +506,10 @@ class SeasonalityEnhanced:
         Returns:
             list: List of signals with adjusted weights
         """
-        for signal in signals:
-            symbol = signal.get('symbol')
-            if not symbol:
-                continue
-                
-            score = self.get_seasonal_score(symbol, date)
-            
+        scored = [signal for signal in signals if signal.get('symbol')]
+        scores = self.get_seasonal_scores([signal['symbol'] for signal in scored], date).tolist()
+        
+        for signal, score in zip(scored, scores):
             # Add seasonality score to the signal
             signal['seasonality_score'] = score
             
@@ -428,13 +538,13 @@ class SeasonalityEnhanced:
         os.makedirs(output_dir, exist_ok=True)
         
         # Add month to trades
-        trades['month'] = pd.to_datetime(trades['timestamp']).dt.month
+        timestamps = pd.to_datetime(trades['timestamp'])
+        trades['month'] = timestamps.dt.month
         
-        # Calculate seasonality score for each trade
-        trades['seasonality_score'] = trades.apply(
-            lambda x: self.get_seasonal_score(x['symbol'], pd.to_datetime(x['timestamp'])), 
-            axis=1
-        )
+        # Calculate seasonality score for each trade (one gather over all trades)
+        tensor = self.score_tensor
+        slots = day_of_year_slots(timestamps)
+        trades['seasonality_score'] = tensor.values[tensor.rows(trades['symbol']), slots].astype(float)
         
         # Group trades by seasonality score
         high_seasonality = trades[trades['seasonality_score'] >= 0.7]
@@ -0,0 +1,172 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Seasonality Score Tensor
+-------------------------------------
+Seasonal scores compiled into a dense float32 array of symbols x day-of-year.
+
+Day-of-year slots follow a leap-year calendar (366 slots, February 29 is
+slot 59), so a date maps to the same slot in every year. The last row holds
+the scores of symbols without seasonality data. Scoring any universe over
+any date range is then one gather: ``scores[rows[:, None], slots[None, :]]``.
+
+Tensors are saved as a .npy file named by the key of the inputs they were
+compiled from, with a JSON sidecar (symbols, key and that file name), and
+loaded memory-mapped, so backtest processes share the pages instead of each
+recompiling the scores.
+
+Usage:
+    tensor = SeasonalityTensor.from_monthly(symbols, month_scores, key)
+    tensor.save('output/seasonal_scores.npy')
+    tensor = SeasonalityTensor.load('output/seasonal_scores.npy', key=key)
+    scores = tensor.scores(['AAPL', 'MSFT'], pd.date_range('2023-01-01', '2023-12-31'))
+"""
+
+import hashlib
+import json
+import logging
+import os
+from typing import Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger("SeasonalityTensor")
+
+DAYS_PER_YEAR = 366
+
+# First slot of every month in a leap year
+_MONTH_START = np.cumsum([0, 31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30])
+
+# Month (1-12) of every slot
+SLOT_MONTHS = np.repeat(np.arange(1, 13), np.diff(np.append(_MONTH_START, DAYS_PER_YEAR)))
+
+DateLike = Union[pd.Timestamp, str, "np.datetime64", Sequence]
+
+
+def day_of_year_slots(dates: DateLike) -> np.ndarray:
+    """Slot (0-365) of each date in the leap-year calendar
+
+    Args:
+        dates: A date or a sequence/index of dates
+
+    Returns:
+        np.ndarray: Slot per date (0-d for a single date)
+    """
+    if np.ndim(dates) == 0:
+        date = pd.Timestamp(dates)
+        return np.asarray(_MONTH_START[date.month - 1] + date.day - 1)
+    index = pd.DatetimeIndex(dates)
+    return _MONTH_START[index.month.to_numpy() - 1] + index.day.to_numpy() - 1
+
+
+def _read_sidecar(path: str) -> Optional[dict]:
+    """Symbols, key and scores file name saved for path (None if missing)"""
+    try:
+        with open(path + ".json", 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        logger.debug(f"No seasonality sidecar at {path}: {e}")
+        return None
+
+
+class SeasonalityTensor:
+    """Dense float32 seasonal scores of a symbol universe by day of year"""
+
+    def __init__(self, symbols: Sequence[str], values: np.ndarray, key: str = ""):
+        """Initialize the tensor
+
+        Args:
+            symbols (list): Symbols of the first len(symbols) rows
+            values (np.ndarray): (len(symbols) + 1) x 366 scores; the last
+                row is used for symbols without data
+            key (str): Identifies the inputs the scores were compiled from
+        """
+        if values.shape != (len(symbols) + 1, DAYS_PER_YEAR):
+            raise ValueError(f"Expected {(len(symbols) + 1, DAYS_PER_YEAR)} scores, got {values.shape}")
+        self.symbols = list(symbols)
+        self.values = values
+        self.key = key
+        self._index = pd.Index(self.symbols)
+
+    @classmethod
+    def from_monthly(cls, symbols: Sequence[str], month_scores: np.ndarray, key: str = "") -> 'SeasonalityTensor':
+        """Expand (symbols + 1) x 12 monthly scores to day-of-year slots"""
+        month_scores = np.asarray(month_scores, dtype=np.float32)
+        return cls(symbols, np.ascontiguousarray(month_scores[:, SLOT_MONTHS - 1]), key)
+
+    def rows(self, symbols: Sequence[str]) -> np.ndarray:
+        """Row of each symbol (the default row for unknown symbols)"""
+        rows = self._index.get_indexer(list(symbols))
+        rows[rows < 0] = len(self.symbols)
+        return rows
+
+    def scores(self, symbols: Sequence[str], dates: DateLike) -> np.ndarray:
+        """Scores of symbols on dates
+
+        Args:
+            symbols (list): Symbols to score
+            dates: A date, or a sequence of dates
+
+        Returns:
+            np.ndarray: len(symbols) scores for a single date, otherwise
+                len(symbols) x len(dates)
+        """
+        slots = day_of_year_slots(dates)
+        rows = self.rows(symbols)
+        if slots.ndim == 0:
+            return self.values[rows, int(slots)]
+        return self.values[rows[:, None], slots[None, :]]
+
+    def _values_file(self, path: str) -> str:
+        """Scores file of this key and symbol list next to path"""
+        digest = hashlib.sha1(json.dumps([self.key, self.symbols]).encode()).hexdigest()[:16]
+        root, ext = os.path.splitext(path)
+        return f"{root}.{digest}{ext or '.npy'}"
+
+    def save(self, path: str):
+        """Write the scores (.npy named by key) and the symbols and key (.json sidecar)"""
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        previous = _read_sidecar(path)
+        values_file = self._values_file(path)
+        # Write next to the targets, then swap in (readers never see partial files).
+        # The sidecar is swapped in last and names the scores file it belongs to,
+        # so a concurrent load never pairs new scores with an old symbol list.
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, 'wb') as f:
+            np.save(f, np.asarray(self.values, dtype=np.float32))
+        os.replace(temporary, values_file)
+        with open(temporary, 'w') as f:
+            json.dump({'key': self.key, 'symbols': self.symbols, 'values': os.path.basename(values_file)}, f)
+        os.replace(temporary, path + ".json")
+        if previous and previous.get('values') and previous['values'] != os.path.basename(values_file):
+            try:
+                os.remove(os.path.join(directory, previous['values']))
+            except OSError:
+                pass
+        logger.info(f"Saved seasonality scores for {len(self.symbols)} symbols to {values_file}")
+
+    @classmethod
+    def load(cls, path: str, key: Optional[str] = None) -> Optional['SeasonalityTensor']:
+        """Memory-map a saved tensor
+
+        Args:
+            path (str): Path passed to save()
+            key (str): Expected key; a tensor compiled from other inputs is
+                not returned
+
+        Returns:
+            SeasonalityTensor: The tensor, or None if missing or stale
+        """
+        meta = _read_sidecar(path)
+        if meta is None or (key is not None and meta.get('key') != key):
+            return None
+        try:
+            values = np.load(os.path.join(os.path.dirname(os.path.abspath(path)), meta['values']), mmap_mode='r')
+            # Also rejects a scores file that does not match the symbol list
+            return cls(meta['symbols'], values, meta.get('key', ""))
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.debug(f"No usable seasonality scores at {path}: {e}")
+            return None
@@ -0,0 +1,200 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Sector Index
+-------------------------------------
+Symbol -> sector -> sector ETF lookups shared by the strategies.
+
+The metadata lives in a YAML file (sector_map.yaml next to this module by
+default) and is loaded once into dictionaries, so a lookup is a single hash
+probe. Whole universes can be looked up at once as arrays. The file is
+checked for changes at most every few seconds and reloaded when it changes;
+a file that fails to parse leaves the previous mapping in place.
+
+Usage:
+    index = get_sector_index()
+    index.sector('AAPL')                      # 'Technology'
+    index.symbol_etf('JPM')                   # 'XLF'
+    sectors = index.sectors(['AAPL', 'XOM'])  # array(['Technology', 'Energy'])
+"""
+
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import yaml
+
+logger = logging.getLogger("SectorIndex")
+
+DEFAULT_SECTOR_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sector_map.yaml")
+
+# Shared indexes, one per metadata file
+_indexes: Dict[str, "SectorIndex"] = {}
+_indexes_lock = threading.Lock()
+
+
+class _SectorTables:
+    """One loaded version of the metadata file"""
+
+    def __init__(self, sectors: Dict[str, str], etfs: Dict[str, str],
+                 prefixes: List[Tuple[Tuple[str, ...], str]]):
+        self.sectors = sectors
+        self.etfs = etfs
+        self.prefixes = prefixes
+        # Sectors found through a prefix, remembered per symbol
+        self.inferred: Dict[str, Optional[str]] = {}
+        # Vectorised lookups: symbol position -> sector
+        self.symbol_index = pd.Index(list(sectors))
+        self.symbol_sectors = np.array(list(sectors.values()), dtype=object)
+
+
+def _parse(document: Dict) -> _SectorTables:
+    """Build lookup tables from the parsed YAML document"""
+    sectors = {}
+    etfs = {}
+    for sector, entry in (document.get("sectors") or {}).items():
+        if entry.get("etf"):
+            etfs[sector] = str(entry["etf"])
+        for symbol in entry.get("symbols") or []:
+            symbol = str(symbol)
+            if symbol in sectors and sectors[symbol] != sector:
+                logger.warning(f"{symbol} is listed in {sectors[symbol]} and {sector}, keeping {sectors[symbol]}")
+                continue
+            sectors[symbol] = sector
+
+    prefixes = [(tuple(str(prefix) for prefix in rule.get("prefixes") or []), rule["sector"])
+                for rule in document.get("prefixes") or []]
+    return _SectorTables(sectors, etfs, prefixes)
+
+
+class SectorIndex:
+    """O(1) sector and sector ETF lookups backed by a hot-reloaded file"""
+
+    def __init__(self, path: str = DEFAULT_SECTOR_FILE, check_interval: float = 5.0):
+        """Initialize the index and load the file
+
+        Args:
+            path (str): YAML file with 'sectors' and 'prefixes'
+            check_interval (float): Minimum seconds between checks of the
+                file's modification time
+        """
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._stamp = ()
+        self._checked = 0.0
+        self._tables = _SectorTables({}, {}, [])
+        self.reload()
+
+    def _file_stamp(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def reload(self) -> bool:
+        """Load the file if it changed since the last load
+
+        Returns:
+            bool: True if a new version was loaded
+        """
+        with self._lock:
+            self._checked = time.monotonic()
+            stamp = self._file_stamp()
+            if stamp == self._stamp:
+                return False
+            if stamp is None:
+                logger.warning(f"Sector file {self.path} not found, keeping the previous version")
+                self._stamp = None
+                return False
+            try:
+                with open(self.path, "r") as file:
+                    tables = _parse(yaml.safe_load(file) or {})
+            except Exception as e:
+                logger.error(f"Error loading sector file {self.path}, keeping the previous version: {str(e)}")
+                self._stamp = stamp
+                return False
+            self._tables = tables
+            self._stamp = stamp
+            logger.info(f"Loaded {len(tables.sectors)} symbols in {len(tables.etfs)} sectors from {self.path}")
+            return True
+
+    @property
+    def tables(self) -> _SectorTables:
+        """Current tables, reloading the file first if it may have changed"""
+        if time.monotonic() - self._checked >= self.check_interval:
+            self.reload()
+        return self._tables
+
+    def _infer(self, tables: _SectorTables, symbol: str) -> Optional[str]:
+        """Sector of an unlisted symbol from the prefix rules"""
+        if symbol not in tables.inferred:
+            tables.inferred[symbol] = next(
+                (sector for prefixes, sector in tables.prefixes if symbol.startswith(prefixes)), None)
+        return tables.inferred[symbol]
+
+    def sector(self, symbol: str, default: Optional[str] = None) -> Optional[str]:
+        """Sector of a symbol, or ``default`` if it is unknown"""
+        tables = self.tables
+        sector = tables.sectors.get(symbol)
+        if sector is None and tables.prefixes:
+            sector = self._infer(tables, symbol)
+        return sector if sector is not None else default
+
+    def etf(self, sector: Optional[str]) -> Optional[str]:
+        """ETF tracking a sector, None if there is none"""
+        return self.tables.etfs.get(sector)
+
+    def symbol_etf(self, symbol: str) -> Optional[str]:
+        """ETF tracking the sector of a symbol"""
+        return self.etf(self.sector(symbol))
+
+    @property
+    def sector_etfs(self) -> Dict[str, str]:
+        """ETF -> sector for every sector with an ETF"""
+        return {etf: sector for sector, etf in self.tables.etfs.items()}
+
+    def sectors(self, symbols: Sequence[str], default: Optional[str] = None) -> np.ndarray:
+        """Sectors of many symbols at once
+
+        Args:
+            symbols (list): Symbols to look up
+            default (str): Sector of unknown symbols
+
+        Returns:
+            ndarray: Object array of sectors, aligned with ``symbols``
+        """
+        tables = self.tables
+        symbols = list(symbols)
+        positions = tables.symbol_index.get_indexer(pd.Index(symbols, dtype=object))
+        found = positions >= 0
+        result = np.full(len(symbols), None, dtype=object)
+        result[found] = tables.symbol_sectors[positions[found]]
+        for i in np.flatnonzero(~found):
+            result[i] = self._infer(tables, symbols[i])
+        result[pd.isna(result)] = default
+        return result
+
+    def etfs(self, sectors: Sequence[Optional[str]]) -> np.ndarray:
+        """Sector ETFs of many sectors at once (None where there is none)"""
+        tables = self.tables
+        return np.array([tables.etfs.get(sector) for sector in sectors], dtype=object)
+
+
+def get_sector_index(path: Optional[str] = None) -> SectorIndex:
+    """Shared index per metadata file
+
+    Every caller in a process gets the same instance, so the file is parsed
+    once and reloads are seen everywhere.
+    """
+    path = os.path.abspath(path or DEFAULT_SECTOR_FILE)
+    with _indexes_lock:
+        if path not in _indexes:
+            _indexes[path] = SectorIndex(path)
+        return _indexes[path]
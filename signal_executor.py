@@ -0,0 +1,220 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Signal Executor
+-------------------------------------
+Runs the per-(symbol, strategy) generate_signals calls of a trading cycle
+serially, on a thread pool or on a process pool.
+
+A cycle is a list of SignalJobs in symbol/strategy order. Jobs are split
+into contiguous chunks, one task per chunk, and the results come back in
+job order whatever the mode, so merging them is deterministic and every
+mode produces the same signals as the serial loop.
+
+In process mode each chunk is pickled with its strategies and bar views
+(only the viewed rows are sent). While backtesting, share_bars() packs the
+replayed streams into one shared memory block that every worker attaches
+once; jobs over those streams then send only a (stream, rows) reference
+instead of the candle history. Indicator engines are not shipped: each
+worker process keeps its own engine across cycles (see
+IndicatorEngine.__reduce__). This mode pays off when evaluating a symbol
+costs more than sending its bars, i.e. for large universes with heavy
+strategies; threads only help where strategies spend their time in NumPy.
+
+Usage:
+    executor = SignalExecutor("process", max_workers=8)
+    executor.share_bars(streams)        # optional, for static backtest bars
+    jobs = [SignalJob(symbol, name, strategy, candles, stock_config), ...]
+    for result in executor.run(jobs, market_state):
+        ...
+    executor.close()
+"""
+
+import logging
+import math
+import os
+import traceback
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from bar_store import BarView
+from parameter_sweep import SharedBars
+
+logger = logging.getLogger("SignalExecutor")
+
+SERIAL = "serial"
+THREAD = "thread"
+PROCESS = "process"
+EXECUTOR_MODES = (SERIAL, THREAD, PROCESS)
+
+# Chunks per worker: enough to balance uneven symbols, few enough to keep
+# per-task overhead small
+CHUNKS_PER_WORKER = 4
+
+# Bars shared with this worker process: (shared memory block, stream columns)
+_worker_bars = None
+
+
+class SignalJob(NamedTuple):
+    """One generate_signals call"""
+    symbol: str
+    name: str
+    strategy: Any
+    candles: Any
+    stock_config: Any
+
+
+class SharedRows(NamedTuple):
+    """Rows [start, end) of a stream in the shared bar block, sent instead of a view"""
+    stream: str
+    start: int
+    end: int
+    candle_factory: Any
+
+
+class SignalResult(NamedTuple):
+    """Signals of one job, or the error it raised"""
+    symbol: str
+    name: str
+    signals: List
+    error: Optional[str] = None
+    traceback: Optional[str] = None
+
+
+def evaluate_job(job: SignalJob, market_state: Any) -> SignalResult:
+    """Run one job, capturing its exception instead of raising it"""
+    try:
+        signals = job.strategy.generate_signals(
+            symbol=job.symbol,
+            candles=job.candles,
+            stock_config=job.stock_config,
+            market_state=market_state
+        )
+        return SignalResult(job.symbol, job.name, signals or [])
+    except Exception as e:
+        return SignalResult(job.symbol, job.name, [], str(e), traceback.format_exc())
+
+
+def _attach_bars(handle):
+    """Attach the shared bars once per worker process"""
+    global _worker_bars
+    _worker_bars = SharedBars.attach(handle)
+
+
+def _shared_view(rows: SharedRows) -> BarView:
+    """Zero-copy view of shared rows in a worker process"""
+    ts_ns, data, tz = _worker_bars[1][rows.stream]
+    span = slice(rows.start, rows.end)
+    return BarView(ts_ns[span], data[0, span], data[1, span], data[2, span], data[3, span],
+                   data[4, span], tz=tz, candle_factory=rows.candle_factory)
+
+
+def _evaluate_chunk(jobs: List[SignalJob], market_state: Any) -> List[SignalResult]:
+    return [evaluate_job(job._replace(candles=_shared_view(job.candles))
+                         if isinstance(job.candles, SharedRows) else job, market_state)
+            for job in jobs]
+
+
+class SignalExecutor:
+    """Pluggable executor for the signal generation fan-out"""
+
+    def __init__(self, mode: str = SERIAL, max_workers: Optional[int] = None):
+        """Initialize the executor (pools are started on first use)
+
+        Args:
+            mode (str): 'serial', 'thread' or 'process'
+            max_workers (int): Pool size, the number of CPUs by default
+        """
+        if mode not in EXECUTOR_MODES:
+            raise ValueError(f"Unknown signal executor mode '{mode}', expected one of {EXECUTOR_MODES}")
+        self.mode = mode
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._pool: Optional[Executor] = None
+        self._shared: Optional[SharedBars] = None
+        self._shared_ts: Dict[str, Any] = {}
+
+    def _get_pool(self) -> Executor:
+        if self._pool is None:
+            if self.mode == PROCESS:
+                if self._shared is not None:
+                    self._pool = ProcessPoolExecutor(max_workers=self.max_workers, initializer=_attach_bars,
+                                                     initargs=(self._shared.handle,))
+                else:
+                    self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="signals")
+            logger.info(f"Started {self.mode} pool with {self.max_workers} workers")
+        return self._pool
+
+    def run(self, jobs: List[SignalJob], market_state: Any) -> List[SignalResult]:
+        """Evaluate every job
+
+        Args:
+            jobs (list): Jobs in the order their results should be merged
+            market_state: Market state passed to every strategy
+
+        Returns:
+            List[SignalResult]: One result per job, in job order
+        """
+        if self.mode == SERIAL or len(jobs) <= 1 or self.max_workers == 1:
+            return _evaluate_chunk(jobs, market_state)
+
+        size = math.ceil(len(jobs) / (self.max_workers * CHUNKS_PER_WORKER))
+        pool = self._get_pool()
+        if self._shared is not None:
+            jobs = [self._share_job(job) for job in jobs]
+        futures = [pool.submit(_evaluate_chunk, jobs[i:i + size], market_state)
+                   for i in range(0, len(jobs), size)]
+
+        results = []
+        for future in futures:
+            results.extend(future.result())
+        return results
+
+    def share_bars(self, streams: Dict[str, Any]):
+        """Send jobs over these streams to the workers through shared memory
+
+        Only used in process mode. The streams must not change until
+        unshare_bars(); views of them that were taken before then are
+        replaced by row references, other candles are still pickled.
+
+        Args:
+            streams (dict): Symbol -> BarBuffer (BarStore items)
+        """
+        if self.mode != PROCESS:
+            return
+        # A running pool was started without the block
+        self.close()
+        self._shared = SharedBars(streams)
+        self._shared_ts = {name: buffer.columns[0] for name, buffer in streams.items()}
+        logger.info(f"Sharing {len(streams)} bar streams with the signal workers")
+
+    def unshare_bars(self):
+        """Stop sharing bars (restarts the process pool on the next run)"""
+        if self._shared is None:
+            return
+        self.close()
+
+    def _share_job(self, job: SignalJob) -> SignalJob:
+        """Replace a view into a shared stream by a reference to its rows"""
+        candles = job.candles
+        ts_ns = self._shared_ts.get(job.symbol)
+        if ts_ns is None or not isinstance(candles, BarView) or len(candles) == 0:
+            return job
+        # Locate the view inside the shared stream's timestamp column
+        start, remainder = divmod(candles.ts_ns.ctypes.data - ts_ns.ctypes.data, ts_ns.itemsize)
+        if remainder or start < 0 or start + len(candles) > len(ts_ns) or candles.ts_ns.strides != ts_ns.strides:
+            return job
+        rows = SharedRows(job.symbol, start, start + len(candles), candles._candle_factory)
+        return job._replace(candles=rows)
+
+    def close(self):
+        """Shut the pool down and stop sharing bars; the next run starts a new pool"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+        if self._shared is not None:
+            self._shared.close()
+            self._shared = None
+            self._shared_ts = {}
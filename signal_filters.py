@@ -0,0 +1,328 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Signal Filter Pipeline
+-------------------------------------
+Quality filters applied to a batch of signals at once.
+
+The signals of a cycle are sorted by score and turned into columns (symbol,
+strategy, price, score, sector, volume). Each filter stage takes the mask of
+signals still alive and returns the mask of those it keeps, so price, score
+and volume checks are single array comparisons and the sector, correlation
+and daily caps are cumulative counts over the survivors. The pipeline
+reports how many signals each stage rejected and how long it took.
+
+Sectors come from a symbol -> sector index built once from the stock
+configs, and the relative volume of a symbol is computed once per bar and
+cached, however many strategies signal on it.
+
+Stages run in the order given by the "filter_stages" entry of the signal
+quality filters (or the pipeline's default order); a stage only counts the
+signals that reached it, so reordering the caps changes which signals win.
+
+Usage:
+    pipeline = SignalFilterPipeline(config.stocks)
+    accepted, report = pipeline.run(signals, signal_quality_filters, bars=candle_data.get)
+    logger.info(report.summary())
+"""
+
+import functools
+import logging
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from bar_store import as_bars
+from tracing import get_tracer
+
+logger = logging.getLogger("SignalFilters")
+tracer = get_tracer("SignalFilters")
+
+UNKNOWN_SECTOR = "Unknown"
+
+# Stage order of MultiStrategySystem._filter_signals
+DEFAULT_STAGES = ("price", "volume", "sector", "daily")
+# Stage order of enhanced_trading_functions.filter_signals
+ENHANCED_STAGES = ("score", "price", "volume", "correlation", "sector", "daily")
+
+# Registered stages: name -> function(batch, alive, params) -> keep mask
+FILTER_STAGES: Dict[str, Callable] = {}
+
+
+def register_filter_stage(name: str) -> Callable:
+    """Decorator registering a filter stage under a name usable in "filter_stages"
+
+    A stage is called with the SignalBatch, the boolean mask of signals that
+    reached it and the signal quality filter parameters. It returns a
+    boolean mask; signals alive but not kept are rejected by the stage.
+    """
+    def decorator(function):
+        FILTER_STAGES[name] = function
+        return function
+    return decorator
+
+
+class SymbolMetadata:
+    """Symbol -> sector index over the configured stocks"""
+
+    def __init__(self, stocks: Sequence):
+        self.sector_by_symbol = {stock.symbol: stock.sector for stock in stocks}
+        self._symbols = pd.Index(list(self.sector_by_symbol))
+        self._sectors = np.array(list(self.sector_by_symbol.values()) + [UNKNOWN_SECTOR], dtype=object)
+
+    def sectors(self, symbols: np.ndarray) -> np.ndarray:
+        """Sector of every symbol, "Unknown" for symbols without a config"""
+        positions = self._symbols.get_indexer(symbols)
+        # -1 (not found) selects the trailing "Unknown" entry
+        return self._sectors[positions]
+
+
+class VolumeStats:
+    """Last volume and rolling mean volume per symbol, cached per bar"""
+
+    def __init__(self, window: int = 20):
+        self.window = window
+        # symbol -> (bar count, last timestamp, last volume, mean volume)
+        self._cache: Dict[str, Tuple[int, int, float, float]] = {}
+
+    def get(self, symbol: str, candles) -> Tuple[float, float]:
+        """Last and mean volume over the window (NaN without bars)
+
+        Args:
+            symbol (str): Symbol the candles belong to
+            candles: Bars of the symbol (BarView, BarBuffer or candle list)
+
+        Returns:
+            Tuple[float, float]: (last volume, mean volume)
+        """
+        count = len(candles) if candles is not None else 0
+        if count == 0:
+            return np.nan, np.nan
+
+        if isinstance(candles, (list, tuple)):
+            # Only convert the window of a candle list
+            candles = candles[-self.window:]
+        bars = as_bars(candles)
+        last_ts = int(bars.ts_ns[-1])
+        cached = self._cache.get(symbol)
+        if cached is not None and cached[0] == count and cached[1] == last_ts:
+            return cached[2], cached[3]
+
+        volume = bars.volume[-self.window:]
+        stats = (count, last_ts, float(volume[-1]), float(volume.mean()))
+        self._cache[symbol] = stats
+        return stats[2], stats[3]
+
+
+class SignalBatch:
+    """Signals of one filtering pass, sorted by score, as columns"""
+
+    def __init__(self, signals: Sequence, metadata: SymbolMetadata, volume_stats: VolumeStats,
+                 bars: Optional[Callable[[str], Any]] = None, context: Optional[Dict] = None):
+        raw_scores = np.array([getattr(signal, 'score', np.nan) for signal in signals], dtype=float)
+        # Highest score first; signals without a score rank as 0.5, ties keep their order
+        order = np.argsort(-np.where(np.isnan(raw_scores), 0.5, raw_scores), kind="stable")
+
+        self.signals = [signals[i] for i in order]
+        self.scores = raw_scores[order]
+        self.symbols = np.array([signal.symbol for signal in self.signals], dtype=object)
+        self.strategies = np.array([signal.strategy for signal in self.signals], dtype=object)
+        self.prices = np.array([signal.entry_price for signal in self.signals], dtype=float)
+        self.context = context or {}
+        self._metadata = metadata
+        self._volume_stats = volume_stats
+        self._bars = bars
+
+    def __len__(self) -> int:
+        return len(self.signals)
+
+    @functools.cached_property
+    def sectors(self) -> np.ndarray:
+        return self._metadata.sectors(self.symbols)
+
+    @functools.cached_property
+    def sector_codes(self) -> np.ndarray:
+        """Integer code per signal, equal for signals of the same sector"""
+        return np.unique(self.sectors.astype(str), return_inverse=True)[1]
+
+    @functools.cached_property
+    def volumes(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(last volume, mean volume) per signal, looked up once per symbol"""
+        unique, inverse = np.unique(self.symbols.astype(str), return_inverse=True)
+        last = np.full(len(unique), np.nan)
+        mean = np.full(len(unique), np.nan)
+        if self._bars is not None:
+            for i, symbol in enumerate(unique):
+                try:
+                    candles = self._bars(symbol)
+                except KeyError:
+                    continue
+                last[i], mean[i] = self._volume_stats.get(symbol, candles)
+        return last[inverse], mean[inverse]
+
+
+def _rank_within(codes: np.ndarray, alive: np.ndarray) -> np.ndarray:
+    """0-based position of each alive signal among the alive signals of its group"""
+    ranks = np.full(len(codes), -1)
+    rows = np.flatnonzero(alive)
+    order = np.argsort(codes[rows], kind="stable")
+    grouped = codes[rows][order]
+    # Position in the grouped order minus the position of the group's first member
+    ranks[rows[order]] = np.arange(len(rows)) - np.searchsorted(grouped, grouped)
+    return ranks
+
+
+@register_filter_stage("score")
+def _score_stage(batch: SignalBatch, alive: np.ndarray, params: Dict) -> np.ndarray:
+    """Score at least min_score_threshold (signals without a score pass)"""
+    threshold = params.get("min_score_threshold")
+    if threshold is None:
+        return alive
+    return np.isnan(batch.scores) | (batch.scores >= threshold)
+
+
+@register_filter_stage("price")
+def _price_stage(batch: SignalBatch, alive: np.ndarray, params: Dict) -> np.ndarray:
+    """Entry price at least min_price"""
+    return batch.prices >= params.get("min_price", 0.0)
+
+
+@register_filter_stage("volume")
+def _volume_stage(batch: SignalBatch, alive: np.ndarray, params: Dict) -> np.ndarray:
+    """Last volume at least min_relative_volume times the rolling mean"""
+    last, mean = batch.volumes
+    too_low = (mean > 0) & (last < mean * params.get("min_relative_volume", 0.5))
+    return ~too_low
+
+
+@register_filter_stage("sector")
+def _sector_stage(batch: SignalBatch, alive: np.ndarray, params: Dict) -> np.ndarray:
+    """At most max_sector_exposure * max_signals_per_day signals per sector"""
+    cap = int(params["max_sector_exposure"] * params["max_signals_per_day"])
+    return _rank_within(batch.sector_codes, alive) < cap
+
+
+@register_filter_stage("correlation")
+def _correlation_stage(batch: SignalBatch, alive: np.ndarray, params: Dict) -> np.ndarray:
+    """One symbol per known sector: the best-scored symbol blocks its sector peers"""
+    if params.get("max_correlation_threshold", 1.0) >= 1.0 or not alive.any():
+        return alive
+    codes = batch.sector_codes
+    rows = np.flatnonzero(alive)
+    sectors, first = np.unique(codes[rows], return_index=True)
+    leader = np.empty(codes.max() + 1, dtype=object)
+    leader[sectors] = batch.symbols[rows[first]]
+    return (batch.sectors == UNKNOWN_SECTOR) | (batch.symbols == leader[codes])
+
+
+@register_filter_stage("daily")
+def _daily_stage(batch: SignalBatch, alive: np.ndarray, params: Dict) -> np.ndarray:
+    """At most max_signals_per_day signals, best scored first"""
+    return np.cumsum(alive) <= params["max_signals_per_day"]
+
+
+@register_filter_stage("strategy_quality")
+def _strategy_quality_stage(batch: SignalBatch, alive: np.ndarray, params: Dict) -> np.ndarray:
+    """Historical profit factor and Sharpe ratio of the signal's strategy
+
+    Needs ``historical_performance`` (strategy -> metrics) in the batch
+    context; strategies without a history pass.
+    """
+    performance = batch.context.get("historical_performance") or {}
+    if not performance:
+        return alive
+    min_profit_factor = params.get("min_profit_factor", 1.5)
+    min_sharpe_ratio = params.get("min_sharpe_ratio", 0.8)
+    passing = {
+        strategy: (strategy not in performance or
+                   (performance[strategy].get('profit_factor', 0.0) >= min_profit_factor and
+                    performance[strategy].get('sharpe_ratio', 0.0) >= min_sharpe_ratio))
+        for strategy in set(batch.strategies[alive])
+    }
+    return np.array([passing.get(strategy, False) for strategy in batch.strategies], dtype=bool)
+
+
+class FilterReport(NamedTuple):
+    """Outcome of one pipeline run"""
+    total: int
+    accepted: int
+    rejected: Dict[str, int]
+    seconds: Dict[str, float]
+
+    def summary(self) -> str:
+        stages = ", ".join(f"{name}: {count} ({self.seconds[name] * 1000:.2f} ms)"
+                           for name, count in self.rejected.items())
+        return f"{self.accepted}/{self.total} signals passed quality filters (rejected - {stages})"
+
+
+class SignalFilterPipeline:
+    """Configurable batch filter for trading signals"""
+
+    def __init__(self, stocks: Sequence = (), stages: Sequence[str] = DEFAULT_STAGES, volume_window: int = 20):
+        """Initialize the pipeline
+
+        Args:
+            stocks (list): Stock configs providing the symbol metadata
+            stages (list): Default stage order, used when the parameters
+                have no "filter_stages" entry
+            volume_window (int): Bars in the rolling mean volume
+        """
+        self.stages = self._check_stages(stages)
+        self.volume_stats = VolumeStats(volume_window)
+        self._stocks_key = None
+        self.set_stocks(stocks)
+
+    @staticmethod
+    def _check_stages(stages: Sequence[str]) -> Tuple[str, ...]:
+        unknown = [name for name in stages if name not in FILTER_STAGES]
+        if unknown:
+            raise ValueError(f"Unknown signal filter stages {unknown}, expected some of {sorted(FILTER_STAGES)}")
+        return tuple(stages)
+
+    def set_stocks(self, stocks: Sequence):
+        """Rebuild the symbol metadata if the stock list changed"""
+        key = (id(stocks), len(stocks))
+        if key != self._stocks_key:
+            self.metadata = SymbolMetadata(stocks)
+            self._stocks_key = key
+
+    def run(self, signals: Sequence, params: Dict, bars: Optional[Callable[[str], Any]] = None,
+            stages: Optional[Sequence[str]] = None, **context) -> Tuple[List, FilterReport]:
+        """Filter a batch of signals
+
+        Args:
+            signals (list): Signals to filter
+            params (dict): Signal quality filter parameters
+            bars (callable): Symbol -> bars, for the volume stage
+            stages (list): Stage order for this run, overriding both the
+                "filter_stages" parameter and the pipeline default
+            **context: Extra inputs for custom stages (e.g. historical_performance)
+
+        Returns:
+            Tuple[List, FilterReport]: Accepted signals, best scored first,
+            and the per-stage rejection counts and timings
+        """
+        stages = self._check_stages(stages or params.get("filter_stages") or self.stages)
+        batch = SignalBatch(list(signals), self.metadata, self.volume_stats, bars, context)
+        alive = np.ones(len(batch), dtype=bool)
+        rejected = {}
+        seconds = {}
+
+        for name in stages:
+            start = time.perf_counter()
+            if alive.any():
+                keep = alive & FILTER_STAGES[name](batch, alive, params)
+            else:
+                keep = alive
+            dropped = alive & ~keep
+            seconds[name] = time.perf_counter() - start
+            rejected[name] = int(dropped.sum())
+            for i in (np.flatnonzero(dropped) if tracer.enabled else ()):
+                tracer.event(lambda: f"Signal for {batch.symbols[i]} ({batch.strategies[i]}) rejected by {name} filter")
+            alive = keep
+
+        accepted = [batch.signals[i] for i in np.flatnonzero(alive)]
+        return accepted, FilterReport(len(batch), len(accepted), rejected, seconds)
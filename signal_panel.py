@@ -0,0 +1,325 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Signal Panel
+-------------------------------------
+Cross-sectional scoring for SP500Strategy.
+
+The last ``days`` bars of every symbol are stacked into (bar x symbol)
+arrays, so technical indicators and LONG scores are computed for the whole
+universe in a handful of array operations instead of one DataFrame pipeline
+per symbol. The results match SP500Strategy.calculate_technical_indicators
+and calculate_long_signal_score up to floating point rounding: the same
+formulas are used, rows with undefined indicators are skipped like ``dropna``
+does, and score terms are added in the same order.
+
+Usage:
+    panel = build_price_panel(bars_by_symbol, days=20)
+    indicators = panel_indicators(panel, rsi_period=10, macd_fast=8, ...)
+    rows, valid_count = last_valid_rows(indicators, LONG_SCORE_ROWS)
+    scores = panel_long_scores(rows, valid_count, 'BULLISH', sector_regimes)
+"""
+
+import logging
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+logger = logging.getLogger(__name__)
+
+# Raw bar fields stacked into the panel
+PANEL_FIELDS = ('open', 'high', 'low', 'close', 'volume')
+
+# Most recent rows calculate_long_signal_score looks at (volume trend uses 6 closes)
+LONG_SCORE_ROWS = 6
+
+# Rows calculate_long_signal_score requires before it scores a symbol at all
+MIN_SCORE_ROWS = 10
+
+# Multiplier applied to the LONG signal threshold in each market regime
+THRESHOLD_MULTIPLIERS = {
+    'STRONG_BULLISH': 0.9,
+    'BULLISH': 0.95,
+    'NEUTRAL': 1.0,
+    'BEARISH': 1.1,
+    'STRONG_BEARISH': 1.2
+}
+
+# Score adjustment for the market and sector regimes
+REGIME_SCORE_ADJUSTMENTS = {
+    'STRONG_BULLISH': 0.15,
+    'BULLISH': 0.1,
+    'BEARISH': -0.1,
+    'STRONG_BEARISH': -0.2
+}
+
+BULLISH_REGIMES = ('BULLISH', 'STRONG_BULLISH')
+BEARISH_REGIMES = ('BEARISH', 'STRONG_BEARISH')
+
+
+class PricePanel:
+    """Last ``days`` bars of many symbols as (bar x symbol) arrays
+
+    Row -1 is each symbol's most recent bar. Symbols keep their own bar
+    dates (rows are aligned by position, not by date), which is what the
+    per-symbol pipeline sees as well.
+    """
+
+    def __init__(self, symbols: List[str], fields: Dict[str, np.ndarray]):
+        self.symbols = symbols
+        self.fields = fields
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def __getitem__(self, field: str) -> np.ndarray:
+        return self.fields[field]
+
+
+def build_price_panel(bars: Dict[str, pd.DataFrame], days: int,
+                      symbols: Optional[Sequence[str]] = None) -> PricePanel:
+    """Stack the most recent ``days`` bars of every symbol
+
+    Args:
+        bars (dict): Symbol -> DataFrame of OHLCV bars indexed by timestamp
+        days (int): Bars per symbol; symbols with fewer bars are left out
+        symbols (list): Symbols to include, in this order (all of ``bars``
+            by default)
+
+    Returns:
+        PricePanel: Panel of the symbols with enough bars
+    """
+    if symbols is None:
+        symbols = list(bars)
+
+    included = []
+    fields = {field: np.empty((days, len(symbols))) for field in PANEL_FIELDS}
+    for symbol in symbols:
+        frame = bars.get(symbol)
+        if frame is None or len(frame) < days:
+            continue
+        if not frame.index.is_monotonic_increasing:
+            frame = frame.sort_index()
+        column = len(included)
+        included.append(symbol)
+        positions = [frame.columns.get_loc(field) for field in PANEL_FIELDS]
+        block = frame.to_numpy()[-days:, positions].astype(np.float64)
+        for i, values in enumerate(fields.values()):
+            values[:, column] = block[:, i]
+
+    fields = {field: values[:, :len(included)] for field, values in fields.items()}
+    return PricePanel(included, fields)
+
+
+def _shift(values: np.ndarray, periods: int = 1) -> np.ndarray:
+    """Rows moved down by ``periods``, NaN-filled at the top"""
+    shifted = np.full(values.shape, np.nan)
+    shifted[periods:] = values[:-periods]
+    return shifted
+
+
+def _rolling(values: np.ndarray, window: int, reducer: str = "mean", **kwargs) -> np.ndarray:
+    """Rolling mean/std over rows; NaN until a full window is available"""
+    result = np.full(values.shape, np.nan)
+    if len(values) >= window:
+        windows = sliding_window_view(values, window, axis=0)
+        result[window - 1:] = getattr(windows, reducer)(axis=-1, **kwargs)
+    return result
+
+
+def _ewm(values: np.ndarray, span: int) -> np.ndarray:
+    """Exponentially weighted mean with ``adjust=False``, row by row"""
+    alpha = 2.0 / (span + 1.0)
+    old_weight = 1.0 - alpha
+    result = np.empty(values.shape)
+    weighted = values[0]
+    result[0] = weighted
+    for i in range(1, len(values)):
+        weighted = (old_weight * weighted + alpha * values[i]) / (old_weight + alpha)
+        result[i] = weighted
+    return result
+
+
+def panel_indicators(panel: PricePanel, rsi_period: int, macd_fast: int, macd_slow: int,
+                     macd_signal: int, bb_period: int, bb_std_dev: float,
+                     atr_period: int) -> Dict[str, np.ndarray]:
+    """Technical indicators of every symbol, as in calculate_technical_indicators
+
+    Args:
+        panel (PricePanel): Bars of the universe
+        rsi_period, macd_fast, macd_slow, macd_signal, bb_period, bb_std_dev,
+        atr_period: Indicator parameters of the strategy
+
+    Returns:
+        dict: Indicator name -> (bar x symbol) array, plus the raw fields and
+            ``valid``, the rows that survive calculate_technical_indicators'
+            dropna
+    """
+    close, high, low, volume = panel['close'], panel['high'], panel['low'], panel['volume']
+    previous_close = _shift(close)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # RSI
+        delta = close - previous_close
+        gain = np.where(delta > 0, delta, 0.0)
+        loss = -np.where(delta < 0, delta, 0.0)
+        rs = _rolling(gain, rsi_period) / _rolling(loss, rsi_period)
+        rsi = 100 - (100 / (1 + rs))
+
+        # MACD
+        macd = _ewm(close, macd_fast) - _ewm(close, macd_slow)
+        signal = _ewm(macd, macd_signal)
+
+        # Bollinger Bands
+        sma = _rolling(close, bb_period)
+        std = _rolling(close, bb_period, "std", ddof=1)
+        upper_band = sma + (std * bb_std_dev)
+        lower_band = sma - (std * bb_std_dev)
+
+        # ATR (NaN-skipping maximum, like DataFrame.max(axis=1))
+        tr = np.fmax(np.fmax(np.abs(high - low), np.abs(high - previous_close)),
+                     np.abs(low - previous_close))
+        atr = _rolling(tr, atr_period)
+
+        # Volume, momentum and price change
+        volume_sma = _rolling(volume, 10)
+        close_5d_ago = _shift(close, 5)
+
+        indicators = {field: panel[field] for field in PANEL_FIELDS}
+        indicators.update({
+            'rsi': rsi,
+            'macd': macd,
+            'macd_signal': signal,
+            'macd_hist': macd - signal,
+            'sma': sma,
+            'std': std,
+            'upper_band': upper_band,
+            'lower_band': lower_band,
+            'tr': tr,
+            'atr': atr,
+            'bb_upper_dist': (close - upper_band) / close * 100,
+            'bb_lower_dist': (close - lower_band) / close * 100,
+            'volume_sma': volume_sma,
+            'volume_ratio': volume / volume_sma,
+            'momentum': close / close_5d_ago - 1,
+            'price_change_1d': (close / previous_close - 1) * 100,
+            'price_change_5d': (close / close_5d_ago - 1) * 100,
+        })
+
+    valid = np.ones(close.shape, dtype=bool)
+    for values in indicators.values():
+        valid &= ~np.isnan(values)
+    indicators['valid'] = valid
+    return indicators
+
+
+def last_valid_rows(indicators: Dict[str, np.ndarray], count: int) -> Tuple[Dict[str, np.ndarray], np.ndarray]:
+    """The most recent ``count`` valid rows of every symbol
+
+    Args:
+        indicators (dict): Output of panel_indicators
+        count (int): Rows to keep
+
+    Returns:
+        tuple: Name -> (count x symbol) array where row -1 is the latest
+            valid bar (NaN where a symbol has fewer valid rows), and the
+            number of valid rows of each symbol
+    """
+    valid = indicators['valid']
+    valid_count = valid.sum(axis=0)
+
+    # Rank valid rows from the end: 1 for the latest, 2 for the one before...
+    rank = np.cumsum(valid[::-1], axis=0)[::-1]
+    rows, cols = np.nonzero(valid & (rank <= count))
+    slots = count - rank[rows, cols]
+
+    compact = {}
+    for name, values in indicators.items():
+        if name == 'valid':
+            continue
+        out = np.full((count, valid.shape[1]), np.nan)
+        out[slots, cols] = values[rows, cols]
+        compact[name] = out
+    return compact, valid_count
+
+
+def regime_adjustment(regimes: np.ndarray) -> np.ndarray:
+    """Score adjustment of each symbol's regime"""
+    adjustment = np.zeros(len(regimes))
+    for regime, value in REGIME_SCORE_ADJUSTMENTS.items():
+        adjustment[regimes == regime] = value
+    return adjustment
+
+
+def panel_long_scores(rows: Dict[str, np.ndarray], valid_count: np.ndarray,
+                      market_regime: Optional[str], sector_regimes: np.ndarray) -> np.ndarray:
+    """LONG score of every symbol, as in calculate_long_signal_score
+
+    Args:
+        rows (dict): Output of last_valid_rows with at least LONG_SCORE_ROWS rows
+        valid_count (ndarray): Valid rows of each symbol
+        market_regime (str): Market regime of the scan
+        sector_regimes (ndarray): Sector regime of each symbol
+
+    Returns:
+        ndarray: Scores in [0, 1]; 0 for symbols with too little data
+    """
+    close, volume = rows['close'], rows['volume']
+    rsi = rows['rsi'][-1]
+    macd, macd_signal = rows['macd'][-1], rows['macd_signal'][-1]
+    macd_hist, previous_hist = rows['macd_hist'][-1], rows['macd_hist'][-2]
+    bullish = market_regime in BULLISH_REGIMES
+    bearish = market_regime in BEARISH_REGIMES
+
+    # Terms are added in the order of the scalar scorer
+    score = np.zeros(close.shape[1])
+
+    # RSI
+    score += np.where(rsi < 40, 0.2, 0.0)
+    if bearish:
+        score -= np.where(rsi > 35, 0.15, 0.0)
+    elif bullish:
+        score += np.where(rsi < 45, 0.1, 0.0)
+
+    # MACD crossover and histogram
+    crossover = (macd > macd_signal) & (rows['macd'][-2] <= rows['macd_signal'][-2])
+    score += np.where(crossover, 0.3, 0.0)
+    rising = macd_hist > previous_hist
+    score += np.select([(macd_hist > 0) & rising, (macd_hist < 0) & rising], [0.2, 0.15], 0.0)
+    if bullish:
+        score += np.where(macd > macd_signal, 0.1, 0.0)
+    elif bearish:
+        score -= np.where((macd < 0) & (macd_signal < 0), 0.1, 0.0)
+
+    # Volume on up days
+    average_volume = volume[-5:].sum(axis=0) / 5
+    score += np.where((volume[-1] > average_volume * 1.2) & (close[-1] > close[-2]), 0.2, 0.0)
+
+    up_volume = np.zeros_like(score)
+    down_volume = np.zeros_like(score)
+    up_count = np.zeros_like(score)
+    for i in range(-5, 0):
+        up = close[i] > close[i - 1]
+        up_volume += np.where(up, volume[i], 0.0)
+        down_volume += np.where(up, 0.0, volume[i])
+        up_count += up
+    down_count = 5 - up_count
+    average_up = up_volume / np.maximum(1, up_count)
+    average_down = down_volume / np.maximum(1, down_count)
+    mixed = (up_count > 0) & (down_count > 0)
+    score += np.select([mixed & (average_up > average_down * 1.5),
+                        mixed & (average_down > average_up * 1.5)], [1.0, -1.0], 0.0)
+
+    # ATR
+    high_volatility = (rows['atr'][-1] / close[-1]) * 100 > 3.0
+    score += np.where(high_volatility, 0.1 if bullish else -0.1, 0.0)
+
+    # Market and sector regimes
+    score += REGIME_SCORE_ADJUSTMENTS.get(market_regime, 0.0)
+    score += regime_adjustment(sector_regimes)
+
+    score = np.clip(score, 0, 1.0)
+    return np.where(valid_count >= MIN_SCORE_ROWS, score, 0.0)
@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Strategy Registry
+-------------------------------------
+Parameter-bound strategy instances, built once and reused.
+
+Stocks can override strategy parameters through StockConfig
+(mean_reversion_params, trend_following_params, ...). Instead of deep
+copying the strategy for every symbol on every evaluation step, the registry
+keeps one instance per (strategy, parameter set). A bound instance is a
+shallow copy with a read-only merged config: it shares the base strategy's
+performance record, logger and indicator engine, so mutable state stays in
+one place and nothing is copied after the first lookup.
+
+Usage:
+    registry = StrategyRegistry()
+    strategy_to_use = registry.bind("MeanReversion", strategy, stock_config)
+    signals = strategy_to_use.generate_signals(...)
+"""
+
+import copy
+import logging
+import threading
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+logger = logging.getLogger("StrategyRegistry")
+
+# StockConfig attribute holding the per-stock overrides of each strategy
+PARAM_FIELDS = {
+    "MeanReversion": "mean_reversion_params",
+    "TrendFollowing": "trend_following_params",
+    "VolatilityBreakout": "volatility_breakout_params",
+    "GapTrading": "gap_trading_params"
+}
+
+
+def _freeze(value: Any) -> Hashable:
+    """Hashable form of a (nested) parameter value"""
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, set):
+        return frozenset(_freeze(item) for item in value)
+    return value
+
+
+class FrozenConfig(dict):
+    """Read-only strategy config (unlike MappingProxyType it can be pickled)"""
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("bound strategy configs are read-only")
+
+    __setitem__ = __delitem__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __reduce__(self):
+        return (FrozenConfig, (dict(self),))
+
+
+class StrategyRegistry:
+    """Cache of strategies bound to per-stock parameter overrides"""
+
+    def __init__(self):
+        self._instances: Dict[Tuple, Tuple[Any, Any]] = {}
+        self._lock = threading.Lock()
+        self.builds = 0
+
+    def __len__(self) -> int:
+        return len(self._instances)
+
+    def bind(self, name: str, strategy: Any, stock_config: Optional[Any] = None) -> Any:
+        """Strategy to evaluate a stock with
+
+        Args:
+            name (str): Strategy name (key of PARAM_FIELDS)
+            strategy: Base strategy instance
+            stock_config (StockConfig): Stock whose overrides apply
+
+        Returns:
+            The base strategy when the stock has no overrides, otherwise the
+            shared instance bound to them. Bound instances must not be
+            modified; change the base strategy instead (a changed base config
+            yields a new instance).
+        """
+        field = PARAM_FIELDS.get(name)
+        params = getattr(stock_config, field, None) if field and stock_config is not None else None
+        if not params:
+            return strategy
+
+        # The entry keeps the base alive, so its id cannot be reused
+        key = (name, id(strategy), _freeze(strategy.config), _freeze(params))
+        entry = self._instances.get(key)
+        if entry is not None:
+            return entry[1]
+
+        with self._lock:
+            entry = self._instances.get(key)
+            if entry is None:
+                bound = copy.copy(strategy)
+                bound.config = FrozenConfig({**strategy.config, **params})
+                entry = (strategy, bound)
+                self._instances[key] = entry
+                self.builds += 1
+                logger.debug(f"Bound {name} to {dict(params)}")
+            return entry[1]
+
+    def clear(self):
+        """Drop every bound instance"""
+        with self._lock:
+            self._instances.clear()
+
+
+# Registry shared by callers that have no system instance of their own
+_shared_registry = StrategyRegistry()
+
+
+def get_strategy_registry() -> StrategyRegistry:
+    """Process-wide registry"""
+    return _shared_registry
@@ -39,6 +39,9 @@ from enhanced_trading_functions import (
 # Import ML strategy selector
 from ml_strategy_selector import MLStrategySelector
 
+# Import parallel parameter sweep runner
+from parameter_sweep import ParameterSweep
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -51,6 +54,9 @@ logging.basicConfig(
 
 logger = logging.getLogger("SystemOptimizer")
 
+# Directory parameter sweep results are streamed to (one JSON lines file per sweep)
+SWEEP_RESULTS_DIR = "sweep_results"
+
 def load_config():
     """Load configuration from YAML file"""
     try:
@@ -147,7 +153,8 @@ class EnhancedMultiStrategySystem(MultiStrategySystem):
                 self.candle_data,
                 self.market_state,
                 self.ml_strategy_selector,
-                self.logger
+                self.logger,
+                background_training=not self.backtest_mode
             )
             
             # Apply enhanced quality filters
@@ -329,7 +336,53 @@ def run_backtest(config_dict, start_date, end_date):
         logger.error(traceback.format_exc())
         return None
 
-def optimize_ml_strategy_selector(base_config, start_date, end_date):
+def build_system(config_dict):
+    """
+    Create an enhanced system from a configuration dictionary
+    
+    Used as the system factory of parameter sweeps, so it must stay a
+    module-level function that worker processes can import.
+    
+    Args:
+        config_dict: Configuration dictionary (not modified)
+        
+    Returns:
+        EnhancedMultiStrategySystem: System instance, or None on error
+    """
+    config = create_system_config(copy.deepcopy(config_dict))
+    if not config:
+        logger.error("Failed to create system config")
+        return None
+    return EnhancedMultiStrategySystem(config)
+
+def run_parameter_sweep(name, combinations, start_date, end_date, max_workers=None,
+                        max_combinations=None):
+    """
+    Backtest parameter combinations in parallel, resuming earlier runs
+    
+    Results are appended to sweep_results/<name>_<start>_<end>.jsonl as each
+    backtest finishes; combinations already in that file are not run again.
+    
+    Args:
+        name: Sweep name used for the results file
+        combinations: List of (params, config_dict) pairs
+        start_date: Start date for backtest
+        end_date: End date for backtest
+        max_workers: Number of worker processes (CPU count by default)
+        max_combinations: Optional cap on the number of combinations
+        
+    Returns:
+        List[Dict]: Records with "params" and "metrics" for successful backtests
+    """
+    if max_combinations is not None and len(combinations) > max_combinations:
+        logger.info(f"Limiting to {max_combinations} parameter combinations")
+        combinations = combinations[:max_combinations]
+    
+    results_file = os.path.join(SWEEP_RESULTS_DIR, f"{name}_{start_date}_{end_date}.jsonl")
+    sweep = ParameterSweep(build_system, start_date, end_date, results_file, max_workers=max_workers)
+    return sweep.run(combinations)
+
+def optimize_ml_strategy_selector(base_config, start_date, end_date, max_workers=None, max_combinations=None):
     """
     Optimize ML strategy selector parameters
     
@@ -354,45 +407,32 @@ def optimize_ml_strategy_selector(base_config, start_date, end_date):
     
     # Generate parameter combinations
     param_combinations = []
-    for ml_lookback_window in param_grid["ml_lookback_window"]:
-        for ml_min_training_samples in param_grid["ml_min_training_samples"]:
-            for ml_retraining_frequency in param_grid["ml_retraining_frequency"]:
-                for n_estimators in param_grid["n_estimators"]:
-                    for max_depth in param_grid["max_depth"]:
-                        params = {
-                            "ml_lookback_window": ml_lookback_window,
-                            "ml_min_training_samples": ml_min_training_samples,
-                            "ml_retraining_frequency": ml_retraining_frequency,
-                            "n_estimators": n_estimators,
-                            "max_depth": max_depth
-                        }
-                        param_combinations.append(params)
-    
-    # Limit number of combinations to test
-    max_combinations = 10
-    if len(param_combinations) > max_combinations:
-        logger.info(f"Limiting to {max_combinations} parameter combinations")
-        param_combinations = param_combinations[:max_combinations]
-    
-    # Test each parameter combination
-    best_sharpe = 0
-    best_params = None
-    
-    for params in param_combinations:
+    for values in itertools.product(*param_grid.values()):
+        params = dict(zip(param_grid.keys(), values))
+        
         # Create config copy with updated parameters
         config_copy = copy.deepcopy(base_config)
         
         # Update ML strategy selector parameters
         config_copy["ml_strategy_selector"].update(params)
+        param_combinations.append((params, config_copy))
+    
+    # Run backtests in parallel
+    records = run_parameter_sweep("ml_strategy_selector", param_combinations, start_date, end_date,
+                                  max_workers=max_workers, max_combinations=max_combinations)
+    
+    # Pick the best parameter combination
+    best_sharpe = 0
+    best_params = None
+    
+    for record in records:
+        result = record["metrics"]
         
-        # Run backtest
-        result = run_backtest(config_copy, start_date, end_date)
-        
-        if result and result.sharpe_ratio > best_sharpe:
-            best_sharpe = result.sharpe_ratio
-            best_params = params
+        if result["sharpe_ratio"] > best_sharpe:
+            best_sharpe = result["sharpe_ratio"]
+            best_params = record["params"]
             
-            logger.info(f"New best parameters found: {params}")
+            logger.info(f"New best parameters found: {best_params}")
             logger.info(f"Sharpe ratio: {best_sharpe:.2f}")
     
     logger.info(f"Optimized ML strategy selector parameters: {best_params}")
@@ -400,7 +440,7 @@ def optimize_ml_strategy_selector(base_config, start_date, end_date):
     
     return best_params
 
-def optimize_signal_filtering(base_config, start_date, end_date):
+def optimize_signal_filtering(base_config, start_date, end_date, max_workers=None, max_combinations=None):
     """
     Optimize signal filtering parameters to improve win rate
     
@@ -425,60 +465,46 @@ def optimize_signal_filtering(base_config, start_date, end_date):
     
     # Generate parameter combinations
     param_combinations = []
-    for min_score in param_grid["min_score_threshold"]:
-        for max_corr in param_grid["max_correlation_threshold"]:
-            for min_vol in param_grid["min_volume_percentile"]:
-                for min_regime in param_grid["min_regime_weight"]:
-                    for max_signals in param_grid["max_signals_per_day"]:
-                        params = {
-                            "min_score_threshold": min_score,
-                            "max_correlation_threshold": max_corr,
-                            "min_volume_percentile": min_vol,
-                            "min_regime_weight": min_regime,
-                            "max_signals_per_day": max_signals
-                        }
-                        param_combinations.append(params)
-    
-    # Limit number of combinations to test
-    max_combinations = 10
-    if len(param_combinations) > max_combinations:
-        logger.info(f"Limiting to {max_combinations} parameter combinations")
-        param_combinations = param_combinations[:max_combinations]
-    
-    # Test each parameter combination
-    best_win_rate = 0
-    best_sharpe = 0
-    best_params = None
-    
-    for params in param_combinations:
+    for values in itertools.product(*param_grid.values()):
+        params = dict(zip(param_grid.keys(), values))
+        
         # Create config copy with updated parameters
         config_copy = copy.deepcopy(base_config)
         
         # Update signal quality filters
         for key, value in params.items():
             config_copy["signal_quality_filters"][key] = value
+        param_combinations.append((params, config_copy))
+    
+    # Run backtests in parallel
+    records = run_parameter_sweep("signal_filtering", param_combinations, start_date, end_date,
+                                  max_workers=max_workers, max_combinations=max_combinations)
+    
+    # Pick the best parameter combination
+    best_win_rate = 0
+    best_sharpe = 0
+    best_params = None
+    
+    for record in records:
+        result = record["metrics"]
         
-        # Run backtest
-        result = run_backtest(config_copy, start_date, end_date)
+        # Calculate combined score (win rate + sharpe)
+        combined_score = (result["win_rate"] * 0.7) + (result["sharpe_ratio"] * 0.3)
         
-        if result:
-            # Calculate combined score (win rate + sharpe)
-            combined_score = (result.win_rate * 0.7) + (result.sharpe_ratio * 0.3)
+        if combined_score > (best_win_rate * 0.7 + best_sharpe * 0.3):
+            best_win_rate = result["win_rate"]
+            best_sharpe = result["sharpe_ratio"]
+            best_params = record["params"]
             
-            if combined_score > (best_win_rate * 0.7 + best_sharpe * 0.3):
-                best_win_rate = result.win_rate
-                best_sharpe = result.sharpe_ratio
-                best_params = params
-                
-                logger.info(f"New best parameters found: {params}")
-                logger.info(f"Win rate: {best_win_rate:.2f}%, Sharpe: {best_sharpe:.2f}")
+            logger.info(f"New best parameters found: {best_params}")
+            logger.info(f"Win rate: {best_win_rate:.2f}%, Sharpe: {best_sharpe:.2f}")
     
     logger.info(f"Optimized signal filtering parameters: {best_params}")
     logger.info(f"Best win rate: {best_win_rate:.2f}%, Best Sharpe: {best_sharpe:.2f}")
     
     return best_params
 
-def optimize_position_sizing(base_config, start_date, end_date):
+def optimize_position_sizing(base_config, start_date, end_date, max_workers=None, max_combinations=None):
     """
     Optimize position sizing parameters
     
@@ -501,44 +527,39 @@ def optimize_position_sizing(base_config, start_date, end_date):
     
     # Generate parameter combinations
     param_combinations = []
-    for base_risk in param_grid["base_risk_per_trade"]:
-        for max_pos in param_grid["max_position_size"]:
-            for min_pos in param_grid["min_position_size"]:
-                if min_pos < max_pos:  # Ensure min < max
-                    params = {
-                        "base_risk_per_trade": base_risk,
-                        "max_position_size": max_pos,
-                        "min_position_size": min_pos,
-                        "volatility_adjustment": True,
-                        "signal_strength_adjustment": True
-                    }
-                    param_combinations.append(params)
-    
-    # Limit number of combinations to test
-    max_combinations = 10
-    if len(param_combinations) > max_combinations:
-        logger.info(f"Limiting to {max_combinations} parameter combinations")
-        param_combinations = param_combinations[:max_combinations]
+    for base_risk, max_pos, min_pos in itertools.product(*param_grid.values()):
+        if min_pos < max_pos:  # Ensure min < max
+            params = {
+                "base_risk_per_trade": base_risk,
+                "max_position_size": max_pos,
+                "min_position_size": min_pos,
+                "volatility_adjustment": True,
+                "signal_strength_adjustment": True
+            }
+            
+            # Create config copy with updated parameters
+            config_copy = copy.deepcopy(base_config)
+            
+            # Update position sizing parameters
+            config_copy["position_sizing_config"] = params
+            param_combinations.append((params, config_copy))
+    
+    # Run backtests in parallel
+    records = run_parameter_sweep("position_sizing", param_combinations, start_date, end_date,
+                                  max_workers=max_workers, max_combinations=max_combinations)
     
-    # Test each parameter combination
+    # Pick the best parameter combination
     best_sharpe = 0
     best_params = None
     
-    for params in param_combinations:
-        # Create config copy with updated parameters
-        config_copy = copy.deepcopy(base_config)
-        
-        # Update position sizing parameters
-        config_copy["position_sizing_config"] = params
-        
-        # Run backtest
-        result = run_backtest(config_copy, start_date, end_date)
+    for record in records:
+        result = record["metrics"]
         
-        if result and result.sharpe_ratio > best_sharpe:
-            best_sharpe = result.sharpe_ratio
-            best_params = params
+        if result["sharpe_ratio"] > best_sharpe:
+            best_sharpe = result["sharpe_ratio"]
+            best_params = record["params"]
             
-            logger.info(f"New best parameters found: {params}")
+            logger.info(f"New best parameters found: {best_params}")
             logger.info(f"Sharpe ratio: {best_sharpe:.2f}")
     
     logger.info(f"Optimized position sizing parameters: {best_params}")
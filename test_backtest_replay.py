@@ -0,0 +1,213 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test script for the backtest replay cursor.
+Checks the per-step counts, update flags and views of the index, VIX and
+stock streams against a plain timestamp scan, that strategies never see a
+bar after the replay clock, that positions are closed at the last bar of
+their day, and the bounded session views used by the gap strategy.
+"""
+
+import datetime as dt
+import logging
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from backtest_replay import ReplayCursor
+from bar_store import BarBuffer, as_bars
+from multi_strategy_system import (MARKET_STREAM, VIX_STREAM, CandleData, MeanReversionStrategy,
+                                   MultiStrategySystem, PositionState, StockConfig, StrategyPerformance,
+                                   SystemConfig, TradeDirection)
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+TZ = 'America/New_York'
+
+
+def session_times(days, minutes, tz=TZ):
+    """Bar times every ``minutes`` from 9:30 to 16:00 on each day"""
+    times = [pd.date_range(f"{day} 09:30", f"{day} 15:59", freq=f"{minutes}min", tz=tz) for day in days]
+    return times[0].append(times[1:])
+
+
+def make_buffer(times, seed, start=100.0):
+    rng = np.random.default_rng(seed)
+    close = start * np.exp(np.cumsum(rng.normal(0, 0.002, len(times))))
+    buffer = BarBuffer(capacity=None, candle_factory=CandleData)
+    buffer.extend_arrays(times.as_unit('ns').asi8, close, close * 1.001, close * 0.999, close,
+                         rng.integers(1000, 5000, len(times)).astype(float))
+    buffer.tz = times.tz
+    return buffer
+
+
+def make_streams():
+    days = ['2024-03-04', '2024-03-05', '2024-03-06']
+    return {
+        MARKET_STREAM: make_buffer(session_times(days, 30), seed=1, start=4500.0),
+        VIX_STREAM: make_buffer(session_times(days, 60), seed=2, start=18.0),
+        # The stock skips the middle day entirely
+        'AAA': make_buffer(session_times(days[::2], 5), seed=3)
+    }
+
+
+def make_system(symbols):
+    config = SystemConfig(
+        stocks=[StockConfig(symbol=s, max_position_size=1000, min_position_size=10,
+                            max_risk_per_trade_pct=1.0, min_volume=0) for s in symbols],
+        initial_capital=100000, max_open_positions=5, max_positions_per_symbol=1,
+        max_correlated_positions=3, max_sector_exposure_pct=30.0, max_portfolio_risk_daily_pct=5.0,
+        strategy_weights={'Recorder': 1.0}, rebalance_interval=dt.timedelta(days=1),
+        data_lookback_days=30, market_hours_start=dt.time(9, 30), market_hours_end=dt.time(16, 0),
+        enable_auto_trading=False, backtesting_mode=True, data_source='SYNTHETIC'
+    )
+    # MeanReversionStrategy leaves the Strategy abstract methods unimplemented;
+    # the tests replace the strategies anyway
+    with mock.patch.object(MeanReversionStrategy, '__abstractmethods__', frozenset()):
+        return MultiStrategySystem(config)
+
+
+def test_cursor_matches_scan():
+    """Counts, update flags and views match a plain scan of the timestamps"""
+    streams = make_streams()
+    stamps = {name: list(buffer.view().ts_ns) for name, buffer in streams.items()}
+    cursor = ReplayCursor(streams)
+    assert list(cursor.timeline) == sorted(set().union(*stamps.values()))
+
+    previous = {name: 0 for name in streams}
+    for _ in cursor:
+        now = cursor.timeline[cursor.step]
+        for name, times in stamps.items():
+            visible = sum(1 for t in times if t <= now)
+            assert cursor.count(name) == visible
+            assert cursor.updated(name) == (now in times) == (visible > previous[name])
+            view = cursor.view(name)
+            assert len(view) == visible and (visible == 0 or view.ts_ns[-1] <= now)
+            tail = cursor.view(name, 3)
+            assert np.array_equal(tail.ts_ns, view.ts_ns[-3:])
+            assert np.shares_memory(view.close, streams[name].view().close) or visible == 0
+            previous[name] = visible
+
+    # VIX bars arrive every other market bar; the stock is idle on the middle day
+    cursor = ReplayCursor(streams, start=dt.date(2024, 3, 5), end=dt.date(2024, 3, 5))
+    updates = {name: 0 for name in streams}
+    for _ in cursor:
+        for name in streams:
+            updates[name] += cursor.updated(name)
+    assert updates[MARKET_STREAM] == 13 and updates[VIX_STREAM] == 7 and updates['AAA'] == 0
+    assert cursor.count('AAA') == 78
+
+
+class RecordingStrategy:
+    """Records the last bar time and the replay clock of every call"""
+
+    def __init__(self, system):
+        self.system = system
+        self.config = {}
+        self.calls = []
+        self.performance = StrategyPerformance(strategy='Recorder')
+
+    def generate_signals(self, symbol, candles, stock_config, market_state):
+        self.calls.append((candles.ts_ns[-1], len(candles), self.system.current_backtest_time))
+        return []
+
+    def calculate_regime_weight(self, market_state):
+        return 1.0
+
+
+def test_backtest_never_sees_future_bars():
+    """Strategies get the bars up to the replay clock, once per new stock bar"""
+    system = make_system(['AAA'])
+    streams = make_streams()
+    system.attach_backtest_data({name: (*buffer.columns, buffer.tz)
+                                 for name, buffer in streams.items()})
+    recorder = RecordingStrategy(system)
+    system.strategies = {'Recorder': recorder}
+    system.strategy_weights = {'Recorder': 1.0}
+    system.run_backtest(dt.date(2024, 3, 4), dt.date(2024, 3, 6))
+
+    stock = streams['AAA'].view()
+    # Every stock bar from the 20th on is evaluated exactly once
+    assert len(recorder.calls) == len(stock) - 19
+    for last_ns, count, clock in recorder.calls:
+        clock_ns = pd.Timestamp(clock).tz_convert('UTC').as_unit('ns').value
+        assert last_ns == clock_ns and stock.ts_ns[count - 1] == last_ns
+
+
+def test_day_end_close_uses_that_day():
+    """Day-end exits use the last bar of the replayed day, not a later one"""
+    system = make_system(['AAA'])
+    streams = make_streams()
+    stock = streams['AAA'].view()
+    cursor = ReplayCursor(streams)
+    entry = dt.datetime(2024, 3, 4, 10, 0)
+    system.positions = {'AAA': [PositionState('AAA', TradeDirection.LONG, 100.0, 95.0, None, 10, entry)]}
+    system.trade_history = []
+
+    for _ in cursor:
+        if cursor.is_day_end:
+            system.current_backtest_time = cursor.timestamp
+            system._close_positions_at_day_end(cursor)
+            break
+    position = system.positions['AAA'][0]
+    day_one = stock.index.date == dt.date(2024, 3, 4)
+    assert not position.is_active and position.exit_price == stock.close[day_one][-1]
+    assert cursor.date == dt.date(2024, 3, 4) and len(system.trade_history) == 1
+
+    # The stock has no bar on the next day, so its position stays open then
+    system.positions['AAA'].append(PositionState('AAA', TradeDirection.LONG, 100.0, 95.0, None, 10, entry))
+    for _ in range(cursor.step + 1, len(cursor)):
+        cursor.advance()
+        if cursor.is_day_end:
+            break
+    assert cursor.date == dt.date(2024, 3, 5)
+    system._close_positions_at_day_end(cursor)
+    assert system.positions['AAA'][1].is_active
+
+
+def test_last_sessions():
+    """Session views cover the last calendar days without scanning the history"""
+    days = pd.bdate_range('2024-01-02', periods=40).strftime('%Y-%m-%d')
+    bars = make_buffer(session_times(days, 5), seed=4).view()
+    frame = bars.to_frame()
+    for sessions in (1, 2, 3):
+        view = bars.last_sessions(sessions)
+        expected = frame[np.isin(frame.index.date, sorted(set(frame.index.date))[-sessions:])]
+        assert np.array_equal(view.close, expected.close.values)
+        assert np.shares_memory(view.close, bars.close)
+    assert len(bars.last_sessions(100)) == len(bars)
+    assert len(as_bars([]).last_sessions(2)) == 0
+
+    # Naive timestamps split on their own calendar days
+    naive = as_bars([CandleData(dt.datetime(2024, 1, d, h), 1, 1, 1, 1, 1) for d in (2, 3) for h in (10, 15)])
+    assert [c.timestamp.day for c in naive.last_sessions(1)] == [3, 3]
+
+
+def main():
+    """Run all tests"""
+    logger.info("=== Starting Backtest Replay Tests ===")
+
+    test_cursor_matches_scan()
+    logger.info("Cursor counts and views match the timestamp scan")
+
+    test_backtest_never_sees_future_bars()
+    logger.info("Strategies never see bars after the replay clock")
+
+    test_day_end_close_uses_that_day()
+    logger.info("Day-end exits use that day's last bar")
+
+    test_last_sessions()
+    logger.info("Session views match the frame filter")
+
+    logger.info("=== Backtest Replay Tests Completed ===")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test script for the columnar bar store.
+Checks BarBuffer appends, compactions and capacity changes against a plain
+list of bars, that pinned views survive compactions and replacements, that
+attached (read-only, shared) columns are never written, and that views and
+as_bars share memory with the buffer instead of copying it.
+"""
+
+import datetime as dt
+import logging
+
+import numpy as np
+import pandas as pd
+
+from bar_store import BAR_FIELDS, BarBuffer, BarStore, BarView, as_bars
+from multi_strategy_system import CandleData
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+START = pd.Timestamp('2024-01-02 09:30').value
+MINUTE = 60 * 10 ** 9
+
+
+def make_rows(first, count):
+    """count bars as (ts_ns, open, high, low, close, volume) tuples"""
+    return [(START + (first + i) * MINUTE, first + i + 0.1, first + i + 0.5, first + i - 0.5,
+             first + i + 0.2, float(1000 + first + i)) for i in range(count)]
+
+
+def columns(rows):
+    ts_ns = np.array([row[0] for row in rows], dtype=np.int64)
+    return (ts_ns,) + tuple(np.array([row[i] for row in rows], dtype=float) for i in range(1, 6))
+
+
+def as_rows(view):
+    return list(zip(view.ts_ns.tolist(), *(getattr(view, name).tolist() for name in BAR_FIELDS)))
+
+
+def test_matches_list_reference():
+    """Random appends and capacity changes keep the newest bars, like a list"""
+    rng = np.random.default_rng(11)
+    buffer = BarBuffer(capacity=50, headroom=7)
+    reference = []
+    capacity = 50
+    pinned = []
+    written = 0
+
+    for step in range(600):
+        action = rng.integers(0, 10)
+        if action < 6:
+            count = int(rng.choice([1, 1, 2, 5, 13, 49, 50, 80]))
+            rows = make_rows(written, count)
+            written += count
+            if count == 1:
+                buffer.append(CandleData(pd.Timestamp(rows[0][0]).to_pydatetime(), *rows[0][1:]))
+            else:
+                buffer.extend_arrays(*columns(rows))
+            reference.extend(rows)
+        elif action == 6:
+            capacity = int(rng.choice([10, 30, 50, 120])) if rng.random() < 0.8 else None
+            buffer.set_capacity(capacity)
+        elif action == 7:
+            view = buffer.pin()
+            pinned.append((view, as_rows(view)))
+        elif action == 8 and rng.random() < 0.2:
+            rows = make_rows(written, int(rng.integers(0, 20)))
+            written += len(rows)
+            buffer.replace(BarView(*columns(rows)))
+            reference = list(rows)
+        if capacity is not None:
+            reference = reference[-capacity:]
+
+        assert as_rows(buffer.view()) == reference, f"step {step}"
+        assert len(buffer) == len(reference)
+        assert as_rows(buffer.view(7)) == reference[-7:]
+
+    # Pinned views never change, whatever happened to the buffer afterwards
+    assert pinned
+    for view, rows in pinned:
+        assert as_rows(view) == rows
+        assert not view.close.flags.writeable
+
+
+def test_pin_across_compaction():
+    """A pinned window keeps its rows when the buffer compacts in place"""
+    buffer = BarBuffer(capacity=20, headroom=5)
+    buffer.extend_arrays(*columns(make_rows(0, 25)))
+    view = buffer.pin()
+    rows = as_rows(view)
+    assert np.shares_memory(view.close, buffer._data)
+
+    # Fills the headroom, so a later batch needs a compaction
+    for first in range(25, 61, 3):
+        buffer.extend_arrays(*columns(make_rows(first, 3)))
+    assert as_rows(view) == rows
+    assert as_rows(buffer.view()) == make_rows(41, 20)
+    assert not np.shares_memory(view.close, buffer._data)
+
+    # Without a pin the compaction reuses the same columns
+    block = buffer._data
+    for first in range(61, 100, 3):
+        buffer.extend_arrays(*columns(make_rows(first, 3)))
+    assert buffer._data is block and as_rows(buffer.view()) == make_rows(80, 20)
+    assert len(buffer._ts) == buffer.capacity + buffer.headroom
+
+
+def test_attach_is_read_only():
+    """Attached columns are read in place and copied before the first write"""
+    rows = make_rows(0, 30)
+    ts_ns, *values = columns(rows)
+    data = np.vstack(values)
+    ts_ns.flags.writeable = False
+    data.flags.writeable = False
+
+    store = BarStore(capacity=10)
+    buffer = store.add_symbol('AAA')
+    buffer.attach(ts_ns, data, tz=None)
+    assert buffer.capacity is None and len(buffer) == 30
+    view = store.view('AAA')
+    assert np.shares_memory(view.close, data) and np.shares_memory(view.ts_ns, ts_ns)
+    assert as_rows(view) == rows
+
+    buffer.extend_arrays(*columns(make_rows(30, 5)))
+    assert as_rows(buffer.view()) == make_rows(0, 35)
+    assert not np.shares_memory(buffer._data, data)
+    assert as_rows(BarView(ts_ns, *values)) == rows
+
+    try:
+        buffer.attach(ts_ns, data[:, :5])
+        assert False, "mismatched blocks must be rejected"
+    except ValueError:
+        pass
+
+
+def test_views_and_frames():
+    """as_bars is zero-copy for views and buffers; frames match the candles"""
+    times = pd.date_range('2024-03-01 09:30', periods=40, freq='5min', tz='America/New_York')
+    rng = np.random.default_rng(3)
+    close = 50 + np.cumsum(rng.normal(0, 0.5, 40))
+    candles = [CandleData(t.to_pydatetime(), c - 0.1, c + 0.3, c - 0.3, c, int(v))
+               for t, c, v in zip(times, close, rng.integers(100, 900, 40))]
+    reference = pd.DataFrame([vars(c) for c in candles]).set_index('timestamp')
+
+    buffer = BarBuffer(capacity=None, candle_factory=CandleData)
+    buffer.extend(candles)
+    frame = buffer.view().to_frame()
+    assert frame.index.tz is not None and (frame.index == reference.index).all()
+    assert np.allclose(frame[list(BAR_FIELDS)].values, reference[list(BAR_FIELDS)].values)
+
+    view = as_bars(buffer)
+    assert as_bars(view) is view
+    assert np.shares_memory(view.close, buffer._data)
+    assert view[5] == candles[5] and view[-3:].to_candles() == candles[-3:]
+    assert list(view) == candles and buffer.last_timestamp() == candles[-1].timestamp
+
+    listed = as_bars(candles)
+    assert as_rows(listed) == as_rows(view) and type(listed[0]) is CandleData
+    assert view.index_before(candles[10].timestamp + dt.timedelta(minutes=2)) == 10
+    assert view.index_before(candles[0].timestamp - dt.timedelta(minutes=1)) == -1
+
+
+def main():
+    """Run all tests"""
+    logger.info("=== Starting Bar Store Tests ===")
+
+    test_matches_list_reference()
+    logger.info("Buffers match the list reference")
+
+    test_pin_across_compaction()
+    logger.info("Pinned views survive compactions")
+
+    test_attach_is_read_only()
+    logger.info("Attached columns are never written")
+
+    test_views_and_frames()
+    logger.info("Views are zero-copy and frames match the candles")
+
+    logger.info("=== Bar Store Tests Completed ===")
+
+
+if __name__ == "__main__":
+    main()
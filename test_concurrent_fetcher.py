@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test script for the concurrent fetcher.
+Checks that downloads run in parallel within the worker bound, that the
+provider rate limit holds, and that slow or failing symbols are reported
+without holding back the others.
+"""
+
+import logging
+import threading
+import time
+
+from concurrent_fetcher import ConcurrentFetcher, RateLimiter
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+class FakeProvider:
+    """Sleeps per request and records the peak number of requests in flight"""
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.in_flight = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def get(self, symbol, delay=None):
+        with self.lock:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        try:
+            time.sleep(self.delay if delay is None else delay)
+            if symbol == 'FAIL':
+                raise ValueError("no data")
+            return symbol.lower()
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+
+def test_bounded_concurrency():
+    """Downloads overlap, but never more than max_workers at once"""
+    provider = FakeProvider()
+    fetcher = ConcurrentFetcher(max_workers=4)
+    symbols = [f"S{i}" for i in range(12)]
+    try:
+        refresh = fetcher.run({symbol: (lambda request, symbol=symbol: request(provider.get, symbol))
+                               for symbol in symbols}, provider="FAKE", timeout=5)
+    finally:
+        fetcher.close()
+
+    assert refresh.results == {symbol: symbol.lower() for symbol in symbols}
+    assert not refresh.missing
+    assert provider.peak == 4
+    # 12 requests of 50ms on 4 workers: about 150ms instead of 600ms
+    assert refresh.duration < 0.45
+
+
+def test_rate_limit():
+    """The token bucket allows a burst, then ``rate`` requests per second"""
+    limiter = RateLimiter(rate=20, burst=2)
+    start = time.monotonic()
+    for _ in range(6):
+        assert limiter.acquire()
+    elapsed = time.monotonic() - start
+    assert 0.15 < elapsed < 0.5
+
+    # No token can be had before an immediate deadline
+    assert not limiter.acquire(deadline=time.monotonic())
+
+
+def test_deadlines_and_failures():
+    """Slow and failing symbols are reported; the rest are returned in time"""
+    provider = FakeProvider()
+    fetcher = ConcurrentFetcher(max_workers=4, rate_limits={"FAKE": 100})
+    tasks = {
+        'OK': lambda request: request(provider.get, 'OK'),
+        'FAIL': lambda request: request(provider.get, 'FAIL'),
+        'SLOW': lambda request: request(provider.get, 'SLOW', delay=2.0),
+    }
+    try:
+        start = time.monotonic()
+        refresh = fetcher.run(tasks, provider="FAKE", timeout=0.3)
+        assert time.monotonic() - start < 1.0
+    finally:
+        fetcher.close()
+
+    assert refresh.results == {'OK': 'ok'}
+    assert set(refresh.errors) == {'FAIL'}
+    assert refresh.timed_out == {'SLOW'}
+    assert refresh.missing == {'FAIL', 'SLOW'}
+
+
+def main():
+    """Run all tests"""
+    logger.info("=== Starting Concurrent Fetcher Tests ===")
+
+    test_bounded_concurrency()
+    logger.info("Downloads run concurrently within the worker bound")
+
+    test_rate_limit()
+    logger.info("Rate limit holds")
+
+    test_deadlines_and_failures()
+    logger.info("Slow and failing symbols are reported")
+
+    logger.info("=== Concurrent Fetcher Tests Completed ===")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test script for the correlation service.
+Checks the incremental EWMA estimates against pandas, the prior used for
+young pairs, missing prices, and batch exposure queries against the
+per-position loop of adjust_position_for_correlation.
+"""
+
+import logging
+
+import numpy as np
+import pandas as pd
+
+from correlation_service import CorrelationService
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+SYMBOLS = ["A", "B", "C", "D", "E"]
+
+
+def make_closes(bars=300, seed=0):
+    rng = np.random.default_rng(seed)
+    returns = rng.normal(0, 0.01, (bars, len(SYMBOLS)))
+    returns[:, 1] += returns[:, 0]          # B follows A
+    returns[:, 2] -= returns[:, 0]          # C moves against A
+    index = pd.date_range("2024-01-01", periods=bars, freq="D")
+    return pd.DataFrame(100 * np.cumprod(1 + returns, axis=0), index=index, columns=SYMBOLS)
+
+
+def test_matches_pandas_ewm():
+    """Incremental updates equal pandas' EWMA correlation of the full history"""
+    closes = make_closes()
+    service = CorrelationService(SYMBOLS, halflife=20, min_periods=5)
+    service.warm_up(closes)
+
+    expected = closes.pct_change().iloc[1:].ewm(alpha=service.alpha, adjust=False).corr().loc[closes.index[-1]]
+    assert np.allclose(service.matrix, expected.to_numpy())
+    assert service.correlation("A", "B") > 0.5 and service.correlation("A", "C") < -0.5
+
+    # A bar already applied is ignored
+    assert not service.update(closes.iloc[-1].to_dict(), closes.index[-1])
+
+
+def test_prior_and_missing_prices():
+    """Young pairs use the prior; symbols without a price keep their estimates"""
+    prior = np.full((len(SYMBOLS), len(SYMBOLS)), 0.3)
+    service = CorrelationService(SYMBOLS, halflife=20, min_periods=50, prior=prior)
+    closes = make_closes(bars=40)
+    service.warm_up(closes)
+    assert service.matrix[0, 1] == 0.3 and service.matrix[0, 0] == 1.0
+
+    # E stops trading: its pairs stop counting, the others keep going
+    counts = service._counts.copy()
+    service.update(dict(zip(SYMBOLS[:4], closes.iloc[-1, :4] * 1.01)), "next")
+    assert (service._counts[:4, :4] == counts[:4, :4] + 1).all()
+    assert (service._counts[4] == counts[4]).all()
+    assert service.correlation("A", "unknown", default=-2.0) == -2.0
+
+
+def test_exposure_matches_loop():
+    """Batch exposure equals summing size x correlation over the book"""
+    service = CorrelationService(SYMBOLS, halflife=20, min_periods=5)
+    service.warm_up(make_closes())
+    matrix = service.to_dict()
+
+    book = [("A", 100, 1), ("C", 50, -1), ("A", 20, -1), ("X", 999, 1)]
+    candidates = [("B", 1), ("A", -1), ("C", 1), ("Y", 1)]
+
+    exposure = service.exposure([c for c, _ in candidates], [d for _, d in candidates],
+                                [s for s, _, _ in book], [n for _, n, _ in book], [d for _, _, d in book])
+    for (symbol, direction), value in zip(candidates, exposure):
+        expected = sum(size * matrix[symbol][other] * (1.0 if direction == sign else -1.0)
+                       for other, size, sign in book
+                       if symbol in matrix and other in matrix and other != symbol)
+        assert np.isclose(value, expected), (symbol, value, expected)
+
+
+def main():
+    """Run all tests"""
+    logger.info("=== Starting Correlation Service Tests ===")
+
+    test_matches_pandas_ewm()
+    logger.info("EWMA correlations match pandas")
+
+    test_prior_and_missing_prices()
+    logger.info("Prior and missing prices handled")
+
+    test_exposure_matches_loop()
+    logger.info("Batch exposure matches the per-position loop")
+
+    logger.info("=== Correlation Service Tests Completed ===")
+
+
+if __name__ == "__main__":
+    main()
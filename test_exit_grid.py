@@ -0,0 +1,203 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test script for the exit rule grid.
+Checks the vectorized first-touch exits against a bar-by-bar simulation of
+every cell, the fill conventions on hand-made bars, that trades keep their
+own entry prices, and the cost of a 100-cell grid compared to a single cell.
+"""
+
+import logging
+import time
+
+import numpy as np
+import pandas as pd
+
+from exit_grid import EXIT_REASONS, ExitGrid, average_true_range, entries_from_trades, evaluate_exit_grid
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def make_bars(symbols, length=400, seed=4):
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range('2022-01-03', periods=length, tz='UTC')
+    bars = {}
+    for symbol in symbols:
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, length)))
+        opened = close * np.exp(rng.normal(0, 0.01, length))
+        high = np.maximum(opened, close) * (1 + rng.uniform(0, 0.02, length))
+        low = np.minimum(opened, close) * (1 - rng.uniform(0, 0.02, length))
+        bars[symbol] = pd.DataFrame({'open': opened, 'high': high, 'low': low, 'close': close}, index=dates)
+    return bars
+
+
+def simulate(frame, entry_bar, sign, stop, target, trailing, hold, period=14):
+    """Bar-by-bar exit of one trade, written for clarity"""
+    o, h, l, c = (frame[col].to_numpy() for col in ('open', 'high', 'low', 'close'))
+    atr = average_true_range(h, l, c, period)[entry_bar]
+    price = c[entry_bar]
+    stop_price = price - sign * stop * atr
+    target_price = price + sign * target * atr if target is not None else None
+    best = 0.0
+    for step in range(1, hold + 1):
+        bar = entry_bar + step
+        if bar >= len(c):
+            return c[bar - 1] if step > 1 else price, 'end', step - 1
+        level, reason = stop_price, 'stop'
+        if trailing is not None and best >= trailing[0]:
+            trail = price + sign * (best - trailing[1]) * atr
+            if sign * (trail - stop_price) > 0:
+                level, reason = trail, 'trailing'
+        adverse = l[bar] if sign > 0 else h[bar]
+        favorable = h[bar] if sign > 0 else l[bar]
+        if sign * (adverse - level) <= 0:
+            fill = min(o[bar], level) if sign > 0 else max(o[bar], level)
+            return fill, reason, step
+        if target_price is not None and sign * (favorable - target_price) >= 0:
+            fill = max(o[bar], target_price) if sign > 0 else min(o[bar], target_price)
+            return fill, 'target', step
+        best = max(best, sign * (favorable - price) / atr)
+    return c[entry_bar + hold], 'time', hold
+
+
+def test_matches_simulation():
+    """Every cell and entry exits where the bar-by-bar simulation does"""
+    bars = make_bars(['AAA', 'BBB', 'CCC'])
+    rng = np.random.default_rng(9)
+    trades = []
+    for _ in range(60):
+        symbol = str(rng.choice(list(bars)))
+        bar = int(rng.integers(20, 399))
+        trades.append({'symbol': symbol, 'entry_time': bars[symbol].index[bar].tz_convert(None),
+                       'direction': str(rng.choice(['LONG', 'SHORT'])), 'realized_pnl': 0.0})
+    entries = entries_from_trades(trades)
+    assert list(entries.columns) == ['symbol', 'entry_time', 'direction']
+
+    grid = ExitGrid(stop_loss_atr=[1.0, 2.0], take_profit_atr=[1.5, None],
+                    trailing=[None, (0.5, 1.0)], max_hold=[3, 15])
+    assert len(grid) == 16
+    result = evaluate_exit_grid(entries, bars, grid)
+    assert result.excursion.shape == (16, 60)
+
+    for cell, rules in grid.cells.iterrows():
+        trades_frame = result.trades(cell)
+        target = None if np.isnan(rules.take_profit_atr) else rules.take_profit_atr
+        trailing = None if np.isnan(rules.trailing_activation_atr) else \
+            (rules.trailing_activation_atr, rules.trailing_distance_atr)
+        for _, trade in trades_frame.iterrows():
+            frame = bars[trade.symbol]
+            entry_bar = frame.index.get_loc(pd.Timestamp(trade.entry_time, tz='UTC'))
+            sign = 1 if trade.direction == 'LONG' else -1
+            fill, reason, held = simulate(frame, entry_bar, sign, rules.stop_loss_atr, target, trailing,
+                                          int(rules.max_hold))
+            assert np.isclose(trade.exit_price, fill) and trade.exit_reason == reason and trade.bars_held == held
+
+    summary = result.summary()
+    assert summary['total_return'].is_monotonic_decreasing
+    assert (summary[[f'{reason}_exits' for reason in EXIT_REASONS]].sum(axis=1) == 60).all()
+
+
+def test_fill_conventions():
+    """Gaps fill at the open, stops win ties, unknown entries are skipped"""
+    dates = pd.bdate_range('2023-01-02', periods=25)
+    flat = np.full(25, 100.0)
+    frame = pd.DataFrame({'open': flat, 'high': flat + 1, 'low': flat - 1, 'close': flat}, index=dates)
+    frame.iloc[21] = [90.0, 91.0, 89.0, 90.0]      # gaps below a 2 ATR stop
+    frame.iloc[23] = [100.0, 110.0, 90.0, 100.0]   # touches both levels
+    bars = {'FLAT': frame}
+    entries = pd.DataFrame({'symbol': ['FLAT', 'FLAT', 'NONE'], 'direction': [1, -1, 1],
+                            'entry_time': [dates[20], dates[22], dates[20]]})
+
+    result = evaluate_exit_grid(entries, bars, ExitGrid([2.0], [3.0], max_hold=[5]))
+    trades = result.trades(0)
+    assert len(trades) == 2 and np.isclose(trades.atr[0], 2.0)
+    assert trades.exit_reason.tolist() == ['stop', 'stop']
+    # The short's ATR includes the two 11 point gap bars
+    assert np.allclose(trades.exit_price, [90.0, 100 + 2 * 46 / 14]) and trades.bars_held.tolist() == [1, 1]
+
+    # Close-only checks ignore the wicks
+    closes = evaluate_exit_grid(entries, bars, ExitGrid([2.0], [3.0], max_hold=[5]), intrabar=False).trades(0)
+    assert closes.exit_reason.tolist() == ['stop', 'end'] and closes.exit_price.tolist() == [90.0, 100.0]
+
+    try:
+        ExitGrid([0.0], [1.0])
+        assert False, "stops must be positive"
+    except ValueError:
+        pass
+
+
+def test_trade_entry_prices():
+    """Trades are scored from their own fills, not the entry bar's close"""
+    dates = pd.bdate_range('2023-01-02', periods=25)
+    flat = np.full(25, 100.0)
+    frame = pd.DataFrame({'open': flat, 'high': flat + 1, 'low': flat - 1, 'close': flat}, index=dates)
+    frame.iloc[22] = [100.0, 105.0, 99.0, 100.0]    # reaches a 3 ATR target from 98, not from 100
+    bars = {'FLAT': frame}
+    trades = [
+        {'symbol': 'FLAT', 'entry_time': dates[20], 'direction': 'LONG', 'entry_price': 98.0, 'realized_pnl': 0.0},
+        {'symbol': 'FLAT', 'entry_time': dates[20], 'direction': 'LONG', 'entry_price': 98.0, 'atr': 2.5},
+        {'symbol': 'NONE', 'entry_time': dates[20], 'direction': 'LONG', 'entry_price': 98.0, 'atr': 2.0}
+    ]
+    entries = entries_from_trades(trades)
+    assert list(entries.columns) == ['symbol', 'entry_time', 'direction', 'entry_price', 'atr']
+
+    trades_frame = evaluate_exit_grid(entries, bars, ExitGrid([2.0], [3.0], max_hold=[3])).trades(0)
+    # The entry without bars is still skipped; a missing ATR comes from the bars
+    assert len(trades_frame) == 2 and trades_frame.atr.tolist() == [2.0, 2.5]
+    assert trades_frame.exit_reason.tolist() == ['target', 'time']
+    assert np.allclose(trades_frame.exit_price, [104.0, 100.0])
+
+    # Re-priced at the close, the first trade would never reach its target
+    repriced = evaluate_exit_grid(entries.drop(columns=['entry_price', 'atr']), bars,
+                                  ExitGrid([2.0], [3.0], max_hold=[3])).trades(0)
+    assert repriced.exit_reason.tolist() == ['time', 'time']
+
+
+def test_grid_cost():
+    """A 100-cell grid costs about as much as a single cell"""
+    bars = make_bars([f"S{i}" for i in range(50)], length=750, seed=1)
+    rng = np.random.default_rng(2)
+    entries = pd.DataFrame({'symbol': [f"S{i}" for i in rng.integers(0, 50, 2000)],
+                            'direction': rng.choice(['LONG', 'SHORT'], 2000)})
+    entries['entry_time'] = [bars[s].index[i] for s, i in zip(entries.symbol, rng.integers(20, 700, 2000))]
+
+    start = time.perf_counter()
+    evaluate_exit_grid(entries, bars, ExitGrid([2.0], [3.0], max_hold=[20]))
+    single = time.perf_counter() - start
+
+    grid = ExitGrid(stop_loss_atr=[1.0, 1.5, 2.0, 2.5, 3.0], take_profit_atr=[2.0, 2.5, 3.0, 3.5, 4.0],
+                    trailing=[None, (1.0, 1.0)], max_hold=[10, 20])
+    start = time.perf_counter()
+    summary = evaluate_exit_grid(entries, bars, grid).summary()
+    full = time.perf_counter() - start
+    logger.info(f"1 cell: {single * 1000:.0f} ms, {len(grid)} cells: {full * 1000:.0f} ms")
+    assert len(summary) == 100 and full < 5
+
+
+def main():
+    """Run all tests"""
+    logger.info("=== Starting Exit Grid Tests ===")
+
+    test_matches_simulation()
+    logger.info("Grid exits match the bar-by-bar simulation")
+
+    test_fill_conventions()
+    logger.info("Fill conventions hold")
+
+    test_trade_entry_prices()
+    logger.info("Trades keep their own entry prices")
+
+    test_grid_cost()
+    logger.info("Grid cost is close to a single cell")
+
+    logger.info("=== Exit Grid Tests Completed ===")
+
+
+if __name__ == "__main__":
+    main()
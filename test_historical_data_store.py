@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test script for the historical data store.
+Uses a fake bars client so it runs offline, and checks that symbols are
+batched into shared requests, that cached days are not fetched again and that
+only missing date ranges are requested on later calls.
+"""
+
+import logging
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from historical_data_store import BAR_COLUMNS, HistoricalDataStore
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+class FakeBarsClient:
+    """Returns one bar per business day and records every request"""
+
+    def __init__(self, empty_symbols=()):
+        self.requests = []
+        self.empty_symbols = set(empty_symbols)
+
+    def get_bars(self, symbols, start, end, timeframe, adjustment="all"):
+        self.requests.append((tuple(symbols), start, end))
+        index = pd.date_range(start, end, freq="B", tz="America/New_York").tz_convert("UTC")
+        index.name = "timestamp"
+        return {
+            symbol: pd.DataFrame({column: np.arange(len(index), dtype=float) for column in BAR_COLUMNS},
+                                 index=index)
+            for symbol in symbols if symbol not in self.empty_symbols
+        }
+
+
+def make_store(client):
+    """Store over a fresh temporary cache directory"""
+    cache_dir = tempfile.mkdtemp(prefix="bars_cache_")
+    return HistoricalDataStore(client, cache_dir=cache_dir), cache_dir
+
+
+def test_symbols_are_batched_and_cached():
+    """One request for all symbols, none for a repeated range"""
+    client = FakeBarsClient(empty_symbols={"NONE"})
+    store, cache_dir = make_store(client)
+    try:
+        bars = store.get_bars(["AAA", "BBB", "NONE"], "2023-01-01", "2023-03-31", "1D")
+        assert len(client.requests) == 1
+        assert set(bars) == {"AAA", "BBB"}
+        assert len(bars["AAA"]) == len(pd.bdate_range("2023-01-01", "2023-03-31"))
+
+        # Sub-range, different timeframe spelling, symbol without bars
+        bars = store.get_bars(["AAA", "NONE"], "2023-02-01", "2023-02-28", "1Day")
+        assert len(client.requests) == 1
+        assert len(bars["AAA"]) == len(pd.bdate_range("2023-02-01", "2023-02-28"))
+    finally:
+        shutil.rmtree(cache_dir)
+
+
+def test_only_missing_ranges_are_fetched():
+    """Extending the range fetches just the gaps, across year partitions"""
+    client = FakeBarsClient()
+    store, cache_dir = make_store(client)
+    try:
+        store.get_bars(["AAA", "BBB"], "2023-04-01", "2023-06-30")
+        bars = store.get_bars(["AAA", "BBB", "CCC"], "2022-12-01", "2024-01-15")
+
+        requested = {(symbols, str(start), str(end)) for symbols, start, end in client.requests[1:]}
+        assert requested == {
+            (("AAA", "BBB"), "2022-12-01", "2023-03-31"),
+            (("AAA", "BBB"), "2023-07-01", "2024-01-15"),
+            (("CCC",), "2022-12-01", "2024-01-15"),
+        }
+        expected = len(pd.bdate_range("2022-12-01", "2024-01-15"))
+        assert all(len(bars[symbol]) == expected for symbol in ("AAA", "BBB", "CCC"))
+        assert bars["AAA"].index.is_monotonic_increasing
+
+        # A new store over the same directory reuses the cache on disk
+        client_again = FakeBarsClient()
+        store_again = HistoricalDataStore(client_again, cache_dir=cache_dir)
+        bars = store_again.get_bars(["AAA"], "2023-01-01", "2023-12-31")
+        assert not client_again.requests
+        assert len(bars["AAA"]) == len(pd.bdate_range("2023-01-01", "2023-12-31"))
+    finally:
+        shutil.rmtree(cache_dir)
+
+
+def main():
+    """Run all tests"""
+    logger.info("=== Starting Historical Data Store Tests ===")
+
+    test_symbols_are_batched_and_cached()
+    logger.info("Symbols are batched and repeated ranges come from the cache")
+
+    test_only_missing_ranges_are_fetched()
+    logger.info("Only missing date ranges are fetched")
+
+    logger.info("=== Historical Data Store Tests Completed ===")
+
+
+if __name__ == "__main__":
+    main()
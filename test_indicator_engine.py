@@ -0,0 +1,247 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test script for the incremental indicator engine.
+Checks that the streaming indicators in indicator_engine.py produce the same
+values as the batch functions in technical_indicators.py (and ADX as the
+strategies computed it, including bars with equal up and down moves), both
+when warmed up from a full history and when fed one bar at a time.
+"""
+
+import logging
+
+import numpy as np
+import pandas as pd
+
+from bar_store import BarBuffer
+from indicator_engine import IndicatorEngine
+from technical_indicators import (calculate_adx, calculate_atr, calculate_bollinger_bands,
+                                  calculate_ema, calculate_macd, calculate_rsi, calculate_sma)
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+RTOL = 1e-8
+ATOL = 1e-8
+# pandas' rolling variance can leave a ~1e-12 residue on windows that have just
+# become flat; its square root shows up as ~1e-6 in the band values
+BAND_ATOL = 1e-5
+
+
+def generate_mock_bars(n=600, seed=42, flat_every=0, tie_every=0):
+    """
+    Generate random OHLCV bars as a DataFrame.
+
+    Args:
+        n (int): Number of bars
+        seed (int): Random seed
+        flat_every (int): If set, insert a run of unchanged prices every
+            ``flat_every`` bars to exercise zero-loss and zero-variance windows
+        tie_every (int): If set, prices sit on a 1/64 tick grid and every
+            ``tie_every`` bars the high rises exactly as far as the low falls
+
+    Returns:
+        pd.DataFrame: Bars indexed by timestamp
+    """
+    rng = np.random.RandomState(seed)
+    close = 100 * np.cumprod(1 + rng.normal(0, 0.01, n))
+    if flat_every:
+        for start in range(flat_every, n - 30, flat_every):
+            close[start:start + 25] = close[start]
+    high = close * (1 + rng.uniform(0, 0.01, n))
+    low = close * (1 - rng.uniform(0, 0.01, n))
+    if tie_every:
+        # Ticks are exact in binary, so the up and down moves compare equal
+        high, low, close = (np.round(values * 64) / 64 for values in (high, low, close))
+        for i in range(tie_every, n, tie_every):
+            high[i] = high[i - 1] + 0.25
+            low[i] = low[i - 1] - 0.25
+            close[i] = min(max(close[i], low[i]), high[i])
+    open_ = low + (high - low) * rng.uniform(0, 1, n)
+    volume = rng.randint(1000, 100000, n).astype(float)
+    index = pd.date_range("2024-01-02 09:30", periods=n, freq="15min", tz="UTC")
+    return pd.DataFrame({"open": open_, "high": high, "low": low,
+                         "close": close, "volume": volume}, index=index)
+
+
+def to_buffer(df, capacity=10000):
+    """Load a bar DataFrame into a BarBuffer"""
+    buffer = BarBuffer(capacity=capacity)
+    ts = df.index.values.astype("datetime64[ns]").view("int64")
+    buffer.extend_arrays(ts, df["open"].values, df["high"].values, df["low"].values,
+                         df["close"].values, df["volume"].values)
+    return buffer
+
+
+def strategy_adx(df, period=14):
+    """ADX as the trend following strategy computed it before the engine
+
+    Unlike calculate_adx, a bar with equal up and down moves books no
+    directional movement at all.
+    """
+    tr = pd.concat([df["high"] - df["low"], (df["high"] - df["close"].shift()).abs(),
+                    (df["low"] - df["close"].shift()).abs()], axis=1).max(axis=1)
+    atr = tr.rolling(window=period).mean()
+    up_move = df["high"] - df["high"].shift()
+    down_move = df["low"].shift() - df["low"]
+    plus_dm = pd.Series(np.where((up_move > down_move) & (up_move > 0), up_move, 0), index=df.index)
+    minus_dm = pd.Series(np.where((down_move > up_move) & (down_move > 0), down_move, 0), index=df.index)
+    plus_di = 100 * (plus_dm.rolling(window=period).mean() / atr)
+    minus_di = 100 * (minus_dm.rolling(window=period).mean() / atr)
+    dx = 100 * np.abs(plus_di - minus_di) / (plus_di + minus_di)
+    return dx.rolling(window=period).mean(), plus_di, minus_di
+
+
+def expected_indicators(df):
+    """Batch reference values for the indicators queried in engine_indicators"""
+    upper, middle, lower = calculate_bollinger_bands(df["close"], 20, 2)
+    macd, signal, hist = calculate_macd(df["close"], 12, 26, 9)
+    adx, plus_di, minus_di = strategy_adx(df, 14)
+    return {
+        "sma": calculate_sma(df["close"], 20),
+        "sma_volume": calculate_sma(df["volume"], 20),
+        "ema": calculate_ema(df["close"], 9),
+        "rsi": calculate_rsi(df["close"], 14),
+        "atr": calculate_atr(df["high"], df["low"], df["close"], 14),
+        "adx": adx,
+        "plus_di": plus_di,
+        "minus_di": minus_di,
+        "bb_upper": upper,
+        "bb_middle": middle,
+        "bb_lower": lower,
+        "macd": macd,
+        "macd_signal": signal,
+        "macd_hist": hist,
+    }
+
+
+def engine_indicators(engine, symbol, candles):
+    """Query the engine for the same indicators as expected_indicators"""
+    bands = engine.get(symbol, candles, "bollinger", period=20, std_dev=2)
+    macd = engine.get(symbol, candles, "macd", fast_period=12, slow_period=26, signal_period=9)
+    adx = engine.get(symbol, candles, "adx", period=14)
+    return {
+        "sma": engine.get(symbol, candles, "sma", period=20),
+        "sma_volume": engine.get(symbol, candles, "sma", period=20, field="volume"),
+        "ema": engine.get(symbol, candles, "ema", period=9),
+        "rsi": engine.get(symbol, candles, "rsi", period=14).rsi,
+        "atr": engine.get(symbol, candles, "atr", period=14).atr,
+        "adx": adx.adx,
+        "plus_di": adx.plus_di,
+        "minus_di": adx.minus_di,
+        "bb_upper": bands.upper,
+        "bb_middle": bands.middle,
+        "bb_lower": bands.lower,
+        "macd": macd.macd,
+        "macd_signal": macd.signal,
+        "macd_hist": macd.histogram,
+    }
+
+
+def assert_equivalent(expected, actual, label):
+    """Assert two indicator dictionaries match, NaN positions included"""
+    for name, series in expected.items():
+        values = np.asarray(series, dtype=float)
+        got = np.asarray(actual[name], dtype=float)
+        assert len(values) == len(got), f"{label}/{name}: length {len(got)} != {len(values)}"
+        assert np.array_equal(np.isnan(values), np.isnan(got)), \
+            f"{label}/{name}: NaN positions differ"
+        atol = BAND_ATOL if name.startswith("bb_") else ATOL
+        assert np.allclose(values, got, rtol=RTOL, atol=atol, equal_nan=True), \
+            f"{label}/{name}: max abs diff {np.nanmax(np.abs(values - got))}"
+
+
+def test_warm_start_matches_batch():
+    """Engine warmed up from a full history matches the batch functions"""
+    for seed, flat_every, tie_every in ((1, 0, 0), (2, 0, 0), (3, 97, 0), (4, 0, 7)):
+        df = generate_mock_bars(seed=seed, flat_every=flat_every, tie_every=tie_every)
+        engine = IndicatorEngine()
+        actual = engine_indicators(engine, "TEST", to_buffer(df))
+        assert_equivalent(expected_indicators(df), actual, f"seed={seed}")
+        if not tie_every:
+            # Without ties calculate_adx agrees with the strategies' ADX
+            assert_equivalent({"adx": calculate_adx(df["high"], df["low"], df["close"], 14)}, actual,
+                              f"seed={seed}")
+
+
+def test_streaming_matches_batch():
+    """Feeding bars one at a time gives the same values at every step"""
+    df = generate_mock_bars(n=300, seed=7, flat_every=61, tie_every=11)
+    buffer = to_buffer(df.iloc[:40])
+    engine = IndicatorEngine()
+    engine_indicators(engine, "TEST", buffer)
+
+    for i in range(40, len(df)):
+        row = df.iloc[i:i + 1]
+        ts = row.index.values.astype("datetime64[ns]").view("int64")
+        buffer.extend_arrays(ts, row["open"].values, row["high"].values, row["low"].values,
+                             row["close"].values, row["volume"].values)
+        if i % 25 == 0 or i == len(df) - 1:
+            assert_equivalent(expected_indicators(df.iloc[:i + 1]),
+                              engine_indicators(engine, "TEST", buffer), f"bar={i}")
+        else:
+            engine.update("TEST", buffer)
+
+
+def test_symbols_and_parameters_are_independent():
+    """Different symbols and parameter sets keep separate state"""
+    df_a = generate_mock_bars(seed=11)
+    df_b = generate_mock_bars(seed=12)
+    engine = IndicatorEngine()
+    for period in (5, 14, 30):
+        for symbol, df in (("AAA", df_a), ("BBB", df_b)):
+            expected = calculate_rsi(df["close"], period).values
+            got = engine.get(symbol, to_buffer(df), "rsi", period=period).rsi
+            assert np.allclose(expected, got, rtol=RTOL, atol=ATOL, equal_nan=True)
+
+
+def test_history_change_rebuilds_state():
+    """Revised or rewound histories are recomputed rather than appended to"""
+    df = generate_mock_bars(n=200, seed=5)
+    engine = IndicatorEngine()
+    engine.get("TEST", to_buffer(df), "ema", period=9)
+
+    # Shorter history that ends earlier
+    short = df.iloc[:120]
+    got = engine.get("TEST", to_buffer(short), "ema", period=9)
+    assert np.allclose(calculate_ema(short["close"], 9).values, got, rtol=RTOL, atol=ATOL)
+
+    # Same timestamps, revised last bar
+    revised = df.copy()
+    revised.iloc[-1, revised.columns.get_loc("close")] *= 1.05
+    engine.get("TEST", to_buffer(df), "ema", period=9)
+    got = engine.get("TEST", to_buffer(revised), "ema", period=9)
+    assert np.allclose(calculate_ema(revised["close"], 9).values, got, rtol=RTOL, atol=ATOL)
+
+    # Window that starts later than the consumed history
+    tail = df.iloc[50:]
+    got = engine.get("TEST", to_buffer(tail), "ema", period=9)
+    assert len(got) == len(tail)
+
+
+def main():
+    """Run all tests"""
+    logger.info("=== Starting Indicator Engine Tests ===")
+
+    test_warm_start_matches_batch()
+    logger.info("Warm start matches batch functions")
+
+    test_streaming_matches_batch()
+    logger.info("Bar-by-bar updates match batch functions")
+
+    test_symbols_and_parameters_are_independent()
+    logger.info("Symbols and parameter sets are independent")
+
+    test_history_change_rebuilds_state()
+    logger.info("History changes rebuild indicator state")
+
+    logger.info("=== Indicator Engine Tests Completed ===")
+
+
+if __name__ == "__main__":
+    main()
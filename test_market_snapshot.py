@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test script for market snapshots.
+Checks that pinned bar views survive appends, compactions and replacements
+of the buffer they came from, and that published generations reach a
+waiting reader in order.
+"""
+
+import datetime as dt
+import logging
+import threading
+
+import numpy as np
+
+from bar_store import Bar, BarBuffer, BarStore
+from market_snapshot import SnapshotPublisher
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+START = dt.datetime(2024, 1, 2, 9, 30)
+
+
+def make_bars(first, count):
+    """Minute bars whose close is their sequence number"""
+    return [Bar(START + dt.timedelta(minutes=i), i, i + 1, i - 1, float(i), 100)
+            for i in range(first, first + count)]
+
+
+def test_pinned_views_are_stable():
+    """Writes after pin() never change what the pinned view shows"""
+    buffer = BarBuffer(capacity=10, headroom=2)
+    buffer.extend(make_bars(0, 5))
+    buffer.extend(make_bars(5, 5))
+    pinned = buffer.pin()
+    columns = buffer.columns[0]
+
+    # Append into the headroom: the same columns, behind the pinned rows
+    buffer.extend(make_bars(10, 2))
+    assert buffer.columns[0].base is columns.base
+    # Compaction moves to new columns instead of overwriting
+    buffer.extend(make_bars(12, 3))
+    assert list(buffer.view().close) == [float(i) for i in range(5, 15)]
+    assert list(pinned.close) == [float(i) for i in range(10)]
+
+    second = buffer.pin()
+    buffer.replace(make_bars(100, 4))
+    assert list(second.close) == [float(i) for i in range(5, 15)]
+    assert list(buffer.view().close) == [100.0, 101.0, 102.0, 103.0]
+
+    try:
+        pinned.close[0] = -1.0
+        assert False, "pinned views must be read-only"
+    except ValueError:
+        pass
+
+    # Without a pin the buffer compacts in place as before
+    buffer = BarBuffer(capacity=10, headroom=2)
+    buffer.extend(make_bars(0, 5))
+    buffer.extend(make_bars(5, 7))
+    columns = buffer.columns[0]
+    buffer.extend(make_bars(12, 1))
+    assert buffer.columns[0].base is columns.base
+
+
+def test_publish_and_wait():
+    """Readers get each new generation once, even while the writer keeps going"""
+    store = BarStore(capacity=50)
+    store.add_symbol("AAPL")
+    market = BarBuffer(capacity=50)
+    vix = BarBuffer(capacity=50)
+    publisher = SnapshotPublisher()
+    seen = []
+
+    def reader():
+        version = 0
+        while version < 7:
+            snapshot = publisher.wait_for(version, timeout=5)
+            if snapshot is None:
+                return
+            version = snapshot.version
+            bars = snapshot.bars("AAPL")
+            # Every generation is internally consistent
+            assert np.array_equal(bars.close, np.arange(len(bars), dtype=float) + max(0, 10 * version - 50))
+            seen.append(version)
+
+    thread = threading.Thread(target=reader)
+    thread.start()
+    for version in range(1, 8):
+        store["AAPL"].extend(make_bars(10 * (version - 1), 10))
+        publisher.publish(store, market, vix, market_state="BULLISH", stale_symbols=["MSFT"])
+    thread.join(timeout=5)
+    publisher.close()
+
+    assert seen and seen == sorted(set(seen)) and seen[-1] == 7
+    snapshot = publisher.current
+    assert snapshot.version == 7 and snapshot.stale_symbols == frozenset(["MSFT"])
+    assert snapshot.market_state == "BULLISH" and len(snapshot.bars("AAPL")) == 50
+    assert publisher.wait_for(7, timeout=0) is None
+
+
+def main():
+    """Run all tests"""
+    logger.info("=== Starting Market Snapshot Tests ===")
+
+    test_pinned_views_are_stable()
+    logger.info("Pinned views survive later writes")
+
+    test_publish_and_wait()
+    logger.info("Generations are published in order")
+
+    logger.info("=== Market Snapshot Tests Completed ===")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test script for the batched MLSignalClassifier features.
+Checks the vectorized bar features against a per-window reference, the
+batch feature matrix against per-signal extraction, the feature store,
+and that batch scoring matches per-signal scores with one predict_proba
+call.
+"""
+
+import datetime
+import logging
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from mean_reversion_enhanced import CandleData, MarketState, Signal
+from ml_signal_classifier import BAR_FEATURE_NAMES, MLSignalClassifier, window_features
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def make_candles(length, seed):
+    rng = np.random.default_rng(seed)
+    close = 50 * np.exp(np.cumsum(rng.normal(0, 0.015, length)))
+    start = datetime.datetime(2023, 1, 2)
+    return [CandleData(timestamp=start + datetime.timedelta(days=i), open=c, high=c * (1 + rng.uniform(0, 0.02)),
+                       low=c * (1 - rng.uniform(0, 0.02)), close=c, volume=float(rng.integers(1000, 5000)))
+            for i, c in enumerate(close)]
+
+
+def make_signal(symbol, candle, direction='long', strength='strong'):
+    sign = 1 if direction == 'long' else -1
+    return Signal(symbol=symbol, timestamp=candle.timestamp, direction=direction, entry_price=candle.close,
+                  stop_loss=candle.close * (1 - 0.03 * sign), take_profit=candle.close * (1 + 0.06 * sign),
+                  strategy_name='MeanReversion', strength=strength)
+
+
+def reference_window(closes, highs, lows, volumes):
+    """Bar features of one window, computed the way the per-signal code did"""
+    current = closes[-1]
+    ma5, ma10, ma20 = np.mean(closes[-5:]), np.mean(closes[-10:]), np.mean(closes[-20:])
+    tr = np.zeros(len(highs))
+    tr[0] = highs[0] - lows[0]
+    for i in range(1, len(highs)):
+        tr[i] = max(highs[i] - lows[i], abs(highs[i] - closes[i - 1]), abs(lows[i] - closes[i - 1]))
+    deltas = np.diff(closes)
+    avg_gain = np.mean(np.where(deltas > 0, deltas, 0)[-14:])
+    avg_loss = np.mean(np.where(deltas < 0, -deltas, 0)[-14:])
+    rsi = 100.0 if avg_loss == 0 else 100 - 100 / (1 + avg_gain / avg_loss)
+    bb_std = np.std(closes[-20:])
+    return [current / ma5 - 1, current / ma10 - 1, current / ma20 - 1,
+            np.mean(tr[-14:]) / current, np.std(closes[-5:]) / ma5, np.std(closes[-10:]) / ma10,
+            np.std(closes[-20:]) / ma20,
+            current / closes[-2] - 1, current / closes[-6] - 1, current / closes[-11] - 1,
+            rsi, (current - (ma20 - 2 * bb_std)) / (4 * bb_std),
+            volumes[-1] / np.mean(volumes[-5:]), volumes[-1] / np.mean(volumes[-10:])]
+
+
+def make_classifier(tmp, **params):
+    params.setdefault('model_path', os.path.join(tmp, 'models', 'signal_classifier.pkl'))
+    return MLSignalClassifier({'ml_classifier_params': params})
+
+
+def test_window_features():
+    """Vectorized bar features equal the per-window reference"""
+    candles = make_candles(80, seed=1)
+    columns = [np.array([getattr(c, name) for c in candles]) for name in ('close', 'high', 'low', 'volume')]
+    windows = [np.lib.stride_tricks.sliding_window_view(values, 25) for values in columns]
+    features = window_features(*windows)
+    assert features.shape == (56, len(BAR_FEATURE_NAMES))
+    for row in range(len(features)):
+        expected = reference_window(*(window[row] for window in windows))
+        assert np.allclose(features[row], expected)
+
+
+def test_batch_features_and_store():
+    """The batch matrix equals per-signal extraction and reuses cached bars"""
+    state = MarketState(date=datetime.datetime(2023, 6, 1), regime='bullish', volatility=0.012,
+                        trend_strength=0.4, is_range_bound=False)
+    candles = {f"S{i}": make_candles(120, seed=i) for i in range(5)}
+    rng = np.random.default_rng(0)
+    signals = []
+    for _ in range(40):
+        symbol = f"S{rng.integers(0, 5)}"
+        bar = int(rng.integers(0, 120))
+        signals.append(make_signal(symbol, candles[symbol][bar], rng.choice(['long', 'short']),
+                                   rng.choice(['weak', 'medium', 'strong'])))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        classifier = make_classifier(tmp)
+        matrix = classifier.extract_features_batch(candles, signals, state)
+        for row, signal in enumerate(signals):
+            history = [c for c in candles[signal.symbol] if c.timestamp <= signal.timestamp]
+            if len(history) < classifier.feature_lookback:
+                assert np.isnan(matrix[row]).all()
+            else:
+                assert np.allclose(matrix[row], classifier._extract_features(history, signal, state))
+
+        # A second batch is served from the feature store
+        store = classifier.feature_store
+        hits = store.hits
+        again = classifier.extract_features_batch(candles, signals, state)
+        assert np.array_equal(np.isnan(again), np.isnan(matrix)) and np.allclose(again[~np.isnan(again)],
+                                                                               matrix[~np.isnan(matrix)])
+        assert store.hits - hits == int((~np.isnan(matrix[:, 0])).sum())
+
+        # A bar that changed (still forming) is recomputed
+        last = candles['S0'][-1]
+        signal = make_signal('S0', last)
+        before = classifier.extract_features_batch(candles, [signal], state)[0]
+        last.close *= 1.05
+        after = classifier.extract_features_batch(candles, [signal], state)[0]
+        assert not np.allclose(before, after)
+        assert np.allclose(after, classifier._extract_features(candles['S0'], signal, state))
+
+
+class CountingModel:
+    """Wraps a classifier and counts predict_proba calls"""
+
+    def __init__(self, model):
+        self.model = model
+        self.calls = 0
+
+    def predict_proba(self, X):
+        self.calls += 1
+        return self.model.predict_proba(X)
+
+
+def test_batch_scoring():
+    """Batch scores equal per-signal scores with a single predict_proba call"""
+    candles = {f"S{i}": make_candles(300, seed=10 + i) for i in range(8)}
+    rng = np.random.default_rng(1)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        classifier = make_classifier(tmp, min_training_samples=50)
+        training = []
+        for _ in range(300):
+            symbol = f"S{rng.integers(0, 8)}"
+            bar = int(rng.integers(20, 290))
+            history = candles[symbol][:bar + 1]
+            outcome = candles[symbol][bar + 5].close / history[-1].close - 1
+            features = classifier._extract_features(history, make_signal(symbol, history[-1]))
+            training.append({'features': features, 'label': 1 if outcome > 0 else 0})
+        assert classifier.train_model(training) and classifier.is_trained
+        assert os.path.exists(classifier.model_path)
+
+        signals = [make_signal(f"S{i % 8}", candles[f"S{i % 8}"][-1], 'long' if i % 3 else 'short')
+                   for i in range(40)]
+        classifier.model = CountingModel(classifier.model)
+        start = time.perf_counter()
+        scores = classifier.predict_signal_quality_batch(candles, signals)
+        batch = time.perf_counter() - start
+        assert classifier.model.calls == 1 and scores.shape == (40,)
+
+        classifier.feature_store.clear()
+        start = time.perf_counter()
+        single = [classifier.predict_signal_quality(candles[s.symbol], s, None) for s in signals]
+        serial = time.perf_counter() - start
+        logger.info(f"40 signals: batch {batch * 1000:.1f} ms, one by one {serial * 1000:.1f} ms")
+        assert np.allclose(scores, single) and classifier.model.calls == 41
+
+        # Unknown symbols and short histories keep the default score
+        extra = [make_signal('NONE', candles['S0'][-1]), make_signal('S1', candles['S1'][3])]
+        assert classifier.predict_signal_quality_batch(candles, extra).tolist() == [0.5, 0.5]
+
+
+def main():
+    """Run all tests"""
+    logger.info("=== Starting ML Signal Classifier Tests ===")
+
+    test_window_features()
+    logger.info("Vectorized bar features match the reference")
+
+    test_batch_features_and_store()
+    logger.info("Batch features match and are cached")
+
+    test_batch_scoring()
+    logger.info("Batch scoring matches per-signal scoring")
+
+    logger.info("=== ML Signal Classifier Tests Completed ===")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test script for MLStrategySelector training and prediction.
+Checks the growable training arrays, fingerprint-based retraining skips,
+background training with model swap-in, warm-start retraining, and that
+the batched predictions match each model's own predict call.
+"""
+
+import contextlib
+import datetime as dt
+import logging
+import os
+import tempfile
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+from ml_strategy_selector import MLStrategySelector, TrainingSet
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+STRATEGIES = ['MeanReversion', 'TrendFollowing', 'VolatilityBreakout']
+
+
+def make_state(rng):
+    return SimpleNamespace(
+        regime=SimpleNamespace(value=int(rng.integers(0, 4))),
+        market_indicators={'vix': rng.uniform(10, 40), 'adx': rng.uniform(5, 50)},
+        breadth_indicators={'advance_decline': rng.normal()},
+        sentiment_indicators={'put_call': rng.uniform(0.5, 1.5)}
+    )
+
+
+def record_samples(selector, rng, count):
+    for _ in range(count):
+        state = make_state(rng)
+        for i, name in enumerate(STRATEGIES):
+            vix = state.market_indicators['vix']
+            profit = (0.01 * (i - 1) * (vix - 25) / 15 + 0.005 * state.regime.value
+                      + rng.normal(0, 0.002))
+            selector.record_trade_result(name, state, profit)
+
+
+@contextlib.contextmanager
+def temporary_cwd():
+    """The selector keeps its models in ./models"""
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            yield tmp
+        finally:
+            os.chdir(cwd)
+
+
+def make_selector(**config):
+    settings = {'strategies': STRATEGIES, 'retraining_interval_days': 0, 'min_training_samples': 30,
+                'n_estimators': 40, 'max_depth': 6}
+    settings.update(config)
+    return MLStrategySelector(settings)
+
+
+def test_training_set():
+    """Rows grow geometrically, earlier views keep their rows"""
+    data = TrainingSet(capacity=4)
+    for i in range(3):
+        data.append([i, i * 2.0], i / 10, dt.datetime(2024, 1, 1 + i))
+    view = data.features
+    before = data.fingerprint()
+    for i in range(3, 20):
+        data.append([i, i * 2.0], i / 10, dt.datetime(2024, 1, 1 + i))
+    assert len(data) == 20 and data.features.shape == (20, 2)
+    assert np.array_equal(view, [[0, 0], [1, 2], [2, 4]]) and data.targets[-1] == 1.9
+    assert data.fingerprint() != before
+    try:
+        data.append([1.0], 0.0, dt.datetime(2024, 2, 1))
+        assert False, "feature count must match"
+    except ValueError:
+        pass
+
+
+def test_batched_predictions_and_skip():
+    """One batched call matches per-model predict; unchanged data is not refit"""
+    rng = np.random.default_rng(3)
+    with temporary_cwd():
+        selector = make_selector(background_training=False)
+        record_samples(selector, rng, 60)
+        selector.train_models(dt.datetime(2024, 1, 1))
+        assert set(selector.models) == set(STRATEGIES)
+
+        for _ in range(5):
+            state = make_state(rng)
+            predictions = selector.predict_strategies(state, STRATEGIES + ['Unknown'])
+            assert predictions['Unknown'] == 0.0
+            features = selector._extract_features(state)
+            for name in STRATEGIES:
+                expected = selector.models[name].predict(selector.scalers[name].transform(features))[0]
+                assert np.isclose(predictions[name], expected)
+                assert np.isclose(selector.predict_strategy_performance(name, state), expected)
+        weights = selector.get_optimal_strategy_weights(make_state(rng), STRATEGIES)
+        assert np.isclose(sum(weights.values()), 1.0)
+
+        # Unchanged data keeps the fitted models; new samples retrain
+        models = dict(selector.models)
+        selector.train_models(dt.datetime(2024, 1, 2))
+        assert all(selector.models[name] is models[name] for name in STRATEGIES)
+        selector.record_trade_result('TrendFollowing', make_state(rng), 0.01)
+        selector.train_models(dt.datetime(2024, 1, 3))
+        assert selector.models['TrendFollowing'] is not models['TrendFollowing']
+        assert selector.models['MeanReversion'] is models['MeanReversion']
+
+
+def test_background_and_warm_start():
+    """Background fits swap in atomically; warm starts replace the oldest trees"""
+    rng = np.random.default_rng(8)
+    with temporary_cwd():
+        selector = make_selector(n_estimators=200, max_depth=None, warm_start_trees=10)
+        record_samples(selector, rng, 400)
+
+        start = time.perf_counter()
+        selector.train_models(dt.datetime(2024, 1, 1))
+        submitted = time.perf_counter() - start
+        # Predictions stay available (zero without a model) while the fits run
+        assert set(selector.predict_strategies(make_state(rng), STRATEGIES)) == set(STRATEGIES)
+        selector.wait_for_training()
+        logger.info(f"Submitted background training in {submitted * 1000:.1f} ms")
+        assert set(selector.models) == set(STRATEGIES)
+        assert all(os.path.exists(f"models/{name}_model.pkl") for name in STRATEGIES)
+
+        old_model = selector.models['MeanReversion']
+        old_trees = list(old_model.estimators_)
+        record_samples(selector, rng, 20)
+        selector.train_models(dt.datetime(2024, 1, 2), wait_for_completion=True)
+        new_model = selector.models['MeanReversion']
+        assert new_model is not old_model and old_model.estimators_ == old_trees
+        assert len(new_model.estimators_) == 200
+        # The 10 oldest trees were dropped, the other 190 are kept as they were
+        assert all(np.array_equal(new.tree_.threshold, old.tree_.threshold)
+                   for new, old in zip(new_model.estimators_[:190], old_trees[10:]))
+        assert not np.array_equal(new_model.estimators_[-1].tree_.threshold, old_trees[-1].tree_.threshold)
+        assert selector.scalers['MeanReversion'] is not None
+
+        # A new selector loads the saved models
+        reloaded = make_selector()
+        state = make_state(rng)
+        assert np.isclose(reloaded.predict_strategy_performance('MeanReversion', state),
+                          selector.predict_strategy_performance('MeanReversion', state))
+        selector.close()
+
+
+def test_backtest_signals_train_first():
+    """ML signal generation retrains before predicting unless told otherwise"""
+    from enhanced_trading_functions import generate_ml_signals
+
+    rng = np.random.default_rng(5)
+    with temporary_cwd():
+        selector = make_selector()
+        record_samples(selector, rng, 200)
+        state = make_state(rng)
+        state.timestamp = dt.datetime(2024, 3, 1)
+        assert generate_ml_signals([], {name: None for name in STRATEGIES}, {}, state, selector, logger) == []
+        assert set(selector.models) == set(STRATEGIES)
+        assert selector.last_training_date == state.timestamp
+        selector.close()
+
+
+def main():
+    """Run all tests"""
+    logger.info("=== Starting ML Strategy Selector Tests ===")
+
+    test_training_set()
+    logger.info("Training arrays grow correctly")
+
+    test_batched_predictions_and_skip()
+    logger.info("Batched predictions match and unchanged data is skipped")
+
+    test_background_and_warm_start()
+    logger.info("Background and warm-start training work")
+
+    test_backtest_signals_train_first()
+    logger.info("Signal generation trains before predicting")
+
+    logger.info("=== ML Strategy Selector Tests Completed ===")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test script for the parameter sweep runner.
+Checks that the shared bar block round-trips the streams read-only and is
+removed on close, that failed backtests are recorded instead of raised, and
+that a restarted sweep skips the combinations already in its results file.
+"""
+
+import datetime as dt
+import json
+import logging
+import os
+import tempfile
+
+import numpy as np
+
+from bar_store import BarBuffer
+from parameter_sweep import ParameterSweep, SharedBars, combination_key
+from test_walk_forward import RUNS, ToySystem
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+START, END = dt.date(2023, 1, 1), dt.date(2023, 6, 30)
+
+
+def build_sweep_system(config):
+    """ToySystem, except that a 'fail' config cannot be built"""
+    if config['strategy'].get('fail'):
+        raise ValueError("invalid parameters")
+    return ToySystem(config)
+
+
+def make_combinations(lookbacks, fail=False):
+    combinations = [({'lookback': lookback}, {'strategy': {'lookback': lookback}}) for lookback in lookbacks]
+    if fail:
+        combinations.insert(1, ({'lookback': 0}, {'strategy': {'lookback': 0, 'fail': True}}))
+    return combinations
+
+
+def read_lines(path):
+    with open(path, 'r') as file:
+        return [json.loads(line) for line in file]
+
+
+def test_shared_bars_round_trip():
+    """Workers see the same bars, read-only; close removes the block"""
+    streams = ToySystem({'strategy': {'lookback': 5}}).load_backtest_data(START, END)
+    streams['EMPTY'] = BarBuffer(capacity=None)
+
+    with SharedBars(streams) as shared:
+        shm, columns = SharedBars.attach(shared.handle)
+        try:
+            for name, buffer in streams.items():
+                ts_ns, data, tz = columns[name]
+                assert np.array_equal(ts_ns, buffer.columns[0]) and np.array_equal(data, buffer.columns[1])
+                assert tz == buffer.tz and not data.flags.writeable and not ts_ns.flags.writeable
+
+            # A system attached to the block replays it without copying
+            system = ToySystem({'strategy': {'lookback': 5}})
+            system.attach_backtest_data(columns)
+            assert np.shares_memory(system.buffer.view().close, columns['TOY'][1])
+            del system, ts_ns, data, columns
+        finally:
+            shm.close()
+        name = shared.handle[0]
+
+    try:
+        SharedBars.attach((name, []))
+        assert False, "the block must be removed on close"
+    except FileNotFoundError:
+        pass
+
+
+def test_failures_are_recorded():
+    """A failing combination is written with its error; the others finish"""
+    with tempfile.TemporaryDirectory() as tmp:
+        for workers in (1, 2):
+            results_file = os.path.join(tmp, f"sweep_{workers}.jsonl")
+            sweep = ParameterSweep(build_sweep_system, START, END, results_file, max_workers=workers)
+            records = sweep.run(make_combinations([5, 20], fail=True))
+            assert [record['params']['lookback'] for record in records] == [5, 20]
+
+            lines = read_lines(results_file)
+            failed = [line for line in lines if line['metrics'] is None]
+            assert len(lines) == 3 and len(failed) == 1
+            assert failed[0]['params'] == {'lookback': 0} and 'invalid parameters' in failed[0]['error']
+
+        serial = read_lines(os.path.join(tmp, "sweep_1.jsonl"))
+        parallel = read_lines(os.path.join(tmp, "sweep_2.jsonl"))
+        by_key = {line['key']: line['metrics'] for line in serial}
+        assert all(by_key[line['key']] == line['metrics'] for line in parallel)
+
+
+def test_resume_skips_finished():
+    """A restarted sweep only runs what is missing or failed"""
+    with tempfile.TemporaryDirectory() as tmp:
+        results_file = os.path.join(tmp, "results", "sweep.jsonl")
+        sweep = ParameterSweep(build_sweep_system, START, END, results_file, max_workers=1)
+        RUNS.clear()
+        first = sweep.run(make_combinations([5, 20], fail=True))
+        assert len(RUNS) == 2
+
+        # An interrupted write leaves a partial last line, which is ignored
+        with open(results_file, 'a') as file:
+            file.write('{"key": "trunc')
+
+        RUNS.clear()
+        again = sweep.run(make_combinations([5, 20, 40], fail=True))
+        # Only the new combination runs; the failed one is retried (and fails again)
+        assert RUNS == [(40, START, END)]
+        assert again[:2] == first and again[2]['params'] == {'lookback': 40}
+        keys = set(sweep.load_results())
+        assert keys == {combination_key({'strategy': {'lookback': n}}, START, END) for n in (5, 20, 40)}
+        # The record after the partial line is intact
+        with open(results_file, 'r') as file:
+            lines = file.read().splitlines()
+        assert lines[3] == '{"key": "trunc' and len(lines) == 6
+        assert sum(json.loads(line)['metrics'] is None for line in lines[4:]) == 1
+
+        # Other dates are other combinations
+        later = ParameterSweep(build_sweep_system, START, dt.date(2023, 7, 31), results_file, max_workers=1)
+        RUNS.clear()
+        later.run(make_combinations([5]))
+        assert RUNS == [(5, START, dt.date(2023, 7, 31))]
+
+
+def main():
+    """Run all tests"""
+    logger.info("=== Starting Parameter Sweep Tests ===")
+
+    test_shared_bars_round_trip()
+    logger.info("Shared bars round-trip and are removed")
+
+    test_failures_are_recorded()
+    logger.info("Failures are recorded, not raised")
+
+    test_resume_skips_finished()
+    logger.info("Resumed sweeps skip finished combinations")
+
+    logger.info("=== Parameter Sweep Tests Completed ===")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test script for the performance metrics engine.
+Checks drawdown, Sharpe, Sortino, win rate and profit factor against plain
+loop implementations, the batch scoring of curves of different lengths,
+the streaming tracker against the batch results, and the metrics of the
+portfolio and utility helpers that now use the engine.
+"""
+
+import datetime
+import logging
+import math
+import time
+
+import numpy as np
+import pandas as pd
+
+from performance_metrics import (StreamingMetrics, annualized_return, batch_metrics, compute_metrics,
+                                 drawdown_curve, equity_returns, max_drawdown, sharpe_ratio,
+                                 sortino_ratio, trade_statistics)
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def make_curve(length, seed):
+    rng = np.random.default_rng(seed)
+    return 100000 * np.exp(np.cumsum(rng.normal(0.0004, 0.012, length)))
+
+
+def loop_max_drawdown(values):
+    peak, worst = values[0], 0.0
+    for value in values:
+        peak = max(peak, value)
+        worst = max(worst, (peak - value) / peak)
+    return worst
+
+
+def loop_ratios(values, ddof=0):
+    returns = [values[i] / values[i - 1] - 1 for i in range(1, len(values))]
+    mean = sum(returns) / len(returns)
+    std = math.sqrt(sum((r - mean) ** 2 for r in returns) / (len(returns) - ddof))
+    downside = math.sqrt(sum(min(r, 0) ** 2 for r in returns) / len(returns))
+    return mean / std * math.sqrt(252), mean / downside * math.sqrt(252)
+
+
+def test_single_curve():
+    """Engine metrics match plain loop implementations"""
+    values = make_curve(500, seed=1)
+    sharpe, sortino = loop_ratios(values)
+    assert np.isclose(max_drawdown(values), loop_max_drawdown(values))
+    assert np.isclose(sharpe_ratio(equity_returns(values)), sharpe)
+    assert np.isclose(sortino_ratio(equity_returns(values)), sortino)
+    assert np.isclose(sharpe_ratio(equity_returns(values), ddof=1), loop_ratios(values, ddof=1)[0])
+    assert drawdown_curve(values).min() == 0 and np.isclose(drawdown_curve(values).max(), max_drawdown(values))
+
+    pnl = [120.0, -40.0, 0.0, 35.0, -80.0]
+    stats = trade_statistics(pnl)
+    assert stats['win_rate'] == 0.4 and np.isclose(stats['profit_factor'], 155 / 120)
+    assert stats['avg_win'] == 77.5 and np.isclose(stats['avg_loss'], -40)
+    assert trade_statistics([10.0])['profit_factor'] == float('inf')
+    assert trade_statistics([])['profit_factor'] == 0.0 and trade_statistics([])['win_rate'] == 0.0
+
+    metrics = compute_metrics(values, pnl=pnl, days=730)
+    assert np.isclose(metrics.total_return_pct, (values[-1] / values[0] - 1) * 100)
+    assert np.isclose(metrics.annualized_return_pct, annualized_return(values[-1] / values[0] - 1, 730) * 100)
+    assert np.isclose(metrics.max_drawdown_pct, loop_max_drawdown(values) * 100)
+    assert metrics.total_trades == 5 and metrics.win_rate == 0.4
+
+    # Flat and empty curves score zero instead of dividing by zero
+    flat = compute_metrics([100.0] * 10)
+    assert flat.sharpe_ratio == 0 and flat.sortino_ratio == 0 and flat.max_drawdown_pct == 0
+    assert compute_metrics([]).total_return_pct == 0 and max_drawdown([]) == 0
+
+
+def test_batch_and_streaming():
+    """Batch rows and the streaming tracker equal the single-curve metrics"""
+    curves = [make_curve(length, seed) for seed, length in enumerate([300, 40, 1, 500, 2, 260])]
+    scores = batch_metrics(curves)
+    assert len(scores) == len(curves) and scores.periods.tolist() == [300, 40, 1, 500, 2, 260]
+    for curve, (_, row) in zip(curves, scores.iterrows()):
+        metrics = compute_metrics(curve)
+        assert np.isclose(row.total_return_pct, metrics.total_return_pct)
+        assert np.isclose(row.max_drawdown_pct, metrics.max_drawdown_pct)
+        assert np.isclose(row.sharpe_ratio, metrics.sharpe_ratio)
+        assert np.isclose(row.sortino_ratio, metrics.sortino_ratio)
+
+        live = StreamingMetrics()
+        drawdowns = [live.update(value) for value in curve]
+        assert np.allclose(drawdowns, drawdown_curve(curve))
+        assert np.isclose(live.max_drawdown * 100, metrics.max_drawdown_pct)
+        assert np.isclose(live.sharpe_ratio, metrics.sharpe_ratio)
+        assert np.isclose(live.sortino_ratio, metrics.sortino_ratio)
+        assert np.isclose(live.snapshot()['total_return_pct'], metrics.total_return_pct)
+
+    matrix = np.vstack([make_curve(100, seed) for seed in range(3)])
+    assert np.allclose(batch_metrics(matrix).sharpe_ratio, [compute_metrics(row).sharpe_ratio for row in matrix])
+    assert batch_metrics([]).empty
+
+
+def test_scoring_throughput():
+    """Thousands of sweep equity curves are scored per second"""
+    rng = np.random.default_rng(5)
+    curves = [100000 * np.exp(np.cumsum(rng.normal(0.0003, 0.01, int(length))))
+              for length in rng.integers(200, 260, 5000)]
+    start = time.perf_counter()
+    scores = batch_metrics(curves)
+    elapsed = time.perf_counter() - start
+    logger.info(f"Scored {len(curves)} curves in {elapsed * 1000:.0f} ms")
+    assert len(scores) == 5000 and elapsed < 2.5
+
+    live = StreamingMetrics(100000)
+    ticks = curves[0].tolist() * 50
+    start = time.perf_counter()
+    for value in ticks:
+        live.update(value)
+    per_tick = (time.perf_counter() - start) / len(ticks)
+    logger.info(f"Streaming update: {per_tick * 1e6:.2f} us per tick")
+    assert per_tick < 1e-4
+
+
+def test_portfolio_and_utils():
+    """Portfolio and utils report the engine's figures in their own units"""
+    from portfolio import Portfolio
+    from utils import calculate_performance_metrics
+
+    values = make_curve(120, seed=8)
+    start = datetime.datetime(2023, 1, 2)
+    portfolio = Portfolio.__new__(Portfolio)
+    portfolio.equity_curve = [(start + datetime.timedelta(days=i), v) for i, v in enumerate(values)]
+    portfolio.closed_positions = []
+    assert np.isclose(portfolio.get_max_drawdown(), loop_max_drawdown(values))
+    assert portfolio.get_win_rate() == 0.0 and portfolio.get_profit_factor() == 0.0
+
+    results = pd.DataFrame({
+        'timestamp': [start + datetime.timedelta(days=i) for i in range(len(values))],
+        'portfolio_value': values,
+        'action': ['BUY', 'SELL', 'HOLD'] * 40,
+        'pnl': np.tile([0.0, 25.0, 0.0], 40) - np.repeat([0.0, 30.0], 60) * np.tile([0, 1, 0], 40)
+    })
+    metrics = calculate_performance_metrics(results)
+    assert np.isclose(metrics['max_drawdown'], -loop_max_drawdown(values) * 100)
+    assert np.isclose(metrics['sharpe_ratio'], loop_ratios(values, ddof=1)[0])
+    assert np.isclose(metrics['win_rate'], 20 / 80) and np.isclose(metrics['profit_factor'], 500 / 100)
+
+
+def main():
+    """Run all tests"""
+    logger.info("=== Starting Performance Metrics Tests ===")
+
+    test_single_curve()
+    logger.info("Single-curve metrics match the loop implementations")
+
+    test_batch_and_streaming()
+    logger.info("Batch and streaming metrics agree")
+
+    test_scoring_throughput()
+    logger.info("Scoring throughput is sufficient")
+
+    test_portfolio_and_utils()
+    logger.info("Portfolio and utils use the engine")
+
+    logger.info("=== Performance Metrics Tests Completed ===")
+
+
+if __name__ == "__main__":
+    main()
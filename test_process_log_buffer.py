@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test script for the process log buffer.
+Checks the bounded ring, cursor reads with dropped lines, and the
+server-sent-events tail while a producer thread is writing.
+"""
+
+import logging
+import threading
+
+from process_log_buffer import ProcessLogBuffer, sse_events
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def test_bounded_cursor_reads():
+    """Only the newest lines are kept; cursors return what is new"""
+    buffer = ProcessLogBuffer(max_lines=5)
+    for i in range(3):
+        buffer.append(f"line {i}")
+
+    lines, cursor, dropped = buffer.read(0)
+    assert lines == ["line 0", "line 1", "line 2"] and cursor == 3 and dropped == 0
+    assert buffer.read(cursor) == ([], 3, 0)
+
+    for i in range(3, 12):
+        buffer.append(f"line {i}")
+    assert len(buffer) == 5 and buffer.first_cursor == 7
+
+    # Lines 3-6 left the ring before they were read
+    lines, cursor, dropped = buffer.read(cursor)
+    assert lines == [f"line {i}" for i in range(7, 12)] and cursor == 12 and dropped == 4
+
+    # No cursor: newest lines; limits page through the rest
+    assert buffer.read(None, limit=2) == (["line 10", "line 11"], 12, 0)
+    assert buffer.read(8, limit=2) == (["line 8", "line 9"], 10, 0)
+
+    # A cursor of an earlier run starts over from the oldest line kept
+    assert buffer.read(100)[0][0] == "line 7"
+
+    try:
+        ProcessLogBuffer(max_lines=0)
+        assert False, "empty buffers must be rejected"
+    except ValueError:
+        pass
+
+
+def test_sse_tail():
+    """The stream delivers every line once, in order, then the end event"""
+    buffer = ProcessLogBuffer(max_lines=10000)
+    buffer.append("before")
+
+    def produce():
+        for i in range(2000):
+            buffer.append(f"tick {i}")
+        buffer.close()
+
+    producer = threading.Thread(target=produce)
+    events = sse_events(buffer, cursor=1, status=lambda: "completed", heartbeat=5)
+    assert next(events).startswith("retry: 3000\nevent: run\ndata: ")
+    producer.start()
+    received = list(events)
+    producer.join()
+
+    messages = [event for event in received if event.startswith("id: ")]
+    assert [event.split("data: ", 1)[1].rstrip("\n") for event in messages] == [f"tick {i}" for i in range(2000)]
+    assert messages[-1].startswith("id: 2001\n")
+    assert received[-1] == "event: end\ndata: completed\n\n"
+
+    # A closed buffer with lines lost to the ring
+    small = ProcessLogBuffer(max_lines=2)
+    for i in range(5):
+        small.append(f"{i}\nsecond row")
+    small.close()
+    received = list(sse_events(small, cursor=0, heartbeat=1))
+    assert received[1] == "event: dropped\ndata: 3\n\n"
+    assert received[2] == "id: 4\ndata: 3\ndata: second row\n\n"
+    assert received[-1] == "event: end\ndata: closed\n\n"
+
+
+def main():
+    """Run all tests"""
+    logger.info("=== Starting Process Log Buffer Tests ===")
+
+    test_bounded_cursor_reads()
+    logger.info("Bounded ring and cursor reads work")
+
+    test_sse_tail()
+    logger.info("Server-sent events tail the buffer")
+
+    logger.info("=== Process Log Buffer Tests Completed ===")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test script for the regime service.
+Checks that regimes are computed once per bar timestamp, that nested
+lookups (market regime using the sector regimes) are served from the same
+entry and that old bars are evicted.
+"""
+
+import logging
+
+from regime_service import RegimeService
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+class FakeDetector:
+    """Counts how often each regime is computed"""
+
+    def __init__(self):
+        self.calls = {'market': 0, 'sectors': 0}
+        self.service = RegimeService(self.market, self.sectors, max_entries=2)
+        self.timestamp = 1
+
+    def sectors(self):
+        self.calls['sectors'] += 1
+        return {'XLK': {'status': 'BULLISH'}}
+
+    def market(self):
+        self.calls['market'] += 1
+        # Like SP500Strategy: the market regime looks at sector breadth
+        sectors = self.service.sector_regimes(self.timestamp)
+        return 'BULLISH' if sectors['XLK']['status'] == 'BULLISH' else 'NEUTRAL'
+
+
+def test_computed_once_per_bar():
+    """Repeated lookups for one bar hit the cache"""
+    detector = FakeDetector()
+    service = detector.service
+    for _ in range(3):
+        assert service.market_regime(1) == 'BULLISH'
+        assert service.sector_regimes(1)['XLK']['status'] == 'BULLISH'
+
+    assert detector.calls == {'market': 1, 'sectors': 1}
+    assert service.stats() == {'market': {'hits': 2, 'misses': 1},
+                               'sectors': {'hits': 3, 'misses': 1}}
+
+    # A new bar is computed again
+    detector.timestamp = 2
+    service.market_regime(2)
+    assert detector.calls == {'market': 2, 'sectors': 2}
+
+
+def test_old_bars_are_evicted():
+    """Only the most recent max_entries bars are kept"""
+    detector = FakeDetector()
+    service = detector.service
+    for timestamp in (1, 2, 3):
+        service.sector_regimes(timestamp)
+    service.sector_regimes(3)
+    service.sector_regimes(1)
+    assert detector.calls['sectors'] == 4
+
+    service.invalidate()
+    service.sector_regimes(1)
+    assert detector.calls['sectors'] == 5
+
+
+def main():
+    """Run all tests"""
+    logger.info("=== Starting Regime Service Tests ===")
+
+    test_computed_once_per_bar()
+    logger.info("Regimes are computed once per bar")
+
+    test_old_bars_are_evicted()
+    logger.info("Old bars are evicted")
+
+    logger.info("=== Regime Service Tests Completed ===")
+
+
+if __name__ == "__main__":
+    main()
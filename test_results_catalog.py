@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test script for the results catalog.
+Checks incremental indexing of result files and position snapshots,
+paginated and filtered run queries, recorded metrics, and the polling
+watcher picking up new files.
+"""
+
+import logging
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from results_catalog import CatalogWatcher, ResultsCatalog, parse_run_period, record_backtest_run
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def write_run(directory, start, end, stamp, rows=3, mtime=None):
+    path = os.path.join(directory, f"backtest_results_{start}_to_{end}_{stamp}.csv")
+    pd.DataFrame({'symbol': [f"S{i}" for i in range(rows)], 'score': [0.9] * rows}).to_csv(path, index=False)
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+    return path
+
+
+def write_positions(directory, name, symbols, mtime):
+    path = os.path.join(directory, name)
+    pd.DataFrame({'symbol': symbols, 'qty': range(1, len(symbols) + 1),
+                  'unrealized_pl': [1.5] * (len(symbols) - 1) + [None]}).to_csv(path, index=False)
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+def test_indexing_and_queries():
+    """Runs and snapshots are indexed once and queried by page and filter"""
+    with tempfile.TemporaryDirectory() as tmp:
+        results, trades = os.path.join(tmp, 'backtest_results'), os.path.join(tmp, 'trades')
+        os.makedirs(results)
+        os.makedirs(trades)
+        base = time.time() - 1000
+        quarters = [("2023-01-01", "2023-03-31"), ("2023-04-01", "2023-06-30"),
+                    ("2023-07-01", "2023-09-30"), ("2023-10-01", "2023-12-31")]
+        paths = [write_run(results, start, end, f"2024010{i}_120000", rows=i + 1, mtime=base + i)
+                 for i, (start, end) in enumerate(quarters)]
+        with open(os.path.join(results, 'notes.txt'), 'w') as file:
+            file.write('not a result')
+        write_positions(trades, 'paper_positions_1.csv', ['AAPL', 'MSFT'], base)
+        write_positions(trades, 'paper_positions_2.csv', ['NVDA', 'XOM', 'JPM'], base + 10)
+        write_positions(trades, 'trades_1.csv', ['IGNORED'], base + 20)
+
+        catalog = ResultsCatalog(os.path.join(results, 'catalog.db'),
+                                 roots={'backtest': results, 'positions': trades})
+        assert catalog.refresh() == {'indexed': 6, 'removed': 0}
+        assert catalog.refresh() == {'indexed': 0, 'removed': 0}
+
+        page = catalog.backtest_runs(page=1, per_page=3)
+        assert page['total'] == 4 and len(page['results']) == 3
+        assert page['results'][0]['name'] == os.path.basename(paths[3])
+        assert page['results'][0]['rows'] == 4 and page['results'][0]['start_date'] == "2023-10-01"
+        assert [run['name'] for run in catalog.backtest_runs(page=2, per_page=3)['results']] == \
+            [os.path.basename(paths[0])]
+
+        half = catalog.backtest_runs(start_date="2023-04-01", end_date="2023-09-30")
+        assert [run['end_date'] for run in half['results']] == ["2023-09-30", "2023-06-30"]
+        assert catalog.backtest_runs(search="2023-07")['total'] == 1
+        assert catalog.backtest_runs(search="%")['total'] == 0
+
+        positions = catalog.latest_positions()
+        assert [p['symbol'] for p in positions] == ['NVDA', 'XOM', 'JPM']
+        assert positions[-1]['unrealized_pl'] is None
+        assert catalog.latest_positions('XOM') == [{'symbol': 'XOM', 'qty': 2, 'unrealized_pl': 1.5}]
+        assert catalog.position_snapshots()['total'] == 2
+
+        # Metrics recorded by the writer survive later re-indexing of the file
+        assert record_backtest_run(catalog.db_path, paths[1], {'win_rate': 61.0, 'total_return': 12.5,
+                                                               'tier_metrics': {'Tier 1': {'win_rate': 70}}})
+        write_run(results, *quarters[1], "20240101_120000", rows=9, mtime=base + 50)
+        assert catalog.refresh()['indexed'] == 1
+        best = catalog.backtest_runs(min_return=10)
+        assert best['total'] == 1 and best['results'][0]['win_rate'] == 61.0 and best['results'][0]['rows'] == 9
+        assert catalog.run_summary(paths[1])['tier_metrics']['Tier 1']['win_rate'] == 70
+        assert catalog.backtest_runs(sort='date')['results'][0]['name'] == os.path.basename(paths[1])
+
+        # Deleted files leave the catalog with their rows
+        os.remove(os.path.join(trades, 'paper_positions_2.csv'))
+        assert catalog.refresh() == {'indexed': 0, 'removed': 1}
+        assert [p['symbol'] for p in catalog.latest_positions()] == ['AAPL', 'MSFT']
+
+        try:
+            catalog.backtest_runs(sort='name; DROP TABLE files')
+            assert False, "unknown sort columns must be rejected"
+        except ValueError:
+            pass
+        catalog.close()
+
+
+def test_watcher_and_periods():
+    """The polling watcher indexes files written after it started"""
+    assert parse_run_period("backtest_results_20230101_20230331.csv") == ("2023-01-01", "2023-03-31")
+    assert parse_run_period("summary.csv") == (None, None)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        catalog = ResultsCatalog(os.path.join(tmp, 'catalog.db'), roots={'backtest': tmp})
+        watcher = CatalogWatcher(catalog, interval=0.05, use_watchdog=False).start()
+        try:
+            write_run(tmp, "2024-01-01", "2024-03-31", "20240401_090000")
+            deadline = time.time() + 5
+            while catalog.backtest_runs()['total'] == 0 and time.time() < deadline:
+                time.sleep(0.05)
+            assert catalog.backtest_runs()['results'][0]['end_date'] == "2024-03-31"
+        finally:
+            watcher.stop()
+            catalog.close()
+
+
+def main():
+    """Run all tests"""
+    logger.info("=== Starting Results Catalog Tests ===")
+
+    test_indexing_and_queries()
+    logger.info("Indexing and queries work")
+
+    test_watcher_and_periods()
+    logger.info("Watcher keeps the catalog current")
+
+    logger.info("=== Results Catalog Tests Completed ===")
+
+
+if __name__ == "__main__":
+    main()
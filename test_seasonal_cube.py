@@ -0,0 +1,147 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test script for the seasonal return cube.
+Checks the batch win rates and seasonal correlations against the
+per-symbol calculations of SeasonalityAnalyzer for histories of different
+lengths, and the batch analyze_seasonality results.
+"""
+
+import logging
+import time
+
+import numpy as np
+import pandas as pd
+
+from seasonal_cube import DEFAULT_LOOKBACK_YEARS, SeasonalReturnCube
+from seasonality_analyzer import SeasonalityAnalyzer, TradeDirection
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def make_history(lengths, seed=11):
+    rng = np.random.default_rng(seed)
+    calendar = pd.bdate_range(end='2024-12-31', periods=max(lengths))
+    history = {}
+    for i, length in enumerate(lengths):
+        dates = calendar[len(calendar) - length:]
+        returns = rng.normal(0.0003, 0.015, length) + 0.004 * np.sin(np.arange(length) * 2 * np.pi / 252)
+        history[f"S{i}"] = pd.DataFrame({'close': 50 * np.exp(np.cumsum(returns))}, index=dates)
+    return history
+
+
+def make_analyzer(history):
+    # Skip the API client; the analyses only read historical_data
+    analyzer = SeasonalityAnalyzer.__new__(SeasonalityAnalyzer)
+    analyzer.historical_data = history
+    analyzer.universe = list(history) + ['MISSING']
+    return analyzer
+
+
+def reference_correlations(df, lookback_years, window_days):
+    """Per-symbol correlations, as SeasonalityAnalyzer computes them"""
+    current = df['close'].iloc[-window_days:]
+    current = current / current.iloc[0] - 1
+    correlations = {}
+    for years in lookback_years:
+        offset = 365 * years + window_days
+        if len(df) <= offset:
+            continue
+        window = df['close'].iloc[len(df) - offset:len(df) - offset + window_days]
+        window = window / window.iloc[0] - 1
+        correlations[years] = current.reset_index(drop=True).corr(window.reset_index(drop=True))
+    return correlations
+
+
+LENGTHS = [6500, 3000, 1500, 700, 400, 300, 120, 60]
+
+
+def test_win_rates_match():
+    """Batch win rates equal calculate_win_rate for every horizon"""
+    history = make_history(LENGTHS)
+    analyzer = make_analyzer(history)
+    cube = SeasonalReturnCube(history)
+    assert cube.closes.shape == (max(LENGTHS), len(LENGTHS))
+
+    lookbacks = [0, 1, 2, 3, 5, 10, 25]
+    for forward_days in (20, 90, 300):
+        stats = cube.win_rates(lookbacks, forward_days=forward_days)
+        for col, symbol in enumerate(cube.symbols):
+            for row, years in enumerate(lookbacks):
+                win_rate, avg_return, direction = analyzer.calculate_win_rate(symbol, years, forward_days)
+                assert np.isclose(stats['win_rate'][row, col], win_rate)
+                assert np.isclose(stats['avg_return'][row, col], avg_return)
+                assert bool(stats['long'][row, col]) == (direction == TradeDirection.LONG)
+
+    # The year cube holds the bar (i + 1) * 252 - d bars before the end
+    years = cube.year_cube(3, days=5)
+    assert years.shape == (3, 5, len(LENGTHS))
+    assert years[1, 2, 0] == history['S0']['close'].iloc[-2 * 252 + 2]
+    assert np.isnan(years[1, 0, LENGTHS.index(300)])
+
+
+def test_correlations_match():
+    """Batch correlations equal the per-symbol window correlations"""
+    history = make_history(LENGTHS)
+    history['FLAT'] = pd.DataFrame({'close': np.full(800, 10.0)}, index=pd.bdate_range(end='2024-12-31', periods=800))
+    cube = SeasonalReturnCube(history)
+
+    for window_days in (30, 90):
+        correlations = cube.seasonal_correlations(DEFAULT_LOOKBACK_YEARS, window_days=window_days)
+        for col, symbol in enumerate(cube.symbols):
+            expected = reference_correlations(history[symbol], DEFAULT_LOOKBACK_YEARS, window_days)
+            for row, years in enumerate(DEFAULT_LOOKBACK_YEARS):
+                if years in expected and not np.isnan(expected[years]):
+                    assert np.isclose(correlations[row, col], expected[years])
+                else:
+                    assert np.isnan(correlations[row, col])
+
+
+def test_batch_analysis():
+    """The batch analysis selects and scores the same symbols"""
+    history = make_history([6500] * 40 + [1200] * 20, seed=3)
+    analyzer = make_analyzer(history)
+    results = analyzer.analyze_seasonality(forward_days=60, min_correlation=0.3, min_win_rate=0.5)
+    assert results and [r['score'] for r in results] == sorted((r['score'] for r in results), reverse=True)
+
+    for result in results:
+        expected = reference_correlations(history[result['symbol']], DEFAULT_LOOKBACK_YEARS, 60)
+        years, correlation = max(((y, c) for y, c in expected.items() if not np.isnan(c)), key=lambda x: x[1])
+        win_rate, avg_return, direction = analyzer.calculate_win_rate(result['symbol'], years, 60)
+        assert result['correlation_years'] == years and np.isclose(result['best_correlation'], correlation * 100)
+        assert np.isclose(result['win_rate'], win_rate * 100) and result['win_rate'] >= 50
+        assert np.isclose(result['avg_return'], avg_return * 100) and result['direction'] == direction.value
+
+    # A full S&P 500 universe with 25 years of bars takes well under a second
+    large = make_history([6500] * 500, seed=7)
+    start = time.perf_counter()
+    make_analyzer(large).analyze_seasonality(forward_days=90)
+    elapsed = time.perf_counter() - start
+    logger.info(f"Analyzed 500 symbols x 6500 bars in {elapsed * 1000:.0f} ms")
+    assert elapsed < 5
+
+
+def main():
+    """Run all tests"""
+    logger.info("=== Starting Seasonal Cube Tests ===")
+
+    test_win_rates_match()
+    logger.info("Win rates match calculate_win_rate")
+
+    test_correlations_match()
+    logger.info("Correlations match the per-symbol windows")
+
+    test_batch_analysis()
+    logger.info("Batch analysis selects the same opportunities")
+
+    logger.info("=== Seasonal Cube Tests Completed ===")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test script for the seasonality score tensor.
+Checks batch scores against get_seasonal_score for known and unknown
+symbols, day-of-year slots, the memory-mapped file cache and recompilation
+when the weights change.
+"""
+
+import logging
+import os
+import tempfile
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import yaml
+
+from seasonality_enhanced import SeasonalityEnhanced
+from seasonality_tensor import SeasonalityTensor, day_of_year_slots
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+MONTHS = ['January', 'February', 'March', 'April', 'May', 'June', 'July',
+          'August', 'September', 'October', 'November', 'December']
+
+
+def write_opportunities(directory, seed=5):
+    rng = np.random.default_rng(seed)
+    opportunities = []
+    for symbol in ['AAPL', 'XOM', 'NEM', 'FDX', 'JPM']:
+        for month in rng.choice(12, size=6, replace=False):
+            opportunities.append({
+                'symbol': symbol,
+                'season': MONTHS[month],
+                'win_rate': float(rng.uniform(0.3, 0.8)),
+                'avg_return': float(rng.uniform(-0.06, 0.06)),
+                'correlation': float(rng.uniform(-1, 1)),
+                'direction': 'LONG',
+                'trade_count': 20
+            })
+    path = os.path.join(directory, 'opportunities.yaml')
+    with open(path, 'w') as f:
+        yaml.safe_dump({'opportunities': opportunities}, f)
+    return path
+
+
+def make_config(path):
+    return {'seasonality': {'data_file': path, 'stock_specific_influence': 0.6, 'sector_influence': 0.4,
+                            'monthly_weights': {1: 0.5, 3: 0.3, 12: 0.6}}}
+
+
+def test_slots():
+    """Dates map to leap-year day-of-year slots"""
+    assert int(day_of_year_slots('2023-01-01')) == 0
+    assert int(day_of_year_slots('2024-02-29')) == 59
+    assert int(day_of_year_slots('2023-03-01')) == int(day_of_year_slots('2024-03-01')) == 60
+    assert int(day_of_year_slots('2023-12-31')) == 365
+    slots = day_of_year_slots(pd.date_range('2023-01-01', '2024-12-31'))
+    assert len(slots) == 731 and slots.max() == 365
+
+
+def test_matches_scalar_scores():
+    """Batch scores equal get_seasonal_score for every symbol and date"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_opportunities(tmp)
+        analyzer = SeasonalityEnhanced(path, config=make_config(path))
+        symbols = ['AAPL', 'XOM', 'NEM', 'FDX', 'JPM', 'MSFT', 'UNKNOWN']
+        dates = pd.date_range('2023-06-01', '2024-05-31')
+
+        batch = analyzer.get_seasonal_scores(symbols, dates)
+        assert batch.shape == (len(symbols), len(dates)) and batch.dtype == np.float32
+        expected = np.array([[analyzer.get_seasonal_score(symbol, date) for date in dates] for symbol in symbols])
+        assert np.allclose(batch, expected, atol=1e-6)
+
+        single = analyzer.get_seasonal_scores(symbols, datetime(2024, 2, 29))
+        assert np.allclose(single, [analyzer.get_seasonal_score(s, datetime(2024, 2, 29)) for s in symbols], atol=1e-6)
+
+        top = analyzer.get_top_seasonal_stocks(symbols, datetime(2023, 3, 15), top_n=3)
+        assert [s for s, _ in top] == [s for s, _ in sorted(
+            ((s, analyzer.get_seasonal_score(s, datetime(2023, 3, 15))) for s in symbols),
+            key=lambda x: x[1], reverse=True)[:3]]
+
+
+def test_file_cache_and_recompile():
+    """Scores are saved once, memory-mapped by later analyzers and recompiled on changes"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_opportunities(tmp)
+        first = SeasonalityEnhanced(path, config=make_config(path))
+        tensor = first.score_tensor
+        tensor_file = os.path.join(tmp, 'opportunities_scores.npy')
+        assert os.path.exists(tensor_file + '.json') and os.path.exists(tensor._values_file(tensor_file))
+
+        second = SeasonalityEnhanced(path, config=make_config(path))
+        loaded = second.score_tensor
+        assert isinstance(loaded.values, np.memmap)
+        assert loaded.symbols == tensor.symbols and np.array_equal(loaded.values, tensor.values)
+
+        # Dropping the monthly weights changes the scores of the weighted months
+        date = datetime(2023, 1, 10)
+        before = second.get_seasonal_scores(['AAPL'], date)[0]
+        second.config = {'seasonality': {}}
+        after = second.get_seasonal_scores(['AAPL'], date)[0]
+        assert np.isclose(after, second.get_seasonal_score('AAPL', date), atol=1e-6) and before != after
+
+        # A tensor compiled from other inputs is ignored
+        assert SeasonalityTensor.load(tensor_file, key='other') is None
+
+        # Saving other inputs writes a new scores file; the sidecar only ever
+        # names the scores of its own symbols and key
+        old_values = tensor._values_file(tensor_file)
+        other = SeasonalityTensor(tensor.symbols[::-1], np.asarray(tensor.values) + 1, key='other')
+        other.save(tensor_file)
+        assert not os.path.exists(old_values)
+        reloaded = SeasonalityTensor.load(tensor_file, key='other')
+        assert reloaded.symbols == other.symbols and np.array_equal(reloaded.values, other.values)
+        assert SeasonalityTensor.load(tensor_file, key=tensor.key) is None
+
+
+def main():
+    """Run all tests"""
+    logger.info("=== Starting Seasonality Tensor Tests ===")
+
+    test_slots()
+    logger.info("Day-of-year slots are correct")
+
+    test_matches_scalar_scores()
+    logger.info("Batch scores match get_seasonal_score")
+
+    test_file_cache_and_recompile()
+    logger.info("File cache and recompilation work")
+
+    logger.info("=== Seasonality Tensor Tests Completed ===")
+
+
+if __name__ == "__main__":
+    main()
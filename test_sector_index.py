@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test script for the sector index.
+Checks single and vectorised lookups against the shipped sector_map.yaml and
+that edits to the metadata file are picked up without a restart.
+"""
+
+import logging
+import os
+import shutil
+import tempfile
+
+from sector_index import SectorIndex, get_sector_index
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+SECTOR_FILE = """
+sectors:
+  Technology:
+    etf: XLK
+    symbols: [AAPL, MSFT]
+  Energy:
+    etf: XLE
+    symbols: [XOM]
+prefixes:
+  - sector: Financials
+    prefixes: [JPM]
+"""
+
+
+def test_lookups():
+    """Exact, prefix and unknown symbols, one at a time and as arrays"""
+    index = get_sector_index()
+    assert index is get_sector_index()
+
+    assert index.sector('AAPL') == 'Technology'
+    assert index.symbol_etf('JPM') == 'XLF'
+    assert index.sector('XOMA') == 'Energy'          # prefix rule
+    assert index.sector('ZZZZ') is None
+    assert index.sector('ZZZZ', 'Unknown') == 'Unknown'
+    assert index.sector_etfs['XLRE'] == 'Real Estate'
+
+    symbols = ['AAPL', 'ZZZZ', 'XOM', 'XOMA']
+    sectors = index.sectors(symbols, 'Unknown')
+    assert list(sectors) == [index.sector(symbol, 'Unknown') for symbol in symbols]
+    assert list(index.etfs(sectors)) == ['XLK', None, 'XLE', 'XLE']
+
+
+def test_file_changes_are_reloaded():
+    """A rewritten file replaces the mapping; a broken one is ignored"""
+    directory = tempfile.mkdtemp(prefix="sectors_")
+    path = os.path.join(directory, "sectors.yaml")
+    try:
+        with open(path, "w") as file:
+            file.write(SECTOR_FILE)
+        index = SectorIndex(path, check_interval=0)
+        assert index.sector('MSFT') == 'Technology'
+        assert index.sector('JPMX') == 'Financials'
+        assert index.sector('NVDA') is None
+
+        with open(path, "w") as file:
+            file.write(SECTOR_FILE.replace("[AAPL, MSFT]", "[AAPL, MSFT, NVDA]"))
+        assert index.sector('NVDA') == 'Technology'
+
+        with open(path, "w") as file:
+            file.write("sectors: [unclosed")
+        assert index.sector('NVDA') == 'Technology'
+    finally:
+        shutil.rmtree(directory)
+
+
+def main():
+    """Run all tests"""
+    logger.info("=== Starting Sector Index Tests ===")
+
+    test_lookups()
+    logger.info("Single and vectorised lookups agree")
+
+    test_file_changes_are_reloaded()
+    logger.info("Metadata file changes are reloaded")
+
+    logger.info("=== Sector Index Tests Completed ===")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test script for the signal executor.
+Checks that the serial, thread and process modes return the same results
+in job order, and that a failing strategy is reported without stopping the
+other jobs.
+"""
+
+import logging
+import pickle
+
+import numpy as np
+
+from bar_store import BarBuffer, BarView
+from signal_executor import EXECUTOR_MODES, SharedRows, SignalExecutor, SignalJob
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+class ThresholdStrategy:
+    """Signals every close above a threshold; fails on one symbol"""
+
+    def __init__(self, threshold):
+        self.config = {'threshold': threshold}
+
+    def generate_signals(self, symbol, candles, stock_config, market_state):
+        if symbol == 'FAIL':
+            raise ValueError("bad data")
+        above = np.flatnonzero(candles.close > self.config['threshold'])
+        return [(symbol, market_state, int(i)) for i in above]
+
+
+def make_bars(seed, count=50):
+    closes = np.random.default_rng(seed).normal(100, 5, count)
+    return BarView(np.arange(count, dtype=np.int64), closes, closes, closes, closes, np.ones(count))
+
+
+def make_jobs():
+    strategies = {'Low': ThresholdStrategy(95), 'High': ThresholdStrategy(105)}
+    symbols = [f"S{i}" for i in range(12)] + ['FAIL']
+    return [SignalJob(symbol, name, strategy, make_bars(i), None)
+            for i, symbol in enumerate(symbols) for name, strategy in strategies.items()]
+
+
+def test_modes_agree():
+    """Every mode returns the serial results, in job order"""
+    jobs = make_jobs()
+    expected = None
+    for mode in EXECUTOR_MODES:
+        executor = SignalExecutor(mode, max_workers=2)
+        try:
+            results = executor.run(jobs, 'BULLISH')
+        finally:
+            executor.close()
+
+        assert [(r.symbol, r.name) for r in results] == [(job.symbol, job.name) for job in jobs]
+        comparable = [(r.symbol, r.name, r.signals, r.error) for r in results]
+        if expected is None:
+            expected = comparable
+        assert comparable == expected, f"{mode} results differ from serial"
+
+
+def test_errors_are_captured():
+    """A failing job yields an error result; the others still run"""
+    results = SignalExecutor("serial").run(make_jobs(), 'BULLISH')
+    failed = [r for r in results if r.error]
+    assert [(r.symbol, r.name) for r in failed] == [('FAIL', 'Low'), ('FAIL', 'High')]
+    assert failed[0].error == "bad data" and "ValueError" in failed[0].traceback
+    assert any(r.signals for r in results if not r.error)
+
+    try:
+        SignalExecutor("cluster")
+        assert False, "unknown modes must be rejected"
+    except ValueError:
+        pass
+
+
+def test_shared_bars():
+    """Process jobs over shared streams send row references, not bars"""
+    streams = {}
+    for i in range(6):
+        bars = make_bars(i, count=5000)
+        streams[f"S{i}"] = BarBuffer(capacity=None)
+        streams[f"S{i}"].extend(bars)
+    strategies = {'Low': ThresholdStrategy(95), 'High': ThresholdStrategy(105)}
+    # Growing windows, like a replay; FAIL and the copied view are not shared
+    jobs = [SignalJob(symbol, name, strategy, buffer.view()[:end], None)
+            for end in (30, 2000, 5000) for symbol, buffer in streams.items()
+            for name, strategy in strategies.items()]
+    jobs.append(SignalJob('S0', 'Low', strategies['Low'], make_bars(0, count=40), None))
+    jobs.append(SignalJob('FAIL', 'Low', strategies['Low'], make_bars(9), None))
+    expected = SignalExecutor("serial").run(jobs, 'BULLISH')
+
+    executor = SignalExecutor("process", max_workers=2)
+    try:
+        executor.share_bars(streams)
+        shared = [executor._share_job(job) for job in jobs]
+        assert all(isinstance(job.candles, SharedRows) for job in shared[:-2])
+        assert shared[-2] is jobs[-2] and shared[-1] is jobs[-1]
+        assert shared[-3].candles[1:3] == (0, 5000)
+        assert len(pickle.dumps(shared)) * 20 < len(pickle.dumps(jobs))
+
+        results = executor.run(jobs, 'BULLISH')
+        assert [(r.symbol, r.name, r.signals, r.error) for r in results] == \
+            [(r.symbol, r.name, r.signals, r.error) for r in expected]
+    finally:
+        executor.close()
+    assert executor._shared is None and executor._share_job(jobs[0]) is jobs[0]
+
+
+def main():
+    """Run all tests"""
+    logger.info("=== Starting Signal Executor Tests ===")
+
+    test_modes_agree()
+    logger.info("Serial, thread and process modes agree")
+
+    test_errors_are_captured()
+    logger.info("Strategy errors are captured per job")
+
+    test_shared_bars()
+    logger.info("Process jobs read shared bars")
+
+    logger.info("=== Signal Executor Tests Completed ===")
+
+
+if __name__ == "__main__":
+    main()
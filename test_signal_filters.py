@@ -0,0 +1,171 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test script for the signal filter pipeline.
+Checks the batch pipeline against the one-signal-at-a-time filters it
+replaces, the per-stage report, stage reordering and the volume cache.
+"""
+
+import logging
+from types import SimpleNamespace
+from unittest import mock
+
+import numpy as np
+
+from bar_store import BarView
+from signal_filters import ENHANCED_STAGES, SignalFilterPipeline, VolumeStats
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+PARAMS = {
+    "min_score_threshold": 0.6,
+    "max_correlation_threshold": 0.7,
+    "min_price": 5.0,
+    "max_sector_exposure": 0.3,
+    "max_signals_per_day": 10
+}
+
+
+def make_universe(seed=7, symbols=30, signals=120):
+    rng = np.random.default_rng(seed)
+    sectors = ["Technology", "Energy", "Financials", ""]
+    stocks = [SimpleNamespace(symbol=f"S{i}", sector=sectors[i % len(sectors)]) for i in range(symbols)]
+    bars = {}
+    for i, stock in enumerate(stocks):
+        count = 40
+        volume = rng.uniform(1e5, 1e6, count)
+        closes = np.full(count, 50.0)
+        bars[stock.symbol] = BarView(np.arange(count, dtype=np.int64) + i, closes, closes, closes, closes, volume)
+    generated = []
+    for i in range(signals):
+        # A few signals on symbols without config or bars
+        symbol = f"S{rng.integers(symbols + 3)}"
+        signal = SimpleNamespace(symbol=symbol, strategy=f"Strategy{i % 3}", entry_price=float(rng.uniform(1, 100)))
+        if i % 2:
+            signal.score = float(rng.uniform(0.4, 1.0))
+        generated.append(signal)
+    return stocks, bars, generated
+
+
+def reference_filter(signals, stocks, bars, params, enhanced):
+    """The former per-signal loop of _filter_signals / filter_signals"""
+    accepted, by_sector = [], {}
+    for signal in sorted(signals, key=lambda s: getattr(s, 'score', 0.5), reverse=True):
+        if len(accepted) >= params["max_signals_per_day"]:
+            continue
+        if enhanced and hasattr(signal, 'score') and signal.score < params["min_score_threshold"]:
+            continue
+        if signal.entry_price < params["min_price"]:
+            continue
+        if signal.symbol in bars:
+            volume = bars[signal.symbol].volume[-20:]
+            if volume.mean() > 0 and volume[-1] < volume.mean() * 0.5:
+                continue
+        sector = next((stock.sector for stock in stocks if stock.symbol == signal.symbol), "Unknown")
+        if by_sector.get(sector, 0) >= int(params["max_sector_exposure"] * params["max_signals_per_day"]):
+            continue
+        if enhanced and any(
+                other.symbol != signal.symbol and sector != "Unknown" and
+                next((stock.sector for stock in stocks if stock.symbol == other.symbol), "Unknown") == sector
+                for other in accepted):
+            continue
+        accepted.append(signal)
+        by_sector[sector] = by_sector.get(sector, 0) + 1
+    return accepted
+
+
+def test_matches_reference():
+    """Default and enhanced stage orders accept what the old loops accepted"""
+    for seed in range(20):
+        stocks, bars, signals = make_universe(seed)
+        for stages, enhanced in ((None, False), (ENHANCED_STAGES, True)):
+            pipeline = SignalFilterPipeline(stocks, **({"stages": stages} if stages else {}))
+            accepted, report = pipeline.run(signals, PARAMS, bars=bars.get)
+            expected = reference_filter(signals, stocks, bars, PARAMS, enhanced)
+            assert [id(s) for s in accepted] == [id(s) for s in expected], f"seed {seed} enhanced={enhanced}"
+            assert report.accepted == len(accepted)
+            assert report.total - sum(report.rejected.values()) == report.accepted
+
+
+def test_stage_order_and_report():
+    """Stage order comes from the parameters; unknown stages are rejected"""
+    stocks, bars, signals = make_universe()
+    pipeline = SignalFilterPipeline(stocks)
+
+    _, report = pipeline.run(signals, PARAMS, bars=bars.get)
+    assert list(report.rejected) == ["price", "volume", "sector", "daily"]
+    assert set(report.seconds) == set(report.rejected)
+
+    # Capping the day first leaves fewer signals once the other stages ran
+    reordered = dict(PARAMS, filter_stages=["daily", "price", "volume", "sector"])
+    accepted, report = pipeline.run(signals, reordered, bars=bars.get)
+    assert list(report.rejected)[0] == "daily" and report.rejected["daily"] == len(signals) - 10
+    assert len(accepted) <= 10
+
+    try:
+        pipeline.run(signals, dict(PARAMS, filter_stages=["price", "spread"]))
+        assert False, "unknown stages must be rejected"
+    except ValueError:
+        pass
+
+
+def test_volume_stats_cache():
+    """Volume stats are recomputed only when a new bar arrives"""
+    stats = VolumeStats(window=3)
+    volume = np.array([1.0, 2.0, 3.0, 6.0])
+    bars = BarView(np.arange(4, dtype=np.int64), volume, volume, volume, volume, volume)
+    assert stats.get("A", bars) == (6.0, 11.0 / 3)
+    volume[-1] = 100.0
+    assert stats.get("A", bars) == (6.0, 11.0 / 3)
+    assert stats.get("A", bars[:3]) == (3.0, 2.0)
+    assert np.isnan(stats.get("B", None)[0])
+
+
+def test_hybrid_keeps_generation_order():
+    """Hybrid signals come back per symbol in generation order, not by score"""
+    from hybrid_strategy_system import HybridStrategySystem, MultiStrategySystem
+
+    def signal(symbol, strategy, score):
+        return SimpleNamespace(symbol=symbol, strategy=strategy, score=score, entry_price=20.0)
+
+    generated = {
+        "AAA": [signal("AAA", "MeanReversion", 0.2), signal("AAA", "Trend", 0.9), signal("AAA", "Gap", 0.6)],
+        "BBB": [signal("BBB", "Gap", 0.7), signal("BBB", "Trend", 0.95)]
+    }
+    system = HybridStrategySystem.__new__(HybridStrategySystem)
+    system.signal_filters = SignalFilterPipeline([])
+    system.config = SimpleNamespace(signal_quality_filters=dict(PARAMS))
+    system.historical_performance = {"Gap": {"profit_factor": 1.0, "sharpe_ratio": 0.2}}
+    with mock.patch.object(MultiStrategySystem, "generate_signals", return_value=generated, create=True):
+        filtered = system.generate_signals(None, ["AAA", "BBB"])
+    assert filtered["AAA"] == [generated["AAA"][0], generated["AAA"][1]]
+    assert filtered["BBB"] == [generated["BBB"][1]]
+
+
+def main():
+    """Run all tests"""
+    logger.info("=== Starting Signal Filter Tests ===")
+
+    test_matches_reference()
+    logger.info("Batch pipeline matches the per-signal filters")
+
+    test_stage_order_and_report()
+    logger.info("Stage order and report work")
+
+    test_volume_stats_cache()
+    logger.info("Volume stats are cached per bar")
+
+    test_hybrid_keeps_generation_order()
+    logger.info("Hybrid signals keep their generation order")
+
+    logger.info("=== Signal Filter Tests Completed ===")
+
+
+if __name__ == "__main__":
+    main()
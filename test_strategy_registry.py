@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test script for the strategy registry.
+Checks that per-stock parameter overrides yield one shared, read-only
+instance per parameter set, and that bound instances share the base
+strategy's performance record.
+"""
+
+import logging
+from types import SimpleNamespace
+
+from strategy_registry import StrategyRegistry
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+class FakeStrategy:
+    """Strategy with a config and a mutable performance record"""
+
+    def __init__(self, config):
+        self.config = config
+        self.performance = {'trades': 0}
+
+
+def stock(params=None):
+    return SimpleNamespace(symbol='TEST', mean_reversion_params=params or {})
+
+
+def test_bound_instances_are_reused():
+    """One instance per parameter set, the base when there are no overrides"""
+    registry = StrategyRegistry()
+    base = FakeStrategy({'bb_period': 20, 'rsi_period': 14})
+
+    assert registry.bind('MeanReversion', base, stock()) is base
+    assert registry.bind('TrendFollowing', base, stock({'bb_period': 15})) is base
+
+    first = registry.bind('MeanReversion', base, stock({'bb_period': 15}))
+    again = registry.bind('MeanReversion', base, stock({'bb_period': 15}))
+    other = registry.bind('MeanReversion', base, stock({'bb_period': 10}))
+    assert first is again and first is not other
+    assert dict(first.config) == {'bb_period': 15, 'rsi_period': 14}
+    assert base.config['bb_period'] == 20
+    assert registry.builds == 2
+
+    # Shared mutable state, read-only parameters
+    first.performance['trades'] += 1
+    assert base.performance['trades'] == 1
+    try:
+        first.config['bb_period'] = 5
+        assert False, "bound configs must be read-only"
+    except TypeError:
+        pass
+
+
+def test_base_config_changes_rebind():
+    """Changing the base strategy's config yields a fresh instance"""
+    registry = StrategyRegistry()
+    base = FakeStrategy({'bb_period': 20, 'rsi_period': 14})
+    first = registry.bind('MeanReversion', base, stock({'bb_period': 15}))
+
+    base.config['rsi_period'] = 7
+    second = registry.bind('MeanReversion', base, stock({'bb_period': 15}))
+    assert second is not first
+    assert dict(second.config) == {'bb_period': 15, 'rsi_period': 7}
+
+
+def main():
+    """Run all tests"""
+    logger.info("=== Starting Strategy Registry Tests ===")
+
+    test_bound_instances_are_reused()
+    logger.info("Bound instances are reused")
+
+    test_base_config_changes_rebind()
+    logger.info("Base config changes rebind")
+
+    logger.info("=== Strategy Registry Tests Completed ===")
+
+
+if __name__ == "__main__":
+    main()
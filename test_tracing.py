@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test script for hot-path tracing.
+Checks that disabled tracers never build their messages, that sampling and
+the ring buffer bound what is recorded, and that stage spans are timed.
+"""
+
+import logging
+import pickle
+
+from tracing import (configure_tracing, dump_recent, get_tracer, recent_events,
+                     span_report, timed)
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def test_disabled_tracers_are_free():
+    """Nothing is built or recorded while a module is not traced"""
+    configure_tracing({"Traced": 1.0})
+    tracer = get_tracer("Untraced.Module")
+    built = []
+    try:
+        tracer.event(lambda: built.append(1) or "message")
+        with tracer.span("stage"):
+            pass
+        assert not built and not tracer.enabled
+        assert "stage" not in span_report()
+    finally:
+        configure_tracing({})
+
+
+def test_sampling_and_ring_buffer():
+    """Every Nth event is kept, the buffer holds the newest, dumps clear it"""
+    configure_tracing({"Sampled": 0.25, "Sampled.Everything": 1.0}, buffer_size=5)
+    try:
+        recent_events(clear=True)
+        sampled = get_tracer("Sampled.Module")
+        for i in range(12):
+            sampled.event(lambda: f"event {i}")
+        assert [text for _, _, text in recent_events()] == ["event 3", "event 7", "event 11"]
+
+        # The longest prefix wins; a tracer created before configuring follows it
+        everything = get_tracer("Sampled.Everything.Child")
+        for i in range(10):
+            everything.event("value %d", i)
+        assert [text for _, _, text in recent_events()] == [f"value {i}" for i in range(5, 10)]
+
+        # Unpickling yields the shared tracer of the receiving process
+        assert pickle.loads(pickle.dumps(everything)) is everything
+
+        assert dump_recent(logger, "test") == 5
+        assert recent_events() == []
+    finally:
+        configure_tracing({})
+
+
+def test_spans():
+    """Spans and timed functions add up per stage"""
+    configure_tracing({"Spans": 1.0})
+    tracer = get_tracer("Spans")
+    try:
+        span_report(reset=True)
+
+        @timed("filter", tracer)
+        def work():
+            return sum(range(1000))
+
+        for _ in range(3):
+            with tracer.span("signal"):
+                work()
+        report = span_report(reset=True)
+        assert report["signal"]["count"] == 3 and report["filter"]["count"] == 3
+        assert report["signal"]["total_s"] >= report["filter"]["total_s"] > 0
+    finally:
+        configure_tracing({})
+
+
+def main():
+    """Run all tests"""
+    logger.info("=== Starting Tracing Tests ===")
+
+    test_disabled_tracers_are_free()
+    logger.info("Disabled tracers build nothing")
+
+    test_sampling_and_ring_buffer()
+    logger.info("Sampling and ring buffer work")
+
+    test_spans()
+    logger.info("Stage spans are timed")
+
+    logger.info("=== Tracing Tests Completed ===")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test script for the walk-forward harness.
+Checks rolling and anchored folds, in-sample selection and out-of-sample
+runs on a small deterministic system, the fold cache on re-runs, the
+stitched equity curve, and that parallel folds match a serial run.
+"""
+
+import datetime as dt
+import logging
+import tempfile
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+from bar_store import BarBuffer
+from walk_forward import WalkForward, grid_combinations, make_folds, stitch_equity
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Backtests run in this process (max_workers=1)
+RUNS = []
+
+
+class ToySystem:
+    """Long above a moving average of 'lookback' closes, on deterministic bars"""
+
+    def __init__(self, config):
+        self.lookback = config['strategy']['lookback']
+        self.buffer = None
+
+    def load_backtest_data(self, start_date, end_date):
+        days = pd.date_range(pd.Timestamp(start_date) - pd.Timedelta(days=60), end_date, freq='D', tz='UTC')
+        step = np.arange(len(days))
+        close = 100 * np.exp(0.0004 * step + 0.05 * np.sin(step / 9.0) + 0.02 * np.sin(step / 2.3))
+        self.buffer = BarBuffer(capacity=None)
+        self.buffer.extend_arrays(days.as_unit('ns').asi8, close, close * 1.01, close * 0.99, close, np.full(len(days), 1e6))
+        self.buffer.tz = days.tz
+        return {'TOY': self.buffer}
+
+    def attach_backtest_data(self, columns):
+        ts_ns, data, tz = columns['TOY']
+        self.buffer = BarBuffer(capacity=None)
+        self.buffer.attach(ts_ns, data, tz)
+
+    def run_backtest(self, start_date, end_date):
+        RUNS.append((self.lookback, start_date, end_date))
+        bars = self.buffer.view()
+        times = bars.index
+        close = pd.Series(bars.close, index=times)
+        average = close.rolling(self.lookback).mean()
+        position = (close > average).shift(1, fill_value=False).astype(float)
+        returns = (close.pct_change().fillna(0) * position)
+        window = (times.date >= start_date) & (times.date <= end_date)
+        equity = 100000 * (1 + returns[window]).cumprod()
+        daily = returns[window]
+        # Like MultiStrategySystem, the curve starts with the initial capital
+        opening = (equity.index[0] - pd.Timedelta(hours=1)).to_pydatetime()
+        return SimpleNamespace(
+            total_return_pct=(equity.iloc[-1] / 100000 - 1) * 100,
+            sharpe_ratio=float(daily.mean() / daily.std() * np.sqrt(252)) if daily.std() > 0 else 0.0,
+            total_trades=int(position[window].diff().abs().sum()),
+            equity_curve=[(opening, 100000.0)] + list(zip(equity.index.to_pydatetime(), equity.values))
+        )
+
+
+def build_toy_system(config):
+    return ToySystem(config)
+
+
+def test_folds():
+    """Rolling folds move both windows; anchored folds grow the training window"""
+    start, end = dt.date(2023, 1, 1), dt.date(2023, 12, 31)
+    rolling = make_folds(start, end, train_days=120, test_days=60)
+    assert len(rolling) == 5
+    assert rolling[0].train_end == dt.date(2023, 4, 30) and rolling[0].test_start == dt.date(2023, 5, 1)
+    assert rolling[1].train_start == dt.date(2023, 3, 2) and rolling[1].test_start == rolling[0].test_end + dt.timedelta(days=1)
+    assert rolling[-1].test_end == end
+
+    anchored = make_folds(start, end, train_days=120, test_days=60, anchored=True)
+    assert all(fold.train_start == start for fold in anchored)
+    assert [fold.test_start for fold in anchored] == [fold.test_start for fold in rolling]
+
+    try:
+        make_folds(start, end, train_days=0, test_days=10)
+        assert False, "empty windows must be rejected"
+    except ValueError:
+        pass
+
+
+def test_cached_walk_forward():
+    """Folds pick their in-sample best, stitch out of sample and are cached"""
+    combinations = grid_combinations({'strategy': {'lookback': 5, 'name': 'toy'}}, 'strategy', {'lookback': [3, 10, 30]})
+    assert [config['strategy'] for _, config in combinations][1] == {'lookback': 10, 'name': 'toy'}
+    folds = make_folds(dt.date(2023, 1, 1), dt.date(2023, 9, 27), train_days=90, test_days=45)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        walk = WalkForward(build_toy_system, combinations, cache_dir=tmp, max_workers=1)
+        RUNS.clear()
+        result = walk.run(folds)
+        assert len(RUNS) == len(folds) * 4 and len(result.folds) == len(folds)
+
+        # Every fold's best candidate has the highest in-sample Sharpe ratio
+        for record, fold in zip(result.folds, folds):
+            scores = {lookback: build_toy_system({'strategy': {'lookback': lookback}})
+                      for lookback in (3, 10, 30)}
+            for lookback, system in scores.items():
+                system.load_backtest_data(dt.date(2023, 1, 1), dt.date(2023, 9, 30))
+            sharpe = {lookback: system.run_backtest(fold.train_start, fold.train_end).sharpe_ratio
+                      for lookback, system in scores.items()}
+            assert record['best_params']['lookback'] == max(sharpe, key=sharpe.get)
+            assert record['in_sample']['sharpe_ratio'] == max(sharpe.values())
+
+        # The stitched curve compounds the out-of-sample returns
+        expected = np.prod([1 + record['out_of_sample']['total_return_pct'] / 100 for record in result.folds])
+        assert np.isclose(result.total_return_pct, (expected - 1) * 100)
+        assert result.equity_curve.index.is_monotonic_increasing
+        assert len(result.summary()) == len(folds) and 'oos_sharpe_ratio' in result.summary()
+
+        # A re-run only runs folds it has not seen
+        RUNS.clear()
+        extended = make_folds(dt.date(2023, 1, 1), dt.date(2023, 11, 11), train_days=90, test_days=45)
+        again = walk.run(extended)
+        assert len(RUNS) == 4 and len(again.folds) == len(folds) + 1
+        assert np.allclose(again.equity_curve.iloc[:len(result.equity_curve)], result.equity_curve)
+
+        # Other candidates are a different cache entry
+        other = WalkForward(build_toy_system, combinations[:2], cache_dir=tmp, max_workers=1)
+        assert other.load_fold(folds[0]) is None and walk.load_fold(folds[0]) is not None
+
+
+def test_parallel_matches_serial():
+    """Folds run on a process pool give the same results"""
+    combinations = grid_combinations({'strategy': {}}, 'strategy', {'lookback': [4, 12, 25]})
+    folds = make_folds(dt.date(2023, 1, 1), dt.date(2023, 8, 31), train_days=60, test_days=30, anchored=True)
+    with tempfile.TemporaryDirectory() as serial_dir, tempfile.TemporaryDirectory() as parallel_dir:
+        serial = WalkForward(build_toy_system, combinations, cache_dir=serial_dir, max_workers=1).run(folds)
+        parallel = WalkForward(build_toy_system, combinations, cache_dir=parallel_dir, max_workers=3).run(folds)
+    assert [r['best_params'] for r in parallel.folds] == [r['best_params'] for r in serial.folds]
+    assert np.allclose(parallel.equity_curve, serial.equity_curve)
+
+    assert stitch_equity([]).empty
+
+
+def main():
+    """Run all tests"""
+    logger.info("=== Starting Walk-Forward Tests ===")
+
+    test_folds()
+    logger.info("Folds are correct")
+
+    test_cached_walk_forward()
+    logger.info("Walk-forward selection, stitching and cache work")
+
+    test_parallel_matches_serial()
+    logger.info("Parallel folds match the serial run")
+
+    logger.info("=== Walk-Forward Tests Completed ===")
+
+
+if __name__ == "__main__":
+    main()
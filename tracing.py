@@ -0,0 +1,245 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Hot-Path Tracing
+-------------------------------------
+Cheap diagnostics for code that runs per symbol, per bar or per strategy,
+where INFO logging (string formatting plus handler I/O) used to dominate
+the cost of a backtest.
+
+- Events: ``tracer.event(lambda: f"...")`` records a message. When tracing
+  is disabled for the tracer's module this is one attribute check; the
+  message is only built for events that are recorded.
+- Sampling: each module (tracer name prefix) has a rate between 0 and 1.
+  A rate of 0.1 records every 10th event of a tracer.
+- Ring buffer: recorded events go to an in-memory ring buffer, not to the
+  log handlers. ``dump_recent()`` writes what led up to an error.
+- Spans: ``with tracer.span("signal"):`` and ``@timed("filter", tracer)`` collect
+  count/total/max timings per pipeline stage; ``span_report()`` returns them.
+
+Tracing is off unless configured, either in code or through the
+TRADING_TRACE environment variable ("Strategy=0.1,MultiStrategySystem=1").
+
+Usage:
+    configure_tracing({"Strategy": 0.1, "MultiStrategySystem": 1.0})
+    trace = get_tracer("Strategy.MeanReversion")
+    trace.event(lambda: f"{symbol} RSI: {rsi:.2f}")
+    with trace.span("signal"):
+        ...
+    dump_recent(logger)
+"""
+
+import functools
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger("Tracing")
+
+DEFAULT_BUFFER_SIZE = 10000
+
+# Recorded events: (unix time, tracer name, message)
+_ring = deque(maxlen=DEFAULT_BUFFER_SIZE)
+_rates: Dict[str, float] = {}
+_echo = False
+_tracers: Dict[str, "Tracer"] = {}
+_tracers_lock = threading.Lock()
+
+# Stage -> [count, total seconds, max seconds]
+_spans: Dict[str, list] = {}
+_spans_lock = threading.Lock()
+
+
+def _rate_for(name: str) -> float:
+    """Sample rate of the longest configured prefix of a tracer name"""
+    best, rate = -1, 0.0
+    for prefix, value in _rates.items():
+        if (name == prefix or name.startswith(prefix + ".") or prefix == "*") and len(prefix) > best:
+            best, rate = len(prefix), value
+    return rate
+
+
+class _NullSpan:
+    """Span used while tracing is disabled"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    """Times one pass through a stage"""
+
+    __slots__ = ("stage", "start")
+
+    def __init__(self, stage: str):
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        with _spans_lock:
+            stats = _spans.setdefault(self.stage, [0, 0.0, 0.0])
+            stats[0] += 1
+            stats[1] += elapsed
+            stats[2] = max(stats[2], elapsed)
+        return False
+
+
+class Tracer:
+    """Sampled event recorder for one module"""
+
+    __slots__ = ("name", "enabled", "_stride", "_count")
+
+    def __init__(self, name: str):
+        self.name = name
+        self._count = 0
+        self._apply(_rate_for(name))
+
+    def __reduce__(self):
+        # Unpickled tracers (e.g. in strategy worker processes) are the
+        # receiving process's shared tracer of the same name
+        return (get_tracer, (self.name,))
+
+    def _apply(self, rate: float):
+        self.enabled = rate > 0
+        self._stride = max(1, int(round(1.0 / rate))) if rate > 0 else 0
+
+    def event(self, message, *args):
+        """Record an event if tracing is enabled and the event is sampled
+
+        Args:
+            message: Text, a %-format string used with ``args``, or a
+                callable returning the text (built only when recorded)
+        """
+        if not self.enabled:
+            return
+        self._count += 1
+        if self._count < self._stride:
+            return
+        self._count = 0
+
+        if args:
+            text = message % args
+        elif callable(message):
+            text = message()
+        else:
+            text = message
+        _ring.append((time.time(), self.name, text))
+        if _echo:
+            logging.getLogger(self.name).debug(text)
+
+    def span(self, stage: str):
+        """Context manager timing a pipeline stage (no-op while disabled)"""
+        return _Span(stage) if self.enabled else _NULL_SPAN
+
+
+def get_tracer(name: str) -> Tracer:
+    """Shared tracer for a module name"""
+    with _tracers_lock:
+        if name not in _tracers:
+            _tracers[name] = Tracer(name)
+        return _tracers[name]
+
+
+def timed(stage: str, tracer: Tracer) -> Callable:
+    """Decorator timing every call of a function as ``stage``"""
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return function(*args, **kwargs)
+            with _Span(stage):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def configure_tracing(rates: Optional[Dict[str, float]] = None, buffer_size: int = DEFAULT_BUFFER_SIZE,
+                      echo: bool = False):
+    """Set the sample rates and buffer size (applies to existing tracers too)
+
+    Args:
+        rates (dict): Tracer name prefix -> sample rate in [0, 1]; "*"
+            matches every tracer. None or {} disables tracing.
+        buffer_size (int): Events kept in the ring buffer
+        echo (bool): Also send recorded events to the module's logger at DEBUG
+    """
+    global _ring, _rates, _echo
+    _rates = {prefix: min(1.0, max(0.0, float(rate))) for prefix, rate in (rates or {}).items()}
+    _echo = echo
+    if _ring.maxlen != buffer_size:
+        _ring = deque(_ring, maxlen=buffer_size)
+    with _tracers_lock:
+        for tracer in _tracers.values():
+            tracer._apply(_rate_for(tracer.name))
+
+
+def tracing_enabled() -> bool:
+    """True if any module is traced"""
+    return any(rate > 0 for rate in _rates.values())
+
+
+def recent_events(clear: bool = False) -> list:
+    """Events in the ring buffer, oldest first"""
+    events = list(_ring)
+    if clear:
+        _ring.clear()
+    return events
+
+
+def dump_recent(target: Optional[logging.Logger] = None, reason: str = "error") -> int:
+    """Write the buffered events to a logger in one record and clear the buffer
+
+    Args:
+        target (Logger): Logger to write to (the Tracing logger by default)
+        reason (str): Why the buffer is dumped
+
+    Returns:
+        int: Number of events written
+    """
+    events = recent_events(clear=True)
+    if events:
+        lines = [f"{time.strftime('%H:%M:%S', time.localtime(ts))}.{int(ts % 1 * 1000):03d} {name}: {text}"
+                 for ts, name, text in events]
+        (target or logger).error(f"Last {len(events)} trace events before {reason}:\n" + "\n".join(lines))
+    return len(events)
+
+
+def span_report(reset: bool = False) -> Dict[str, Dict[str, float]]:
+    """Timing per stage: calls, total seconds, mean and max milliseconds"""
+    with _spans_lock:
+        report = {stage: {"count": count, "total_s": total, "mean_ms": total / count * 1000 if count else 0.0,
+                          "max_ms": peak * 1000}
+                  for stage, (count, total, peak) in _spans.items()}
+        if reset:
+            _spans.clear()
+    return report
+
+
+def _rates_from_env(value: str) -> Dict[str, float]:
+    """Parse "Prefix=rate,Prefix=rate" (a bare prefix means rate 1)"""
+    rates = {}
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        prefix, _, rate = item.partition("=")
+        try:
+            rates[prefix.strip()] = float(rate) if rate else 1.0
+        except ValueError:
+            logger.warning(f"Ignoring invalid TRADING_TRACE entry '{item}'")
+    return rates
+
+
+if os.environ.get("TRADING_TRACE"):
+    configure_tracing(_rates_from_env(os.environ["TRADING_TRACE"]))
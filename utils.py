@@ -13,6 +13,8 @@ import numpy as np
 import logging
 from datetime import datetime, timedelta
 
+from performance_metrics import annualized_return, equity_returns, max_drawdown, sharpe_ratio, trade_statistics
+
 def setup_logging(log_level=logging.INFO):
     """
     Set up logging configuration.
@@ -94,57 +96,33 @@ def calculate_performance_metrics(results):
             'trade_count': 0
         }
     
-    # Calculate returns
-    portfolio_values['prev_value'] = portfolio_values['portfolio_value'].shift(1)
-    portfolio_values['daily_return'] = (portfolio_values['portfolio_value'] - portfolio_values['prev_value']) / portfolio_values['prev_value']
-    
-    # Calculate cumulative returns
-    initial_value = portfolio_values.iloc[0]['portfolio_value']
-    final_value = portfolio_values.iloc[-1]['portfolio_value']
+    values = portfolio_values['portfolio_value'].to_numpy(dtype=float)
+    initial_value = values[0]
+    final_value = values[-1]
     
     total_return = (final_value - initial_value) / initial_value * 100
     
     # Calculate annualized return
     days = (portfolio_values.iloc[-1]['timestamp'] - portfolio_values.iloc[0]['timestamp']).days
-    if days > 0:
-        annualized_return = ((final_value / initial_value) ** (365 / days) - 1) * 100
-    else:
-        annualized_return = 0.0
-    
-    # Calculate Sharpe ratio (assuming risk-free rate of 0)
-    daily_returns = portfolio_values['daily_return'].dropna()
-    if len(daily_returns) > 0 and daily_returns.std() > 0:
-        sharpe_ratio = (daily_returns.mean() / daily_returns.std()) * np.sqrt(252)  # Annualized
-    else:
-        sharpe_ratio = 0.0
-    
-    # Calculate maximum drawdown
-    portfolio_values['cumulative_max'] = portfolio_values['portfolio_value'].cummax()
-    portfolio_values['drawdown'] = (portfolio_values['portfolio_value'] - portfolio_values['cumulative_max']) / portfolio_values['cumulative_max'] * 100
-    max_drawdown = portfolio_values['drawdown'].min()
+    annualized_return_pct = annualized_return(total_return / 100, days) * 100
+    
+    # Sharpe ratio (risk-free rate of 0, sample standard deviation)
+    sharpe = sharpe_ratio(equity_returns(values), ddof=1)
+    
+    # Maximum drawdown (negative percentage)
+    max_drawdown_pct = -max_drawdown(values) * 100
     
     # Calculate win rate and profit factor from trades
     trades = results[results['action'].isin(['BUY', 'SELL'])]
-    
-    if len(trades) > 0:
-        winning_trades = trades[trades['pnl'] > 0]
-        losing_trades = trades[trades['pnl'] < 0]
-        
-        win_rate = len(winning_trades) / len(trades) if len(trades) > 0 else 0.0
-        
-        gross_profit = winning_trades['pnl'].sum() if len(winning_trades) > 0 else 0.0
-        gross_loss = abs(losing_trades['pnl'].sum()) if len(losing_trades) > 0 else 0.0
-        
-        profit_factor = gross_profit / gross_loss if gross_loss > 0 else float('inf')
-    else:
-        win_rate = 0.0
-        profit_factor = 0.0
+    trade_stats = trade_statistics(trades['pnl'].to_numpy(dtype=float)) if len(trades) > 0 else None
+    win_rate = trade_stats['win_rate'] if trade_stats else 0.0
+    profit_factor = trade_stats['profit_factor'] if trade_stats else 0.0
     
     return {
         'total_return': total_return,
-        'annualized_return': annualized_return,
-        'sharpe_ratio': sharpe_ratio,
-        'max_drawdown': max_drawdown,
+        'annualized_return': annualized_return_pct,
+        'sharpe_ratio': sharpe,
+        'max_drawdown': max_drawdown_pct,
         'win_rate': win_rate,
         'profit_factor': profit_factor,
         'trade_count': len(trades) // 2  # Divide by 2 because each round trip is 2 trades (buy + sell)
@@ -0,0 +1,363 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Walk-Forward Optimization
+-------------------------------------
+Rolling or anchored train/test folds over a date range. The parameters of
+every fold are optimized on its training window and then run on the test
+window that follows.
+
+The bars of the whole range are loaded once and shared with the worker
+processes (see parameter_sweep.SharedBars). The in-sample backtests of all
+folds go to one process pool. As soon as a fold's last candidate finishes,
+its best parameters are queued for the out-of-sample run. Each finished
+fold is written to its own JSON file, keyed by the hash of the candidate
+configurations and the fold's date range. A re-run skips completed folds
+and only runs new or changed ones.
+
+The out-of-sample equity curves of the test windows are chained into one
+curve: each window starts with the capital the previous one ended with.
+
+Usage:
+    folds = make_folds(dt.date(2022, 1, 1), dt.date(2023, 12, 31), train_days=180, test_days=60)
+    walk = WalkForward(build_system, grid_combinations(config, "signal_quality_filters", grid))
+    result = walk.run(folds)
+    result.summary()         # best parameters and in/out-of-sample metrics per fold
+    result.equity_curve      # stitched out-of-sample equity
+"""
+
+import copy
+import datetime as dt
+import hashlib
+import itertools
+import json
+import logging
+import math
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+import pandas as pd
+
+from parameter_sweep import SharedBars, _init_worker, result_metrics, run_backtest_on_bars
+
+logger = logging.getLogger("WalkForward")
+
+
+@dataclass(frozen=True)
+class Fold:
+    """Training window and the test window that follows it"""
+    index: int
+    train_start: dt.date
+    train_end: dt.date
+    test_start: dt.date
+    test_end: dt.date
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: str(value) if isinstance(value, dt.date) else value for name, value in asdict(self).items()}
+
+
+def make_folds(start_date: dt.date, end_date: dt.date, train_days: int, test_days: int,
+               step_days: Optional[int] = None, anchored: bool = False) -> List[Fold]:
+    """Split a date range into walk-forward folds
+
+    Args:
+        start_date (date): First day of the first training window
+        end_date (date): Last day of the last test window
+        train_days (int): Calendar days of the (first) training window
+        test_days (int): Calendar days of each test window
+        step_days (int): Days between folds (test_days by default, so the
+            test windows tile the range)
+        anchored (bool): Keep every training window starting at start_date
+            (growing) instead of rolling it forward
+
+    Returns:
+        list: Folds in date order; the last test window may be shorter
+    """
+    if train_days < 1 or test_days < 1:
+        raise ValueError("Training and test windows need at least one day")
+    step = step_days or test_days
+    folds = []
+    while True:
+        offset = dt.timedelta(days=len(folds) * step)
+        train_end = start_date + offset + dt.timedelta(days=train_days - 1)
+        test_start = train_end + dt.timedelta(days=1)
+        if test_start > end_date:
+            break
+        folds.append(Fold(
+            index=len(folds),
+            train_start=start_date if anchored else start_date + offset,
+            train_end=train_end,
+            test_start=test_start,
+            test_end=min(test_start + dt.timedelta(days=test_days - 1), end_date)
+        ))
+    return folds
+
+
+def grid_combinations(base_config: Dict, section: str, param_grid: Dict[str, List]) -> List[Tuple[Dict, Dict]]:
+    """(params, config) pairs of a parameter grid applied to one config section"""
+    combinations = []
+    for values in itertools.product(*param_grid.values()):
+        params = dict(zip(param_grid.keys(), values))
+        config = copy.deepcopy(base_config)
+        config.setdefault(section, {}).update(params)
+        combinations.append((params, config))
+    return combinations
+
+
+def _hash(payload: Any) -> str:
+    return hashlib.sha1(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def _run_job(system_factory: Callable, config: Dict, start_date: dt.date, end_date: dt.date,
+             with_equity: bool = False, columns=None) -> Tuple[Optional[Dict], Optional[List], Optional[str]]:
+    """One backtest: (metrics, equity curve if requested, error)"""
+    try:
+        result = run_backtest_on_bars(system_factory, config, start_date, end_date, columns)
+        equity = [(pd.Timestamp(t).isoformat(), float(v)) for t, v in result.equity_curve] if with_equity else None
+        return result_metrics(result), equity, None
+    except Exception as e:
+        return None, None, f"{type(e).__name__}: {e}"
+
+
+def stitch_equity(folds: List[Dict], initial_capital: float = 100000) -> pd.Series:
+    """Chain the out-of-sample equity curves of consecutive folds
+
+    Each test window is rescaled to start with the capital the previous
+    window ended with.
+    """
+    capital = initial_capital
+    parts = []
+    for fold in sorted(folds, key=lambda record: record["fold"]["test_start"]):
+        curve = fold.get("equity_curve") or []
+        if not curve or not curve[0][1]:
+            continue
+        times = pd.to_datetime([t for t, _ in curve])
+        values = pd.Series([v for _, v in curve], index=times, dtype=float)
+        scaled = values * (capital / values.iloc[0])
+        parts.append(scaled)
+        capital = float(scaled.iloc[-1])
+    if not parts:
+        return pd.Series(dtype=float)
+    return pd.concat(parts)
+
+
+@dataclass
+class WalkForwardResult:
+    """Completed folds and their stitched out-of-sample equity"""
+    folds: List[Dict]
+    equity_curve: pd.Series
+    initial_capital: float
+
+    @property
+    def total_return_pct(self) -> float:
+        if self.equity_curve.empty:
+            return 0.0
+        return (self.equity_curve.iloc[-1] / self.initial_capital - 1) * 100
+
+    def summary(self) -> pd.DataFrame:
+        """Best parameters and in/out-of-sample metrics per fold"""
+        rows = []
+        for record in self.folds:
+            row = dict(record["fold"])
+            row["best_params"] = json.dumps(record["best_params"], sort_keys=True, default=str)
+            for prefix, metrics in (("is", record["in_sample"]), ("oos", record["out_of_sample"])):
+                row.update({f"{prefix}_{name}": value for name, value in (metrics or {}).items()})
+            rows.append(row)
+        return pd.DataFrame(rows)
+
+
+class WalkForward:
+    """Parallel walk-forward optimization with cached folds"""
+
+    def __init__(self, system_factory: Callable, combinations: List[Tuple[Dict, Dict]],
+                 cache_dir: str = "walk_forward_results",
+                 objective: Union[str, Callable[[Dict], float]] = "sharpe_ratio",
+                 max_workers: Optional[int] = None, initial_capital: float = 100000):
+        """Initialize the harness
+
+        Args:
+            system_factory (callable): Module-level function mapping a config
+                dictionary to a MultiStrategySystem (it must be picklable)
+            combinations (list): Candidate (params, config_dict) pairs; all
+                must replay the same bars (same symbols and data source)
+            cache_dir (str): Directory of the per-fold JSON results
+            objective: Metric name to maximize in sample, or a function of
+                the metrics dictionary
+            max_workers (int): Worker processes (CPU count by default, 1 runs
+                in the calling process)
+            initial_capital (float): Capital the stitched equity starts with
+        """
+        if not combinations:
+            raise ValueError("Walk-forward optimization needs at least one candidate")
+        self.system_factory = system_factory
+        self.combinations = combinations
+        self.cache_dir = cache_dir
+        self.objective = objective
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.initial_capital = initial_capital
+        self.config_hash = _hash({"configs": [config for _, config in combinations],
+                                  "objective": objective if isinstance(objective, str) else objective.__name__})
+
+    def fold_key(self, fold: Fold) -> str:
+        """Cache key of a fold: candidate configs and the fold's date range"""
+        return _hash({"config": self.config_hash, "train": [fold.train_start, fold.train_end],
+                      "test": [fold.test_start, fold.test_end]})
+
+    def _fold_file(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"fold_{key}.json")
+
+    def load_fold(self, fold: Fold) -> Optional[Dict]:
+        """Cached result of a fold, if it was completed before"""
+        try:
+            with open(self._fold_file(self.fold_key(fold)), "r") as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+
+    def _save_fold(self, record: Dict):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._fold_file(record["key"])
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "w") as file:
+            json.dump(record, file, default=str)
+        os.replace(temporary, path)
+
+    def _score(self, metrics: Optional[Dict]) -> float:
+        if metrics is None:
+            return -math.inf
+        value = metrics.get(self.objective) if isinstance(self.objective, str) else self.objective(metrics)
+        if value is None or (isinstance(value, float) and math.isnan(value)):
+            return -math.inf
+        return float(value)
+
+    def _best(self, in_sample: List[Optional[Dict]]) -> Optional[int]:
+        """Index of the best candidate (the first one on ties), None if all failed"""
+        scores = [self._score(metrics) for metrics in in_sample]
+        if all(metrics is None for metrics in in_sample):
+            return None
+        return max(range(len(scores)), key=lambda i: (scores[i], -i))
+
+    def _record(self, fold: Fold, in_sample: List[Optional[Dict]], best: Optional[int],
+                out_of_sample: Optional[Dict], equity: Optional[List], error: Optional[str]) -> Dict:
+        record = {
+            "key": self.fold_key(fold),
+            "fold": fold.to_dict(),
+            "candidates": len(self.combinations),
+            "failed_candidates": sum(metrics is None for metrics in in_sample),
+            "best_params": self.combinations[best][0] if best is not None else None,
+            "in_sample": in_sample[best] if best is not None else None,
+            "out_of_sample": out_of_sample,
+            "equity_curve": equity
+        }
+        if error:
+            record["error"] = error
+            logger.error(f"Fold {fold.index} ({fold.test_start} to {fold.test_end}) failed: {error}")
+        else:
+            self._save_fold(record)
+            logger.info(f"Fold {fold.index}: best {record['best_params']}, out-of-sample return "
+                        f"{out_of_sample.get('total_return_pct')}")
+        return record
+
+    def run(self, folds: List[Fold]) -> WalkForwardResult:
+        """Optimize and test every fold not already in the cache
+
+        Args:
+            folds (list): Folds from make_folds
+
+        Returns:
+            WalkForwardResult: Completed folds in fold order and the stitched
+                out-of-sample equity curve (failed folds are left out and
+                retried on the next run)
+        """
+        records = {fold.index: self.load_fold(fold) for fold in folds}
+        pending = [fold for fold in folds if records[fold.index] is None]
+        logger.info(f"Walk-forward over {len(folds)} folds x {len(self.combinations)} candidates: "
+                    f"{len(folds) - len(pending)} cached, {len(pending)} to run")
+
+        if pending:
+            # Load the bars of the whole range once for every fold
+            start = min(fold.train_start for fold in pending)
+            end = max(fold.test_end for fold in pending)
+            system = self.system_factory(self.combinations[0][1])
+            streams = system.load_backtest_data(start, end)
+            if self.max_workers == 1:
+                records.update(self._run_inline(streams, pending))
+            else:
+                records.update(self._run_parallel(streams, pending))
+
+        completed = [records[fold.index] for fold in folds
+                     if records[fold.index] is not None and "error" not in records[fold.index]]
+        return WalkForwardResult(completed, stitch_equity(completed, self.initial_capital), self.initial_capital)
+
+    def _run_inline(self, streams, pending: List[Fold]) -> Dict[int, Dict]:
+        columns = {name: (*buffer.columns, buffer.tz) for name, buffer in streams.items()}
+        records = {}
+        for fold in pending:
+            in_sample = [self._candidate(fold, i, _run_job(self.system_factory, config, fold.train_start,
+                                                           fold.train_end, columns=columns))
+                         for i, (_, config) in enumerate(self.combinations)]
+            records[fold.index] = self._test(fold, in_sample, lambda config: _run_job(
+                self.system_factory, config, fold.test_start, fold.test_end, True, columns))
+        return records
+
+    def _candidate(self, fold: Fold, i: int, outcome: Tuple) -> Optional[Dict]:
+        """In-sample metrics of one candidate (None if its backtest failed)"""
+        metrics, _, error = outcome
+        if error:
+            logger.warning(f"Fold {fold.index}: backtest failed for {self.combinations[i][0]}: {error}")
+        return metrics
+
+    def _test(self, fold: Fold, in_sample: List[Optional[Dict]], run: Callable) -> Dict:
+        """Run the best candidate of a fold out of sample and record the fold"""
+        best = self._best(in_sample)
+        if best is None:
+            return self._record(fold, in_sample, None, None, None, "every in-sample backtest failed")
+        metrics, equity, error = run(self.combinations[best][1])
+        return self._record(fold, in_sample, best, metrics, equity, error)
+
+    def _run_parallel(self, streams, pending: List[Fold]) -> Dict[int, Dict]:
+        """In-sample runs of all folds on one pool, each fold's test run queued when it is ready"""
+        records = {}
+        in_sample = {fold.index: [None] * len(self.combinations) for fold in pending}
+        remaining = {fold.index: len(self.combinations) for fold in pending}
+        with SharedBars(streams) as shared:
+            workers = min(self.max_workers, len(pending) * len(self.combinations))
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(shared.handle,)) as executor:
+                futures = {}
+                for fold in pending:
+                    for i, (_, config) in enumerate(self.combinations):
+                        future = executor.submit(_run_job, self.system_factory, config,
+                                                 fold.train_start, fold.train_end)
+                        futures[future] = ("train", fold, i)
+
+                while futures:
+                    done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        stage, fold, i = futures.pop(future)
+                        try:
+                            outcome = future.result()
+                        except Exception as e:
+                            # The worker itself died (e.g. killed or out of memory)
+                            outcome = (None, None, f"{type(e).__name__}: {e}")
+
+                        if stage == "test":
+                            records[fold.index] = self._record(fold, in_sample[fold.index], i, *outcome)
+                            continue
+
+                        in_sample[fold.index][i] = self._candidate(fold, i, outcome)
+                        remaining[fold.index] -= 1
+                        if remaining[fold.index]:
+                            continue
+                        best = self._best(in_sample[fold.index])
+                        if best is None:
+                            records[fold.index] = self._record(fold, in_sample[fold.index], None, None, None,
+                                                               "every in-sample backtest failed")
+                            continue
+                        test = executor.submit(_run_job, self.system_factory, self.combinations[best][1],
+                                               fold.test_start, fold.test_end, True)
+                        futures[test] = ("test", fold, best)
+        return records
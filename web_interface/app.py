@@ -16,11 +16,14 @@ import subprocess
 import threading
 from datetime import datetime
 import pandas as pd
-from flask import Flask, render_template, request, jsonify, redirect, url_for
+from flask import Flask, render_template, request, jsonify, redirect, url_for, Response, stream_with_context
 
 # Add parent directory to path to import strategy modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from process_log_buffer import ProcessLogBuffer, sse_events
+from results_catalog import ResultsCatalog, CatalogWatcher
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -40,6 +43,10 @@ config_file = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__fil
 active_processes = {}
 process_logs = {}
 process_status = {}
+# Output lines kept per process; older lines are dropped
+process_log_max_lines = int(os.environ.get('PROCESS_LOG_MAX_LINES', 5000))
+results_catalog = None
+catalog_lock = threading.Lock()
 config_data = None
 
 def load_config():
@@ -65,66 +72,46 @@ def save_config(config):
         logger.error(f"Error saving configuration: {str(e)}")
         return False
 
-def get_backtest_results():
-    """Get list of backtest result files"""
+def get_results_catalog():
+    """Get the results catalog, indexing the results and trades directories on first use"""
+    global results_catalog
+    with catalog_lock:
+        if results_catalog is None:
+            if not config_data:
+                load_config()
+            paths = (config_data or {}).get('paths', {})
+            results_catalog = ResultsCatalog(
+                os.path.join('..', paths.get('results_catalog', 'backtest_results/results_catalog.db')),
+                roots={
+                    'backtest': os.path.join('..', 'backtest_results'),
+                    'positions': os.path.join('..', paths.get('trades', 'trades'))
+                }
+            )
+            CatalogWatcher(results_catalog).start()
+        return results_catalog
+
+def get_backtest_results(page=1, per_page=50, **filters):
+    """Get a page of backtest result files, newest first
+
+    Args:
+        page (int): Page number, starting at 1
+        per_page (int): Results per page
+        **filters: start_date, end_date, search, min_return, sort, descending
+            (see ResultsCatalog.backtest_runs)
+
+    Returns:
+        dict: 'results', 'total', 'page' and 'per_page'
+    """
     try:
-        results_dir = os.path.join('..', 'backtest_results')
-        if not os.path.exists(results_dir):
-            return []
-        
-        result_files = []
-        for file in os.listdir(results_dir):
-            if file.endswith('.csv'):
-                file_path = os.path.join(results_dir, file)
-                mod_time = datetime.fromtimestamp(os.path.getmtime(file_path))
-                result_files.append({
-                    'name': file,
-                    'path': file_path,
-                    'date': mod_time.strftime('%Y-%m-%d %H:%M:%S')
-                })
-        
-        # Sort by date (newest first)
-        result_files.sort(key=lambda x: x['date'], reverse=True)
-        return result_files
+        return get_results_catalog().backtest_runs(page=page, per_page=per_page, **filters)
     except Exception as e:
         logger.error(f"Error getting backtest results: {str(e)}")
-        return []
+        return {'results': [], 'total': 0, 'page': page, 'per_page': per_page}
 
-def get_open_positions():
-    """Get list of open positions from CSV files"""
+def get_open_positions(symbol=None):
+    """Get open positions from the newest position snapshot"""
     try:
-        if not config_data:
-            load_config()
-        
-        trades_dir = os.path.join('..', config_data.get('paths', {}).get('trades', 'trades'))
-        if not os.path.exists(trades_dir):
-            return []
-        
-        position_files = []
-        for file in os.listdir(trades_dir):
-            if 'position' in file.lower() and file.endswith('.csv'):
-                file_path = os.path.join(trades_dir, file)
-                mod_time = datetime.fromtimestamp(os.path.getmtime(file_path))
-                position_files.append({
-                    'name': file,
-                    'path': file_path,
-                    'date': mod_time.strftime('%Y-%m-%d %H:%M:%S')
-                })
-        
-        # Sort by date (newest first)
-        position_files.sort(key=lambda x: x['date'], reverse=True)
-        
-        # Get positions from the most recent file
-        if position_files:
-            try:
-                df = pd.read_csv(position_files[0]['path'])
-                positions = df.to_dict('records')
-                return positions
-            except Exception as e:
-                logger.error(f"Error reading positions file: {str(e)}")
-                return []
-        
-        return []
+        return get_results_catalog().latest_positions(symbol)
     except Exception as e:
         logger.error(f"Error getting open positions: {str(e)}")
         return []
@@ -138,7 +125,7 @@ def run_process(script, args, process_name):
         cmd = [sys.executable, os.path.join('..', script)] + args
         
         # Initialize log
-        process_logs[process_name] = []
+        process_logs[process_name] = ProcessLogBuffer(process_log_max_lines)
         process_status[process_name] = 'starting'
         
         # Start process
@@ -157,8 +144,9 @@ def run_process(script, args, process_name):
         
         # Read output
         for line in process.stdout:
-            process_logs[process_name].append(line.strip())
-            logger.info(f"[{process_name}] {line.strip()}")
+            line = line.strip()
+            process_logs[process_name].append(line)
+            logger.info(f"[{process_name}] {line}")
         
         # Process completed
         process.wait()
@@ -168,6 +156,7 @@ def run_process(script, args, process_name):
         else:
             process_status[process_name] = 'failed'
             logger.error(f"Process {process_name} failed with return code {process.returncode}")
+        process_logs[process_name].close()
         
         # Remove from active processes
         if process_name in active_processes:
@@ -175,7 +164,10 @@ def run_process(script, args, process_name):
             
     except Exception as e:
         process_status[process_name] = 'error'
+        if process_name not in process_logs:
+            process_logs[process_name] = ProcessLogBuffer(process_log_max_lines)
         process_logs[process_name].append(f"Error: {str(e)}")
+        process_logs[process_name].close()
         logger.error(f"Error running process {process_name}: {str(e)}")
         
         # Remove from active processes
@@ -349,7 +341,7 @@ def index():
         load_config()
     
     # Get backtest results
-    backtest_results = get_backtest_results()
+    backtest_results = get_backtest_results(per_page=5)['results']
     
     # Get open positions
     open_positions = get_open_positions()
@@ -576,16 +568,49 @@ def stop_process_route(process_name):
 
 @app.route('/process_logs/<process_name>')
 def get_process_logs(process_name):
-    """Get logs for a process"""
-    if process_name in process_logs:
-        return jsonify({
-            'success': True,
-            'logs': process_logs[process_name],
-            'status': process_status.get(process_name, 'unknown')
-        })
-    else:
+    """Get logs for a process
+
+    Without a cursor the newest lines are returned. Pass the returned
+    'cursor' back as ?cursor= to get only the lines added since.
+    """
+    if process_name not in process_logs:
         return jsonify({'success': False, 'message': f'Process {process_name} not found'})
 
+    buffer = process_logs[process_name]
+    cursor = request.args.get('cursor', type=int)
+    limit = request.args.get('limit', default=1000, type=int)
+    lines, next_cursor, dropped = buffer.read(cursor, max(1, min(limit, buffer.max_lines)))
+    return jsonify({
+        'success': True,
+        'logs': lines,
+        'cursor': next_cursor,
+        'dropped': dropped,
+        'more': next_cursor < buffer.cursor,
+        'run_id': buffer.run_id,
+        'status': process_status.get(process_name, 'unknown')
+    })
+
+@app.route('/process_logs/<process_name>/stream')
+def stream_process_logs(process_name):
+    """Tail the logs of a process as server-sent events"""
+    if process_name not in process_logs:
+        return jsonify({'success': False, 'message': f'Process {process_name} not found'}), 404
+
+    # EventSource resends the id of the last event when it reconnects
+    cursor = request.headers.get('Last-Event-ID', type=int)
+    if cursor is None:
+        cursor = request.args.get('cursor', type=int)
+    events = sse_events(
+        process_logs[process_name],
+        cursor,
+        status=lambda: process_status.get(process_name, 'unknown')
+    )
+    return Response(
+        stream_with_context(events),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
 @app.route('/emergency_stop', methods=['POST'])
 def emergency_stop_route():
     """Emergency stop all processes and close all positions"""
@@ -594,15 +619,29 @@ def emergency_stop_route():
 
 @app.route('/get_positions')
 def get_positions_route():
-    """Get open positions"""
-    positions = get_open_positions()
+    """Get open positions (?symbol= for one symbol)"""
+    positions = get_open_positions(request.args.get('symbol'))
     return jsonify({'success': True, 'positions': positions})
 
 @app.route('/get_backtest_results')
 def get_backtest_results_route():
-    """Get backtest results"""
-    results = get_backtest_results()
-    return jsonify({'success': True, 'results': results})
+    """Get backtest results (?page=, per_page=, start_date=, end_date=, search=, min_return=, sort=)"""
+    filters = {
+        'start_date': request.args.get('start_date'),
+        'end_date': request.args.get('end_date'),
+        'search': request.args.get('search'),
+        'min_return': request.args.get('min_return', type=float),
+        'descending': request.args.get('order', 'desc') != 'asc'
+    }
+    sort = request.args.get('sort')
+    if sort:
+        filters['sort'] = sort
+    results = get_backtest_results(
+        page=request.args.get('page', default=1, type=int),
+        per_page=min(request.args.get('per_page', default=50, type=int), 500),
+        **filters
+    )
+    return jsonify({'success': True, **results})
 
 if __name__ == '__main__':
     # Load configuration
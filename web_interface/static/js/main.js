@@ -2,6 +2,109 @@
  * Main JavaScript file for S&P 500 Trading Strategy Web Interface
  */
 
+// Lines shown in the logs modal; older lines are removed as new ones arrive
+const MAX_LOG_LINES = 5000;
+let processLogStream = null;
+
+/**
+ * Show the logs of a process and keep appending new lines while the modal is open.
+ * The latest lines are fetched once, then tailed from their cursor with
+ * server-sent events (or polled with ?cursor= where EventSource is missing).
+ */
+function showProcessLogs(processName) {
+    const logsContent = document.getElementById('logsContent');
+    const logsModalEl = document.getElementById('logsModal');
+    let lines = [];
+    let runId = null;
+
+    let pending = [];
+    let scheduled = false;
+
+    // Lines are batched and drawn once per animation frame
+    function render(newLines, reset) {
+        if (reset) {
+            lines = [];
+            pending = [];
+        }
+        pending.push(...newLines);
+        if (!scheduled) {
+            scheduled = true;
+            requestAnimationFrame(flush);
+        }
+    }
+
+    function flush() {
+        scheduled = false;
+        lines = lines.concat(pending);
+        pending = [];
+        if (lines.length > MAX_LOG_LINES) {
+            lines = lines.slice(lines.length - MAX_LOG_LINES);
+        }
+        const atBottom = logsContent.scrollTop + logsContent.clientHeight >= logsContent.scrollHeight - 5;
+        logsContent.textContent = lines.join('\n');
+        if (atBottom) {
+            logsContent.scrollTop = logsContent.scrollHeight;
+        }
+    }
+
+    function closeStream() {
+        if (processLogStream) {
+            processLogStream.close();
+            processLogStream = null;
+        }
+    }
+
+    closeStream();
+    return fetch(`/process_logs/${processName}`)
+    .then(response => response.json())
+    .then(data => {
+        if (!data.success) {
+            return data;
+        }
+        runId = data.run_id;
+        render(data.logs, true);
+        bootstrap.Modal.getOrCreateInstance(logsModalEl).show();
+        logsModalEl.addEventListener('hidden.bs.modal', closeStream, { once: true });
+
+        // Only one tail at a time, even if several handlers opened the modal
+        closeStream();
+        if (window.EventSource) {
+            const source = new EventSource(`/process_logs/${processName}/stream?cursor=${data.cursor}`);
+            source.addEventListener('run', event => {
+                // The process was restarted: start over with the new run
+                if (event.data !== runId) {
+                    runId = event.data;
+                    render([], true);
+                }
+            });
+            source.addEventListener('message', event => render([event.data], false));
+            source.addEventListener('dropped', event => render([`... ${event.data} lines dropped ...`], false));
+            source.addEventListener('end', () => closeStream());
+            processLogStream = source;
+        } else {
+            let cursor = data.cursor;
+            const timer = setInterval(() => {
+                fetch(`/process_logs/${processName}?cursor=${cursor}`)
+                .then(response => response.json())
+                .then(update => {
+                    if (!update.success) {
+                        return;
+                    }
+                    const reset = update.run_id !== runId;
+                    runId = update.run_id;
+                    render(update.dropped ? [`... ${update.dropped} lines dropped ...`].concat(update.logs) : update.logs, reset);
+                    cursor = update.cursor;
+                    if (['completed', 'failed', 'error', 'terminated'].includes(update.status) && !update.more) {
+                        closeStream();
+                    }
+                });
+            }, 2000);
+            processLogStream = { close: () => clearInterval(timer) };
+        }
+        return data;
+    });
+}
+
 document.addEventListener('DOMContentLoaded', function() {
     // Initialize tooltips
     const tooltipTriggerList = [].slice.call(document.querySelectorAll('[data-bs-toggle="tooltip"]'));
@@ -158,19 +261,13 @@ document.addEventListener('DOMContentLoaded', function() {
                 this.innerHTML = '<span class="spinner-border spinner-border-sm" role="status" aria-hidden="true"></span>';
                 this.disabled = true;
                 
-                fetch(`/process_logs/${processName}`)
-                .then(response => response.json())
+                showProcessLogs(processName)
                 .then(data => {
                     // Reset button state
                     this.innerHTML = 'View Logs';
                     this.disabled = false;
                     
-                    if (data.success) {
-                        const logsContent = document.getElementById('logsContent');
-                        logsContent.textContent = data.logs.join('\n');
-                        const logsModal = new bootstrap.Modal(document.getElementById('logsModal'));
-                        logsModal.show();
-                    } else {
+                    if (!data.success) {
                         showNotification('Error: ' + data.message, 'danger');
                     }
                 })
@@ -246,7 +343,7 @@ document.addEventListener('DOMContentLoaded', function() {
     function refreshBacktestResults() {
         const backtestResultsDiv = document.getElementById('backtestResults');
         if (backtestResultsDiv) {
-            fetch('/get_backtest_results')
+            fetch('/get_backtest_results?per_page=5')
             .then(response => response.json())
             .then(data => {
                 if (data.success) {
@@ -263,7 +360,7 @@ document.addEventListener('DOMContentLoaded', function() {
                                 </thead>
                                 <tbody>`;
                         
-                        data.results.slice(0, 5).forEach(result => {
+                        data.results.forEach(result => {
                             html += `
                             <tr>
                                 <td>${result.name}</td>